@@ -0,0 +1,111 @@
+"""Load test for the quantity HTTP API.
+
+Opens ``--concurrency`` keep-alive connections and fires batched
+``/v1/quantities`` requests for ``--duration`` seconds, then reports
+requests/sec, elements/sec and p50/p99 latency. Without ``--external`` an
+in-process server is started on a free port.
+
+    python benchmarks/api_load.py --concurrency 32 --elements 500 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concrete_calc.api import QuantityServer  # noqa: E402
+
+
+def make_payload(n, seed=0):
+    rng = random.Random(seed)
+    return json.dumps({
+        "unit_system": "Metric (SI)",
+        "elements": [
+            {"element_id": f"E{i}", "length": rng.uniform(0.2, 8), "width": rng.uniform(0.2, 4),
+             "height": rng.uniform(0.1, 4), "mix": rng.choice(["1:2:4", "1:1.5:3"]),
+             "slump": rng.uniform(10, 180)}
+            for i in range(n)
+        ],
+    }).encode()
+
+
+async def client(host, port, path, body, deadline, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            status = int(status_line.split()[1])
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 503:
+                await asyncio.sleep(0.01)
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run(args):
+    server = None
+    host, port = args.host, args.port
+    if not args.external:
+        server = await QuantityServer("127.0.0.1", 0, args.workers, args.max_queue).start()
+        host, port = "127.0.0.1", server.port
+    body = make_payload(args.elements)
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(client(host, port, args.path, body, deadline, latencies, statuses)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    if server:
+        await server.close()
+
+    ok = statuses.get(200, 0)
+    print(f"{len(latencies)} requests in {elapsed:.1f} s with {args.concurrency} clients "
+          f"x {args.elements} elements ({args.path})")
+    print(f"  throughput: {len(latencies) / elapsed:.1f} req/s, {ok * args.elements / elapsed:,.0f} elements/s")
+    if latencies:
+        print(f"  latency:    p50 {1000 * percentile(latencies, 50):.1f} ms, "
+              f"p99 {1000 * percentile(latencies, 99):.1f} ms, max {1000 * max(latencies):.1f} ms")
+    print(f"  statuses:   {dict(sorted(statuses.items()))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--external", action="store_true",
+                        help="target an already running server at --host/--port instead of starting one")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--path", default="/v1/quantities")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--elements", type=int, default=100, help="elements per request")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, help="server compute threads (in-process server only)")
+    parser.add_argument("--max-queue", type=int, default=64, help="server queue bound (in-process server only)")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
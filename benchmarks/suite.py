@@ -0,0 +1,223 @@
+"""Benchmark suite for the calculator: math, figure, PDF and full-page reruns.
+
+Each benchmark is timed with ``timeit`` (auto-ranged, several repeats) and
+the best per-call time is kept. Results are written to
+``benchmarks/latest.json`` and compared with the saved baseline in
+``benchmarks/baseline.json``. A benchmark more than ``--threshold`` slower
+than its baseline is reported as a regression and the exit status is 1.
+
+    python benchmarks/suite.py                    # run and compare
+    python benchmarks/suite.py --only pdf app     # benchmarks whose name contains "pdf" or "app"
+    python benchmarks/suite.py --save-baseline    # run and store as the new baseline
+
+Baselines are machine specific; save a new one when changing hardware.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from concrete_calc.engine import DEFAULTS, UNIT_SYSTEMS, METRIC, compute_quantities, compute_single  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+LATEST_PATH = os.path.join(HERE, "latest.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 5
+BATCH_SIZE = 100_000
+
+DENSITIES = UNIT_SYSTEMS[METRIC]["densities"]
+MIX = (DEFAULTS["c_ratio"], DEFAULTS["s_ratio"], DEFAULTS["a_ratio"])
+FACTORS = (DEFAULTS["dry_factor"], DEFAULTS["wastage_percent"], DEFAULTS["wc_ratio"])
+
+
+# --- BENCHMARKS ---
+# Each setup function returns the zero-argument callable to time.
+def setup_calc_single():
+    return lambda: compute_single(3.0, 0.3, 0.5, *MIX, *DENSITIES, *FACTORS)
+
+
+def setup_calc_batch():
+    rng = np.random.default_rng(0)
+    l, w, h = rng.uniform(0.1, 8.0, (3, BATCH_SIZE))
+    return lambda: compute_quantities(l, w, h, *MIX, *DENSITIES, *FACTORS)
+
+
+def setup_figure_build():
+    from concrete_calc.figures import draw_3d_specimen
+
+    return lambda: draw_3d_specimen(3.0, 0.3, 0.5)
+
+
+def setup_figure_json():
+    from concrete_calc.figures import draw_3d_specimen
+
+    fig = draw_3d_specimen(3.0, 0.3, 0.5)
+    return fig.to_json
+
+
+def _pdf_args():
+    from concrete_calc.geometry import prism_mesh
+
+    q = compute_single(3.0, 0.3, 0.5, *MIX, *DENSITIES, *FACTORS)
+    return ("Beam", 3.0, 0.3, 0.5, "m³", "kg", *MIX, DEFAULTS["wc_ratio"],
+            q["wet_volume"], q["dry_volume"], DEFAULTS["dry_factor"], DEFAULTS["wastage_percent"],
+            q["weight_c"], q["weight_s"], q["weight_a"], q["weight_water"],
+            prism_mesh(3.0, 0.3, 0.5), 100, "Medium / Workable")
+
+
+def setup_pdf():
+    from concrete_calc.report import create_pdf
+
+    args = _pdf_args()
+    return lambda: create_pdf(*args)
+
+
+def setup_pdf_no_visual():
+    # The same report with the specimen drawing step replaced by a no-op.
+    from concrete_calc import report
+
+    args = _pdf_args()
+
+    def run():
+        draw_mesh, report.draw_mesh = report.draw_mesh, lambda *a, **k: 1
+        try:
+            return report.create_pdf(*args)
+        finally:
+            report.draw_mesh = draw_mesh
+    return run
+
+
+def _app():
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=120)
+
+
+def setup_app_first_run():
+    # A new session against a cold artifact cache.
+    from concrete_calc.artifact_cache import shared_cache
+
+    def run():
+        shared_cache().clear()
+        _app().run()
+    return run
+
+
+def setup_app_rerun():
+    # Widget-free rerun of a warm session, i.e. what every interaction used to cost.
+    at = _app().run()
+    if at.exception:
+        raise RuntimeError(f"main.py raised: {at.exception[0].message}")
+    return at.run
+
+
+BENCHMARKS = {
+    "calc_single": setup_calc_single,
+    f"calc_batch_{BATCH_SIZE}": setup_calc_batch,
+    "figure_build": setup_figure_build,
+    "figure_to_json": setup_figure_json,
+    "pdf_create": setup_pdf,
+    "pdf_create_no_visual": setup_pdf_no_visual,
+    "app_first_run": setup_app_first_run,
+    "app_rerun": setup_app_rerun,
+}
+
+
+# --- RUNNER ---
+def time_call(func, repeat=DEFAULT_REPEAT):
+    """Best and median seconds per call over ``repeat`` auto-ranged rounds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+    return {"best": per_call[0], "median": per_call[len(per_call) // 2], "number": number}
+
+
+def run_suite(names, repeat=DEFAULT_REPEAT, log=print):
+    results = {}
+    for name in names:
+        func = BENCHMARKS[name]()
+        func()  # warm-up (imports, caches)
+        results[name] = time_call(func, repeat)
+        log(f"{name:<24} {_fmt(results[name]['best']):>10}  (median {_fmt(results[name]['median'])}, "
+            f"{results[name]['number']} calls x {repeat})")
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """``(name, baseline_s, now_s, change)`` for every benchmark in both runs."""
+    rows = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before:
+            rows.append((name, before["best"], now["best"], now["best"] / before["best"] - 1))
+    return rows, [r for r in rows if r[3] > threshold]
+
+
+def _fmt(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def _save(path, results):
+    with open(path, "w") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+            "results": results,
+        }, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", metavar="TEXT", help="run benchmarks whose name contains TEXT")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression (default 0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", default=LATEST_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if not args.only or any(t in n for t in args.only)]
+    results = run_suite(names, args.repeat)
+    _save(args.output, results)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                # Keep entries for benchmarks that were not part of this run.
+                results = {**json.load(f)["results"], **results}
+        _save(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    rows, regressions = compare(results, baseline, args.threshold)
+    print(f"\n{'benchmark':<24} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, before, now, change in rows:
+        flag = "  REGRESSION" if change > args.threshold else ""
+        print(f"{name:<24} {_fmt(before):>10} {_fmt(now):>10} {change:>+8.1%}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) more than {args.threshold:.0%} slower than the baseline.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
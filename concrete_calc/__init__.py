@@ -0,0 +1,5 @@
+"""Importable calculation core behind the Concrete Mix Design Calculator.
+
+Submodules are imported on demand so that the pure-calculation path never
+pulls in Streamlit, Plotly or FPDF.
+"""
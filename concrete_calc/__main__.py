@@ -0,0 +1,5 @@
+import sys
+
+from concrete_calc.cli import main
+
+sys.exit(main())
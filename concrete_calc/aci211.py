@@ -0,0 +1,219 @@
+"""ACI 211.1 absolute-volume mix design.
+
+The reference tables of ACI 211.1-91 are held as NumPy arrays and looked
+up with vectorized (bi)linear interpolation, so ``design_mix`` proportions
+any number of requests in one call:
+
+1. mixing water and air content from slump and nominal maximum aggregate
+   size (Table 6.3.3),
+2. water-cement ratio from the target compressive strength (Table 6.3.4a),
+3. cement content from water and w/c,
+4. dry-rodded coarse aggregate volume from maximum size and the fineness
+   modulus of the sand (Table 6.3.6),
+5. fine aggregate as whatever absolute volume remains in 1 m³.
+
+All quantities are per cubic metre of concrete, SSD aggregates, SI units.
+Inputs outside a table's range are clamped to its nearest edge.
+"""
+import numpy as np
+
+# --- TABLE 6.3.1: RECOMMENDED SLUMPS ---
+SLUMP_CONSTRUCTION = (
+    "Reinforced foundation walls and footings",
+    "Beams and reinforced walls",
+    "Building columns",
+    "Pavements and slabs",
+    "Mass concrete",
+)
+# Minimum / maximum slump in mm per construction type.
+SLUMP_RANGES_MM = np.array([[25, 75], [25, 100], [25, 100], [25, 75], [25, 50]], dtype=float)
+
+# --- TABLE 6.3.3: MIXING WATER AND AIR ---
+AGGREGATE_SIZES_MM = np.array([9.5, 12.5, 19.0, 25.0, 37.5, 50.0, 75.0, 150.0])
+# Mid-points of the 25-50, 75-100 and 150-175 mm slump bands.
+SLUMP_POINTS_MM = np.array([37.5, 87.5, 162.5])
+# kg/m³, rows follow SLUMP_POINTS_MM. ACI gives no 150-175 mm value for
+# 150 mm aggregate; the 75-100 mm value is used there.
+WATER_NON_AIR = np.array([
+    [207, 199, 190, 179, 166, 154, 130, 113],
+    [228, 216, 205, 193, 181, 169, 145, 124],
+    [243, 228, 216, 202, 190, 178, 160, 124],
+], dtype=float)
+WATER_AIR_ENTRAINED = np.array([
+    [181, 175, 168, 160, 150, 142, 122, 107],
+    [202, 193, 184, 175, 165, 157, 133, 119],
+    [216, 205, 197, 184, 174, 166, 154, 119],
+], dtype=float)
+# Air content in percent by aggregate size.
+ENTRAPPED_AIR = np.array([3.0, 2.5, 2.0, 1.5, 1.0, 0.5, 0.3, 0.2])
+EXPOSURES = ("mild", "moderate", "severe")
+ENTRAINED_AIR = np.array([
+    [4.5, 4.0, 3.5, 3.0, 2.5, 2.0, 1.5, 1.0],
+    [6.0, 5.5, 5.0, 4.5, 4.5, 4.0, 3.5, 3.0],
+    [7.5, 7.0, 6.0, 6.0, 5.5, 5.0, 4.5, 4.0],
+])
+
+# --- TABLE 6.3.4(a): W/C RATIO BY STRENGTH ---
+STRENGTHS_MPA = np.array([15.0, 20.0, 25.0, 30.0, 35.0, 40.0])
+WC_NON_AIR = np.array([0.79, 0.69, 0.61, 0.54, 0.47, 0.42])
+# ACI gives no air-entrained value at 40 MPa; the 35 MPa trend is continued.
+WC_AIR_ENTRAINED = np.array([0.70, 0.60, 0.52, 0.45, 0.39, 0.33])
+
+# --- TABLE 6.3.6: COARSE AGGREGATE VOLUME ---
+FINENESS_MODULI = np.array([2.40, 2.60, 2.80, 3.00])
+# Dry-rodded volume of coarse aggregate per unit volume of concrete; rows
+# follow AGGREGATE_SIZES_MM.
+COARSE_VOLUME = np.array([
+    [0.50, 0.48, 0.46, 0.44],
+    [0.59, 0.57, 0.55, 0.53],
+    [0.66, 0.64, 0.62, 0.60],
+    [0.71, 0.69, 0.67, 0.65],
+    [0.75, 0.73, 0.71, 0.69],
+    [0.78, 0.76, 0.74, 0.72],
+    [0.82, 0.80, 0.78, 0.76],
+    [0.87, 0.85, 0.83, 0.81],
+])
+
+DESIGN_DEFAULTS = {
+    "sg_cement": 3.15,
+    "sg_coarse": 2.68,
+    "sg_fine": 2.64,
+    "rodded_density_coarse": 1600.0,  # kg/m³
+}
+WATER_DENSITY = 1000.0
+M3_PER_FT3 = 0.028316846592
+LB_PER_KG = 2.2046226218
+KG_M3_PER_LB_FT3 = 16.01846337
+
+DESIGN_COLUMNS = ("wc_ratio", "air_percent", "water", "cement", "coarse", "fine", "density",
+                  "vol_water", "vol_cement", "vol_coarse", "vol_fine", "vol_air")
+
+
+# --- INTERPOLATION ---
+def _locate(grid, x):
+    """Left index and fraction of ``x`` on an ascending ``grid`` (clamped)."""
+    x = np.clip(np.asarray(x, dtype=float), grid[0], grid[-1])
+    i = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+    t = (x - grid[i]) / (grid[i + 1] - grid[i])
+    return i, t
+
+
+def interp1(grid, values, x):
+    """Vectorized linear interpolation of ``values`` over ``grid``."""
+    i, t = _locate(grid, x)
+    return values[i] * (1 - t) + values[i + 1] * t
+
+
+def interp2(row_grid, col_grid, table, r, c):
+    """Vectorized bilinear interpolation of ``table[row, col]``."""
+    i, s = _locate(row_grid, r)
+    j, t = _locate(col_grid, c)
+    top = table[i, j] * (1 - t) + table[i, j + 1] * t
+    bottom = table[i + 1, j] * (1 - t) + table[i + 1, j + 1] * t
+    return top * (1 - s) + bottom * s
+
+
+def _log_size(size_mm):
+    # Aggregate sizes roughly double per step, so interpolate on log size.
+    return np.log(np.asarray(size_mm, dtype=float))
+
+
+_LOG_SIZES = np.log(AGGREGATE_SIZES_MM)
+_EXPOSURE_GRID = np.arange(len(EXPOSURES), dtype=float)
+
+
+def _exposure_index(exposure):
+    if isinstance(exposure, str):
+        return EXPOSURES.index(exposure)
+    labels, codes = np.unique(np.asarray(exposure, dtype=str), return_inverse=True)
+    return np.array([EXPOSURES.index(e) for e in labels])[codes]
+
+
+# --- DESIGN ---
+def recommended_slump(construction):
+    """``(min_mm, max_mm)`` from Table 6.3.1 for a construction type."""
+    return tuple(SLUMP_RANGES_MM[SLUMP_CONSTRUCTION.index(construction)])
+
+
+def design_mix(target_strength, slump, max_aggregate, fineness_modulus, air_entrained=False,
+               exposure="moderate", sg_cement=DESIGN_DEFAULTS["sg_cement"],
+               sg_coarse=DESIGN_DEFAULTS["sg_coarse"], sg_fine=DESIGN_DEFAULTS["sg_fine"],
+               rodded_density_coarse=DESIGN_DEFAULTS["rodded_density_coarse"], wc_ratio=None):
+    """Proportion one cubic metre of concrete by the absolute-volume method.
+
+    ``target_strength`` is the required average 28-day strength in MPa,
+    ``slump`` and ``max_aggregate`` are in mm. Every argument may be an
+    array; all are broadcast together. ``wc_ratio`` overrides the
+    strength-based w/c (e.g. for a durability limit) where it is not NaN.
+
+    Returns a dict of arrays keyed by ``DESIGN_COLUMNS``: masses in kg/m³,
+    absolute volumes in m³/m³ and ``density`` in kg/m³. ``fine`` is
+    negative (and the mix infeasible) when the other materials already
+    fill the cubic metre.
+    """
+    exposure = _exposure_index(exposure)
+    (target_strength, slump, max_aggregate, fineness_modulus, air_entrained, exposure, sg_cement,
+     sg_coarse, sg_fine, rodded_density_coarse) = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (target_strength, slump, max_aggregate, fineness_modulus,
+                                                air_entrained, exposure, sg_cement, sg_coarse, sg_fine,
+                                                rodded_density_coarse)))
+    entrained = air_entrained.astype(bool)
+    log_size = _log_size(max_aggregate)
+
+    water = np.where(entrained,
+                     interp2(SLUMP_POINTS_MM, _LOG_SIZES, WATER_AIR_ENTRAINED, slump, log_size),
+                     interp2(SLUMP_POINTS_MM, _LOG_SIZES, WATER_NON_AIR, slump, log_size))
+    air = np.where(entrained,
+                   interp2(_EXPOSURE_GRID, _LOG_SIZES, ENTRAINED_AIR, exposure, log_size),
+                   interp1(_LOG_SIZES, ENTRAPPED_AIR, log_size))
+
+    wc = np.where(entrained, interp1(STRENGTHS_MPA, WC_AIR_ENTRAINED, target_strength),
+                  interp1(STRENGTHS_MPA, WC_NON_AIR, target_strength))
+    if wc_ratio is not None:
+        wc_ratio = np.broadcast_to(np.asarray(wc_ratio, dtype=float), wc.shape)
+        wc = np.where(np.isnan(wc_ratio), wc, wc_ratio)
+    cement = water / wc
+
+    coarse = interp2(_LOG_SIZES, FINENESS_MODULI, COARSE_VOLUME, log_size, fineness_modulus) \
+        * rodded_density_coarse
+
+    vol_water = water / WATER_DENSITY
+    vol_cement = cement / (sg_cement * WATER_DENSITY)
+    vol_coarse = coarse / (sg_coarse * WATER_DENSITY)
+    vol_air = air / 100
+    vol_fine = 1.0 - (vol_water + vol_cement + vol_coarse + vol_air)
+    fine = vol_fine * sg_fine * WATER_DENSITY
+
+    return {
+        "wc_ratio": wc, "air_percent": air, "water": water, "cement": cement, "coarse": coarse,
+        "fine": fine, "density": water + cement + coarse + fine,
+        "vol_water": vol_water, "vol_cement": vol_cement, "vol_coarse": vol_coarse,
+        "vol_fine": vol_fine, "vol_air": vol_air,
+    }
+
+
+def slump_from_water(water, max_aggregate, air_entrained=False):
+    """Slump (mm) that Table 6.3.3 associates with a mixing-water content (kg/m³).
+
+    The inverse of the water lookup: linear between the band mid-points,
+    extrapolated beyond them and clipped to 0-250 mm. Broadcasts like
+    ``design_mix``.
+    """
+    water, max_aggregate, air_entrained = np.broadcast_arrays(
+        np.asarray(water, dtype=float), np.asarray(max_aggregate, dtype=float),
+        np.asarray(air_entrained, dtype=bool))
+    j, t = _locate(_LOG_SIZES, _log_size(max_aggregate))
+    # Water at each slump point for the requested aggregate size: shape (..., 3).
+    table = np.where(air_entrained[..., None], WATER_AIR_ENTRAINED.T[j], WATER_NON_AIR.T[j]) * (1 - t[..., None]) \
+        + np.where(air_entrained[..., None], WATER_AIR_ENTRAINED.T[j + 1], WATER_NON_AIR.T[j + 1]) * t[..., None]
+    seg = (water > table[..., 1]).astype(np.intp)
+    w0 = np.take_along_axis(table, seg[..., None], -1)[..., 0]
+    w1 = np.take_along_axis(table, seg[..., None] + 1, -1)[..., 0]
+    slope = (SLUMP_POINTS_MM[seg + 1] - SLUMP_POINTS_MM[seg]) / np.maximum(w1 - w0, 1e-9)
+    return np.clip(SLUMP_POINTS_MM[seg] + (water - w0) * slope, 0.0, 250.0)
+
+
+def mass_ratios(design):
+    """Cement : sand : stone by mass (cement = 1) for a ``design_mix`` result."""
+    cement = design["cement"]
+    return np.ones_like(cement), design["fine"] / cement, design["coarse"] / cement
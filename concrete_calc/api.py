@@ -0,0 +1,253 @@
+"""Local HTTP/JSON batch API for ERP and procurement integration.
+
+A small HTTP/1.1 server on ``asyncio`` streams (no web framework needed):
+
+``GET  /health``
+    Liveness plus queue counters.
+``POST /v1/quantities``
+    Body is an element spec (see ``concrete_calc.spec``). Every element
+    in the request goes through the vectorized engine in one call; the
+    response has per-element rows, totals per unit system and the number
+    of rejected elements.
+``POST /v1/report``
+    Same body; returns ``application/pdf`` with one page per element.
+
+Work runs in a thread pool of ``workers``. At most ``workers`` requests
+compute at once and at most ``max_queue`` more may wait; beyond that the
+server answers ``503`` with ``Retry-After`` instead of queueing without
+bound. Connections are kept alive between requests.
+
+Run with ``python -m concrete_calc.api --port 8000``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from concrete_calc.artifact_cache import canonical_key, shared_cache
+from concrete_calc.spec import SpecError, columns_from_spec, compute_records, iter_rows, totals_by_unit
+
+DEFAULT_PORT = 8000
+DEFAULT_MAX_QUEUE = 64
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MAX_REPORT_PAGES = 500
+KEEP_ALIVE_SECONDS = 30
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = HTTPStatus(status)
+        self.headers = headers or {}
+
+
+# --- HANDLERS (run in the worker pool) ---
+def quantities(spec):
+    out, rejected = compute_records(columns_from_spec(spec))
+    body = {
+        "results": list(iter_rows(out)),
+        "totals": totals_by_unit(out),
+        "rejected": rejected,
+    }
+    return json.dumps(body).encode()
+
+
+def report(spec):
+    # Crews request the same standard elements all day; identical specs reuse the bytes.
+    return shared_cache().get_or_create(canonical_key("report", spec), lambda: _render_report(spec))
+
+
+def _render_report(spec):
+    from fpdf import FPDF
+
+    from concrete_calc.geometry import report_geometry
+    from concrete_calc.engine import UNIT_SYSTEMS
+    from concrete_calc.report import add_report_page
+
+    # Refuse oversized requests before any of their elements is computed.
+    elements = spec.get("elements") if isinstance(spec, dict) else spec
+    if isinstance(elements, list) and len(elements) > MAX_REPORT_PAGES:
+        raise SpecError(f"at most {MAX_REPORT_PAGES} elements per report request")
+    out, _ = compute_records(columns_from_spec(spec))
+    # Every column, so each page can draw the element's own shape.
+    rows = list(iter_rows(out, out))
+    if not rows:
+        raise SpecError("no valid elements to report on")
+    pdf = FPDF()
+    for r in rows:
+        units = UNIT_SYSTEMS[r["unit_system"]]
+        mesh, formula = report_geometry(r)
+        add_report_page(
+            pdf, r["shape_name"], r["length"], r["width"], r["height"], units["v_unit"], units["w_unit"],
+            r["c_ratio"], r["s_ratio"], r["a_ratio"], r["wc_ratio"], r["wet_volume"], r["dry_volume"],
+            r["dry_factor"], r["wastage_percent"], r["weight_c"], r["weight_s"], r["weight_a"],
+            r["weight_water"], mesh, r["slump"], r["workability"], volume_formula=formula,
+        )
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def _call(func, body):
+    """Decode the request body and run ``func`` on it (in the worker pool:
+    large bodies would otherwise block the event loop while parsing)."""
+    try:
+        payload = json.loads(body or b"null")
+    except ValueError as e:
+        raise HTTPError(400, f"invalid JSON: {e}")
+    return func(payload)
+
+
+ROUTES = {
+    ("POST", "/v1/quantities"): (quantities, "application/json"),
+    ("POST", "/v1/report"): (report, "application/pdf"),
+}
+
+
+# --- SERVER ---
+class QuantityServer:
+    """Asyncio HTTP server with a bounded compute queue."""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, workers=None, max_queue=DEFAULT_MAX_QUEUE):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="concrete-api")
+        self.stats = {"requests": 0, "rejected_busy": 0, "errors": 0, "in_flight": 0, "waiting": 0}
+        self._slots = None
+        self._server = None
+
+    async def start(self):
+        self._slots = asyncio.Semaphore(self.workers)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def _run(self, func, body):
+        if self.stats["waiting"] >= self.max_queue and self._slots.locked():
+            self.stats["rejected_busy"] += 1
+            raise HTTPError(503, "server busy, retry shortly", {"Retry-After": "1"})
+        self.stats["waiting"] += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.stats["waiting"] -= 1
+        self.stats["in_flight"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, _call, func, body)
+        finally:
+            self.stats["in_flight"] -= 1
+            self._slots.release()
+
+    async def _dispatch(self, method, path, body):
+        if (method, path) == ("GET", "/health"):
+            return HTTPStatus.OK, "application/json", json.dumps({"status": "ok", **self.stats}).encode(), {}
+        route = ROUTES.get((method, path))
+        if route is None:
+            raise HTTPError(404 if not any(p == path for _, p in ROUTES) else 405, f"no route for {method} {path}")
+        func, content_type = route
+        try:
+            data = await self._run(func, body)
+        except SpecError as e:
+            raise HTTPError(422, str(e))
+        return HTTPStatus.OK, content_type, data, {}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                keep_alive = await self._handle_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, request_line, reader, writer):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        self.stats["requests"] += 1
+        try:
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                raise HTTPError(400, "malformed request line")
+            method, target, _ = parts
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise HTTPError(413, f"body larger than {MAX_BODY_BYTES} bytes")
+            body = await reader.readexactly(length) if length else b""
+            status, content_type, data, extra = await self._dispatch(method, target.split("?")[0], body)
+        except HTTPError as e:
+            status, content_type, extra = e.status, "application/json", e.headers
+            data = json.dumps({"error": str(e)}).encode()
+        except ValueError as e:
+            status, content_type, extra = HTTPStatus.BAD_REQUEST, "application/json", {}
+            data = json.dumps({"error": str(e)}).encode()
+        except Exception as e:  # keep serving other clients
+            self.stats["errors"] += 1
+            status, content_type, extra = HTTPStatus.INTERNAL_SERVER_ERROR, "application/json", {}
+            data = json.dumps({"error": f"{type(e).__name__}: {e}"}).encode()
+
+        head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(data)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        return keep_alive
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="concrete-calc-api", description="Serve the quantity engine over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, help="compute threads (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="requests allowed to wait for a worker before answering 503")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    server = QuantityServer(args.host, args.port, args.workers, args.max_queue)
+    print(f"Serving concrete quantities on http://{args.host}:{args.port} "
+          f"({server.workers} workers, queue {args.max_queue})")
+    started = time.perf_counter()
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print(f"Stopped after {time.perf_counter() - started:.0f} s, {server.stats['requests']} requests")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
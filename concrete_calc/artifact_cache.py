@@ -0,0 +1,170 @@
+"""Process-wide cache for generated artifacts (figures, PDF bytes).
+
+Site crews ask for the same standard elements all day, so whatever one
+session builds is reused by every other session in the same server
+process. Entries are keyed by ``canonical_key`` (a SHA-256 over the
+inputs, with a tag for the kind of artifact) and evicted least recently
+used first once the total size exceeds the byte budget.
+
+The budget of the shared cache defaults to 256 MiB and can be set with the
+``CONCRETE_CALC_CACHE_MB`` environment variable; ``0`` disables caching.
+"""
+import hashlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_BUDGET_MB = 256
+BUDGET_ENV = "CONCRETE_CALC_CACHE_MB"
+
+
+# --- KEYS ---
+def _feed(h, value):
+    # Type-tagged so 1 and 1.0 (which the PDF prints differently) get different keys.
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, bool):
+        h.update(b"N" if value is None else b"T" if value else b"F")
+    elif isinstance(value, int):
+        h.update(b"i" + str(value).encode() + b";")
+    elif isinstance(value, float):
+        h.update(b"f" + struct.pack("<d", value))
+    elif isinstance(value, str):
+        data = value.encode()
+        h.update(b"s" + str(len(data)).encode() + b":" + data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        h.update(b"b" + str(len(data)).encode() + b":" + data)
+    elif isinstance(value, np.ndarray):
+        h.update(b"a" + value.dtype.str.encode() + str(value.shape).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (tuple, list)):
+        h.update(b"(" + str(len(value)).encode() + b":")
+        for item in value:
+            _feed(h, item)
+        h.update(b")")
+    elif isinstance(value, dict):
+        h.update(b"{" + str(len(value)).encode() + b":")
+        for k in sorted(value, key=repr):
+            _feed(h, k)
+            _feed(h, value[k])
+        h.update(b"}")
+    else:
+        raise TypeError(f"cannot build a cache key from {type(value).__name__}")
+
+
+def canonical_key(kind, *parts):
+    """Stable hex digest of ``kind`` and ``parts`` (numbers, strings, arrays, containers)."""
+    h = hashlib.sha256()
+    _feed(h, kind)
+    _feed(h, parts)
+    return f"{kind}:{h.hexdigest()}"
+
+
+# --- CACHE ---
+class ArtifactCache:
+    """Thread-safe LRU cache bounded by the total size of its entries."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _count(self, kind, event):
+        counters = self._counters.setdefault(kind, {"hits": 0, "misses": 0, "evictions": 0})
+        counters[event] += 1
+
+    def get(self, key, default=None):
+        kind = key.partition(":")[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count(kind, "misses")
+                return default
+            self._entries.move_to_end(key)
+            self._count(kind, "hits")
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        """Store ``value``; anything larger than the whole budget is not kept."""
+        nbytes = int(nbytes)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            key, (_, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self._count(key.partition(":")[0], "evictions")
+
+    def get_or_create(self, key, build, size=len):
+        """Return the cached value for ``key``, building and storing it on a miss.
+
+        ``size(value)`` gives the bytes charged against the budget. Two
+        sessions missing the same key at once both build; the later result
+        simply replaces the earlier one.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = build()
+            self.put(key, value, size(value))
+        return value
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self, kind=None):
+        """Drop every entry, or only those of one ``kind``."""
+        with self._lock:
+            for key in [k for k in self._entries if kind is None or k.partition(":")[0] == kind]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        """Hit/miss/eviction counters per kind plus current size."""
+        with self._lock:
+            by_kind = {kind: dict(c) for kind, c in self._counters.items()}
+            entries = {}
+            for key, (_, nbytes) in self._entries.items():
+                kind = key.partition(":")[0]
+                count, total = entries.get(kind, (0, 0))
+                entries[kind] = (count + 1, total + nbytes)
+            for kind, (count, total) in entries.items():
+                by_kind.setdefault(kind, {"hits": 0, "misses": 0, "evictions": 0})
+                by_kind[kind].update(entries=count, bytes=total)
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": sum(c["hits"] for c in self._counters.values()),
+                "misses": sum(c["misses"] for c in self._counters.values()),
+                "by_kind": by_kind,
+            }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """The cache shared by every session in this process."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            budget_mb = float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MB))
+            _shared = ArtifactCache(budget_mb * 1024 * 1024)
+        return _shared
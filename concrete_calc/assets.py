@@ -0,0 +1,196 @@
+"""Static image assets, optimized once per process.
+
+Every image the page shows is decoded, downsized to its display width and
+re-encoded (WebP by default) the first time it is requested. The result is
+pinned in a module-level dict, outside the shared artifact cache's
+evictable byte budget, so each asset is encoded once per process however
+busy the cache gets. Entries remember the source file's mtime, so an
+edited file is re-encoded (replacing its old entry) automatically.
+
+When Streamlit static serving is enabled (see ``.streamlit/config.toml``)
+the background is written once under ``static/_generated`` with a
+content-hashed name and referenced by URL, so the per-rerun CSS no longer
+carries the image at all.
+"""
+import base64
+import functools
+import hashlib
+import io
+import os
+import threading
+import time
+
+# Display widths the page actually renders each image at.
+DISPLAY_WIDTHS = {
+    "background.jpg": 1600,
+    "image_ede32d.png": 900,
+    "slump_combined.png": 1000,
+    "water.png": 480,
+}
+DEFAULT_WIDTH = 1200
+DEFAULT_FORMAT = "WEBP"
+DEFAULT_QUALITY = 80
+# ``st.image`` re-encodes anything that is not the PNG (alpha) or JPEG (opaque)
+# it would pick itself, so images for it are encoded that way up front.
+STREAMLIT_FORMAT = "AUTO"
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+GENERATED_SUBDIR = "_generated"
+
+_MIME = {"WEBP": "image/webp", "JPEG": "image/jpeg", "PNG": "image/png"}
+
+_lock = threading.Lock()
+_stats = {}
+_encoded = {}  # (path, width, format, quality) -> (mtime, bytes, format); a handful of entries
+
+
+# --- ENCODING ---
+def _source_format(path, default):
+    fmt = os.path.splitext(path)[1].lstrip(".").upper() or default
+    return "JPEG" if fmt == "JPG" else fmt
+
+
+def _encode(path, max_width, fmt, quality):
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        from PIL import Image
+    except ImportError:
+        # Without Pillow the original bytes are served unchanged.
+        return raw, _source_format(path, fmt)
+    img = Image.open(io.BytesIO(raw))
+    # For st.image the format matters more than a few bytes: a smaller source
+    # in another format would still be re-encoded on every rerun.
+    keep_smaller = True
+    if fmt == STREAMLIT_FORMAT:
+        fmt = "PNG" if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info else "JPEG"
+        keep_smaller = img.format == fmt
+    if img.width > max_width:
+        height = round(img.height * max_width / img.width)
+        img = img.resize((max_width, height), Image.LANCZOS)
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    buf = io.BytesIO()
+    if fmt == "WEBP":
+        img.save(buf, format=fmt, quality=quality, method=4)
+    else:
+        img.save(buf, format=fmt, quality=quality, optimize=True)
+    out = buf.getvalue()
+    # Never serve something bigger than the source.
+    if keep_smaller and len(out) >= len(raw):
+        return raw, _source_format(path, fmt)
+    return out, fmt
+
+
+def optimized_image(path, max_width=None, fmt=DEFAULT_FORMAT, quality=DEFAULT_QUALITY):
+    """Return ``(bytes, format)`` for ``path`` at display resolution.
+
+    Raises ``FileNotFoundError`` like ``open`` when the file is missing.
+    """
+    max_width = max_width or DISPLAY_WIDTHS.get(os.path.basename(path), DEFAULT_WIDTH)
+    mtime = os.stat(path).st_mtime_ns
+    key = (os.path.abspath(path), max_width, fmt, quality)
+    with _lock:
+        hit = _encoded.get(key)
+    if hit is not None and hit[0] == mtime:
+        return hit[1:]
+
+    start = time.perf_counter()
+    data, out_fmt = _encode(path, max_width, fmt, quality)
+    elapsed = time.perf_counter() - start
+    with _lock:
+        # An edited file replaces its old encoding rather than adding another.
+        _encoded[key] = (mtime, data, out_fmt)
+        _stats[os.path.basename(path)] = {
+            "source_bytes": os.path.getsize(path),
+            "served_bytes": len(data),
+            "format": out_fmt,
+            "encode_seconds": elapsed,
+        }
+    return data, out_fmt
+
+
+def image_source(path, max_width=None):
+    """What to hand to ``st.image``: optimized bytes, or the path if missing.
+
+    The bytes are already in the format ``st.image`` serves, so reruns pass
+    them through instead of decoding and re-encoding the image each time.
+    """
+    try:
+        return optimized_image(path, max_width, STREAMLIT_FORMAT)[0]
+    except FileNotFoundError:
+        return path
+
+
+# --- BACKGROUND URL ---
+def static_serving_enabled():
+    try:
+        import streamlit as st
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def background_url(path):
+    """URL for a CSS ``background-image``.
+
+    Uses a content-hashed file under ``static/`` when static serving is on,
+    otherwise a data URI of the optimized image (still far smaller than the
+    original JPEG).
+    """
+    data, fmt = optimized_image(path)
+    if static_serving_enabled():
+        digest = hashlib.sha1(data).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = f"{stem}.{digest}.{fmt.lower()}"
+        out_dir = os.path.join(STATIC_DIR, GENERATED_SUBDIR)
+        target = os.path.join(out_dir, name)
+        if not os.path.exists(target):
+            os.makedirs(out_dir, exist_ok=True)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        return f"app/static/{GENERATED_SUBDIR}/{name}"
+    encoded = base64.b64encode(data).decode()
+    return f"data:{_MIME.get(fmt, 'image/' + fmt.lower())};base64,{encoded}"
+
+
+# --- MEASUREMENT ---
+_payload = {"css_bytes": 0, "legacy_css_bytes": 0}
+
+
+def record_css_payload(css, legacy_bytes=0):
+    """Remember the size of the CSS block sent on the latest rerun."""
+    _payload["css_bytes"] = len(css.encode())
+    _payload["legacy_css_bytes"] = legacy_bytes
+
+
+def payload_report():
+    """Per-rerun CSS bytes now vs what the base64 path used to send."""
+    return dict(_payload)
+
+
+def asset_report():
+    """Per-asset source vs served sizes and one-off encode times."""
+    with _lock:
+        return {name: dict(info) for name, info in _stats.items()}
+
+
+@functools.lru_cache(maxsize=16)
+def legacy_background_payload(path):
+    """Bytes the old ``add_bg_from_local`` sent per rerun for ``path``.
+
+    The data URI was embedded twice per call and the function ran twice.
+    Computed once per path; the figure is only a point of comparison.
+    """
+    size = os.path.getsize(path)
+    return 4 * (4 * ((size + 2) // 3))
+
+
+def clear_cache():
+    """Forget every encoded image and the measurements (the next request re-encodes)."""
+    with _lock:
+        _encoded.clear()
+        _stats.clear()
+    legacy_background_payload.cache_clear()
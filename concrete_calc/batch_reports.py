@@ -0,0 +1,288 @@
+"""Project report generation for many elements at once.
+
+Quantities for the whole schedule are computed in the parent with the
+vectorized engine; PDF pages are built in a process pool, one chunk of
+elements per task. Each task writes its own file(s) and returns only small
+counters, and at most ``2 * workers`` chunks are in flight, so memory stays
+bounded however long the schedule is. For the same reason there is no
+single combined document (FPDF holds a whole document in memory): the
+multi-page option writes one part file per chunk.
+"""
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from concrete_calc.engine import (DEFAULT_SLUMP, METRIC, RESULT_COLUMNS, SCHEDULE_COLUMNS,
+                                  UNIT_SYSTEMS, compute_schedule, workability_class)
+from concrete_calc.geometry import GEOMETRY_COLUMNS
+from concrete_calc.spec import totals_by_unit
+
+# Shape inputs carried into each record so pages draw the element's own geometry.
+SHAPE_COLUMNS = ("shape", "outline", "openings") + GEOMETRY_COLUMNS
+
+DEFAULT_CHUNK_SIZE = 50
+
+
+# --- INPUT ---
+def _as_chunks(schedule, chunk_size):
+    """Yield DataFrame chunks from a DataFrame, an iterable of DataFrames or of row dicts."""
+    import pandas as pd
+
+    if isinstance(schedule, pd.DataFrame):
+        for start in range(0, len(schedule), chunk_size):
+            yield schedule.iloc[start:start + chunk_size]
+        return
+    rows = []
+    for item in schedule:
+        if isinstance(item, pd.DataFrame):
+            for start in range(0, len(item), chunk_size):
+                yield item.iloc[start:start + chunk_size]
+            continue
+        rows.append(item)
+        if len(rows) == chunk_size:
+            yield pd.DataFrame(rows)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows)
+
+
+def _report_records(chunk, unit_system, offset, precomputed=False):
+    """Plain-dict report arguments for one chunk (cheap to pickle).
+
+    With ``precomputed`` the chunk already holds engine results (for
+    example ``spec.compute_records`` output) and is not recomputed.
+    """
+    computed = chunk if precomputed else compute_schedule(chunk, unit_system, include_inputs=True)
+    n = len(computed)
+    if "unit_system" not in computed:
+        computed = computed.assign(unit_system=unit_system)
+    slump = computed["slump"].fillna(DEFAULT_SLUMP) if "slump" in computed else np.full(n, DEFAULT_SLUMP)
+    element_id = computed["element_id"].astype(str) if "element_id" in computed \
+        else [str(i) for i in range(offset, offset + n)]
+    units = computed["unit_system"].map(lambda u: UNIT_SYSTEMS.get(u, UNIT_SYSTEMS[METRIC]))
+    computed = computed.assign(
+        row=np.arange(offset, offset + n),
+        element_id=element_id,
+        slump=slump,
+        workability=workability_class(slump)[0],
+        v_unit=units.map(lambda u: u["v_unit"]),
+        w_unit=units.map(lambda u: u["w_unit"]),
+    )
+    keys = ("row", "element_id", "slump", "workability", "v_unit", "w_unit") + SCHEDULE_COLUMNS + RESULT_COLUMNS \
+        + tuple(k for k in SHAPE_COLUMNS if k in computed)
+    return computed[list(keys)].to_dict("records"), computed
+
+
+# --- WORKER ---
+def _safe_name(text):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text).strip("_") or "element"
+
+
+def _add_element_page(pdf, rec):
+    from concrete_calc.geometry import report_geometry
+    from concrete_calc.report import add_report_page
+
+    mesh, formula = report_geometry(rec)
+    add_report_page(
+        pdf, rec["shape_name"], rec["length"], rec["width"], rec["height"],
+        rec["v_unit"], rec["w_unit"], rec["c_ratio"], rec["s_ratio"], rec["a_ratio"], rec["wc_ratio"],
+        rec["wet_volume"], rec["dry_volume"], rec["dry_factor"], rec["wastage_percent"],
+        rec["weight_c"], rec["weight_s"], rec["weight_a"], rec["weight_water"],
+        mesh, rec["slump"], rec["workability"],
+        title=f"Element {rec['element_id']}: Quantity & Workability Report", volume_formula=formula,
+    )
+
+
+def report_filename(rec):
+    """``NNNNNN_<element id>_<shape>_Report.pdf``; the schedule row number
+    keeps repeated element ids from overwriting each other."""
+    return f"{rec['row'] + 1:06d}_{_safe_name(rec['element_id'])}_{_safe_name(rec['shape_name'])}_Report.pdf"
+
+
+def _write_chunk(records, out_dir, part_name=None):
+    """Build the PDFs for one chunk of elements; returns (reports, bytes)."""
+    from fpdf import FPDF
+
+    written = 0
+    if part_name:
+        pdf = FPDF()
+        for rec in records:
+            _add_element_page(pdf, rec)
+        path = os.path.join(out_dir, part_name)
+        pdf.output(path, "F")
+        return len(records), os.path.getsize(path)
+    for rec in records:
+        pdf = FPDF()
+        _add_element_page(pdf, rec)
+        path = os.path.join(out_dir, report_filename(rec))
+        pdf.output(path, "F")
+        written += os.path.getsize(path)
+    return len(records), written
+
+
+# --- SUMMARY ---
+def write_summary_pdf(path, totals, counts, stats=None):
+    """Project summary PDF: element counts and total quantities.
+
+    ``totals`` is ``{unit_system: {quantity: total}}`` (``spec.totals_by_unit``);
+    each unit system gets its own table so metric and imperial rows never mix.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 20)
+    pdf.set_text_color(255, 179, 0)
+    pdf.cell(200, 15, "Project Concrete Quantity Summary", ln=True, align='C')
+    pdf.set_draw_color(255, 179, 0)
+    pdf.line(10, 25, 200, 25)
+    pdf.ln(5)
+
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(200, 10, "1. Elements by Type", ln=True)
+    pdf.set_font("Arial", 'B', 11)
+    pdf.set_fill_color(255, 179, 0)
+    pdf.cell(90, 10, "Element Type", 1, 0, 'C', True)
+    pdf.cell(90, 10, "Count", 1, 1, 'C', True)
+    pdf.set_font("Arial", '', 11)
+    for name, count in sorted(counts.items()):
+        pdf.cell(90, 10, f" {name}", 1)
+        pdf.cell(90, 10, f" {count}", 1, 1, 'C')
+    pdf.ln(5)
+
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(200, 10, "2. Total Quantities", ln=True)
+    for unit_system, t in sorted(totals.items()):
+        unit = UNIT_SYSTEMS.get(unit_system, UNIT_SYSTEMS[METRIC])
+        v_unit, w_unit = unit["v_unit"], unit["w_unit"]
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(200, 9, f"{unit_system} ({t['count']} elements)", ln=True)
+        pdf.set_font("Arial", 'B', 11)
+        pdf.cell(90, 10, "Quantity", 1, 0, 'C', True)
+        pdf.cell(90, 10, "Total", 1, 1, 'C', True)
+        pdf.set_font("Arial", '', 11)
+        rows = [
+            ("Wet Volume", t["wet_volume"], v_unit), ("Dry Volume", t["dry_volume"], v_unit),
+            ("Cement", t["weight_c"], w_unit), ("Sand", t["weight_s"], w_unit),
+            ("Stone", t["weight_a"], w_unit), ("Water", t["weight_water"], w_unit),
+        ]
+        for name, value, unit in rows:
+            pdf.cell(90, 10, f" {name}", 1)
+            pdf.cell(90, 10, f" {value:.4f} {unit}", 1, 1, 'C')
+        pdf.ln(3)
+
+    if stats:
+        pdf.ln(5)
+        pdf.set_font("Arial", '', 10)
+        pdf.multi_cell(0, 7, f"Generated {stats['reports']} element reports in "
+                             f"{stats['seconds']:.2f} s ({stats['reports_per_sec']:.1f} reports/s).")
+    pdf.output(path, "F")
+
+
+# --- DRIVER ---
+class ReportWriter:
+    """Feed schedule chunks to a process pool that writes their PDFs.
+
+    ``write(frame)`` splits a DataFrame into ``chunk_size`` pieces, computes
+    their quantities in the calling process and hands the page building to
+    the pool, blocking only while ``2 * workers`` chunks are already in
+    flight. ``close()`` waits for the
+    rest, writes the summary and returns the counters (see
+    ``generate_reports``). Use as a context manager or call ``close()``.
+    """
+
+    def __init__(self, out_dir, unit_system=METRIC, workers=None, part_files=False,
+                 chunk_size=DEFAULT_CHUNK_SIZE, summary=True, progress=None, precomputed=False):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir, self.unit_system, self.part_files = out_dir, unit_system, part_files
+        self.chunk_size = chunk_size
+        self.summary, self.progress, self.precomputed = summary, progress, precomputed
+        self.workers = workers or os.cpu_count() or 1
+        self.totals, self.counts = {}, {}
+        self.done = self.written = self.rows = self.parts = 0
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._pending = set()
+        self._start = time.perf_counter()
+
+    def write(self, frame):
+        """Queue the reports for the rows of one DataFrame."""
+        for start in range(0, len(frame), self.chunk_size):
+            self._submit(frame.iloc[start:start + self.chunk_size])
+
+    def _submit(self, chunk):
+        records, computed = _report_records(chunk, self.unit_system, self.rows, self.precomputed)
+        self.rows += len(records)
+        totals_by_unit(computed, self.totals)
+        for name, count in computed["shape_name"].value_counts().items():
+            self.counts[name] = self.counts.get(name, 0) + int(count)
+
+        self.parts += 1
+        name = f"project_part_{self.parts:04d}.pdf" if self.part_files else None
+        self._pending.add(self._pool.submit(_write_chunk, records, self.out_dir, name))
+        if len(self._pending) >= 2 * self.workers:
+            finished, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._collect(finished)
+
+    def _collect(self, finished):
+        for fut in finished:
+            n, size = fut.result()
+            self.done += n
+            self.written += size
+            if self.progress:
+                self.progress(self.done)
+
+    def close(self):
+        """Wait for the queued reports; returns the counters."""
+        try:
+            while self._pending:
+                finished, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+                self._collect(finished)
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+        elapsed = time.perf_counter() - self._start
+        stats = {
+            "reports": self.done,
+            "bytes": self.written,
+            "seconds": elapsed,
+            "reports_per_sec": self.done / elapsed if elapsed > 0 else float("inf"),
+        }
+        if self.summary:
+            write_summary_pdf(os.path.join(self.out_dir, "project_summary.pdf"), self.totals, self.counts, stats)
+        stats["totals"] = self.totals
+        stats["counts"] = self.counts
+        return stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.stats = self.close()
+        else:
+            self._pool.shutdown(cancel_futures=True)
+
+
+def generate_reports(schedule, out_dir, unit_system=METRIC, workers=None, part_files=False,
+                     chunk_size=DEFAULT_CHUNK_SIZE, summary=True, progress=None, precomputed=False):
+    """Write one PDF per element (or multi-page part files) plus a summary.
+
+    ``schedule`` may be a DataFrame, an iterable of DataFrame chunks (e.g.
+    from a streaming CSV reader) or an iterable of row dicts using the
+    engine's schedule column names, optionally with ``element_id`` and
+    ``slump``. With ``precomputed=True`` the chunks are engine results
+    (with their shape columns) and are not recomputed. With
+    ``part_files=True`` each chunk of ``chunk_size`` elements becomes one
+    multi-page ``project_part_NNNN.pdf`` instead of a file per element
+    (named by ``report_filename``). ``progress(done)`` is called each time
+    a chunk finishes. Returns counters including ``reports_per_sec`` and
+    ``totals`` per unit system.
+    """
+    with ReportWriter(out_dir, unit_system, workers, part_files, chunk_size, summary, progress,
+                      precomputed) as writer:
+        for chunk in _as_chunks(schedule, chunk_size):
+            writer.write(chunk)
+    return writer.stats
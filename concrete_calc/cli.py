@@ -0,0 +1,188 @@
+"""``concrete-calc``: headless quantity estimates from a JSON or CSV spec.
+
+The pure-calculation path imports only NumPy and the engine; pandas and
+FPDF are imported only when ``--pdf`` asks for reports, and Streamlit and
+Plotly are never imported. Run with ``--timings`` to see the cold-start
+budget (module imports + parse + compute) on stderr.
+
+Examples::
+
+    concrete-calc element.json
+    concrete-calc schedule.csv --format csv -o quantities.csv
+    concrete-calc schedule.csv --totals --pdf reports/
+    concrete-calc schedule.csv --format parquet -o quantities.parquet
+
+Parquet, Arrow and Excel output (``concrete_calc.export``) hold typed
+per-element columns, written one chunk at a time; they need pyarrow or
+openpyxl and an ``--output`` file.
+"""
+import time
+
+_T0 = time.perf_counter()
+
+import argparse  # noqa: E402
+import contextlib  # noqa: E402
+import csv  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+
+from concrete_calc.engine import METRIC, UNIT_SYSTEMS  # noqa: E402
+from concrete_calc.spec import (SpecError, columns_from_spec, compute_records, finalise,  # noqa: E402
+                                iter_rows, row_keys, target_names, totals_by_unit)
+
+_T_IMPORTED = time.perf_counter()
+
+CSV_CHUNK_ROWS = 50_000
+TABLE_FORMATS = ("parquet", "arrow", "xlsx")
+
+
+# --- INPUT ---
+def read_json_spec(path):
+    """Columns from a JSON spec file (see ``concrete_calc.spec``)."""
+    with open(path) if path != "-" else sys.stdin as f:
+        spec = json.load(f)
+    yield columns_from_spec(spec)
+
+
+def read_csv_spec(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Columns from a CSV schedule, ``chunk_rows`` rows at a time."""
+    with open(path, newline="") if path != "-" else sys.stdin as f:
+        reader = csv.reader(f, skipinitialspace=True)
+        names = target_names(next(reader, []))
+        while True:
+            rows = [row for _, row in zip(range(chunk_rows), reader)]
+            if not rows:
+                return
+            cols = {}
+            for i, name in enumerate(names):
+                if name not in cols:
+                    cols[name] = [row[i] if i < len(row) else "" for row in rows]
+            yield finalise(cols, len(rows), METRIC)
+
+
+# --- OUTPUT ---
+def _emit(chunks, fmt, stream, want_rows):
+    totals = {}
+    rejected = 0
+    writer = None
+    first = True
+    for out, dropped in chunks:
+        rejected += dropped
+        totals_by_unit(out, totals)
+        if not want_rows:
+            continue
+        if fmt == "csv":
+            keys = row_keys(out)
+            if writer is None:
+                writer = csv.writer(stream)
+                writer.writerow(keys)
+            writer.writerows(zip(*(out[k].tolist() for k in keys)))
+        else:
+            for row in iter_rows(out):
+                stream.write(("[\n  " if first else ",\n  ") + json.dumps(row))
+                first = False
+    if fmt == "json" and want_rows:
+        stream.write("[]\n" if first else "\n]\n")
+    return totals, rejected
+
+
+def _emit_table(chunks, fmt, path):
+    from concrete_calc.export import TableWriter, element_table
+
+    totals = {}
+    rejected = 0
+    with TableWriter(path, fmt) as writer:
+        for out, dropped in chunks:
+            rejected += dropped
+            totals_by_unit(out, totals)
+            writer.write(element_table(out))
+    return totals, rejected
+
+
+def _with_reports(chunks, reports):
+    """Pass ``chunks`` through, queueing each one's PDFs on ``reports`` on the way."""
+    import pandas as pd
+
+    for out, dropped in chunks:
+        # The computed chunks keep every shape dimension, so pages match the quantities.
+        reports.write(pd.DataFrame(out))
+        yield out, dropped
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="concrete-calc",
+        description="Compute concrete material quantities from a JSON or CSV spec.")
+    parser.add_argument("spec", help="JSON or CSV spec file ('-' for stdin, JSON by default)")
+    parser.add_argument("--format", choices=("json", "csv") + TABLE_FORMATS,
+                        help="output format (default: same as the input)")
+    parser.add_argument("-o", "--output", help="write quantities here instead of stdout")
+    parser.add_argument("--totals", action="store_true",
+                        help="print totals per unit system to stderr (or only totals with --no-rows)")
+    parser.add_argument("--no-rows", action="store_true", help="do not emit per-element rows")
+    parser.add_argument("--pdf", metavar="DIR", help="also write one PDF report per element to DIR")
+    parser.add_argument("--timings", action="store_true", help="print cold-start timings to stderr")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    t_start = time.perf_counter()
+    is_csv = args.spec.lower().endswith(".csv")
+    fmt = args.format or ("csv" if is_csv else "json")
+    reader = read_csv_spec if is_csv else read_json_spec
+    computed = (compute_records(records) for records in reader(args.spec))
+
+    if fmt in TABLE_FORMATS and not args.no_rows and not args.output:
+        raise SystemExit(f"concrete-calc: --format {fmt} needs an --output file")
+    reports = contextlib.nullcontext()
+    if args.pdf:
+        from concrete_calc.batch_reports import ReportWriter
+
+        # Each chunk goes to the report pool as its rows are written, so
+        # neither side needs the whole schedule in memory.
+        reports = ReportWriter(args.pdf, precomputed=True)
+        computed = _with_reports(computed, reports)
+
+    with reports:
+        if fmt in TABLE_FORMATS and not args.no_rows:
+            try:
+                totals, rejected = _emit_table(computed, fmt, args.output)
+            except SpecError as e:
+                raise SystemExit(f"concrete-calc: {e}")
+        else:
+            stream = open(args.output, "w", newline="") if args.output else sys.stdout
+            try:
+                totals, rejected = _emit(computed, fmt, stream, not args.no_rows)
+            except SpecError as e:
+                raise SystemExit(f"concrete-calc: {e}")
+            finally:
+                if args.output:
+                    stream.close()
+        t_done = time.perf_counter()
+
+    if rejected:
+        print(f"concrete-calc: skipped {rejected} row(s) with missing/invalid dimensions or units",
+              file=sys.stderr)
+    if args.totals or args.no_rows:
+        for unit, bucket in totals.items():
+            units = UNIT_SYSTEMS.get(unit, UNIT_SYSTEMS[METRIC])
+            print(f"{unit}: {bucket['count']} elements, "
+                  f"wet {bucket['wet_volume']:.4f} {units['v_unit']}, dry {bucket['dry_volume']:.4f} {units['v_unit']}, "
+                  f"cement {bucket['weight_c']:.4f}, sand {bucket['weight_s']:.4f}, "
+                  f"stone {bucket['weight_a']:.4f}, water {bucket['weight_water']:.4f} {units['w_unit']}",
+                  file=sys.stderr)
+    if args.pdf:
+        stats = reports.stats
+        print(f"Wrote {stats['reports']} reports to {os.path.abspath(args.pdf)} "
+              f"({stats['reports_per_sec']:.1f} reports/s)", file=sys.stderr)
+    if args.timings:
+        print(f"imports {1000 * (_T_IMPORTED - _T0):.1f} ms, "
+              f"parse+compute+write {1000 * (t_done - t_start):.1f} ms, "
+              f"cold start total {1000 * (t_done - _T0):.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""Material costs: per-element quantities priced from supplier catalogs.
+
+A price catalog lists a price per material, region, supplier and
+effective date. ``PriceCatalog`` codes regions and suppliers as integers
+and sorts once by (material, region, supplier) key and effective date,
+so pricing any number of elements is a hash join of their distinct
+region and supplier names (``pandas.Index.get_indexer``) followed by one
+``searchsorted`` for the price in effect on each pour date - no per-row
+scan. Catalog rows with a blank region apply wherever a region has no
+price of its own; elements without a supplier take the cheapest
+supplier in effect.
+
+``CostLedger`` keeps the unit price and supplier of every element and
+material. Given a new version of the catalog, ``reprice`` diffs it
+against the old one (another hash join, on the catalog's own keys) and
+re-prices only the element-materials whose (material, region) had a row
+added, removed or changed. Roll-ups by pour, floor, element type,
+supplier, material and region are grouped from the ledger's integer
+codes on demand.
+"""
+import numpy as np
+
+from concrete_calc.engine import UNIT_SYSTEMS
+from concrete_calc.headers import normalise_header
+from concrete_calc.schedule_import import _per_unique, read_schedule_chunks
+
+# Material -> quantity column it prices.
+MATERIALS = {"cement": "weight_c", "sand": "weight_s", "stone": "weight_a", "water": "weight_water"}
+MATERIAL_ALIASES = {"cement": "cement", "opc": "cement", "sand": "sand", "fine": "sand",
+                    "fine_aggregate": "sand", "stone": "stone", "gravel": "stone", "coarse": "stone",
+                    "coarse_aggregate": "stone", "aggregate": "stone", "water": "water"}
+
+# Kilograms per price unit ("per t", "per lb", ...).
+PRICE_UNITS = {"kg": 1.0, "t": 1000.0, "tonne": 1000.0, "mt": 1000.0, "lb": 0.45359237,
+               "ton": 907.18474, "short_ton": 907.18474}
+WEIGHT_UNITS = {"kg": 1.0, "lb": 0.45359237}
+
+COST_KEYS = ("pour", "floor", "element_type", "supplier", "material", "region")
+ANY_REGION = ""
+UNDATED = -(2 ** 31)  # effective date of undated catalog rows (always in effect)
+
+# Normalised header -> catalog column.
+CATALOG_ALIASES = {
+    "material": "material", "item": "material", "product": "material",
+    "region": "region", "area": "region", "market": "region",
+    "supplier": "supplier", "vendor": "supplier",
+    "effective_date": "effective_date", "effective": "effective_date", "valid_from": "effective_date",
+    "date": "effective_date", "from": "effective_date",
+    "price": "price", "unit_price": "price", "rate": "price", "cost": "price",
+    "unit": "unit", "price_unit": "unit", "per": "unit", "uom": "unit",
+}
+
+
+def _days(values, default):
+    """Dates as int64 days since the epoch (``default`` for blanks), parsed once per distinct value."""
+    import pandas as pd
+
+    def parse(uniques):
+        stamps = pd.to_datetime(uniques, errors="coerce", format="mixed")
+        days = stamps.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+        return pd.Series(np.where(stamps.isna().to_numpy(), default, days))
+
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return parse(values).to_numpy(dtype=np.int64)
+    return _per_unique(values.astype(object), parse).to_numpy(dtype=np.int64)
+
+
+def _text(values, n):
+    """Stripped strings, blank for missing cells."""
+    import pandas as pd
+
+    if values is None:
+        return np.full(n, "", dtype=object)
+    values = pd.Series(np.asarray(values, dtype=object))
+    return _per_unique(values, lambda u: u.map(lambda v: "" if v is None or v != v else str(v).strip())) \
+        .to_numpy(dtype=object)
+
+
+def _factorize(values):
+    """``(codes, uniques)`` of a text column."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values)
+    return codes.astype(np.int64), pd.Index(uniques, dtype=object)
+
+
+# --- CATALOG ---
+def normalise_catalog(frame):
+    """Catalog DataFrame with ``material, region, supplier, day, price_per_kg`` columns.
+
+    Rows with an unknown material, unit or a missing price are dropped.
+    """
+    import pandas as pd
+
+    frame = frame.rename(columns=lambda c: CATALOG_ALIASES.get(normalise_header(c), normalise_header(c)))
+    frame = frame.loc[:, ~frame.columns.duplicated()]
+    missing = [c for c in ("material", "price") if c not in frame]
+    if missing:
+        raise ValueError(f"catalog is missing required column(s): {', '.join(missing)}")
+    n = len(frame)
+    material = _per_unique(frame["material"].astype(str),
+                           lambda u: u.map(lambda v: MATERIAL_ALIASES.get(normalise_header(v))))
+    unit = _per_unique(frame["unit"].astype(str), lambda u: u.map(
+        lambda v: PRICE_UNITS.get(normalise_header(v).removeprefix("per_")))) if "unit" in frame else 1.0
+    price = pd.to_numeric(frame["price"], errors="coerce")
+    out = pd.DataFrame({
+        "material": material.to_numpy(dtype=object),
+        "region": _text(frame["region"] if "region" in frame else None, n),
+        "supplier": _text(frame["supplier"] if "supplier" in frame else None, n),
+        # Undated rows have always been in effect.
+        "day": _days(frame["effective_date"], UNDATED) if "effective_date" in frame
+        else np.full(n, UNDATED, dtype=np.int64),
+        "price_per_kg": (price / unit).to_numpy(dtype=float),
+    })
+    ok = out["material"].notna() & np.isfinite(out["price_per_kg"])
+    return out[ok.to_numpy()].reset_index(drop=True)
+
+
+def read_catalog(source, name=None):
+    """A ``PriceCatalog`` from a CSV or Excel price list (streamed, then indexed)."""
+    import pandas as pd
+
+    parts = [normalise_catalog(raw) for raw, _ in read_schedule_chunks(source, name=name)]
+    if not parts:
+        raise ValueError("the catalog is empty")
+    return PriceCatalog(pd.concat(parts, ignore_index=True))
+
+
+class PriceCatalog:
+    """Prices indexed by (material, region, supplier) and effective date.
+
+    Regions and suppliers are coded against the catalog's own ``regions``
+    and ``suppliers`` indexes; a key is ``(material, region, supplier)``
+    folded into one integer and sorted together with the date, so a
+    lookup is one ``searchsorted``.
+    """
+
+    def __init__(self, frame):
+        import pandas as pd
+
+        frame = frame.drop_duplicates(["material", "region", "supplier", "day"], keep="last")
+        region, self.regions = _factorize(np.r_[[ANY_REGION], frame["region"].to_numpy(dtype=object)])
+        supplier, self.suppliers = _factorize(np.r_[[""], frame["supplier"].to_numpy(dtype=object)])
+        material = pd.Index(list(MATERIALS)).get_indexer(frame["material"])
+        key = self._key(material, region[1:], supplier[1:])
+        order = np.lexsort((frame["day"].to_numpy(), key))
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self._key_sorted = key[order]
+        self._sorted = self._composite(self._key_sorted, self.frame["day"].to_numpy(dtype=np.int64))
+        self._price = self.frame["price_per_kg"].to_numpy(dtype=float)
+        self._supplier = supplier[1:][order]
+        # Suppliers quoting each material, tried in turn for elements without one.
+        self.quoting = {m: np.unique(self._supplier[material[order] == j]) for j, m in enumerate(MATERIALS)}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _key(self, material, region, supplier):
+        return (np.asarray(material, dtype=np.int64) * len(self.regions) + region) * len(self.suppliers) + supplier
+
+    @staticmethod
+    def _composite(key, day):
+        # Key in the high bits, day (offset to be non-negative) in the low 32.
+        return (key << 32) | (np.asarray(day, dtype=np.int64) - UNDATED)
+
+    def lookup(self, material, region, supplier, day):
+        """Sorted-row index in effect for each query (``-1`` where none).
+
+        ``region`` and ``supplier`` are codes in ``regions`` / ``suppliers``
+        (``-1`` for names the catalog does not know); queries without a
+        price in their region fall back to the any-region price.
+        """
+        j = list(MATERIALS).index(material)
+        rows = np.full(len(day), -1, dtype=np.int64)
+        for reg in (region, np.zeros_like(region)):
+            todo = np.flatnonzero((rows < 0) & (reg >= 0) & (supplier >= 0))
+            if not len(todo):
+                # Regions the catalog does not know still get the any-region price.
+                continue
+            key = self._key(j, reg[todo], supplier[todo])
+            query = self._composite(key, day[todo])
+            # Sorted queries walk the table in order, which is far kinder to the cache.
+            order = np.argsort(query, kind="stable")
+            pos = np.empty(len(todo), dtype=np.int64)
+            pos[order] = np.searchsorted(self._sorted, query[order], side="right") - 1
+            hit = pos >= 0
+            hit[hit] = self._key_sorted[pos[hit]] == key[hit]
+            rows[todo[hit]] = pos[hit]
+        return rows
+
+    def price(self, material, region, supplier, day):
+        """``(price_per_kg, supplier code)`` per query; suppliers coded ``0`` (blank) get the cheapest in effect."""
+        rows = self.lookup(material, region, supplier, day)
+        open_ = np.flatnonzero(supplier == 0)
+        # In (region, day) order every supplier's queries come out already sorted.
+        open_ = open_[np.lexsort((day[open_], region[open_]))]
+        if len(open_):
+            best = np.where(rows[open_] >= 0, self._price[np.maximum(rows[open_], 0)], np.inf)
+            for code in self.quoting[material]:
+                found = self.lookup(material, region[open_], np.full(len(open_), code), day[open_])
+                cost = np.where(found >= 0, self._price[np.maximum(found, 0)], np.inf)
+                better = cost < best
+                rows[open_[better]], best[better] = found[better], cost[better]
+        ok = rows >= 0
+        return (np.where(ok, self._price[np.maximum(rows, 0)], np.nan),
+                np.where(ok, self._supplier[np.maximum(rows, 0)], -1))
+
+    def changes(self, other):
+        """``{material: set of regions}`` whose rows differ between this catalog and ``other``."""
+        on = ["material", "region", "supplier", "day"]
+        merged = self.frame[on + ["price_per_kg"]].merge(other.frame[on + ["price_per_kg"]], on=on, how="outer",
+                                                        indicator=True)
+        differ = (merged["_merge"] != "both") | (merged["price_per_kg_x"] != merged["price_per_kg_y"])
+        changed = {}
+        for material, region in merged.loc[differ, ["material", "region"]].drop_duplicates().itertuples(index=False):
+            changed.setdefault(material, set()).add(region)
+        return changed
+
+
+# --- LEDGER ---
+class CostLedger:
+    """Unit prices and costs of every element and material, re-priced incrementally."""
+
+    def __init__(self, elements, catalog, as_of=None):
+        """``elements``: a DataFrame or mapping with the weight columns, ``unit_system`` and,
+        optionally, ``region``, ``supplier``, ``pour_date``, ``pour``, ``floor`` and ``element_type``.
+        Elements without a pour date are priced at ``as_of`` (default today).
+        """
+        n = len(elements["weight_c"])
+        self.n = n
+        today = np.datetime64(as_of or "today", "D").astype(np.int64)
+        # Key columns are factorized once; groups and joins then work on integer codes.
+        self.keys = {k: _factorize(_text(elements[k] if k in elements else None, n))
+                     for k in ("pour", "floor", "element_type", "region", "supplier")}
+        self.day = _days(elements["pour_date"], today) if "pour_date" in elements else np.full(n, today)
+        units = np.asarray(elements["unit_system"], dtype=object) if "unit_system" in elements \
+            else np.full(n, next(iter(UNIT_SYSTEMS)), dtype=object)
+        to_kg = np.ones(n)
+        for name, system in UNIT_SYSTEMS.items():
+            to_kg[units == name] = WEIGHT_UNITS[system["w_unit"]]
+        self.kg = np.column_stack([np.asarray(elements[col], dtype=float) * to_kg for col in MATERIALS.values()])
+        self.unit_price = np.full((n, len(MATERIALS)), np.nan)
+        # Supplier used per element and material, as codes into ``supplier_names``.
+        self.supplier = np.full((n, len(MATERIALS)), -1, dtype=np.int64)
+        self.supplier_names = []
+        self.catalog = catalog
+        for j, material in enumerate(MATERIALS):
+            self._price(j, material, np.arange(n))
+
+    def _price(self, j, material, rows):
+        region_codes, regions = self.keys["region"]
+        supplier_codes, suppliers = self.keys["supplier"]
+        # Hash-join the element's distinct names against the catalog's, then index by code.
+        region = self.catalog.regions.get_indexer(regions)[region_codes[rows]]
+        supplier = self.catalog.suppliers.get_indexer(suppliers)[supplier_codes[rows]]
+        price, used = self.catalog.price(material, region, supplier, self.day[rows])
+        names = {name: i for i, name in enumerate(self.supplier_names)}
+        mapping = np.array([names.setdefault(name, len(names)) for name in self.catalog.suppliers], dtype=np.int64)
+        self.supplier_names = list(names)
+        self.unit_price[rows, j] = price
+        self.supplier[rows, j] = np.where(used >= 0, mapping[np.maximum(used, 0)], -1)
+
+    @property
+    def cost(self):
+        """(elements, materials) cost; NaN where no price was found."""
+        return self.kg * self.unit_price
+
+    def reprice(self, catalog):
+        """Switch to ``catalog``, re-pricing only what its changes can affect; returns the count re-priced."""
+        changed = self.catalog.changes(catalog)
+        self.catalog = catalog
+        region_codes, regions = self.keys["region"]
+        repriced = 0
+        for j, material in enumerate(MATERIALS):
+            touched = changed.get(material)
+            if not touched:
+                continue
+            # Any-region rows can price every region (as the fallback or the cheapest supplier).
+            rows = np.arange(self.n) if ANY_REGION in touched \
+                else np.flatnonzero(regions.isin(touched)[region_codes])
+            self._price(j, material, rows)
+            repriced += len(rows)
+        return repriced
+
+    def unpriced(self):
+        """Number of element-materials with a quantity but no price."""
+        return int(np.sum(np.isnan(self.unit_price) & (self.kg > 0)))
+
+    def rollup(self, by=("element_type",)):
+        """Cost and weight (kg) per group of ``COST_KEYS``, grouped per material so suppliers split cleanly."""
+        import pandas as pd
+
+        by = list(by)
+        if not set(by) <= set(COST_KEYS):
+            raise ValueError(f"costs can be grouped by {', '.join(COST_KEYS)}")
+        k = len(MATERIALS)
+        element = np.repeat(np.arange(self.n), k)
+        columns = {}
+        for key in by:
+            if key == "material":
+                codes, labels = np.tile(np.arange(k), self.n), list(MATERIALS)
+            elif key == "supplier":
+                codes, labels = self.supplier.ravel(), self.supplier_names
+            else:
+                codes, labels = self.keys[key][0][element], list(self.keys[key][1])
+            if (codes < 0).any():
+                # Unpriced materials have no supplier; group them under a blank one.
+                labels = labels if "" in labels else [*labels, ""]
+                codes = np.where(codes < 0, labels.index(""), codes)
+            columns[key] = pd.Categorical.from_codes(codes, categories=pd.Index(labels, dtype=object))
+        frame = pd.DataFrame({**columns, "cost": self.cost.ravel(), "kg": self.kg.ravel()})
+        if not by:
+            return frame[["cost", "kg"]].sum(min_count=1).to_frame().T
+        return frame.groupby(by, observed=True, sort=True)[["cost", "kg"]].sum(min_count=1)
+
+    def table(self):
+        """Per-element costs: one column per material plus ``total_cost``."""
+        import pandas as pd
+
+        cost = self.cost
+        frame = pd.DataFrame({f"cost_{m}": cost[:, j] for j, m in enumerate(MATERIALS)})
+        frame["total_cost"] = np.nansum(cost, axis=1)
+        return frame
@@ -0,0 +1,279 @@
+"""Truck loads and batch-plant slots for a day's pours.
+
+Pours (volume, time window, optional plant and mix) are first packed into
+jobs. A pour bigger than a truck is split into equal loads; pours under
+``combine_below`` of a truck that share a window, plant and mix are
+combined into multi-drop loads by best-fit decreasing, with the open
+loads' spare capacity kept sorted (``bisect``) so each pour finds the
+tightest fit in O(log n).
+
+Jobs are then dispatched in time order from a heap keyed by each job's
+next target arrival, the earlier window end breaking ties. Each load goes
+to the plant that can get it on site soonest, given the plant's batching
+backlog and its first free truck from a per-plant heap of truck return
+times. A job's next load is targeted to arrive as the previous one
+finishes discharging, so the placing crew is kept supplied when capacity
+allows and late loads show up as waits. The whole day is O(L log L) in
+the number of loads, with a short scan over plants per load.
+
+Times are minutes from midnight; volumes and capacities share one unit
+(m³ or yd³) and rates are per hour.
+"""
+import bisect
+import heapq
+import math
+
+import numpy as np
+
+from concrete_calc.engine import UNIT_SYSTEMS
+from concrete_calc.schedule_import import _per_unique
+
+DEFAULT_TRUCK = 8.0  # volume per truck load
+DEFAULT_DISCHARGE_RATE = 30.0  # placing rate on site, per hour
+DEFAULT_WINDOW = (6 * 60, 18 * 60)
+COMBINE_BELOW = 0.5  # pours under this share of a truck may share a load
+DROP_MINUTES = 10.0  # moving between drops of a multi-drop load
+
+# Volume unit -> m³.
+VOLUME_FACTORS = {"m³": 1.0, "ft³": 0.028316846592, "yd³": 0.764554857984}
+
+PLANT_COLUMNS = ("plant", "rate", "batch", "trucks", "travel")
+DEFAULT_PLANTS = ({"plant": "Plant 1", "rate": 120.0, "batch": 3.0, "trucks": 8, "travel": 25.0},)
+
+# (name, dtype) of the exported dispatch table (see ``export.TableWriter``).
+DISPATCH_COLUMNS = (
+    ("load", "int64"), ("pours", "str"), ("plant", "str"), ("truck", "int64"), ("volume", "float64"),
+    ("batches", "int64"), ("batch_start", "str"), ("depart", "str"), ("arrive", "str"),
+    ("discharge_end", "str"), ("truck_return", "str"), ("wait_minutes", "float64"),
+    ("late_minutes", "float64"), ("volume_unit", "str"),
+)
+
+
+# --- INPUT ---
+def parse_times(values, default):
+    """Times of day as minutes from midnight (``default`` for blanks).
+
+    Accepts "07:30", datetimes (their time of day) and numbers (hours).
+    """
+    import pandas as pd
+
+    def parse(uniques):
+        numeric = pd.to_numeric(uniques, errors="coerce")
+        stamps = pd.to_datetime(uniques.astype(str).where(numeric.isna()), errors="coerce", format="mixed")
+        minutes = stamps.dt.hour * 60 + stamps.dt.minute + stamps.dt.second / 60
+        return (numeric * 60).fillna(minutes).fillna(default).astype(float)
+
+    if values is None:
+        return None
+    return _per_unique(pd.Series(np.asarray(values, dtype=object)), parse).to_numpy(dtype=float)
+
+
+def pours_from_elements(elements, volume_unit="m³", window=DEFAULT_WINDOW, offset=0):
+    """One row per pour from per-element results.
+
+    ``elements`` has ``wet_volume`` and ``unit_system`` and, optionally,
+    ``pour``, ``pour_start``, ``pour_end``, ``plant`` and ``mix_id``;
+    elements without a pour are poured on their own (named from their row
+    number plus ``offset``). Volumes are converted to ``volume_unit``;
+    missing windows default to ``window``. Returns a DataFrame of
+    ``pour, volume, start, end, plant, mix``.
+    """
+    import pandas as pd
+
+    n = len(elements["wet_volume"])
+    units = np.asarray(elements["unit_system"], dtype=object) if "unit_system" in elements \
+        else np.full(n, next(iter(UNIT_SYSTEMS)), dtype=object)
+    factor = np.ones(n)
+    for name, system in UNIT_SYSTEMS.items():
+        factor[units == name] = VOLUME_FACTORS[system["v_unit"]] / VOLUME_FACTORS[volume_unit]
+
+    def text(name):
+        if name not in elements:
+            return np.full(n, "", dtype=object)
+        return pd.Series(np.asarray(elements[name], dtype=object)).fillna("").astype(str).str.strip().to_numpy()
+
+    pour = text("pour")
+    own = pour == ""
+    pour[own] = [f"Element {offset + i + 1}" for i in np.flatnonzero(own)]
+    frame = pd.DataFrame({
+        "pour": pour,
+        "volume": np.asarray(elements["wet_volume"], dtype=float) * factor,
+        "start": parse_times(elements["pour_start"], window[0]) if "pour_start" in elements else float(window[0]),
+        "end": parse_times(elements["pour_end"], window[1]) if "pour_end" in elements else float(window[1]),
+        "plant": text("plant"),
+        "mix": text("mix_id"),
+    })
+    frame = frame[np.isfinite(frame["volume"]) & (frame["volume"] > 0)]
+    return _merge_pours(frame)
+
+
+def _merge_pours(frame):
+    # The pour's window spans its elements'; its plant and mix are the first given
+    # (blank cells do not count, so "first" skips them as missing).
+    given = frame.assign(plant=frame["plant"].replace("", np.nan), mix=frame["mix"].replace("", np.nan))
+    merged = given.groupby("pour", sort=False).agg(
+        volume=("volume", "sum"), start=("start", "min"), end=("end", "max"),
+        plant=("plant", "first"), mix=("mix", "first")).reset_index()
+    return merged.fillna({"plant": "", "mix": ""})
+
+
+def pours_from_chunks(chunks, volume_unit="m³", window=DEFAULT_WINDOW):
+    """``pours_from_elements`` over a stream of element chunks (e.g. a schedule read again).
+
+    Only per-pour rows are kept between chunks; a pour spread over several
+    chunks is merged as if it were in one.
+    """
+    import pandas as pd
+
+    parts, offset = [], 0
+    for chunk in chunks:
+        parts.append(pours_from_elements(chunk, volume_unit, window, offset))
+        offset += len(chunk["wet_volume"])
+    if not parts:
+        return pours_from_elements({"wet_volume": np.zeros(0)}, volume_unit, window)
+    return _merge_pours(pd.concat(parts, ignore_index=True))
+
+
+# --- PACKING ---
+def pack_loads(volume, start, end, plant, mix, truck=DEFAULT_TRUCK, combine_below=COMBINE_BELOW):
+    """Jobs from pours: ``(drops, volume, loads)``.
+
+    ``drops[j]`` lists the pour indices served by job ``j``, delivered in
+    ``loads[j]`` equal loads totalling ``volume[j]``. Only pours under
+    ``combine_below * truck`` with the same window, plant and mix share a
+    load.
+    """
+    volume = np.asarray(volume, dtype=float)
+    small = volume < combine_below * truck
+    drops = [[i] for i in np.flatnonzero(~small)]
+    # Best-fit decreasing per group: each pour goes into the open load it fills most.
+    groups = {}
+    for i in np.flatnonzero(small)[np.argsort(-volume[small], kind="stable")]:
+        groups.setdefault((start[i], end[i], plant[i], mix[i]), []).append(i)
+    for members in groups.values():
+        spare, bins = [], []  # sorted (spare capacity, load), and the pours in each load
+        for i in members:
+            at = bisect.bisect_left(spare, (volume[i], -1))
+            if at < len(spare):
+                room, b = spare.pop(at)
+            else:
+                room, b = truck, len(bins)
+                bins.append([])
+            bins[b].append(i)
+            bisect.insort(spare, (room - volume[i], b))
+        drops.extend(sorted(b) for b in bins)
+    totals = np.array([volume[d].sum() for d in drops]) if drops else np.zeros(0)
+    loads = np.maximum(np.ceil(totals / truck - 1e-9), 1).astype(np.int64)
+    return drops, totals, loads
+
+
+# --- DISPATCH ---
+def time_label(minutes):
+    """"HH:MM" for minutes from midnight, with the day offset past midnight."""
+    if not np.isfinite(minutes):
+        return ""
+    days, rest = divmod(int(round(minutes)), 24 * 60)
+    label = f"{rest // 60:02d}:{rest % 60:02d}"
+    return label if not days else f"{label} ({days:+d}d)"
+
+
+def schedule_loads(pours, plants=DEFAULT_PLANTS, truck=DEFAULT_TRUCK, discharge_rate=DEFAULT_DISCHARGE_RATE,
+                   combine_below=COMBINE_BELOW):
+    """Dispatch ``pours`` (see ``pours_from_elements``) from ``plants``.
+
+    ``plants`` is a sequence of mappings with ``PLANT_COLUMNS``: batching
+    rate and batch size, trucks based there and one-way travel minutes.
+    A pour whose ``plant`` names one of them is served only from it; naming
+    any other plant is a ``ValueError``.
+    Returns a DataFrame with one row per truck load (times in minutes).
+    """
+    import pandas as pd
+
+    plants = [dict(p) for p in plants]
+    if not plants:
+        raise ValueError("at least one plant is needed")
+    for p in plants:
+        if not (p["rate"] > 0 and p["batch"] > 0 and p["trucks"] >= 1 and p["travel"] >= 0):
+            raise ValueError(f"plant {p['plant']!r} needs a positive rate, batch size and truck count")
+    if not truck > 0 or not discharge_rate > 0:
+        raise ValueError("truck capacity and discharge rate must be positive")
+    names = [str(p["plant"]) for p in plants]
+    start = pours["start"].to_numpy(dtype=float)
+    end = pours["end"].to_numpy(dtype=float)
+    pinned = pours["plant"].to_numpy(dtype=object)
+    unknown = sorted(set(pinned) - set(names) - {""})
+    if unknown:
+        raise ValueError(f"pours name unknown plants: {', '.join(map(repr, unknown))} "
+                         f"(known: {', '.join(map(repr, names))})")
+    drops, totals, loads = pack_loads(pours["volume"].to_numpy(dtype=float), start, end, pinned,
+                                      pours["mix"].to_numpy(dtype=object), truck, combine_below)
+
+    every = list(range(len(plants)))
+    options = {name: [names.index(name)] for name in set(names)}
+    plant_free = [-math.inf] * len(plants)
+    # Per plant: a heap of (return time, truck) on the road and a stack of trucks not yet called out.
+    on_road = [[] for _ in plants]
+    idle = [list(range(int(p["trucks"]), 0, -1)) for p in plants]
+
+    jobs = [(start[d[0]], end[d[0]], j, 0) for j, d in enumerate(drops)]
+    heapq.heapify(jobs)
+    rows = []
+    while jobs:
+        target, due, j, i = heapq.heappop(jobs)
+        volume = totals[j] / loads[j]
+        best = None
+        for k in options.get(pinned[drops[j][0]], every):
+            p = plants[k]
+            batches = math.ceil(volume / p["batch"] - 1e-9)
+            batching = batches * p["batch"] / p["rate"] * 60
+            # Start batching just in time for the target, or as soon as the plant and a truck are free.
+            begin = max(target - p["travel"] - batching, plant_free[k])
+            # A truck back in time is reused before another one is called out.
+            reuse = bool(on_road[k]) and (on_road[k][0][0] <= begin or not idle[k])
+            if reuse:
+                begin = max(begin, on_road[k][0][0])
+            arrive = begin + batching + p["travel"]
+            if best is None or arrive < best[0]:
+                best = (arrive, k, begin, batching, batches, reuse)
+        arrive, k, begin, batching, batches, reuse = best
+        discharge = volume / discharge_rate * 60 + DROP_MINUTES * (len(drops[j]) - 1)
+        back = arrive + discharge + plants[k]["travel"]
+        plant_free[k] = begin + batching
+        truck_no = heapq.heappop(on_road[k])[1] if reuse else idle[k].pop()
+        heapq.heappush(on_road[k], (back, truck_no))
+        rows.append((j, i, k, truck_no, volume, batches, begin, begin + batching, arrive, arrive + discharge,
+                     back, arrive - target, max(arrive + discharge - due, 0.0)))
+        if i + 1 < loads[j]:
+            heapq.heappush(jobs, (arrive + discharge, due, j, i + 1))
+
+    out = pd.DataFrame(rows, columns=["job", "load_of_job", "plant_index", "truck", "volume", "batches",
+                                      "batch_start", "depart", "arrive", "discharge_end", "truck_return",
+                                      "wait_minutes", "late_minutes"])
+    labels = pours["pour"].astype(str).to_numpy()
+    out.insert(1, "pours", [" + ".join(labels[d]) for d in (drops[j] for j in out["job"])])
+    out.insert(3, "plant", np.asarray(names, dtype=object)[out["plant_index"].to_numpy(dtype=np.int64)])
+    # Loads numbered in dispatch order from the plants.
+    out = out.drop(columns="plant_index").sort_values(["batch_start", "job"], kind="stable").reset_index(drop=True)
+    out.insert(0, "load", np.arange(1, len(out) + 1))
+    return out
+
+
+def pour_summary(loads):
+    """Per-pour (or multi-drop group) loads, volume, first arrival, finish and lateness."""
+    summary = loads.groupby("pours", sort=False).agg(
+        loads=("load", "size"), volume=("volume", "sum"), first_arrival=("arrive", "min"),
+        finish=("discharge_end", "max"), wait_minutes=("wait_minutes", "sum"),
+        late_minutes=("late_minutes", "max"))
+    return summary.sort_values("first_arrival")
+
+
+def dispatch_table(loads, volume_unit):
+    """Columns of ``DISPATCH_COLUMNS`` (NumPy arrays) for ``export.TableWriter``."""
+    table = {name: loads[name].to_numpy(dtype=dtype) for name, dtype in DISPATCH_COLUMNS
+             if dtype != "str" and name in loads}
+    table["pours"] = loads["pours"].to_numpy(dtype=object)
+    table["plant"] = loads["plant"].to_numpy(dtype=object)
+    for name in ("batch_start", "depart", "arrive", "discharge_end", "truck_return"):
+        table[name] = np.array([time_label(m) for m in loads[name]], dtype=object)
+    table["volume_unit"] = np.full(len(loads), volume_unit, dtype=object)
+    return {name: table[name] for name, _ in DISPATCH_COLUMNS}
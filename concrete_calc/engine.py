@@ -0,0 +1,225 @@
+"""Vectorized quantity-takeoff engine.
+
+Every quantity the calculator page shows (wet/dry volume, per-material
+volumes and weights, water and the shape heuristic) is computed here with
+NumPy so that a single element and a 100k-member schedule go through exactly
+the same arithmetic.
+"""
+import numpy as np
+
+# --- UNIT SYSTEMS & DEFAULTS ---
+METRIC = "Metric (SI)"
+IMPERIAL = "Imperial (BG)"
+
+UNIT_SYSTEMS = {
+    METRIC: {"v_unit": "m³", "w_unit": "kg", "densities": (1440.0, 1600.0, 1550.0)},
+    IMPERIAL: {"v_unit": "ft³", "w_unit": "lb", "densities": (94.0, 100.0, 105.0)},
+}
+
+DEFAULTS = {
+    "c_ratio": 1.0,
+    "s_ratio": 2.0,
+    "a_ratio": 4.0,
+    "dry_factor": 1.54,
+    "wastage_percent": 5.0,
+    "wc_ratio": 0.50,
+}
+
+# Column names understood by compute_schedule (BIM schedule exports are
+# mapped onto these before they reach the engine).
+SCHEDULE_COLUMNS = (
+    "length", "width", "height",
+    "c_ratio", "s_ratio", "a_ratio",
+    "dens_c", "dens_s", "dens_a",
+    "dry_factor", "wastage_percent", "wc_ratio",
+)
+
+RESULT_COLUMNS = (
+    "shape_name", "wet_volume", "dry_volume", "wastage_factor", "total_ratio",
+    "vol_c", "vol_s", "vol_a",
+    "weight_c", "weight_s", "weight_a", "weight_water",
+)
+
+SHAPE_NAMES = ("Cube", "Slab", "Beam", "Column")
+
+# ACI 211.1 slump bands (mm): upper bound, workability class, display colour.
+WORKABILITY_BANDS = (
+    (25, "Very Low / Stiff", "red"),
+    (75, "Low / Plastic", "orange"),
+    (125, "Medium", "green"),
+    (np.inf, "High / Flowing", "blue"),
+)
+DEFAULT_SLUMP = 100
+
+
+# --- SHAPE HEURISTIC ---
+def classify_shape(l, w, h):
+    """Name each L/W/H prism the way the calculator page always has."""
+    l, w, h = np.broadcast_arrays(np.asarray(l, dtype=float),
+                                  np.asarray(w, dtype=float),
+                                  np.asarray(h, dtype=float))
+    conditions = [
+        (l == w) & (w == h),
+        (l > h * 2) & (w > h * 2),
+        (l > w) & (l > h),
+        (h > l) & (h > w),
+    ]
+    return np.select(conditions, SHAPE_NAMES, default="Specimen")
+
+
+# --- WORKABILITY ---
+def workability_class(slump):
+    """ACI 211.1 workability class and display colour for slump values (mm)."""
+    slump = np.asarray(slump, dtype=float)
+    bounds = np.array([b[0] for b in WORKABILITY_BANDS])
+    idx = np.searchsorted(bounds, slump, side="right").clip(max=len(bounds) - 1)
+    labels = np.array([b[1] for b in WORKABILITY_BANDS], dtype=object)
+    colors = np.array([b[2] for b in WORKABILITY_BANDS], dtype=object)
+    return labels[idx], colors[idx]
+
+
+# --- QUANTITY MATH ---
+def compute_from_volume(wet_volume, c_ratio, s_ratio, a_ratio, dens_c, dens_s, dens_a,
+                        dry_factor=DEFAULTS["dry_factor"],
+                        wastage_percent=DEFAULTS["wastage_percent"],
+                        wc_ratio=DEFAULTS["wc_ratio"]):
+    """Run the dry-volume / ratio / weight pipeline on wet volumes.
+
+    All arguments broadcast against each other, so scalars, 1-D arrays and
+    pandas Series can be mixed freely. Returns a dict of float arrays.
+    """
+    wet_volume = np.asarray(wet_volume, dtype=float)
+    wastage_factor = 1 + (np.asarray(wastage_percent, dtype=float) / 100)
+    dry_volume = wet_volume * np.asarray(dry_factor, dtype=float) * wastage_factor
+
+    c_ratio = np.asarray(c_ratio, dtype=float)
+    s_ratio = np.asarray(s_ratio, dtype=float)
+    a_ratio = np.asarray(a_ratio, dtype=float)
+    total_ratio = c_ratio + s_ratio + a_ratio
+    vol_c = (c_ratio / total_ratio) * dry_volume
+    vol_s = (s_ratio / total_ratio) * dry_volume
+    vol_a = (a_ratio / total_ratio) * dry_volume
+
+    weight_c = vol_c * np.asarray(dens_c, dtype=float)
+    weight_s = vol_s * np.asarray(dens_s, dtype=float)
+    weight_a = vol_a * np.asarray(dens_a, dtype=float)
+    weight_water = np.asarray(wc_ratio, dtype=float) * weight_c
+
+    out = {
+        "wet_volume": wet_volume,
+        "dry_volume": dry_volume,
+        "wastage_factor": wastage_factor,
+        "total_ratio": total_ratio,
+        "vol_c": vol_c,
+        "vol_s": vol_s,
+        "vol_a": vol_a,
+        "weight_c": weight_c,
+        "weight_s": weight_s,
+        "weight_a": weight_a,
+        "weight_water": weight_water,
+    }
+    shape = np.broadcast_shapes(*(v.shape for v in out.values()))
+    return {k: np.broadcast_to(v, shape) for k, v in out.items()}
+
+
+def compute_quantities(l, w, h, c_ratio, s_ratio, a_ratio, dens_c, dens_s, dens_a,
+                       dry_factor=DEFAULTS["dry_factor"],
+                       wastage_percent=DEFAULTS["wastage_percent"],
+                       wc_ratio=DEFAULTS["wc_ratio"]):
+    """Compute every quantity for rectangular prisms in one vectorized pass."""
+    l = np.asarray(l, dtype=float)
+    w = np.asarray(w, dtype=float)
+    h = np.asarray(h, dtype=float)
+    out = compute_from_volume(l * w * h, c_ratio, s_ratio, a_ratio,
+                              dens_c, dens_s, dens_a,
+                              dry_factor, wastage_percent, wc_ratio)
+    shape = out["wet_volume"].shape
+    out["shape_name"] = np.broadcast_to(classify_shape(l, w, h), shape)
+    return out
+
+
+def compute_single(l, w, h, c_ratio, s_ratio, a_ratio, dens_c, dens_s, dens_a,
+                   dry_factor=DEFAULTS["dry_factor"],
+                   wastage_percent=DEFAULTS["wastage_percent"],
+                   wc_ratio=DEFAULTS["wc_ratio"]):
+    """Scalar convenience wrapper used by the calculator page."""
+    out = compute_quantities(l, w, h, c_ratio, s_ratio, a_ratio,
+                             dens_c, dens_s, dens_a,
+                             dry_factor, wastage_percent, wc_ratio)
+    return {k: v.item() for k, v in out.items()}
+
+
+# --- SCHEDULES ---
+def default_densities(unit_system):
+    """Per-row default bulk densities for an array of unit-system labels."""
+    unit_system = np.asarray(unit_system, dtype=object)
+    imperial = unit_system == IMPERIAL
+    metric_d = UNIT_SYSTEMS[METRIC]["densities"]
+    imperial_d = UNIT_SYSTEMS[IMPERIAL]["densities"]
+    return tuple(np.where(imperial, i, m) for m, i in zip(metric_d, imperial_d))
+
+
+def _column(schedule, name, n, default):
+    if name in schedule:
+        values = np.asarray(schedule[name], dtype=float)
+        if default is not None:
+            values = np.where(np.isnan(values), default, values)
+        return values
+    return np.broadcast_to(np.asarray(default, dtype=float), (n,))
+
+
+def compute_schedule(schedule, unit_system=METRIC, include_inputs=False):
+    """Compute quantities for a whole member schedule.
+
+    ``schedule`` is a DataFrame or a mapping of equal-length columns using
+    the names in ``SCHEDULE_COLUMNS``. With a ``shape`` column, volumes come
+    from ``geometry.element_geometry`` (cylinders, frusta, polygonal slabs,
+    stairs, voids) and ``length``/``width``/``height`` become each element's
+    bounding box. Missing ratio/factor columns (or
+    blank cells) fall back to the calculator defaults; missing densities
+    fall back to the defaults of each row's ``unit_system`` column, or of
+    ``unit_system`` when the schedule has no such column.
+
+    A DataFrame input returns a DataFrame with the result columns appended;
+    any other mapping returns a dict of arrays. With ``include_inputs`` the
+    resolved input columns (defaults filled in) are included as well.
+    """
+    geometry = None
+    if "shape" in schedule:
+        from concrete_calc.geometry import element_geometry
+
+        geometry = element_geometry(schedule)
+    n = len(schedule["length"] if geometry is None else geometry["wet_volume"])
+    units = schedule["unit_system"] if "unit_system" in schedule else np.full(n, unit_system, dtype=object)
+    dens_defaults = default_densities(units)
+
+    cols = {}
+    for name in SCHEDULE_COLUMNS:
+        if name in ("length", "width", "height"):
+            cols[name] = np.asarray(schedule[name] if geometry is None else geometry[name], dtype=float)
+        elif name.startswith("dens_"):
+            cols[name] = _column(schedule, name, n, dens_defaults["csa".index(name[-1])])
+        else:
+            cols[name] = _column(schedule, name, n, DEFAULTS[name])
+
+    if geometry is None:
+        out = compute_quantities(
+            cols["length"], cols["width"], cols["height"],
+            cols["c_ratio"], cols["s_ratio"], cols["a_ratio"],
+            cols["dens_c"], cols["dens_s"], cols["dens_a"],
+            cols["dry_factor"], cols["wastage_percent"], cols["wc_ratio"],
+        )
+    else:
+        out = compute_from_volume(
+            geometry["wet_volume"],
+            cols["c_ratio"], cols["s_ratio"], cols["a_ratio"],
+            cols["dens_c"], cols["dens_s"], cols["dens_a"],
+            cols["dry_factor"], cols["wastage_percent"], cols["wc_ratio"],
+        )
+        out["shape_name"] = geometry["shape_name"]
+    if include_inputs:
+        out = {**cols, **out}
+    if hasattr(schedule, "assign"):
+        keys = (SCHEDULE_COLUMNS if include_inputs else ()) + RESULT_COLUMNS
+        return schedule.assign(**{k: out[k] for k in keys})
+    return out
@@ -0,0 +1,188 @@
+"""Typed exports of quantity results for downstream tools.
+
+Per-element rows (computed chunks from ``schedule_import.process_schedule``
+or ``spec.compute_records``) and aggregated totals are written with
+numeric columns kept numeric. Parquet and Arrow IPC go through pyarrow,
+one row group / record batch per chunk; CSV uses the csv module and Excel
+openpyxl's write-only mode. Every writer takes one chunk at a time, so an
+export of any size holds only the current chunk in memory.
+"""
+import csv
+import io
+import os
+
+import numpy as np
+
+from concrete_calc.engine import UNIT_SYSTEMS
+
+EXPORT_FORMATS = {
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    "arrow": ("Arrow IPC", ".arrow", "application/vnd.apache.arrow.file"),
+    "csv": ("CSV", ".csv", "text/csv"),
+    "xlsx": ("Excel", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+EXCEL_MAX_ROWS = 1_048_576
+
+QUANTITY_COLUMNS = ("wet_volume", "dry_volume", "weight_c", "weight_s", "weight_a", "weight_water")
+
+# (name, dtype) of the exported tables; "str" columns are text, the rest numeric.
+ELEMENT_COLUMNS = (
+    ("element_id", "str"), ("element_type", "str"), ("shape_name", "str"), ("unit_system", "str"),
+    ("mix_id", "str"), ("c_ratio", "float64"), ("s_ratio", "float64"), ("a_ratio", "float64"),
+    ("wc_ratio", "float64"),
+) + tuple((name, "float64") for name in QUANTITY_COLUMNS) + (("volume_unit", "str"), ("weight_unit", "str"))
+
+TOTAL_COLUMNS = (
+    ("unit_system", "str"), ("element_type", "str"), ("count", "int64"),
+) + tuple((name, "float64") for name in QUANTITY_COLUMNS) + (("volume_unit", "str"), ("weight_unit", "str"))
+
+
+# --- TABLES ---
+def _text(values, n):
+    if values is None:
+        return np.full(n, None, dtype=object)
+    values = np.asarray(values, dtype=object)
+    return np.where([v is None or v != v for v in values], None, values.astype(str)).astype(object)
+
+
+def _units(unit_system):
+    """Volume and weight unit labels per row (``None`` for unknown unit systems)."""
+    unit_system = np.asarray(unit_system, dtype=object)
+    v_unit = np.full(len(unit_system), None, dtype=object)
+    w_unit = np.full(len(unit_system), None, dtype=object)
+    for name, units in UNIT_SYSTEMS.items():
+        mask = unit_system == name
+        v_unit[mask], w_unit[mask] = units["v_unit"], units["w_unit"]
+    return v_unit, w_unit
+
+
+def mix_ids(c_ratio, s_ratio, a_ratio):
+    """``"c:s:a"`` labels, formatted once per distinct mix."""
+    ratios = np.column_stack([c_ratio, s_ratio, a_ratio]).astype(float)
+    unique, inverse = np.unique(ratios, axis=0, return_inverse=True)
+    labels = np.array([":".join(f"{r:g}" for r in row) for row in unique], dtype=object)
+    return labels[inverse.ravel()]
+
+
+def element_table(computed):
+    """Columns of ``ELEMENT_COLUMNS`` (NumPy arrays) for one computed chunk.
+
+    ``computed`` is a DataFrame or a mapping of arrays with the engine's
+    result columns and, optionally, ``element_id``, ``element_type``,
+    ``shape_name`` and the resolved mix inputs.
+    """
+    n = len(computed["wet_volume"])
+    table = {}
+    for name, dtype in ELEMENT_COLUMNS:
+        if name == "mix_id" or name.endswith("_unit"):
+            continue
+        values = computed[name] if name in computed else None
+        if dtype == "str":
+            table[name] = _text(values, n)
+        else:
+            table[name] = np.full(n, np.nan) if values is None else np.asarray(values, dtype=dtype)
+    if "element_id" not in computed:
+        table["element_id"] = np.arange(n).astype(str).astype(object)
+    table["mix_id"] = mix_ids(table["c_ratio"], table["s_ratio"], table["a_ratio"]) if n else _text(None, 0)
+    table["volume_unit"], table["weight_unit"] = _units(table["unit_system"])
+    return {name: table[name] for name, _ in ELEMENT_COLUMNS}
+
+
+def totals_table(by_type):
+    """Columns of ``TOTAL_COLUMNS`` from ``ScheduleTotals.by_type()``."""
+    flat = by_type.reset_index()
+    table = {name: _text(flat[name], len(flat)) for name in ("unit_system", "element_type")}
+    table["count"] = flat["count"].to_numpy(dtype=np.int64)
+    for name in QUANTITY_COLUMNS:
+        table[name] = flat[name].to_numpy(dtype=np.float64)
+    table["volume_unit"], table["weight_unit"] = _units(table["unit_system"])
+    return {name: table[name] for name, _ in TOTAL_COLUMNS}
+
+
+# --- WRITERS ---
+class TableWriter:
+    """Write tables (dicts of equal-length arrays) chunk by chunk to ``dest``.
+
+    ``dest`` is a path or a binary file object; ``columns`` is
+    ``ELEMENT_COLUMNS`` or ``TOTAL_COLUMNS``. Use as a context manager or
+    call ``close()`` to finish the file.
+    """
+
+    def __init__(self, dest, fmt, columns=ELEMENT_COLUMNS, sheet="Quantities"):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}")
+        self.fmt, self.columns, self.rows = fmt, columns, 0
+        self._owned = isinstance(dest, (str, os.PathLike))
+        self._dest = dest
+        if fmt in ("parquet", "arrow"):
+            import pyarrow as pa
+
+            types = {"str": pa.string(), "float64": pa.float64(), "int64": pa.int64()}
+            self._schema = pa.schema([(name, types[dtype]) for name, dtype in columns])
+            if fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                self._writer = pq.ParquetWriter(dest, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(dest, self._schema)
+        elif fmt == "csv":
+            self._handle = open(dest, "w", newline="", encoding="utf-8") if self._owned \
+                else io.TextIOWrapper(dest, newline="", encoding="utf-8")
+            self._writer = csv.writer(self._handle)
+            self._writer.writerow([name for name, _ in columns])
+        else:
+            from openpyxl import Workbook
+
+            self._book, self._sheet = Workbook(write_only=True), sheet
+            self._new_sheet()
+
+    def write(self, table):
+        """Append one chunk (a row group for Parquet, a record batch for Arrow)."""
+        n = len(table[self.columns[0][0]])
+        if not n:
+            return
+        self.rows += n
+        if self.fmt in ("parquet", "arrow"):
+            import pyarrow as pa
+
+            self._writer.write_batch(pa.record_batch(
+                [pa.array(table[name], type=field.type) for (name, _), field in zip(self.columns, self._schema)],
+                schema=self._schema))
+            return
+        # NaN cells are left empty, as in the schedules these rows came from.
+        values = [np.where(np.isnan(table[name]), None, table[name]).tolist() if dtype == "float64"
+                  else table[name].tolist() for name, dtype in self.columns]
+        if self.fmt == "csv":
+            self._writer.writerows(zip(*values))
+        else:
+            for row in zip(*values):
+                if self._sheet_rows == EXCEL_MAX_ROWS:
+                    self._new_sheet()
+                self._writer.append(row)
+                self._sheet_rows += 1
+
+    def _new_sheet(self):
+        # Excel caps a sheet at EXCEL_MAX_ROWS rows; larger exports continue on numbered sheets.
+        sheets = len(self._book.worksheets)
+        self._writer = self._book.create_sheet(self._sheet if not sheets else f"{self._sheet} {sheets + 1}")
+        self._writer.append([name for name, _ in self.columns])
+        self._sheet_rows = 1
+
+    def close(self):
+        if self.fmt in ("parquet", "arrow"):
+            self._writer.close()
+        elif self.fmt == "csv":
+            self._handle.flush()
+            if self._owned:
+                self._handle.close()
+            else:
+                self._handle.detach()
+        else:
+            self._book.save(self._dest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,31 @@
+"""Plotly figures for the calculator page."""
+import plotly.graph_objects as go
+
+from concrete_calc.geometry import prism_mesh
+from concrete_calc.metrics import profiled
+
+
+@profiled("draw_3d_specimen")
+def draw_3d_specimen(l, w, h, mesh=None):
+    # l/w/h are the element's bounding box; ``mesh`` draws shapes other than a prism.
+    vertices, triangles = prism_mesh(l, w, h) if mesh is None else mesh
+    fig = go.Figure(data=[
+        go.Mesh3d(
+            x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
+            i=triangles[:, 0], j=triangles[:, 1], k=triangles[:, 2],
+            opacity=0.6,
+            color='lightcoral',
+            flatshading=True
+        )
+    ])
+    fig.update_layout(
+        scene=dict(
+            xaxis=dict(nticks=4, range=[-1, max(l,w,h)+1]),
+            yaxis=dict(nticks=4, range=[-1, max(l,w,h)+1]),
+            zaxis=dict(nticks=4, range=[-1, max(l,w,h)+1]),
+            aspectmode='data'
+        ),
+        margin=dict(l=0, r=0, b=0, t=0),
+        height=400
+    )
+    return fig
@@ -0,0 +1,568 @@
+"""Element geometry: volumes, classification and triangle meshes.
+
+Meshes are plain ``(vertices, triangles)`` pairs: an ``(n, 3)`` float array
+of corner coordinates and an ``(m, 3)`` int array of vertex indices, wound
+counter-clockwise when seen from outside. Both the Plotly 3D view and the
+vector PDF renderer consume this form.
+
+Besides rectangular prisms, elements can be one of ``SHAPES``:
+
+``cylinder``
+    circular column or pier: ``diameter``, ``height``.
+``frustum``
+    tapered (rectangular) footing: ``length`` x ``width`` at the base,
+    ``top_length`` x ``top_width`` at the top, ``height``.
+``cone_frustum``
+    tapered circular pier: ``diameter`` at the base, ``top_diameter``,
+    ``height``.
+``polygon``
+    slab or wall of any plan shape: ``outline`` extruded by ``height``
+    (the thickness), less any ``openings``.
+``stair``
+    straight waist-slab flight: ``steps``, ``rise``, ``going``, ``width``
+    and ``waist`` (slab thickness measured square to the pitch).
+
+Any element may also give a ``void_volume`` (sleeves, pockets) to subtract.
+Outlines are sequences of ``(x, y)`` points or strings like
+``"0 0; 6 0; 6 4; 0 4"``; ``openings`` holds several such polygons,
+separated by ``|`` in strings. ``element_geometry`` evaluates whole
+columns of elements at once; polygon areas use a vectorized shoelace sum
+over all outlines flattened into one array.
+"""
+import numpy as np
+
+# Outward-wound triangles of a rectangular prism, in the vertex order of prism_mesh.
+PRISM_TRIANGLES = np.array([
+    [7, 3, 0], [0, 4, 7], [0, 2, 1], [0, 3, 2],
+    [4, 5, 6], [4, 6, 7], [6, 5, 1], [6, 1, 2],
+    [4, 0, 5], [0, 1, 5], [3, 7, 6], [2, 3, 6],
+])
+
+
+def prism_mesh(l, w, h):
+    """The 8-vertex, 12-triangle mesh of an L x W x H prism at the origin."""
+    vertices = np.array([
+        [0, 0, 0], [l, 0, 0], [l, w, 0], [0, w, 0],
+        [0, 0, h], [l, 0, h], [l, w, h], [0, w, h],
+    ], dtype=float)
+    return vertices, PRISM_TRIANGLES
+
+
+# Unit-cube corners in the vertex order of prism_mesh.
+UNIT_PRISM_CORNERS = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=float)
+
+
+def prisms_mesh(origins, sizes, dtype=float):
+    """One merged mesh for many axis-aligned prisms.
+
+    ``origins`` and ``sizes`` are ``(n, 3)`` arrays (minimum corner and
+    L/W/H). Element ``i`` owns vertices ``8*i .. 8*i+7`` and triangles
+    ``12*i .. 12*i+11``, in the same order as ``prism_mesh``.
+    """
+    origins = np.asarray(origins, dtype=dtype).reshape(-1, 3)
+    sizes = np.asarray(sizes, dtype=dtype).reshape(-1, 3)
+    vertices = (origins[:, None, :] + sizes[:, None, :] * UNIT_PRISM_CORNERS.astype(dtype)).reshape(-1, 3)
+    offsets = 8 * np.arange(len(sizes), dtype=np.int32)
+    triangles = (PRISM_TRIANGLES.astype(np.int32)[None, :, :] + offsets[:, None, None]).reshape(-1, 3)
+    return vertices, triangles
+
+
+# --- SHAPES ---
+SHAPES = ("prism", "cylinder", "frustum", "cone_frustum", "polygon", "stair")
+SHAPE_ALIASES = {
+    "": "prism", "prism": "prism", "box": "prism", "rectangular": "prism", "rect": "prism",
+    "cylinder": "cylinder", "circular": "cylinder", "round": "cylinder", "circle": "cylinder",
+    "frustum": "frustum", "tapered": "frustum", "tapered_footing": "frustum", "pyramid_frustum": "frustum",
+    "cone_frustum": "cone_frustum", "cone": "cone_frustum", "tapered_circular": "cone_frustum",
+    "polygon": "polygon", "polygonal": "polygon", "slab": "polygon", "outline": "polygon",
+    "stair": "stair", "stairs": "stair", "staircase": "stair", "flight": "stair",
+}
+# Dimensions each shape needs (all must be positive).
+SHAPE_REQUIRED = {
+    "prism": ("length", "width", "height"),
+    "cylinder": ("diameter", "height"),
+    "frustum": ("length", "width", "top_length", "top_width", "height"),
+    "cone_frustum": ("diameter", "top_diameter", "height"),
+    "polygon": ("height",),
+    "stair": ("steps", "rise", "going", "width", "waist"),
+}
+GEOMETRY_COLUMNS = ("diameter", "top_length", "top_width", "top_diameter", "steps", "rise", "going",
+                    "waist", "void_volume")
+# Plain-text wet-volume formula per shape (report methodology).
+VOLUME_FORMULAS = {
+    "prism": "LxWxH", "cylinder": "pi/4 x D^2 x H", "frustum": "H/6 x (A1 + A2 + 4Am)",
+    "cone_frustum": "pi x H/12 x (D^2 + Dd + d^2)", "polygon": "net plan area x thickness",
+    "stair": "profile area x width",
+}
+CIRCLE_SEGMENTS = 24
+
+
+def shape_codes(shape, n):
+    """Index into ``SHAPES`` per element (-1 for unknown names)."""
+    if shape is None:
+        return np.zeros(n, dtype=np.int64)
+    # Blank cells arrive as None or NaN; both mean a plain prism.
+    labels, inverse = np.unique(np.asarray(shape, dtype=object).astype(str), return_inverse=True)
+
+    def code(label):
+        key = label.strip().lower().replace(" ", "_").replace("-", "_")
+        name = "prism" if key in ("nan", "none") else SHAPE_ALIASES.get(key)
+        return SHAPES.index(name) if name else -1
+
+    index = np.array([code(label) for label in labels], dtype=np.int64)
+    return index[inverse.reshape(-1)]
+
+
+# --- POLYGONS ---
+def parse_polygon(value):
+    """``(k, 2)`` float array from a point sequence or a ``"x y; x y; ..."`` string."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return np.zeros((0, 2))
+    if isinstance(value, str):
+        points = [p.replace(",", " ").split() for p in value.split(";") if p.strip()]
+        try:
+            return np.array(points, dtype=float).reshape(-1, 2)
+        except ValueError:
+            return np.zeros((0, 2))
+    return np.asarray(value, dtype=float).reshape(-1, 2)
+
+
+def parse_polygons(value):
+    """List of ``(k, 2)`` arrays from a list of polygons or a ``|``-separated string."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    if isinstance(value, str):
+        return [parse_polygon(part) for part in value.split("|") if part.strip()]
+    return [parse_polygon(part) for part in value]
+
+
+def polygon_text(points):
+    """``"x y; x y; ..."`` form of a ``(k, 2)`` array (the inverse of ``parse_polygon``)."""
+    return "; ".join(f"{x!r} {y!r}" for x, y in np.asarray(points, dtype=float).tolist())
+
+
+def polygons_text(polygons):
+    """``|``-separated form of several polygons (the inverse of ``parse_polygons``)."""
+    return " | ".join(polygon_text(p) for p in polygons)
+
+
+def ragged(polygons):
+    """Flatten polygons to ``(xy, starts)``: all vertices and each polygon's first index."""
+    sizes = np.array([len(p) for p in polygons], dtype=np.int64)
+    starts = np.r_[0, np.cumsum(sizes)[:-1]] if len(sizes) else np.zeros(0, dtype=np.int64)
+    xy = np.concatenate(polygons) if len(polygons) else np.zeros((0, 2))
+    return xy.reshape(-1, 2), starts
+
+
+def shoelace_areas(xy, starts):
+    """Signed areas (positive counter-clockwise) of many polygons at once.
+
+    ``xy`` holds every polygon's vertices back to back and ``starts`` the
+    index of each polygon's first vertex. Polygons with fewer than three
+    vertices get an area of 0.
+    """
+    xy = np.asarray(xy, dtype=float)
+    starts = np.asarray(starts, dtype=np.int64)
+    n = len(xy)
+    if not n:
+        return np.zeros(len(starts))
+    ends = np.r_[starts[1:], n]
+    # Index of each vertex's successor, wrapping at the end of its polygon.
+    nxt = np.arange(1, n + 1)
+    full = ends > starts
+    nxt[ends[full] - 1] = starts[full]
+    cross = xy[:, 0] * xy[nxt, 1] - xy[nxt, 0] * xy[:, 1]
+    sums = np.add.reduceat(cross, np.minimum(starts, n - 1))
+    return np.where(ends - starts >= 3, 0.5 * sums, 0.0)
+
+
+def stair_profiles(steps, rise, going, waist):
+    """Side profiles of waist-slab stair flights as ragged polygons ``(xy, starts)``.
+
+    Each profile runs up the nosings from ``(0, 0)`` to the top landing
+    edge, down by the vertical waist depth and back along the soffit to
+    where it meets the floor.
+    """
+    steps = np.maximum(np.nan_to_num(np.asarray(steps, dtype=float)), 1).astype(np.int64)
+    rise, going, waist = (np.asarray(v, dtype=float) for v in (rise, going, waist))
+    counts = 2 * steps + 3
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    owner = np.repeat(np.arange(len(steps)), counts)
+    local = np.arange(counts.sum()) - starts[owner]
+    r, g, n = rise[owner], going[owner], steps[owner]
+    # Vertices 0 .. 2n-1 alternate riser foot / riser top; then the top
+    # corner, the soffit end under it and the soffit foot on the floor.
+    i = local // 2
+    x = np.where(local < 2 * n, i * g, n * g)
+    y = np.where(local < 2 * n, (i + local % 2) * r, n * r)
+    slope = np.hypot(r, g) / np.where(g > 0, g, np.nan)
+    depth = waist[owner] * slope
+    y = np.where(local == 2 * n + 1, n * r - depth, y)
+    foot = np.minimum(depth * g / np.where(r > 0, r, np.nan), n * g)
+    x = np.where(local == 2 * n + 2, foot, x)
+    y = np.where(local == 2 * n + 2, np.maximum(n * r - depth - (n * g - foot) * r / g, 0.0), y)
+    return np.column_stack([x, y]), starts
+
+
+# --- VOLUMES ---
+def _numeric(elements, name, n):
+    if name in elements:
+        return np.asarray(elements[name], dtype=float).reshape(-1)
+    return np.full(n, np.nan)
+
+
+def element_geometry(elements):
+    """Wet volume, bounding box and shape class for a batch of elements.
+
+    ``elements`` is a DataFrame or a mapping of equal-length columns
+    (``shape`` plus the dimensions in ``SHAPE_REQUIRED``; a missing
+    ``shape`` column means prisms). Returns a dict of arrays:
+    ``wet_volume``, ``length``/``width``/``height`` (bounding box),
+    ``plan_area`` (polygons only, else NaN), ``shape`` (index into
+    ``SHAPES``, -1 if unknown) and ``shape_name``. Unknown shapes and
+    missing dimensions give a NaN volume.
+    """
+    n = len(next(iter(elements.values())) if isinstance(elements, dict) else elements)
+    code = shape_codes(elements["shape"] if "shape" in elements else None, n)
+    num = {k: _numeric(elements, k, n) for k in ("length", "width", "height") + GEOMETRY_COLUMNS}
+    l, w, h, d = num["length"], num["width"], num["height"], num["diameter"]
+    tl, tw, td = num["top_length"], num["top_width"], num["top_diameter"]
+
+    volume = np.full(n, np.nan)
+    box = np.column_stack([l, w, h])
+    plan_area = np.full(n, np.nan)
+
+    is_ = {name: code == i for i, name in enumerate(SHAPES)}
+    volume = np.where(is_["prism"], l * w * h, volume)
+    volume = np.where(is_["cylinder"], np.pi / 4 * d ** 2 * h, volume)
+    # Prismoidal rule: exact for a linear taper in both directions.
+    mid = (l + tl) / 2 * (w + tw) / 2
+    volume = np.where(is_["frustum"], h / 6 * (l * w + tl * tw + 4 * mid), volume)
+    volume = np.where(is_["cone_frustum"], np.pi * h / 12 * (d ** 2 + d * td + td ** 2), volume)
+    round_ = is_["cylinder"] | is_["cone_frustum"]
+    top_d = np.where(is_["cone_frustum"], td, d)
+    box = np.where(round_[:, None], np.column_stack([np.fmax(d, top_d), np.fmax(d, top_d), h]), box)
+    box = np.where(is_["frustum"][:, None], np.column_stack([np.fmax(l, tl), np.fmax(w, tw), h]), box)
+
+    rows = np.flatnonzero(is_["polygon"])
+    if len(rows):
+        outlines = [parse_polygon(v) for v in np.asarray(elements["outline"], dtype=object)[rows]] \
+            if "outline" in elements else [np.zeros((0, 2))] * len(rows)
+        area = np.abs(shoelace_areas(*ragged(outlines)))
+        if "openings" in elements:
+            holes = [parse_polygons(v) for v in np.asarray(elements["openings"], dtype=object)[rows]]
+            owner = np.repeat(np.arange(len(rows)), [len(hs) for hs in holes])
+            hole_areas = np.abs(shoelace_areas(*ragged([p for hs in holes for p in hs])))
+            area = area - np.bincount(owner, hole_areas, minlength=len(rows))
+        area = np.where(area > 0, area, np.nan)
+        extent = np.array([np.ptp(o, axis=0) if len(o) else (np.nan, np.nan) for o in outlines]).reshape(-1, 2)
+        plan_area[rows] = area
+        volume[rows] = area * h[rows]
+        box[rows] = np.column_stack([extent, h[rows]])
+
+    rows = np.flatnonzero(is_["stair"])
+    if len(rows):
+        steps, rise, going, waist = (num[k][rows] for k in ("steps", "rise", "going", "waist"))
+        ok = (steps >= 1) & (rise > 0) & (going > 0) & (waist > 0)
+        profile = np.abs(shoelace_areas(*stair_profiles(np.where(ok, steps, 1), np.where(ok, rise, 1),
+                                                        np.where(ok, going, 1), np.where(ok, waist, 1))))
+        volume[rows] = np.where(ok, profile * w[rows], np.nan)
+        box[rows] = np.column_stack([steps * going, w[rows], steps * rise])
+
+    for i, name in enumerate(SHAPES):
+        for dim in SHAPE_REQUIRED[name]:
+            volume = np.where((code == i) & ~(num[dim] > 0), np.nan, volume)
+    volume = volume - np.nan_to_num(num["void_volume"])
+    volume = np.where(volume > 0, volume, np.nan)
+    return {
+        "wet_volume": volume, "length": box[:, 0], "width": box[:, 1], "height": box[:, 2],
+        "plan_area": plan_area, "shape": code,
+        "shape_name": classify_elements(code, box[:, 0], box[:, 1], box[:, 2]),
+    }
+
+
+def classify_elements(code, l, w, h):
+    """Element class per shape: the prism heuristic for boxes, by proportion otherwise."""
+    from concrete_calc.engine import classify_shape
+
+    names = np.asarray(classify_shape(l, w, h), dtype=object).copy()
+    plan = np.fmin(l, w)
+    names[code == SHAPES.index("cylinder")] = np.where(h >= plan, "Circular Column",
+                                                       "Circular Footing")[code == SHAPES.index("cylinder")]
+    names[code == SHAPES.index("cone_frustum")] = np.where(h >= plan, "Tapered Column",
+                                                           "Tapered Footing")[code == SHAPES.index("cone_frustum")]
+    names[code == SHAPES.index("frustum")] = "Tapered Footing"
+    is_polygon = code == SHAPES.index("polygon")
+    names[is_polygon] = np.where(h * 2 < plan, "Slab", "Wall")[is_polygon]
+    names[code == SHAPES.index("stair")] = "Stair"
+    names[code < 0] = "Unknown"
+    return names
+
+
+def missing_dimensions(elements):
+    """Reason per element why its volume cannot be computed (``""`` when it can)."""
+    geo = element_geometry(elements)
+    n = len(geo["wet_volume"])
+    reasons = np.full(n, "", dtype=object)
+    reasons[geo["shape"] < 0] = "unknown shape"
+    for i, name in enumerate(SHAPES):
+        rows = (geo["shape"] == i) & (reasons == "")
+        for dim in SHAPE_REQUIRED[name]:
+            bad = rows & ~(_numeric(elements, dim, n) > 0)
+            reasons[bad & (reasons == "")] = f"{dim} must be a positive number for a {name}"
+    polygon = geo["shape"] == SHAPES.index("polygon")
+    reasons[polygon & np.isnan(geo["plan_area"]) & (reasons == "")] = "outline must enclose a positive area"
+    reasons[np.isnan(geo["wet_volume"]) & (reasons == "")] = "voids exceed the element volume"
+    return reasons
+
+
+# --- SHAPE MESHES ---
+def frustum_mesh(l, w, top_l, top_w, h):
+    """Rectangular frustum (tapered footing) centred over its base, in prism_mesh order."""
+    dx, dy = (l - top_l) / 2, (w - top_w) / 2
+    vertices = np.array([
+        [0, 0, 0], [l, 0, 0], [l, w, 0], [0, w, 0],
+        [dx, dy, h], [dx + top_l, dy, h], [dx + top_l, dy + top_w, h], [dx, dy + top_w, h],
+    ], dtype=float)
+    return vertices, PRISM_TRIANGLES
+
+
+def round_mesh(diameter, h, top_diameter=None, segments=CIRCLE_SEGMENTS):
+    """Cylinder or conical frustum standing on the origin plane (x, y >= 0)."""
+    r0 = diameter / 2
+    r1 = r0 if top_diameter is None else top_diameter / 2
+    t = 2 * np.pi * np.arange(segments) / segments
+    ring = np.column_stack([np.cos(t), np.sin(t)])
+    centre = max(r0, r1)
+    vertices = np.vstack([
+        np.column_stack([centre + r0 * ring, np.zeros(segments)]),
+        np.column_stack([centre + r1 * ring, np.full(segments, h)]),
+        [[centre, centre, 0], [centre, centre, h]],
+    ])
+    i = np.arange(segments)
+    j = (i + 1) % segments
+    bottom, top = 2 * segments, 2 * segments + 1
+    triangles = np.vstack([
+        np.column_stack([i, j, j + segments]), np.column_stack([i, j + segments, i + segments]),
+        np.column_stack([np.full(segments, bottom), j, i]),
+        np.column_stack([np.full(segments, top), i + segments, j + segments]),
+    ])
+    return vertices, triangles
+
+
+def _segments_cross(p, q, a, b):
+    def orient(u, v, w):
+        return (v[0] - u[0]) * (w[1] - u[1]) - (v[1] - u[1]) * (w[0] - u[0])
+    d1, d2, d3, d4 = orient(p, q, a), orient(p, q, b), orient(a, b, p), orient(a, b, q)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def _on_segment(p, q, a):
+    """Whether point ``a`` lies on segment ``p``-``q`` strictly between its ends."""
+    pq, pa = q - p, a - p
+    cross = pq[0] * pa[1] - pq[1] * pa[0]
+    t = pa @ pq / (pq @ pq)
+    return abs(cross) <= 1e-12 * (pq @ pq) and 0 < t < 1
+
+
+def _bridge_holes(points, outer, holes):
+    """Splice holes into the outer ring (index lists into ``points``) via visible bridges."""
+    ring = list(outer)
+    edges = [(ring[k], ring[(k + 1) % len(ring)]) for k in range(len(ring))]
+    for hole in holes:
+        edges += [(hole[k], hole[(k + 1) % len(hole)]) for k in range(len(hole))]
+    for hole in sorted(holes, key=lambda hl: -points[hl, 0].max()):
+        m = int(np.argmax(points[hole, 0]))
+        mp = points[hole[m]]
+        order = np.argsort(np.hypot(*(points[ring] - mp).T))
+        bridge = int(order[0])
+        for k in order:
+            cand = points[ring[k]]
+            # A bridge through a vertex (e.g. a hole corner in line) is as bad as one through an edge.
+            if not any(_segments_cross(mp, cand, points[a], points[b]) for a, b in edges) \
+                    and not any(_on_segment(mp, cand, points[a]) for a, _ in edges):
+                bridge = int(k)
+                break
+        ring = ring[:bridge + 1] + hole[m:] + hole[:m + 1] + ring[bridge:]
+    return ring
+
+
+def _cross(a, b, c):
+    """Twice the signed area of triangles ``a, b, c`` (points or ``(k, 2)`` arrays)."""
+    return (b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1]) - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0])
+
+
+def triangulate_polygon(outline, holes=()):
+    """Ear-clipping triangulation of a simple polygon with optional holes.
+
+    Returns ``(points, triangles)`` where ``points`` stacks the outline
+    and the holes and ``triangles`` index into it, counter-clockwise.
+    Vertices are kept in a linked ring and only reflex vertices (the only
+    ones that can lie inside an ear) are tested, in one NumPy call per
+    candidate ear. Collinear vertices are clipped as zero-area triangles so
+    every vertex stays in the mesh. Raises ``ValueError`` when no ear can
+    be found (a self-intersecting or otherwise degenerate outline).
+    """
+    outline = np.asarray(outline, dtype=float)
+    if shoelace_areas(outline, [0])[0] < 0:
+        outline = outline[::-1]
+    holes = [np.asarray(hl, dtype=float) for hl in holes if len(hl) >= 3]
+    holes = [hl[::-1] if shoelace_areas(hl, [0])[0] > 0 else hl for hl in holes]
+    points = np.vstack([outline, *holes]) if holes else outline
+    offsets = np.cumsum([len(outline)] + [len(hl) for hl in holes])
+    ring = np.array(_bridge_holes(points, list(range(len(outline))),
+                                  [list(range(a, b)) for a, b in zip(offsets[:-1], offsets[1:])]))
+
+    m = len(ring)
+    xy = points[ring]
+    nxt = np.roll(np.arange(m), -1)
+    prv = np.roll(np.arange(m), 1)
+    alive = np.ones(m, dtype=bool)
+    tol = 1e-12 * max(float(np.ptp(xy, axis=0).max()) ** 2, 1e-300) if m else 0.0
+
+    def turn(i):
+        return _cross(xy[prv[i]], xy[i], xy[nxt[i]])
+
+    def straight(i):
+        # Collinear and between its neighbours: clipping it loses no area.
+        a, b, c = xy[prv[i]], xy[i], xy[nxt[i]]
+        return abs(turn(i)) <= tol and (a - b) @ (c - b) < 0
+
+    reflex = _cross(xy[prv], xy, xy[nxt]) <= tol
+
+    def is_ear(i):
+        a, c = prv[i], nxt[i]
+        if reflex[i]:
+            return straight(i)
+        others = np.flatnonzero(reflex & alive)
+        if not len(others):
+            return True
+        q = xy[others]
+        corners = xy[[a, i, c]]
+        # Bridged holes repeat points; copies of the corners do not block the ear.
+        shared = (np.abs(q[:, None, :] - corners[None]).max(axis=2) <= 1e-12).any(axis=1)
+        inside = (_cross(corners[0], corners[1], q) >= 0) & (_cross(corners[1], corners[2], q) >= 0) \
+            & (_cross(corners[2], corners[0], q) >= 0)
+        return not (inside & ~shared).any()
+
+    triangles = []
+    remaining, i, misses = m, 0, 0
+    while remaining > 3:
+        if is_ear(i):
+            a, c = prv[i], nxt[i]
+            triangles.append((ring[a], ring[i], ring[c]))
+            alive[i] = False
+            nxt[a], prv[c] = c, a
+            remaining -= 1
+            reflex[a], reflex[c] = turn(a) <= tol, turn(c) <= tol
+            i, misses = c, 0
+        else:
+            i = nxt[i]
+            misses += 1
+            if misses > remaining:
+                raise ValueError(f"cannot triangulate the outline: {remaining} of its {m} vertices "
+                                 "form no ear (is it self-intersecting?)")
+    if remaining == 3:
+        triangles.append(tuple(ring[np.flatnonzero(alive)]))
+    return points, np.array(triangles, dtype=np.int64).reshape(-1, 3)
+
+
+def extrusion_mesh(outline, height, holes=()):
+    """Closed mesh of a plan outline (with holes) extruded from z = 0 to ``height``."""
+    points, caps = triangulate_polygon(outline, holes)
+    k = len(points)
+    vertices = np.vstack([np.column_stack([points, np.zeros(k)]), np.column_stack([points, np.full(k, height)])])
+    outline_n = len(outline)
+    rings = [np.arange(outline_n)]
+    start = outline_n
+    for hole in holes:
+        if len(hole) >= 3:
+            rings.append(np.arange(start, start + len(hole)))
+            start += len(hole)
+    walls = []
+    for ring in rings:
+        i, j = ring, np.roll(ring, -1)
+        walls += [np.column_stack([i, j, j + k]), np.column_stack([i, j + k, i + k])]
+    # Caps: bottom faces down (reversed), top faces up. Wall winding follows
+    # each ring's direction, which triangulate_polygon made outer CCW / holes CW.
+    triangles = np.vstack([caps[:, ::-1], caps + k, *walls])
+    return vertices, triangles
+
+
+def element_mesh(shape, length=None, width=None, height=None, diameter=None, top_length=None,
+                 top_width=None, top_diameter=None, outline=None, openings=None, steps=None, rise=None,
+                 going=None, waist=None, **_):
+    """Mesh for one element of any shape in ``SHAPES`` (minimum corner at the origin)."""
+    code = int(shape) if isinstance(shape, (int, np.integer)) else int(shape_codes([shape], 1)[0])
+    shape = SHAPES[max(code, 0)]
+    if shape == "cylinder":
+        return round_mesh(diameter, height)
+    if shape == "cone_frustum":
+        return round_mesh(diameter, height, top_diameter)
+    if shape == "frustum":
+        return frustum_mesh(length, width, top_length, top_width, height)
+    if shape == "polygon":
+        outer = parse_polygon(outline)
+        if len(outer) < 3:
+            return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+        holes = [hl for hl in parse_polygons(openings) if len(hl) >= 3]
+        lo = outer.min(axis=0)
+        return extrusion_mesh(outer - lo, height, [hl - lo for hl in holes])
+    if shape == "stair":
+        xy, _ = stair_profiles([steps], [rise], [going], [waist])
+        vertices, triangles = extrusion_mesh(xy, width)
+        # Profile (x, y) extruded along z becomes (going, width, rise); swapping
+        # two axes mirrors the mesh, so the winding is reversed to stay outward.
+        return vertices[:, [0, 2, 1]], triangles[:, ::-1]
+    return prism_mesh(length, width, height)
+
+
+def report_geometry(record):
+    """``(mesh, volume formula)`` for one element's report page.
+
+    ``record`` maps column names to the element's values: ``shape`` (a
+    name or code; prisms when absent) and the dimensions it needs.
+    """
+    code = int(shape_codes([record.get("shape")], 1)[0])
+    name = SHAPES[max(code, 0)]
+    params = {k: record[k] for k in ("length", "width", "height", "outline", "openings") + GEOMETRY_COLUMNS
+              if k in record}
+    void = record.get("void_volume")
+    formula = VOLUME_FORMULAS[name] + (" - voids" if void is not None and void > 0 else "")
+    return element_mesh(code, **params), formula
+
+
+def elements_mesh(origins, elements, dtype=float):
+    """Merged mesh of elements of any shape placed at ``origins``.
+
+    Returns ``(vertices, triangles, owner)`` where ``owner`` gives each
+    triangle's element index. Prisms are generated in one batch, other
+    shapes one mesh per element.
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 3)
+    n = len(origins)
+    code = shape_codes(elements["shape"], n) if "shape" in elements else np.zeros(n, dtype=np.int64)
+    boxes = np.flatnonzero(code <= 0)
+    others = np.flatnonzero(code > 0)
+    parts, owners = [], []
+    if len(boxes):
+        sizes = np.column_stack([np.asarray(elements[k], dtype=float)[boxes] for k in ("length", "width", "height")])
+        parts.append(prisms_mesh(origins[boxes], sizes))
+        owners.append(np.repeat(boxes, len(PRISM_TRIANGLES)))
+    if len(others):
+        columns = {k: np.asarray(elements[k], dtype=object)[others]
+                   for k in ("length", "width", "height", "outline", "openings") + GEOMETRY_COLUMNS if k in elements}
+        for j, i in enumerate(others):
+            params = {k: v[j] if k in ("outline", "openings") else float(v[j]) for k, v in columns.items()}
+            vertices, triangles = element_mesh(int(code[i]), **params)
+            parts.append((vertices + origins[i], triangles))
+            owners.append(np.full(len(triangles), i))
+    if not parts:
+        return np.zeros((0, 3), dtype=dtype), np.zeros((0, 3), dtype=np.int32), np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum([0] + [len(v) for v, _ in parts[:-1]])
+    vertices = np.vstack([v for v, _ in parts]).astype(dtype)
+    triangles = np.vstack([t + o for (_, t), o in zip(parts, offsets)]).astype(np.int32)
+    return vertices, triangles, np.concatenate(owners)
@@ -0,0 +1,246 @@
+"""Aggregate gradation: sieve analyses, fineness modulus and stockpile blending.
+
+Gradings are percent passing on the ASTM sieve series in ``SIEVES_MM``
+(coarsest first). A blend of stockpiles in mass proportions ``x`` passes
+``A @ x`` where the columns of ``A`` are the stockpiles' gradings, so
+fitting a grading band is a small least-squares problem on the simplex
+(proportions non-negative, summing to one). ``blend`` solves any number
+of such problems at once with accelerated projected gradient steps on
+stacked NumPy arrays, so thousands of what-ifs (perturbed gradings,
+other bands) cost one call.
+
+Target bands are the ASTM C33 grading requirements in ``C33_BANDS``:
+``"fine"`` for fine aggregate and the size numbers (``"57"``, ``"67"``,
+...) for coarse aggregate.
+"""
+import re
+
+import numpy as np
+
+SIEVES_MM = np.array([75.0, 63.0, 50.0, 37.5, 25.0, 19.0, 12.5, 9.5, 4.75, 2.36, 1.18, 0.6, 0.3, 0.15, 0.075])
+SIEVE_LABELS = ('3"', '2-1/2"', '2"', '1-1/2"', '1"', '3/4"', '1/2"', '3/8"', "No. 4", "No. 8", "No. 16",
+                "No. 30", "No. 50", "No. 100", "No. 200")
+# Sieves whose cumulative percent retained add up to the fineness modulus (ASTM C125).
+FM_SIEVES_MM = (75.0, 37.5, 19.0, 9.5, 4.75, 2.36, 1.18, 0.6, 0.3, 0.15)
+FINE_SIEVE_MM = 4.75
+
+# --- ASTM C33 GRADING REQUIREMENTS (percent passing) ---
+C33_BANDS = {
+    "fine": {9.5: (100, 100), 4.75: (95, 100), 2.36: (80, 100), 1.18: (50, 85), 0.6: (25, 60),
+             0.3: (5, 30), 0.15: (0, 10)},
+    "4": {50.0: (100, 100), 37.5: (90, 100), 25.0: (20, 55), 19.0: (0, 15), 9.5: (0, 5)},
+    "467": {50.0: (100, 100), 37.5: (95, 100), 19.0: (35, 70), 9.5: (10, 30), 4.75: (0, 5)},
+    "57": {37.5: (100, 100), 25.0: (95, 100), 12.5: (25, 60), 4.75: (0, 10), 2.36: (0, 5)},
+    "67": {25.0: (100, 100), 19.0: (90, 100), 9.5: (20, 55), 4.75: (0, 10), 2.36: (0, 5)},
+    "7": {19.0: (100, 100), 12.5: (90, 100), 9.5: (40, 70), 4.75: (0, 15), 2.36: (0, 5)},
+    "8": {12.5: (100, 100), 9.5: (85, 100), 4.75: (10, 30), 2.36: (0, 10), 1.18: (0, 5)},
+}
+C33_LABELS = {"fine": "Fine aggregate", "4": "No. 4 (37.5-19 mm)", "467": "No. 467 (37.5-4.75 mm)",
+              "57": "No. 57 (25-4.75 mm)", "67": "No. 67 (19-4.75 mm)", "7": "No. 7 (12.5-4.75 mm)",
+              "8": "No. 8 (9.5-2.36 mm)"}
+
+DEFAULT_ITERATIONS = 400
+DEFAULT_MID_WEIGHT = 0.05
+WHAT_IF_SD = 3.0  # percentage points of passing
+
+
+# --- SIEVE ANALYSES ---
+def _sieve_size(label):
+    """Sieve opening in mm from a number (mm) or a name like 'No. 4', '#8' or '3/8 in'."""
+    if isinstance(label, (int, float, np.number)):
+        return float(label)
+    text = str(label).strip().lower().replace(" ", "")
+    text = re.sub(r"^(no\.?|#)", "no", text).replace('"', "in").replace("inch", "in")
+    if text in ("pan", "0"):
+        return 0.0
+    names = {f"no{name.split()[-1]}" if name.startswith("No.") else name.replace('"', "in"): size
+             for name, size in zip(SIEVE_LABELS, SIEVES_MM)}
+    names.update({"no200": 0.075, "no4": 4.75})
+    if text in names:
+        return float(names[text])
+    if text.endswith("mm"):
+        text = text[:-2]
+    elif text.endswith("um") or text.endswith("µm"):
+        return float(text[:-2]) / 1000
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"unknown sieve {label!r}") from None
+
+
+def resample(sizes, passing):
+    """Percent passing on ``SIEVES_MM`` from a test on other ``sizes`` (mm).
+
+    Interpolates linearly on log size; everything above the largest
+    sieve tested passes if it passed 100 % there, and sieves finer than
+    the finest tested keep its value.
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    passing = np.asarray(passing, dtype=float)
+    keep = sizes > 0
+    order = np.argsort(sizes[keep])
+    log_sizes, values = np.log(sizes[keep][order]), passing[keep][order]
+    out = np.interp(np.log(SIEVES_MM), log_sizes, values)
+    return np.clip(np.minimum.accumulate(out), 0.0, 100.0)
+
+
+def passing_from_retained(sizes, retained):
+    """Cumulative percent passing from masses retained on each sieve (``0`` = pan)."""
+    sizes = np.asarray(sizes, dtype=float)
+    retained = np.asarray(retained, dtype=float)
+    order = np.argsort(-sizes)
+    total = retained.sum()
+    if total <= 0:
+        raise ValueError("sieve analysis has no retained mass")
+    passing = np.empty_like(retained)
+    passing[order] = 100.0 - 100.0 * np.cumsum(retained[order]) / total
+    return passing
+
+
+def read_sieve_analyses(source):
+    """``(names, passing)`` from a CSV of sieve analyses, ``passing`` shaped (sieves, stockpiles).
+
+    Long format has ``stockpile``, ``sieve`` and either ``passing``
+    (percent) or ``retained`` (mass, with a ``pan`` row) columns. Wide
+    format has a ``sieve`` column and one percent-passing column per
+    stockpile. Sieves are given in mm or by name ('No. 4', '3/8"').
+    """
+    import pandas as pd
+
+    frame = pd.read_csv(source, skipinitialspace=True)
+    labels = {str(c).strip(): c for c in frame.columns}
+    frame.columns = [re.sub(r"[^a-z0-9]+", "_", c.lower()).strip("_") for c in labels]
+    sieve_col = next((c for c in ("sieve", "sieve_mm", "size", "size_mm") if c in frame), None)
+    if sieve_col is None:
+        raise ValueError("no sieve column (expected 'sieve')")
+    pile_col = next((c for c in ("stockpile", "source", "pile", "material") if c in frame), None)
+    sizes = np.array([_sieve_size(s) for s in frame[sieve_col]])
+    if pile_col is None:
+        columns = [(label, column) for label, column in zip(labels, frame.columns) if column != sieve_col]
+        return [label for label, _ in columns], np.column_stack(
+            [resample(sizes, frame[column].to_numpy(dtype=float)) for _, column in columns])
+    names, columns = [], []
+    for name, rows in frame.groupby(pile_col, sort=False):
+        idx = rows.index.to_numpy()
+        if "passing" in frame:
+            columns.append(resample(sizes[idx], rows["passing"].to_numpy(dtype=float)))
+        elif "retained" in frame:
+            columns.append(resample(sizes[idx], passing_from_retained(sizes[idx],
+                                                                      rows["retained"].to_numpy(dtype=float))))
+        else:
+            raise ValueError("no 'passing' or 'retained' column")
+        names.append(str(name))
+    return names, np.column_stack(columns)
+
+
+# --- PROPERTIES ---
+def fineness_modulus(passing):
+    """Fineness modulus of gradings ``passing`` (..., sieves) on ``SIEVES_MM``."""
+    idx = np.searchsorted(-SIEVES_MM, -np.array(FM_SIEVES_MM))
+    return (100.0 - np.asarray(passing, dtype=float)[..., idx]).sum(axis=-1) / 100.0
+
+
+def is_fine(passing):
+    """True for gradings that are mostly sand (at least half passing 4.75 mm)."""
+    return np.asarray(passing, dtype=float)[..., list(SIEVES_MM).index(FINE_SIEVE_MM)] >= 50.0
+
+
+def band(name):
+    """``(lo, hi)`` percent passing on ``SIEVES_MM`` for a ``C33_BANDS`` entry.
+
+    Sieves above the band's largest one must pass 100 %, sieves below its
+    smallest one inherit that sieve's upper limit, and unlisted sieves in
+    between are unconstrained (NaN).
+    """
+    limits = C33_BANDS[name]
+    lo, hi = np.full(len(SIEVES_MM), np.nan), np.full(len(SIEVES_MM), np.nan)
+    for size, (low, high) in limits.items():
+        i = list(SIEVES_MM).index(size)
+        lo[i], hi[i] = low, high
+    top, bottom = max(limits), min(limits)
+    lo[SIEVES_MM > top], hi[SIEVES_MM > top] = 100.0, 100.0
+    lo[SIEVES_MM < bottom], hi[SIEVES_MM < bottom] = 0.0, limits[bottom][1]
+    return lo, hi
+
+
+# --- BLENDING ---
+def project_simplex(v):
+    """Euclidean projection of each row of ``v`` (..., n) onto the probability simplex."""
+    u = -np.sort(-v, axis=-1)
+    css = np.cumsum(u, axis=-1) - 1.0
+    k = np.arange(1, v.shape[-1] + 1)
+    rho = np.sum(u - css / k > 0, axis=-1, keepdims=True)
+    theta = np.take_along_axis(css, rho - 1, axis=-1) / rho
+    return np.maximum(v - theta, 0.0)
+
+
+def blend(passing, lo, hi, mid_weight=DEFAULT_MID_WEIGHT, iterations=DEFAULT_ITERATIONS):
+    """Stockpile proportions whose blend best fits the band ``[lo, hi]``.
+
+    ``passing`` is (..., sieves, stockpiles); ``lo`` and ``hi`` are
+    (..., sieves) with NaN on unconstrained sieves; leading dimensions
+    broadcast, one problem per index. The objective is the squared
+    distance of the blend outside the band plus ``mid_weight`` times its
+    squared distance from the band's mid-line (which picks the most
+    central blend when several fit), minimised over the simplex by FISTA with adaptive restart.
+
+    Returns a dict: ``proportions`` (..., stockpiles), ``passing``
+    (..., sieves), ``fineness_modulus``, ``excess`` (largest deviation
+    outside the band, percentage points) and ``within`` (excess <= 0.5).
+    """
+    A = np.asarray(passing, dtype=float)
+    lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+    shape = np.broadcast_shapes(A.shape[:-1], lo.shape, hi.shape)
+    A = np.broadcast_to(A, shape + A.shape[-1:])
+    weight = np.broadcast_to(~(np.isnan(lo) | np.isnan(hi)), shape).astype(float)
+    lo = np.broadcast_to(np.nan_to_num(lo, nan=0.0), shape)
+    hi = np.broadcast_to(np.nan_to_num(hi, nan=100.0), shape)
+    mid = (lo + hi) / 2
+
+    def gradient(x):
+        blended = np.einsum("...sp,...p->...s", A, x)
+        r = weight * (np.minimum(blended - lo, 0.0) + np.maximum(blended - hi, 0.0)
+                      + mid_weight * (blended - mid))
+        return 2 * np.einsum("...sp,...s->...p", A, r)
+
+    # Step 1/L with L bounding the gradient's Lipschitz constant per problem.
+    lipschitz = 2 * (1 + mid_weight) * np.linalg.norm(A * weight[..., None], ord=2, axis=(-2, -1)) ** 2
+    step = 1.0 / np.maximum(lipschitz, 1e-12)[..., None]
+    n = A.shape[-1]
+    x = np.full(shape[:-1] + (n,), 1.0 / n)
+    y, t = x, np.ones(shape[:-1] + (1,))
+    for _ in range(iterations):
+        x_next = project_simplex(y - step * gradient(y))
+        # Restart the momentum of problems where it points uphill (adaptive restart).
+        t = np.where(np.sum((y - x_next) * (x_next - x), axis=-1, keepdims=True) > 0, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = x_next + (t - 1) / t_next * (x_next - x)
+        x, t = x_next, t_next
+
+    blended = np.einsum("...sp,...p->...s", A, x)
+    excess = np.max(weight * np.maximum(lo - blended, blended - hi), axis=-1, initial=0.0)
+    return {
+        "proportions": x, "passing": blended, "fineness_modulus": fineness_modulus(blended),
+        "excess": excess, "within": excess <= 0.5,
+    }
+
+
+def perturbed_gradings(passing, n, sd=WHAT_IF_SD, seed=0):
+    """``n`` what-if copies of ``passing`` (sieves, stockpiles) with test-to-test scatter.
+
+    Sieves strictly between 0 and 100 % passing get normal noise of ``sd``
+    percentage points; gradings are kept within 0-100 and non-increasing
+    towards the finer sieves.
+    """
+    passing = np.asarray(passing, dtype=float)
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0.0, sd, (n,) + passing.shape) * ((passing > 0) & (passing < 100))
+    return np.clip(np.minimum.accumulate(passing + noise, axis=-2), 0.0, 100.0)
+
+
+def blended_density(proportions, densities):
+    """Bulk density of a blend from mass ``proportions`` and stockpile bulk ``densities``.
+
+    Loose volumes add: one unit of mass of the blend takes ``sum(p / rho)``.
+    """
+    return 1.0 / np.sum(np.asarray(proportions, dtype=float) / np.asarray(densities, dtype=float), axis=-1)
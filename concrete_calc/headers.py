@@ -0,0 +1,99 @@
+"""Header and unit-label aliases shared by the schedule importer and specs.
+
+Kept apart from ``schedule_import`` so parsing a spec needs only NumPy and
+the engine: pandas, openpyxl and the shape geometry stay unimported until a
+schedule file or a millimetre outline actually needs them.
+"""
+import re
+
+import numpy as np
+
+from concrete_calc.engine import IMPERIAL, METRIC
+
+# Normalised header -> engine column. Headers are lower-cased and runs of
+# non-alphanumerics collapsed to "_" before lookup.
+COLUMN_ALIASES = {
+    "element_id": "element_id", "id": "element_id", "mark": "element_id", "guid": "element_id",
+    "type": "element_type", "element_type": "element_type", "category": "element_type",
+    "family": "element_type",
+    "length": "length", "l": "length", "length_m": "length", "length_ft": "length",
+    "width": "width", "w": "width", "width_m": "width", "width_ft": "width",
+    "height": "height", "h": "height", "depth": "height", "thickness": "height",
+    "height_m": "height", "height_ft": "height",
+    "mix": "mix_ratio", "mix_ratio": "mix_ratio", "ratio": "mix_ratio",
+    "c_ratio": "c_ratio", "cement_ratio": "c_ratio",
+    "s_ratio": "s_ratio", "sand_ratio": "s_ratio",
+    "a_ratio": "a_ratio", "stone_ratio": "a_ratio", "aggregate_ratio": "a_ratio",
+    "wc_ratio": "wc_ratio", "w_c": "wc_ratio", "w_c_ratio": "wc_ratio",
+    "dry_factor": "dry_factor", "wastage": "wastage_percent", "wastage_percent": "wastage_percent",
+    "dens_c": "dens_c", "cement_density": "dens_c",
+    "dens_s": "dens_s", "sand_density": "dens_s",
+    "dens_a": "dens_a", "stone_density": "dens_a",
+    "unit_system": "unit_system", "units": "unit_system", "unit": "unit_system",
+    "slump": "slump", "pour": "pour",
+    "floor": "floor", "level": "floor", "storey": "floor", "story": "floor",
+    "region": "region", "supplier": "supplier", "vendor": "supplier",
+    "pour_date": "pour_date", "cast_date": "pour_date", "placement_date": "pour_date",
+    "pour_start": "pour_start", "start_time": "pour_start", "window_start": "pour_start",
+    "pour_end": "pour_end", "end_time": "pour_end", "window_end": "pour_end",
+    "plant": "plant", "batch_plant": "plant",
+    "shape": "shape", "geometry": "shape", "section_shape": "shape",
+    "diameter": "diameter", "dia": "diameter", "diameter_m": "diameter", "diameter_ft": "diameter",
+    "top_length": "top_length", "top_width": "top_width", "top_diameter": "top_diameter",
+    "steps": "steps", "risers": "steps", "number_of_risers": "steps",
+    "rise": "rise", "riser_height": "rise", "going": "going", "tread": "going", "tread_depth": "going",
+    "waist": "waist", "waist_thickness": "waist",
+    "void_volume": "void_volume", "voids": "void_volume",
+    "outline": "outline", "boundary": "outline", "polygon": "outline",
+    "openings": "openings", "holes": "openings",
+    "x": "x", "pos_x": "x", "origin_x": "x", "location_x": "x",
+    "y": "y", "pos_y": "y", "origin_y": "y", "location_y": "y",
+    "z": "z", "pos_z": "z", "origin_z": "z", "location_z": "z", "elevation": "z",
+}
+
+# Short unit labels found in exports.
+UNIT_ALIASES = {
+    "metric": METRIC, "si": METRIC, "m": METRIC, "metric_si": METRIC,
+    "imperial": IMPERIAL, "bg": IMPERIAL, "ft": IMPERIAL, "us": IMPERIAL, "imperial_bg": IMPERIAL,
+}
+# Metric exports in millimetres: the rows become metric with dimensions scaled to metres.
+MILLIMETRE_UNITS = ("mm", "millimetre", "millimetres", "millimeter", "millimeters", "metric_mm")
+
+LENGTH_COLUMNS = ("length", "width", "height", "x", "y", "z", "diameter", "top_length", "top_width",
+                  "top_diameter", "rise", "going", "waist")
+
+
+def normalise_header(name):
+    """Lower-case ``name`` and collapse runs of non-alphanumerics to ``_``."""
+    return re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+
+
+def is_blank(value):
+    """True for None, NaN and whitespace-only strings."""
+    return value is None or value != value or (isinstance(value, str) and not value.strip())
+
+
+def millimetres_to_metres(columns, rows):
+    """Scale the dimensions of ``rows`` (a boolean mask) from mm to m in place.
+
+    ``columns`` is a DataFrame or a dict of arrays; outlines and openings of
+    those rows are rewritten in metres and ``void_volume`` goes from mm³ to m³.
+    """
+    rows = np.asarray(rows, dtype=bool)
+    if not rows.any():
+        return columns
+    from concrete_calc.geometry import parse_polygon, parse_polygons, polygon_text, polygons_text
+
+    for name, factor in [(c, 1e-3) for c in LENGTH_COLUMNS] + [("void_volume", 1e-9)]:
+        if name in columns:
+            values = np.asarray(columns[name], dtype=float)
+            columns[name] = np.where(rows, values * factor, values)
+    for name, scaled in (("outline", lambda v: polygon_text(parse_polygon(v) / 1000)),
+                         ("openings", lambda v: polygons_text([p / 1000 for p in parse_polygons(v)]))):
+        if name in columns:
+            values = np.asarray(columns[name], dtype=object).copy()
+            for i in np.flatnonzero(rows):
+                if not is_blank(values[i]):
+                    values[i] = scaled(values[i])
+            columns[name] = values
+    return columns
@@ -0,0 +1,324 @@
+"""In-place strength by the maturity method (ASTM C1074) from temperature logs.
+
+Logger files (CSV or Excel with sensor, time and temperature columns, and
+optionally the element each sensor is cast in) are streamed through
+``schedule_import.read_schedule_chunks``, so a multi-GB log holds one
+chunk in memory. ``MaturityState`` integrates each chunk into per-sensor
+running values of
+
+* the Nurse-Saul temperature-time factor, ``sum((T - T0) * dt)`` in °C·h,
+* the Arrhenius equivalent age at the reference temperature, in hours,
+
+carrying every sensor's last reading over to the next chunk, so readings
+appended later (the next download from the same loggers) continue the
+sums without reprocessing the history. Inside a chunk readings may come
+in any order; from chunk to chunk each sensor's readings must move
+forward in time, as loggers write them. Readings at or before a sensor's
+last processed time are skipped, so re-sending an overlapping file is
+harmless. Memory is constant in the number of readings: the state keeps
+a few values per sensor plus one history point per sensor and
+``history_hours`` bucket for the strength curves.
+
+A calibration curve ``S = a + b * ln(M)`` fitted to lab strengths maps
+either index to strength; ``element_curves`` takes the weakest sensor of
+each element as its strength.
+"""
+import io
+
+import numpy as np
+
+from concrete_calc.headers import normalise_header
+from concrete_calc.schedule_import import read_schedule_chunks
+
+DEFAULT_CHUNK_SIZE = 200_000
+DATUM_C = 0.0  # Nurse-Saul datum temperature T0 (ASTM C1074 for Type I cement)
+ACTIVATION_ENERGY = 40_000.0  # J/mol
+REFERENCE_C = 20.0  # reference temperature of the equivalent age
+GAS_CONSTANT = 8.314  # J/(mol·K)
+HISTORY_HOURS = 1.0
+
+INDICES = {"ttf": "Temperature-time factor (°C·h)", "equivalent_age": "Equivalent age (h)"}
+
+# Normalised header -> log column.
+LOG_ALIASES = {
+    "sensor": "sensor", "sensor_id": "sensor", "logger": "sensor", "logger_id": "sensor", "serial": "sensor",
+    "channel": "sensor", "probe": "sensor",
+    "time": "time", "timestamp": "time", "datetime": "time", "date_time": "time", "reading_time": "time",
+    "hours": "hours", "elapsed_hours": "hours", "age_h": "hours", "age_hours": "hours",
+    "temperature": "temperature", "temp": "temperature", "temperature_c": "temperature", "temp_c": "temperature",
+    "temperature_f": "temperature_f", "temp_f": "temperature_f",
+    "element": "element", "element_id": "element", "mark": "element", "pour": "element", "member": "element",
+}
+
+# Lab cylinders cured at REFERENCE_C: age (days) -> strength (MPa), for a typical 30 MPa mix.
+DEFAULT_CALIBRATION = ((1, 8.0), (3, 17.0), (7, 23.0), (14, 27.0), (28, 30.0))
+
+
+# --- INDICES ---
+def temperature_time_factor(temp_c, hours, datum=DATUM_C):
+    """Nurse-Saul increments ``max(T - T0, 0) * dt`` (°C·h)."""
+    return np.maximum(np.asarray(temp_c, dtype=float) - datum, 0.0) * hours
+
+
+def equivalent_age(temp_c, hours, activation_energy=ACTIVATION_ENERGY, reference=REFERENCE_C):
+    """Arrhenius equivalent-age increments at ``reference`` °C (hours)."""
+    temp_k = np.asarray(temp_c, dtype=float) + 273.15
+    return np.exp(-activation_energy / GAS_CONSTANT * (1.0 / temp_k - 1.0 / (reference + 273.15))) * hours
+
+
+# --- CALIBRATION ---
+def calibrate(ages_days, strengths, index="ttf", cure_temp=REFERENCE_C, datum=DATUM_C,
+              activation_energy=ACTIVATION_ENERGY):
+    """Strength-maturity curve from lab strengths at ``ages_days`` cured at ``cure_temp`` °C.
+
+    Returns ``{"index", "a", "b"}`` for ``S = a + b * ln(M)``, fitted by
+    least squares on the maturity the lab specimens reached.
+    """
+    hours = np.asarray(ages_days, dtype=float) * 24.0
+    strengths = np.asarray(strengths, dtype=float)
+    keep = (hours > 0) & np.isfinite(strengths)
+    if keep.sum() < 2:
+        raise ValueError("at least two lab strengths at positive ages are needed")
+    if index == "ttf":
+        maturity = temperature_time_factor(cure_temp, hours[keep], datum)
+    else:
+        maturity = equivalent_age(cure_temp, hours[keep], activation_energy)
+    if not np.all(maturity > 0):
+        raise ValueError("the lab curing temperature must be above the datum temperature")
+    b, a = np.polyfit(np.log(maturity), strengths[keep], 1)
+    return {"index": index, "a": float(a), "b": float(b)}
+
+
+def strength(maturity, curve):
+    """Strength (MPa) at maturity ``maturity`` on a ``calibrate`` curve, never negative."""
+    maturity = np.asarray(maturity, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.maximum(curve["a"] + curve["b"] * np.log(np.maximum(maturity, 0.0)), 0.0)
+
+
+# --- LOG READING ---
+def normalise_log(chunk):
+    """``(sensor, element, time_s, temp_c, rejected)`` arrays from a raw logger chunk.
+
+    Times are datetimes (seconds since the epoch) or, with an ``hours``
+    column, elapsed hours (returned in seconds). Rows without a sensor,
+    time or temperature are counted in ``rejected`` and dropped.
+    """
+    import pandas as pd
+
+    chunk = chunk.rename(columns=lambda c: LOG_ALIASES.get(normalise_header(c), normalise_header(c)))
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    missing = [c for c in ("sensor", "time|hours", "temperature") if not any(p in chunk for p in c.split("|"))
+               and not (c == "temperature" and "temperature_f" in chunk)]
+    if missing:
+        raise ValueError(f"log is missing required column(s): {', '.join(m.replace('|', '/') for m in missing)}")
+    if "temperature" in chunk:
+        temp = pd.to_numeric(chunk["temperature"], errors="coerce").to_numpy(dtype=float)
+    else:
+        temp = (pd.to_numeric(chunk["temperature_f"], errors="coerce").to_numpy(dtype=float) - 32.0) / 1.8
+    if "time" in chunk:
+        stamps = pd.to_datetime(chunk["time"], errors="coerce", format="mixed")
+        seconds = np.where(stamps.isna(), np.nan, stamps.to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9)
+    else:
+        seconds = pd.to_numeric(chunk["hours"], errors="coerce").to_numpy(dtype=float) * 3600.0
+    sensor = chunk["sensor"]
+    element = chunk["element"] if "element" in chunk else sensor
+    ok = sensor.notna().to_numpy() & np.isfinite(seconds) & np.isfinite(temp)
+    return (sensor[ok].astype(str).to_numpy(), element[ok].astype(str).to_numpy(), seconds[ok], temp[ok],
+            int((~ok).sum()))
+
+
+# --- RUNNING STATE ---
+class MaturityState:
+    """Running maturity of every sensor seen so far, updated chunk by chunk."""
+
+    def __init__(self, datum=DATUM_C, activation_energy=ACTIVATION_ENERGY, history_hours=HISTORY_HOURS):
+        self.datum, self.activation_energy, self.history_hours = datum, activation_energy, history_hours
+        self.sensors, self.elements = [], []
+        self._index = {}  # sensor -> position
+        self.datetime = None  # True for timestamped logs, False for elapsed hours
+        self.readings = self.rejected = self.skipped = 0
+        self.sources = set()  # ids of files already added
+        self._values = {name: np.empty(0) for name in ("first", "last", "last_temp", "ttf", "equivalent_age")}
+        self._counts = np.empty(0, dtype=np.int64)
+        self._history = []  # (sensor positions, time s, ttf, equivalent age) per chunk
+
+    def _positions(self, sensor, element):
+        names, first = np.unique(sensor, return_index=True)
+        new = [(s, e) for s, e in zip(names, element[first]) if s not in self._index]
+        if new:
+            for s, e in new:
+                self._index[s] = len(self.sensors)
+                self.sensors.append(s)
+                self.elements.append(e)
+            # Maturity starts at zero; times and temperatures are unknown until a reading arrives.
+            self._values = {k: np.concatenate([v, np.zeros(len(new)) if k in ("ttf", "equivalent_age")
+                                               else np.full(len(new), np.nan)]) for k, v in self._values.items()}
+            self._counts = np.concatenate([self._counts, np.zeros(len(new), dtype=np.int64)])
+        lookup = np.array([self._index[s] for s in names])
+        return lookup[np.searchsorted(names, sensor)]
+
+    def add(self, chunk):
+        """Fold a raw logger chunk (a DataFrame) into the running values."""
+        sensor, element, t, temp, rejected = normalise_log(chunk)
+        self.rejected += rejected
+        if not len(t):
+            return
+        is_datetime = "time" in {LOG_ALIASES.get(normalise_header(c), normalise_header(c)) for c in chunk.columns}
+        if self.datetime is None:
+            self.datetime = is_datetime
+        elif self.datetime != is_datetime:
+            raise ValueError("cannot mix timestamped logs with elapsed-hours logs")
+        codes = self._positions(sensor, element)
+        order = np.lexsort((t, codes))
+        codes, t, temp = codes[order], t[order], temp[order]
+
+        # Drop readings already covered (overlapping files) and repeated timestamps.
+        values = self._values
+        fresh = ~(t <= values["last"][codes])
+        fresh[1:] &= (codes[1:] != codes[:-1]) | (t[1:] != t[:-1])
+        self.skipped += int((~fresh).sum())
+        codes, t, temp = codes[fresh], t[fresh], temp[fresh]
+        n = len(t)
+        if not n:
+            return
+        self.readings += n
+
+        # Trapezoidal increments; a sensor's first row continues from its last reading.
+        start = np.r_[True, codes[1:] != codes[:-1]]
+        prev_t = np.where(start, values["last"][codes], np.r_[np.nan, t[:-1]])
+        prev_temp = np.where(start, values["last_temp"][codes], np.r_[np.nan, temp[:-1]])
+        hours = (t - prev_t) / 3600.0
+        mean_temp = (temp + prev_temp) / 2
+        firsts = np.flatnonzero(start)
+        lasts = np.r_[firsts[1:] - 1, n - 1]
+        segment = np.cumsum(start) - 1
+        running = {}
+        for name, increment in (("ttf", temperature_time_factor(mean_temp, hours, self.datum)),
+                                ("equivalent_age", equivalent_age(mean_temp, hours, self.activation_energy))):
+            total = np.cumsum(np.nan_to_num(increment))
+            base = total[firsts] - np.nan_to_num(increment[firsts])
+            running[name] = values[name][codes] + total - base[segment]
+            values[name][codes[lasts]] = running[name][lasts]
+
+        sensors = codes[firsts]
+        values["first"][sensors] = np.where(np.isnan(values["first"][sensors]), t[firsts], values["first"][sensors])
+        values["last"][sensors], values["last_temp"][sensors] = t[lasts], temp[lasts]
+        np.add.at(self._counts, sensors, lasts - firsts + 1)
+
+        # One history point per sensor and bucket: the last reading in it.
+        bucket = np.floor(t / (self.history_hours * 3600.0))
+        keep = np.r_[(codes[1:] != codes[:-1]) | (bucket[1:] != bucket[:-1]), True]
+        self._history.append((codes[keep], t[keep], running["ttf"][keep], running["equivalent_age"][keep]))
+
+    def add_log(self, source, chunksize=DEFAULT_CHUNK_SIZE, name=None, source_id=None):
+        """Stream a logger file into the state, yielding the fraction read after each chunk.
+
+        A file whose ``source_id`` was added before is skipped.
+        """
+        if source_id is not None and source_id in self.sources:
+            return
+        for raw, fraction in read_schedule_chunks(source, chunksize, name):
+            self.add(raw)
+            yield fraction
+        if source_id is not None:
+            self.sources.add(source_id)
+
+    def history(self):
+        """``(sensor positions, time s, ttf, equivalent age)`` of the history points, in order per sensor."""
+        if not self._history:
+            return tuple(np.empty(0) for _ in range(4))
+        if len(self._history) > 1:
+            self._history = [tuple(np.concatenate(parts) for parts in zip(*self._history))]
+        codes, t, ttf, te = self._history[0]
+        order = np.lexsort((t, codes))
+        return codes[order], t[order], ttf[order], te[order]
+
+    def summary(self, curve=None):
+        """DataFrame with one row per sensor: element, readings, times, last temperature and maturity."""
+        import pandas as pd
+
+        v = self._values
+        frame = pd.DataFrame({
+            "sensor": self.sensors, "element": self.elements, "readings": self._counts,
+            "first": v["first"], "last": v["last"], "age_h": (v["last"] - v["first"]) / 3600.0,
+            "last_temp": v["last_temp"], "ttf": v["ttf"], "equivalent_age": v["equivalent_age"],
+        })
+        if curve is not None:
+            frame["strength"] = strength(frame[curve["index"]], curve)
+        return frame
+
+    # --- PERSISTENCE ---
+    def save(self, dest):
+        """Write the state to ``dest`` (a path or binary file) as a compressed ``.npz``."""
+        codes, t, ttf, te = self.history()
+        np.savez_compressed(
+            dest, sensors=np.array(self.sensors, dtype=str), elements=np.array(self.elements, dtype=str),
+            sources=np.array(sorted(self.sources), dtype=str), counts=self._counts,
+            params=np.array([self.datum, self.activation_energy, self.history_hours]),
+            tallies=np.array([self.readings, self.rejected, self.skipped,
+                              -1 if self.datetime is None else int(self.datetime)]),
+            h_codes=codes, h_time=t, h_ttf=ttf, h_te=te, **{f"v_{k}": v for k, v in self._values.items()})
+
+    def to_bytes(self):
+        buf = io.BytesIO()
+        self.save(buf)
+        return buf.getvalue()
+
+    @classmethod
+    def load(cls, source):
+        """A state written by ``save``, ready for more readings."""
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        with np.load(source) as data:
+            datum, energy, step = data["params"].tolist()
+            state = cls(datum, energy, step)
+            state.sensors, state.elements = data["sensors"].tolist(), data["elements"].tolist()
+            state._index = {s: i for i, s in enumerate(state.sensors)}
+            state.sources = set(data["sources"].tolist())
+            state._counts = data["counts"]
+            state.readings, state.rejected, state.skipped, is_datetime = (int(x) for x in data["tallies"])
+            state.datetime = None if is_datetime < 0 else bool(is_datetime)
+            state._values = {k: data[f"v_{k}"].copy() for k in state._values}
+            state._history = [(data["h_codes"].astype(np.int64), data["h_time"], data["h_ttf"], data["h_te"])] \
+                if len(data["h_time"]) else []
+        return state
+
+
+# --- STRENGTH CURVES ---
+def element_curves(state, curve):
+    """Strength development per element: ``{element: (time s, strength MPa)}``.
+
+    Each element takes, at every history time, the lowest strength of its
+    sensors (interpolated between their history points), since the
+    coolest sensor governs when the formwork can come off.
+    """
+    codes, t, ttf, te = state.history()
+    maturity = ttf if curve["index"] == "ttf" else te
+    values = strength(maturity, curve)
+    # History rows are sorted by sensor, so each sensor's points are one slice.
+    bounds = np.searchsorted(codes, np.arange(len(state.sensors) + 1))
+    members = {}
+    for i, name in enumerate(state.elements):
+        if bounds[i + 1] > bounds[i]:
+            members.setdefault(name, []).append(slice(bounds[i], bounds[i + 1]))
+    curves = {}
+    for name, slices in members.items():
+        times = np.unique(np.concatenate([t[s] for s in slices]))
+        weakest = np.full(len(times), np.inf)
+        for s in slices:
+            weakest = np.fmin(weakest, np.interp(times, t[s], values[s], left=np.nan))
+        curves[name] = (times, weakest)
+    return curves
+
+
+def time_to_strength(times, strengths, target):
+    """First time the strength reaches ``target`` (NaN if not yet), by linear interpolation."""
+    times, strengths = np.asarray(times, dtype=float), np.asarray(strengths, dtype=float)
+    reached = np.flatnonzero(strengths >= target)
+    if not len(reached):
+        return np.nan
+    i = reached[0]
+    if i == 0 or strengths[i] == strengths[i - 1]:
+        return float(times[i])
+    return float(np.interp(target, strengths[i - 1:i + 1], times[i - 1:i + 1]))
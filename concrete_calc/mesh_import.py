@@ -0,0 +1,364 @@
+"""Enclosed volume of closed triangle meshes from STL and OBJ files.
+
+Binary STL is viewed in place as a structured array of 50-byte facets
+(``np.memmap`` for a path, ``np.frombuffer`` for an upload), without
+making a Python object per triangle. ASCII STL and OBJ are read in blocks
+of lines; each block is split into lines with NumPy and the numbers of the
+lines that matter are parsed in one call, so no per-line Python objects
+are made either. Triangles are then processed in chunks of float64 corners:
+the volume is the sum of signed tetrahedra ``v0 . (v1 x v2) / 6`` (taken
+about the first corner, which keeps the sum well conditioned far from
+the origin), alongside the surface area and bounding box.
+
+A mesh is reported as closed when its area vectors cancel out, a cheap
+necessary condition for a watertight surface; an open mesh's volume
+depends on the reference point and should not be trusted.
+"""
+import io
+import os
+import warnings
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 500_000
+PREVIEW_TRIANGLES = 20_000
+# First clustering grid relative to the one the surface area suggests.
+PREVIEW_OVERSHOOT = 1.5
+BLOCK_BYTES = 16 << 20
+CLOSED_TOLERANCE = 1e-6
+
+# Length of one model unit in metres.
+LENGTH_UNITS = {"m": 1.0, "cm": 0.01, "mm": 0.001, "ft": 0.3048, "in": 0.0254}
+
+STL_HEADER_BYTES = 84
+STL_FACET = np.dtype([("normal", "<f4", (3,)), ("corners", "<f4", (3, 3)), ("attribute", "<u2")])
+
+
+# --- TRIANGLE SOURCES ---
+class TriangleMesh:
+    """Triangles read in chunks of ``(n, 3, 3)`` float64 corners.
+
+    Either ``corners`` (one row of three points per triangle, e.g. a
+    memory-mapped STL field) or indexed ``vertices`` and ``faces``.
+    """
+
+    def __init__(self, corners=None, vertices=None, faces=None, fmt=""):
+        self.corners, self.vertices, self.faces, self.format = corners, vertices, faces, fmt
+        self.count = len(corners) if corners is not None else len(faces)
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        for start in range(0, self.count, chunk_size):
+            stop = min(start + chunk_size, self.count)
+            if self.corners is not None:
+                yield np.asarray(self.corners[start:stop], dtype=np.float64)
+            else:
+                yield self.vertices[self.faces[start:stop]]
+
+
+def _open(source):
+    """Binary handle for a path or file-like ``source``, and whether we opened it."""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), True
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), True
+    source.seek(0)
+    return source, False
+
+
+def _line_blocks(source, size=BLOCK_BYTES):
+    """Blocks of whole lines of about ``size`` bytes."""
+    handle, owned = _open(source)
+    try:
+        tail = b""
+        while True:
+            data = handle.read(size)
+            if not data:
+                break
+            data = tail + data
+            cut = data.rfind(b"\n") + 1
+            if not cut:
+                tail = data
+                continue
+            tail = data[cut:]
+            yield data[:cut]
+        if tail:
+            yield tail + b"\n"
+    finally:
+        if owned:
+            handle.close()
+
+
+_BLANKS = bytes.maketrans(b"\t\r\v\f", b"    ")
+
+
+class _Lines:
+    """A block of lines as one byte array, normalised and split with NumPy.
+
+    Fields end up separated by exactly one space with none at either end of
+    a line. With ``cut`` (e.g. ``b"/"``) the rest of a field from that byte
+    on is dropped, which turns OBJ ``v/vt/vn`` references into plain ``v``.
+    """
+
+    def __init__(self, block, cut=None):
+        buf = np.frombuffer(block.translate(_BLANKS), dtype=np.uint8)
+        space = buf == ord(" ")
+        drop = space & np.r_[True, space[:-1]]
+        if cut is not None and cut in block:
+            blank = space | (buf == ord("\n"))
+            cuts = np.cumsum(buf == ord(cut), dtype=np.int32)
+            # Cuts seen before each byte's field started (the count at the last blank).
+            before = np.maximum.accumulate(np.where(blank, cuts, np.int32(0)))
+            drop |= (cuts > before) & ~blank
+        if drop.any():
+            buf = buf[~drop]
+        newline = buf == ord("\n")
+        edge = (buf == ord(" ")) & (np.r_[True, newline[:-1]] | np.r_[newline[1:], True])
+        if edge.any():
+            buf = buf[~edge]
+        # A trailing pad byte lets keyword tests look past the end of an empty last line.
+        self.buf = np.r_[buf, np.uint8(ord("\n"))]
+        self.ends = np.flatnonzero(self.buf[:-1] == ord("\n"))
+        self.starts = np.r_[0, self.ends[:-1] + 1]
+
+    def keyword(self, word):
+        """Mask of the lines that start with ``word`` followed by a space."""
+        mask = np.ones(len(self.starts), dtype=bool)
+        for k, char in enumerate(word + b" "):
+            mask &= self.buf[np.minimum(self.starts + k, len(self.buf) - 1)] == char
+        return mask
+
+    def numbers(self, picked, skip, dtype):
+        """Flat numbers after the first ``skip`` bytes of the ``picked`` lines, and the count per line."""
+        starts, ends = self.starts[picked] + skip, self.ends[picked]
+        # Fields are single-space separated, so a line's count is its spaces plus one.
+        spaces = np.flatnonzero(self.buf == ord(" "))
+        counts = np.searchsorted(spaces, ends) - np.searchsorted(spaces, starts) + 1
+        # Lines never overlap, so the running sum of +1 at starts and -1 past ends is 0 or 1.
+        inside = np.zeros(len(self.buf) + 1, dtype=np.int8)
+        inside[starts] = 1
+        inside[ends + 1] -= 1
+        # Each picked line with its newline, which separates it from the next one.
+        payload = self.buf[np.cumsum(inside[:-1], dtype=np.int8).view(bool)].tobytes()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            try:
+                values = np.fromstring(payload, dtype=dtype, sep=" ")
+            except (DeprecationWarning, ValueError):
+                raise ValueError("malformed number in the mesh file") from None
+        if len(values) != counts.sum():
+            raise ValueError("malformed number in the mesh file")
+        return values, counts
+
+
+def _first_columns(values, counts, n):
+    """The first ``n`` values of each line, as an ``(lines, n)`` array."""
+    offsets = np.cumsum(counts) - counts
+    return values[offsets[:, None] + np.arange(n)]
+
+
+def _stl_is_binary(head, size):
+    """Binary STL if the facet count matches the size (ASCII files can start with 'solid' too)."""
+    if size < STL_HEADER_BYTES:
+        return False
+    count = int(np.frombuffer(bytes(head[80:84]), dtype="<u4")[0])
+    return size == STL_HEADER_BYTES + count * STL_FACET.itemsize
+
+
+def read_stl(source):
+    """``TriangleMesh`` for a binary (memory-mapped) or ASCII STL file."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            head = f.read(STL_HEADER_BYTES)
+        if _stl_is_binary(head, os.path.getsize(source)):
+            facets = np.memmap(source, dtype=STL_FACET, mode="r", offset=STL_HEADER_BYTES)
+            return TriangleMesh(corners=facets["corners"], fmt="binary STL")
+    else:
+        # Uploads are already in memory; view their buffer without copying it.
+        data = source.getbuffer() if hasattr(source, "getbuffer") else source
+        if _stl_is_binary(data[:STL_HEADER_BYTES], len(data)):
+            facets = np.frombuffer(data, dtype=STL_FACET, offset=STL_HEADER_BYTES)
+            return TriangleMesh(corners=facets["corners"], fmt="binary STL")
+    corners, first = [], True
+    for block in _line_blocks(source):
+        if first and not block.lstrip().startswith(b"solid"):
+            raise ValueError("not an STL file (no binary facet table and no 'solid' header)")
+        first = False
+        lines = _Lines(block)
+        # Every "vertex x y z" line is one corner.
+        picked = np.flatnonzero(lines.keyword(b"vertex"))
+        if len(picked):
+            values, counts = lines.numbers(picked, len(b"vertex "), np.float64)
+            if (counts != 3).any():
+                raise ValueError("ASCII STL vertex without three coordinates")
+            corners.append(values.astype(np.float32))
+    corners = np.concatenate(corners) if corners else np.empty(0, dtype=np.float32)
+    if len(corners) % 9:
+        raise ValueError("ASCII STL has a facet without three vertices")
+    return TriangleMesh(corners=corners.reshape(-1, 3, 3), fmt="ASCII STL")
+
+
+def read_obj(source):
+    """``TriangleMesh`` for an OBJ file, read in blocks; polygons are fan-triangulated."""
+    vertices, faces, n_vertices = [], [], 0
+    for block in _line_blocks(source):
+        # Keep only the vertex index of "v/vt/vn" face references.
+        lines = _Lines(block, cut=b"/")
+        is_vertex = lines.keyword(b"v")
+        # Negative face indices count back from the vertices defined so far.
+        defined = n_vertices + np.cumsum(is_vertex)
+        picked = np.flatnonzero(is_vertex)
+        if len(picked):
+            values, counts = lines.numbers(picked, 2, np.float64)
+            if counts.min() < 3:
+                raise ValueError("OBJ vertex with fewer than three coordinates")
+            vertices.append(_first_columns(values, counts, 3))
+            n_vertices += len(picked)
+
+        face_lines = np.flatnonzero(lines.keyword(b"f"))
+        if not len(face_lines):
+            continue
+        values, counts = lines.numbers(face_lines, 2, np.int64)
+        if counts.min() < 3:
+            raise ValueError("OBJ face with fewer than three vertices")
+        for n in np.unique(counts):
+            rows = _first_columns(values, counts, n)[counts == n]
+            rows = np.where(rows < 0, defined[face_lines[counts == n]][:, None] + rows, rows - 1)
+            fan = np.arange(1, n - 1)
+            tris = np.stack([np.repeat(rows[:, :1], len(fan), axis=1), rows[:, fan], rows[:, fan + 1]], axis=2)
+            faces.append(tris.reshape(-1, 3))
+    vertices = np.concatenate(vertices) if vertices else np.empty((0, 3))
+    faces = np.concatenate(faces) if faces else np.empty((0, 3), dtype=np.int64)
+    if len(faces) and (faces.min() < 0 or faces.max() >= len(vertices)):
+        raise ValueError("OBJ face refers to a vertex that does not exist")
+    return TriangleMesh(vertices=vertices, faces=faces, fmt="OBJ")
+
+
+def open_mesh(source, name=None):
+    """``TriangleMesh`` for an STL or OBJ file, chosen by the file name's extension."""
+    name = name or (os.fspath(source) if isinstance(source, (str, os.PathLike)) else "")
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext == ".obj":
+        return read_obj(source)
+    if ext == ".stl":
+        return read_stl(source)
+    raise ValueError(f"unsupported mesh file {name!r} (expected .stl or .obj)")
+
+
+# --- VOLUME ---
+def mesh_properties(mesh, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Signed volume, area, bounding box and closedness of a ``TriangleMesh``."""
+    volume, area, area_vector = 0.0, 0.0, np.zeros(3)
+    lo, hi = np.full(3, np.inf), np.full(3, -np.inf)
+    origin = None
+    for corners in mesh.chunks(chunk_size):
+        if origin is None:
+            origin = corners[0, 0].copy()
+        # (n, 3) corner coordinates per axis; contiguous columns reduce much faster than (n, 3) rows.
+        x, y, z = (np.ascontiguousarray(corners[..., k]) - origin[k] for k in range(3))
+        lo = np.minimum(lo, [x.min() + origin[0], y.min() + origin[1], z.min() + origin[2]])
+        hi = np.maximum(hi, [x.max() + origin[0], y.max() + origin[1], z.max() + origin[2]])
+        ex1, ey1, ez1 = x[:, 1] - x[:, 0], y[:, 1] - y[:, 0], z[:, 1] - z[:, 0]
+        ex2, ey2, ez2 = x[:, 2] - x[:, 0], y[:, 2] - y[:, 0], z[:, 2] - z[:, 0]
+        # v0 . (v1 x v2) == v0 . (e1 x e2), so one cross product gives both area and volume.
+        nx, ny, nz = ey1 * ez2 - ez1 * ey2, ez1 * ex2 - ex1 * ez2, ex1 * ey2 - ey1 * ex2
+        volume += float(np.dot(x[:, 0], nx) + np.dot(y[:, 0], ny) + np.dot(z[:, 0], nz)) / 6
+        area += float(np.sqrt(nx * nx + ny * ny + nz * nz).sum()) / 2
+        area_vector += [nx.sum() / 2, ny.sum() / 2, nz.sum() / 2]
+    if origin is None:
+        raise ValueError("the mesh has no triangles")
+    return {
+        "triangles": mesh.count, "format": mesh.format,
+        "signed_volume": float(volume), "area": float(area),
+        "bbox_min": lo, "bbox_max": hi,
+        "closed": bool(np.linalg.norm(area_vector) <= CLOSED_TOLERANCE * max(area, 1e-300)),
+    }
+
+
+# --- PREVIEW ---
+def cluster_mesh(mesh, bbox_min, bbox_max, resolution, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Vertex-clustered copy of ``mesh`` on a grid of ``resolution`` cells along its longest side.
+
+    Corners are snapped to grid cell centres; triangles that collapse or
+    repeat are dropped. Returns indexed ``(vertices, triangles)``.
+    """
+    cell = max(float(np.max(bbox_max - bbox_min)), 1e-12) / resolution
+    dims = np.maximum(np.ceil((bbox_max - bbox_min) / cell).astype(np.int64), 1)
+
+    def cell_ids(points):
+        idx = np.clip(((points - bbox_min) / cell).astype(np.int64), 0, dims - 1)
+        return idx[..., 0] + dims[0] * (idx[..., 1] + dims[1] * idx[..., 2])
+
+    if mesh.vertices is not None:
+        # Indexed meshes snap each vertex once rather than once per corner.
+        vertex_ids = cell_ids(mesh.vertices)
+        chunks = (vertex_ids[mesh.faces[s:s + chunk_size]] for s in range(0, mesh.count, chunk_size))
+    else:
+        chunks = (cell_ids(corners) for corners in mesh.chunks(chunk_size))
+    kept = []
+    for ids in chunks:
+        ids = ids[(ids[:, 0] != ids[:, 1]) & (ids[:, 1] != ids[:, 2]) & (ids[:, 0] != ids[:, 2])]
+        kept.append(_unique_triangles(ids))
+    ids = _unique_triangles(np.concatenate(kept)) if kept else np.empty((0, 3), dtype=np.int64)
+    cells, triangles = np.unique(ids, return_inverse=True)
+    iz, rest = np.divmod(cells, dims[0] * dims[1])
+    iy, ix = np.divmod(rest, dims[0])
+    vertices = bbox_min + (np.column_stack([ix, iy, iz]) + 0.5) * cell
+    return vertices, triangles.reshape(-1, 3)
+
+
+def _unique_triangles(ids):
+    """Drop repeated triangles (same corners in any order), keeping the first one's winding."""
+    _, first = np.unique(np.sort(ids, axis=1), axis=0, return_index=True)
+    return ids[np.sort(first)]
+
+
+def preview_mesh(mesh, bbox_min, bbox_max, area, max_triangles=PREVIEW_TRIANGLES, chunk_size=DEFAULT_CHUNK_SIZE):
+    """At most ``max_triangles`` triangles that look like ``mesh``, for plotting.
+
+    The clustering grid is sized from the surface ``area`` (a clustered
+    surface has about two triangles per grid cell it crosses). The whole
+    mesh is clustered only once, on a slightly finer grid than that; when
+    too many triangles remain, the clustered mesh (far smaller) is
+    clustered again on coarser grids. Parts smaller than a cell vanish, so
+    when clustering keeps too little of the mesh an evenly spaced sample of
+    its triangles is shown instead.
+    """
+    if mesh.count <= max_triangles:
+        corners = next(mesh.chunks(mesh.count))
+        return corners.reshape(-1, 3), np.arange(3 * mesh.count).reshape(-1, 3)
+    span = max(float(np.max(bbox_max - bbox_min)), 1e-12)
+    resolution = PREVIEW_OVERSHOOT * span / np.sqrt(2 * area / max_triangles)
+    best = cluster_mesh(mesh, bbox_min, bbox_max, max(int(resolution), 2), chunk_size)
+    for _ in range(4):
+        if len(best[1]) <= max_triangles:
+            break
+        resolution *= np.clip(0.9 * np.sqrt(max_triangles / len(best[1])), 0.25, 0.9)
+        best = cluster_mesh(TriangleMesh(vertices=best[0], faces=best[1]), bbox_min, bbox_max,
+                            max(int(resolution), 2), chunk_size)
+    if not 0.1 * max_triangles <= len(best[1]) <= max_triangles:
+        step = -(-mesh.count // max_triangles)
+        corners = np.concatenate([c[::step] for c in mesh.chunks(chunk_size - chunk_size % step or step)])
+        best = corners.reshape(-1, 3), np.arange(3 * len(corners)).reshape(-1, 3)
+    return best
+
+
+def read_mesh(source, name=None, scale=1.0, max_preview=PREVIEW_TRIANGLES, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Volume and preview of a mesh file, in model units times ``scale``.
+
+    Returns ``mesh_properties`` (scaled) plus ``volume`` (absolute; a
+    negative ``signed_volume`` means inward-facing triangles) and
+    ``preview``, a small ``(vertices, triangles)`` mesh shifted so its
+    bounding box starts at the origin.
+    """
+    mesh = open_mesh(source, name)
+    props = mesh_properties(mesh, chunk_size)
+    vertices, triangles = preview_mesh(mesh, props["bbox_min"], props["bbox_max"], props["area"], max_preview,
+                                       chunk_size)
+    props.update({
+        "signed_volume": props["signed_volume"] * scale ** 3,
+        "volume": abs(props["signed_volume"]) * scale ** 3,
+        "area": props["area"] * scale ** 2,
+        "bbox_min": props["bbox_min"] * scale, "bbox_max": props["bbox_max"] * scale,
+        "preview": ((vertices - props["bbox_min"]) * scale, triangles),
+    })
+    return props
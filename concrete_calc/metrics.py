@@ -0,0 +1,189 @@
+"""Per-session profiling for the calculator page.
+
+A ``Recorder`` collects timing, payload-size and memory events for one
+session. The page turns it on for a session with ``?debug=1`` in the URL,
+or for every session with the ``CONCRETE_CALC_PROFILE=1`` environment
+variable. When it is off nothing is recorded: ``section`` is an empty
+``with`` block and functions wrapped with ``profiled`` pay a single
+context-variable lookup, so the hooks can stay in production code.
+
+Each finished page run is also written as one JSON line to the
+``concrete_calc.metrics`` logger, and a recorder can be exported as JSON
+or CSV.
+"""
+import contextvars
+import csv
+import functools
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PROFILE_ENV = "CONCRETE_CALC_PROFILE"
+MAX_EVENTS = 5000
+
+logger = logging.getLogger("concrete_calc.metrics")
+
+_active = contextvars.ContextVar("concrete_calc_recorder", default=None)
+
+
+def profiling_requested(query_value=None):
+    """True when the environment or a ``debug`` query parameter asks for profiling."""
+    if os.environ.get(PROFILE_ENV, "").strip() not in ("", "0"):
+        return True
+    return str(query_value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+# --- RECORDER ---
+class Recorder:
+    """Bounded event log for one session."""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.run = 0
+        self._run_start = None
+
+    def record(self, kind, name, ms=None, nbytes=None):
+        self.events.append({"t": time.time(), "run": self.run, "kind": kind, "name": name,
+                            "ms": ms, "bytes": nbytes})
+
+    def start_run(self):
+        """Mark the start of a full-page run (fragment reruns stay in the current one)."""
+        self.run += 1
+        self._run_start = time.perf_counter()
+
+    def end_run(self):
+        """Record the run's total time and log its events as one JSON line."""
+        if self._run_start is not None:
+            self.record("run", "full page", 1000 * (time.perf_counter() - self._run_start))
+            self._run_start = None
+        if logger.isEnabledFor(logging.INFO):
+            events = [e for e in self.events if e["run"] == self.run]
+            logger.info(json.dumps({"run": self.run, "events": events}))
+
+    def last(self, kind, name):
+        for e in reversed(self.events):
+            if e["kind"] == kind and e["name"] == name:
+                return e
+        return None
+
+    def summary_rows(self, kind=None):
+        """Count/last/mean/max per (kind, name), slowest last time first."""
+        stats = {}
+        for e in self.events:
+            if kind is not None and e["kind"] != kind:
+                continue
+            s = stats.setdefault((e["kind"], e["name"]), {"count": 0, "total": 0.0, "max": 0.0,
+                                                          "last": None, "bytes": None})
+            s["count"] += 1
+            if e["ms"] is not None:
+                s["total"] += e["ms"]
+                s["max"] = max(s["max"], e["ms"])
+                s["last"] = e["ms"]
+            if e["bytes"] is not None:
+                s["bytes"] = e["bytes"]
+        rows = [
+            {"Kind": k, "Name": n, "Count": s["count"], "Last (ms)": s["last"],
+             "Mean (ms)": s["total"] / s["count"] if s["last"] is not None else None,
+             "Max (ms)": s["max"] if s["last"] is not None else None, "Bytes": s["bytes"]}
+            for (k, n), s in stats.items()
+        ]
+        return sorted(rows, key=lambda r: r["Last (ms)"] or 0.0, reverse=True)
+
+    def to_json(self):
+        return json.dumps(list(self.events), indent=1)
+
+    def to_csv(self):
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=("t", "run", "kind", "name", "ms", "bytes"))
+        writer.writeheader()
+        writer.writerows(self.events)
+        return buf.getvalue()
+
+
+# --- HOOKS ---
+@contextmanager
+def section(name, recorder):
+    """Time a page section into ``recorder`` (no-op when it is ``None``).
+
+    The recorder is also made current for the block, so ``profiled``
+    functions called inside it are attributed to the same session.
+    """
+    if recorder is None:
+        yield
+        return
+    token = _active.set(recorder)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.record("section", name, 1000 * (time.perf_counter() - start))
+        _active.reset(token)
+
+
+def profiled(name):
+    """Decorator timing each call into the current session's recorder, if any."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _active.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.record("call", name, 1000 * (time.perf_counter() - start))
+        return wrapper
+    return decorate
+
+
+def record_size(name, nbytes):
+    """Record a payload size against the current recorder, if any."""
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.record("payload", name, nbytes=int(nbytes))
+
+
+def active():
+    return _active.get() is not None
+
+
+# --- MEMORY ---
+def estimate_bytes(obj, _seen=None):
+    """Rough deep size of ``obj``: arrays, frames and bytes by their buffers."""
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(getattr(usage, "sum", lambda: usage)())
+        except TypeError:
+            pass
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_bytes(k, _seen) + estimate_bytes(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_bytes(v, _seen) for v in obj)
+    return size
+
+
+def peak_rss_bytes():
+    """Peak resident set size of the process, or ``None`` where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
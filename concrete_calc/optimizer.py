@@ -0,0 +1,226 @@
+"""Parameter sweeps and least-cost mix search.
+
+A search space gives each mix parameter (``PARAMETERS``) as a fixed value,
+a list of grid values or a ``(low, high)`` range. Pure grids are
+enumerated in full; with any range present ``samples`` candidates are
+drawn uniformly (grid parameters pick from their values). Candidates are
+evaluated in chunks with the vectorized engine, so memory stays flat
+however large the search, and only the cheapest ``top`` feasible mixes are
+carried from chunk to chunk. With ``workers`` the chunks go to a process
+pool.
+
+Constraints:
+
+``min_cement``
+    cement per unit of wet concrete (weight unit per volume unit).
+``wc_min`` / ``wc_max``
+    limits on the water-cement ratio.
+``workability``
+    allowed workability classes. The slump is estimated from the water
+    content with the ACI 211.1 water table for ``max_aggregate``.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from concrete_calc import aci211
+from concrete_calc.engine import DEFAULTS, IMPERIAL, compute_from_volume, workability_class
+
+PARAMETERS = ("c_ratio", "s_ratio", "a_ratio", "wc_ratio", "dry_factor", "wastage_percent")
+PRICE_KEYS = ("cement", "sand", "stone", "water")
+DEFAULT_CHUNK_SIZE = 250_000
+DEFAULT_TOP = 10
+SENSITIVITY_STEP = 0.10
+
+RESULT_KEYS = PARAMETERS + ("cost", "cost_per_volume", "cement_content", "slump", "weight_c", "weight_s",
+                            "weight_a", "weight_water")
+
+
+# --- SEARCH SPACE ---
+def _axes(space):
+    """Per-parameter ``("fixed"|"grid"|"range", values)`` with defaults for missing ones."""
+    axes = {}
+    for name in PARAMETERS:
+        value = space.get(name, DEFAULTS[name])
+        if isinstance(value, tuple) and len(value) == 2:
+            axes[name] = ("range", (float(value[0]), float(value[1])))
+        elif np.ndim(value) == 0:
+            axes[name] = ("fixed", float(value))
+        else:
+            axes[name] = ("grid", np.asarray(value, dtype=float))
+    return axes
+
+
+def space_size(space, samples=None):
+    """Number of candidates ``optimize_mix`` will evaluate."""
+    axes = _axes(space)
+    if any(kind == "range" for kind, _ in axes.values()):
+        return int(samples or 0)
+    return int(np.prod([len(v) for kind, v in axes.values() if kind == "grid"], dtype=np.int64))
+
+
+def candidates(axes, start, stop, seed=0):
+    """Parameter arrays for candidates ``start .. stop-1`` of the search."""
+    n = stop - start
+    random_mode = any(kind == "range" for kind, _ in axes.values())
+    if random_mode:
+        # Chunks draw from independent streams keyed on their start index.
+        rng = np.random.default_rng((seed, start))
+    else:
+        grids = [v for kind, v in axes.values() if kind == "grid"]
+        index = np.unravel_index(np.arange(start, stop), [len(g) for g in grids]) if grids else ()
+    cols, g = {}, 0
+    for name, (kind, values) in axes.items():
+        if kind == "fixed":
+            cols[name] = np.full(n, values)
+        elif kind == "range":
+            cols[name] = rng.uniform(values[0], values[1], n)
+        elif random_mode:
+            cols[name] = rng.choice(values, n)
+        else:
+            cols[name] = values[index[g]]
+            g += 1
+    return cols
+
+
+# --- EVALUATION ---
+def evaluate(cols, wet_volume, densities, prices, unit_system, max_aggregate=19.0, air_entrained=False):
+    """Quantities, cost and estimated slump for candidate parameter arrays."""
+    q = compute_from_volume(wet_volume, cols["c_ratio"], cols["s_ratio"], cols["a_ratio"], *densities,
+                            cols["dry_factor"], cols["wastage_percent"], cols["wc_ratio"])
+    cost = (q["weight_c"] * prices["cement"] + q["weight_s"] * prices["sand"]
+            + q["weight_a"] * prices["stone"] + q["weight_water"] * prices["water"])
+    water_content = q["weight_water"] / wet_volume
+    if unit_system == IMPERIAL:
+        water_content = water_content * aci211.KG_M3_PER_LB_FT3
+    return {
+        **cols,
+        "cost": cost,
+        "cost_per_volume": cost / wet_volume,
+        "cement_content": q["weight_c"] / wet_volume,
+        "slump": aci211.slump_from_water(water_content, max_aggregate, air_entrained),
+        "weight_c": q["weight_c"], "weight_s": q["weight_s"],
+        "weight_a": q["weight_a"], "weight_water": q["weight_water"],
+    }
+
+
+def feasible(result, constraints):
+    mask = np.ones(len(result["cost"]), dtype=bool)
+    if constraints.get("min_cement") is not None:
+        mask &= result["cement_content"] >= constraints["min_cement"]
+    if constraints.get("wc_min") is not None:
+        mask &= result["wc_ratio"] >= constraints["wc_min"]
+    if constraints.get("wc_max") is not None:
+        mask &= result["wc_ratio"] <= constraints["wc_max"]
+    if constraints.get("workability"):
+        mask &= np.isin(workability_class(result["slump"])[0], list(constraints["workability"]))
+    return mask
+
+
+def _cheapest(result, mask, top):
+    idx = np.flatnonzero(mask)
+    if len(idx) > top:
+        idx = idx[np.argpartition(result["cost"][idx], top)[:top]]
+    return {k: np.asarray(result[k])[idx] for k in RESULT_KEYS}
+
+
+def _merge(best, new, top):
+    if best is None:
+        merged = new
+    else:
+        merged = {k: np.concatenate([best[k], new[k]]) for k in RESULT_KEYS}
+    order = np.argsort(merged["cost"], kind="stable")[:top]
+    return {k: v[order] for k, v in merged.items()}
+
+
+def _search_chunk(axes, start, stop, seed, wet_volume, densities, prices, unit_system, constraints,
+                  max_aggregate, air_entrained, top):
+    """Evaluate one chunk; returns ``(cheapest_feasible, n_feasible)`` (cheap to pickle)."""
+    result = evaluate(candidates(axes, start, stop, seed), wet_volume, densities, prices, unit_system,
+                      max_aggregate, air_entrained)
+    mask = feasible(result, constraints)
+    return _cheapest(result, mask, top), int(mask.sum())
+
+
+# --- DRIVER ---
+def optimize_mix(wet_volume, space, prices, densities, unit_system, constraints=None, samples=None,
+                 top=DEFAULT_TOP, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, seed=0,
+                 max_aggregate=19.0, air_entrained=False, progress=None):
+    """Cheapest feasible mixes for an element of ``wet_volume``.
+
+    ``prices`` maps ``PRICE_KEYS`` to a price per weight unit and
+    ``densities`` is ``(cement, sand, stone)``. ``workers`` > 1 spreads
+    chunks over a process pool. ``progress(done, total)`` is called as
+    chunks finish. Returns a dict with ``best`` (arrays keyed by
+    ``RESULT_KEYS``, cheapest first), ``evaluated``, ``feasible`` and
+    ``seconds``.
+    """
+    constraints = constraints or {}
+    axes = _axes(space)
+    total = space_size(space, samples)
+    bounds = [(s, min(s + chunk_size, total)) for s in range(0, total, chunk_size)]
+    args = (wet_volume, tuple(densities), dict(prices), unit_system, dict(constraints),
+            max_aggregate, air_entrained, top)
+    start = time.perf_counter()
+    best, n_feasible, done = None, 0, 0
+
+    def collect(chunk_best, chunk_feasible, n):
+        nonlocal best, n_feasible, done
+        best = _merge(best, chunk_best, top)
+        n_feasible += chunk_feasible
+        done += n
+        if progress:
+            progress(done, total)
+
+    if workers and workers > 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            for lo, hi in bounds:
+                pending[pool.submit(_search_chunk, axes, lo, hi, seed, *args)] = hi - lo
+                if len(pending) >= 2 * workers:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        collect(*fut.result(), pending.pop(fut))
+            for fut in wait(pending).done:
+                collect(*fut.result(), pending[fut])
+    else:
+        for lo, hi in bounds:
+            collect(*_search_chunk(axes, lo, hi, seed, *args), hi - lo)
+
+    if best is None:
+        best = {k: np.empty(0) for k in RESULT_KEYS}
+    return {"best": best, "evaluated": total, "feasible": n_feasible,
+            "seconds": time.perf_counter() - start}
+
+
+# --- SENSITIVITY ---
+def sensitivity(mix, wet_volume, densities, prices, unit_system, constraints=None, step=SENSITIVITY_STEP,
+                max_aggregate=19.0, air_entrained=False):
+    """One-at-a-time ±``step`` perturbation of each parameter around ``mix``.
+
+    Returns one row per parameter with the cost change (percent) and
+    whether the mix stays feasible at each side.
+    """
+    constraints = constraints or {}
+    base = {k: np.array([float(mix[k])]) for k in PARAMETERS}
+    base_cost = float(evaluate(base, wet_volume, densities, prices, unit_system,
+                               max_aggregate, air_entrained)["cost"][0])
+    # All perturbed candidates in one evaluation: rows alternate low/high per parameter.
+    cols = {k: np.repeat(base[k], 2 * len(PARAMETERS)) for k in PARAMETERS}
+    for i, name in enumerate(PARAMETERS):
+        cols[name][2 * i] *= 1 - step
+        cols[name][2 * i + 1] *= 1 + step
+    result = evaluate(cols, wet_volume, densities, prices, unit_system, max_aggregate, air_entrained)
+    ok = feasible(result, constraints)
+    rows = []
+    for i, name in enumerate(PARAMETERS):
+        lo, hi = 2 * i, 2 * i + 1
+        rows.append({
+            "parameter": name,
+            "low": float(cols[name][lo]), "high": float(cols[name][hi]),
+            "cost_change_low": 100 * (float(result["cost"][lo]) / base_cost - 1),
+            "cost_change_high": 100 * (float(result["cost"][hi]) / base_cost - 1),
+            "feasible_low": bool(ok[lo]), "feasible_high": bool(ok[hi]),
+        })
+    return rows
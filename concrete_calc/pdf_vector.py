@@ -0,0 +1,150 @@
+"""Isometric vector drawing of triangle meshes straight into an FPDF page.
+
+The mesh is projected orthographically along the (1, 1, 1) isometric view
+direction. For closed meshes the faces turned away from the viewer are
+culled, and the rest are depth-sorted (painter's algorithm). Each face
+is emitted as a filled PDF path, followed by its feature edges (silhouette
+and creases, not the diagonals that split flat faces), so nearer faces
+cover hidden edges. No raster image, temp file or headless browser is
+involved.
+"""
+import numpy as np
+
+# Orthonormal isometric camera: screen right, screen up, towards viewer.
+_RIGHT = np.array([1.0, -1.0, 0.0]) / np.sqrt(2.0)
+_UP = np.array([-1.0, -1.0, 2.0]) / np.sqrt(6.0)
+_VIEW = np.array([1.0, 1.0, 1.0]) / np.sqrt(3.0)
+_LIGHT = np.array([0.3, 0.5, 0.8]) / np.linalg.norm([0.3, 0.5, 0.8])
+
+LIGHTCORAL = (240, 128, 128)
+EDGE_COLOR = (60, 60, 60)
+
+
+# --- PROJECTION ---
+def project_isometric(vertices, triangles, crease_deg=1.0):
+    """Project a mesh to 2D drawing primitives.
+
+    Returns ``(points, order, shade, edges, edge_face)``: screen-space
+    ``(n, 2)`` points (y up), visible triangle indices sorted far to near, a 0..1
+    shade per triangle, an ``(e, 2)`` array of feature edges and, for each
+    edge, the triangle after which it should be stroked.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    triangles = np.asarray(triangles, dtype=np.int64)
+    points = np.column_stack([vertices @ _RIGHT, vertices @ _UP])
+
+    corners = vertices[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals = normals / np.where(lengths == 0, 1.0, lengths)[:, None]
+    shade = 0.45 + 0.55 * np.abs(normals @ _LIGHT)
+
+    # Group the three edges of every triangle by their (sorted) endpoints.
+    tri_edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    tri_edges.sort(axis=1)
+    owner = np.tile(np.arange(len(triangles)), 3)
+    keys = tri_edges[:, 0] * len(vertices) + tri_edges[:, 1]
+    by_key = np.argsort(keys, kind="stable")
+    keys = keys[by_key]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    face_a = owner[by_key[starts]]
+    face_b = owner[by_key[ends]]
+    edges = tri_edges[by_key[starts]]
+
+    # A closed mesh (every edge shared by exactly two faces) can be culled:
+    # orient it outwards by the sign of its volume and drop back faces.
+    visible = np.ones(len(triangles), dtype=bool)
+    if np.all(ends - starts == 1):
+        signed_volume = np.einsum("ij,ij->i", corners[:, 0], np.cross(corners[:, 1], corners[:, 2])).sum()
+        facing = (normals @ _VIEW) * np.sign(signed_volume or 1.0)
+        visible = facing > -1e-9
+    order = np.flatnonzero(visible)
+    order = order[np.argsort(corners[order].mean(axis=1) @ _VIEW, kind="stable")]
+    rank = np.full(len(triangles), -1)
+    rank[order] = np.arange(len(order))
+
+    # Boundary edges and creases between non-coplanar faces are features.
+    dots = np.abs(np.einsum("ij,ij->i", normals[face_a], normals[face_b]))
+    feature = (starts == ends) | (dots < np.cos(np.radians(crease_deg)))
+    feature &= visible[face_a] | visible[face_b]
+    edge_face = np.where(rank[face_a] > rank[face_b], face_a, face_b)
+    return points, order, shade, edges[feature], edge_face[feature]
+
+
+# --- PDF OUTPUT ---
+def finite_mesh(vertices, triangles):
+    """``(vertices, triangles)`` without the faces that touch a non-finite vertex.
+
+    Vertices no face uses any more are dropped and the faces re-indexed, so
+    a mesh with a stray NaN still draws the rest and fits its own box.
+    """
+    vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    ok = np.isfinite(vertices).all(axis=1)
+    triangles = triangles[ok[triangles].all(axis=1)] if len(triangles) else triangles
+    used, triangles = np.unique(triangles, return_inverse=True)
+    return vertices[used], triangles.reshape(-1, 3)
+
+
+def _fit(points, x, y, w, h):
+    lo = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - lo, 1e-12)
+    scale = min(w / span[0], h / span[1])
+    ox = x + (w - span[0] * scale) / 2
+    oy = y + (h - span[1] * scale) / 2
+    # Page y grows downwards, screen-space y grows upwards.
+    px = ox + (points[:, 0] - lo[0]) * scale
+    py = oy + (span[1] - (points[:, 1] - lo[1])) * scale
+    return px, py
+
+
+def _fill_triangle(pdf, xs, ys):
+    points = list(zip(xs.tolist(), ys.tolist()))
+    if hasattr(pdf, "polygon"):
+        pdf.polygon(points, style="DF")
+        return
+    # PyFPDF 1.7 has no public call for a filled path (rect() is its only
+    # filled shape), so write the same "fill and stroke" path operator
+    # polygon() emits on fpdf2.
+    k, page_h = pdf.k, pdf.h
+    path = " ".join(f"{px * k:.2f} {(page_h - py) * k:.2f} {op}" for (px, py), op in zip(points, "mll"))
+    pdf._out(f"{path} h B")
+
+
+def draw_mesh(pdf, vertices, triangles, x, y, w, h, color=LIGHTCORAL,
+              edge_color=EDGE_COLOR, line_width=0.3):
+    """Draw an isometric view of a mesh into the box (x, y, w, h) in mm.
+
+    Faces with non-finite vertices are skipped (see ``finite_mesh``).
+    Returns the number of faces drawn; an empty mesh draws nothing.
+    """
+    vertices, tris = finite_mesh(vertices, triangles)
+    if not len(tris):
+        return 0
+    points, order, shade, edges, edge_face = project_isometric(vertices, tris)
+    px, py = _fit(points, x, y, w, h)
+    fills = (np.asarray(color, dtype=float) * shade[:, None]).astype(int)
+
+    rank = np.empty(len(tris), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    edge_order = np.argsort(rank[edge_face], kind="stable")
+    edges, edge_face = edges[edge_order], edge_face[edge_order]
+    e = 0
+    for t in order:
+        # Each face is also stroked in its own colour to hide the hairline
+        # seams PDF viewers show between adjacent filled triangles.
+        r, g, b = fills[t]
+        pdf.set_line_width(0.2)
+        pdf.set_fill_color(r, g, b)
+        pdf.set_draw_color(r, g, b)
+        idx = tris[t]
+        _fill_triangle(pdf, px[idx], py[idx])
+        if e < len(edges) and edge_face[e] == t:
+            pdf.set_line_width(line_width)
+            pdf.set_draw_color(*edge_color)
+            while e < len(edges) and edge_face[e] == t:
+                v0, v1 = edges[e]
+                pdf.line(px[v0], py[v0], px[v1], py[v1])
+                e += 1
+    return len(order)
@@ -0,0 +1,466 @@
+"""Local SQLite store for projects, their elements, mix designs and densities.
+
+Every element points at one mix design (ratios, w/c, dry factor, wastage)
+and one density set (unit system and bulk densities). Quantities are
+cached per element in ``quantities`` together with a ``stale`` flag that
+SQLite triggers raise whenever an input of that element actually changes:
+its shape, dimensions, type or pour, or the mix design or density set it
+uses. ``recompute`` then takes the wet volume of only the stale rows from
+``geometry.element_geometry`` and pushes them through the vectorized
+engine.
+
+Roll-ups per (unit system, element type, pour) live in ``rollups`` and
+are maintained incrementally: a recomputed element adds the difference
+between its new and previously counted quantities, a deleted one
+subtracts what it contributed. ``rebuild_rollups`` recounts a project from
+the cached quantities.
+
+The database file defaults to ``concrete_calc_projects.sqlite3`` in the
+working directory and can be set with ``CONCRETE_CALC_DB``.
+"""
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from concrete_calc.engine import DEFAULTS, METRIC, UNIT_SYSTEMS, compute_from_volume
+from concrete_calc.geometry import (GEOMETRY_COLUMNS, SHAPES, element_geometry, parse_polygon, parse_polygons,
+                                    polygon_text, polygons_text)
+
+DB_ENV = "CONCRETE_CALC_DB"
+DEFAULT_DB = "concrete_calc_projects.sqlite3"
+DEFAULT_NAME = "Default"
+
+MIX_COLUMNS = ("c_ratio", "s_ratio", "a_ratio", "wc_ratio", "dry_factor", "wastage_percent")
+DENSITY_COLUMNS = ("dens_c", "dens_s", "dens_a")
+# Outlines are stored as "x y; x y; ..." text, openings as such outlines joined by "|".
+SHAPE_COLUMNS = ("shape", "length", "width", "height") + GEOMETRY_COLUMNS + ("outline", "openings")
+ELEMENT_COLUMNS = ("element_id", "element_type", "pour") + SHAPE_COLUMNS
+TEXT_COLUMNS = ("element_id", "element_type", "pour", "shape", "outline", "openings")
+QUANTITY_COLUMNS = ("wet_volume", "dry_volume", "weight_c", "weight_s", "weight_a", "weight_water")
+ROLLUP_KEYS = ("unit_system", "element_type", "pour")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    unit_system TEXT NOT NULL,
+    default_mix_id INTEGER,
+    default_density_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS mix_designs (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    {", ".join(f"{c} REAL NOT NULL" for c in MIX_COLUMNS)},
+    UNIQUE (project_id, name)
+);
+CREATE TABLE IF NOT EXISTS density_sets (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    unit_system TEXT NOT NULL,
+    {", ".join(f"{c} REAL NOT NULL" for c in DENSITY_COLUMNS)},
+    UNIQUE (project_id, name)
+);
+CREATE TABLE IF NOT EXISTS elements (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    element_id TEXT NOT NULL DEFAULT '',
+    element_type TEXT NOT NULL DEFAULT '',
+    pour TEXT NOT NULL DEFAULT '',
+    length REAL NOT NULL, width REAL NOT NULL, height REAL NOT NULL,
+    shape TEXT NOT NULL DEFAULT 'prism',
+    {", ".join(f"{c} REAL" for c in GEOMETRY_COLUMNS)},
+    outline TEXT, openings TEXT,
+    mix_id INTEGER NOT NULL REFERENCES mix_designs(id),
+    density_id INTEGER NOT NULL REFERENCES density_sets(id)
+);
+CREATE INDEX IF NOT EXISTS elements_by_type ON elements (project_id, element_type);
+CREATE INDEX IF NOT EXISTS elements_by_pour ON elements (project_id, pour);
+CREATE INDEX IF NOT EXISTS elements_by_mix ON elements (mix_id);
+CREATE INDEX IF NOT EXISTS elements_by_density ON elements (density_id);
+
+-- Cached quantities; the key columns record the roll-up group they are counted in.
+CREATE TABLE IF NOT EXISTS quantities (
+    element_pk INTEGER PRIMARY KEY REFERENCES elements(id) ON DELETE CASCADE,
+    stale INTEGER NOT NULL DEFAULT 1,
+    project_id INTEGER,
+    {", ".join(f"{c} TEXT" for c in ROLLUP_KEYS)},
+    {", ".join(f"{c} REAL" for c in QUANTITY_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS quantities_stale ON quantities (element_pk) WHERE stale = 1;
+
+CREATE TABLE IF NOT EXISTS rollups (
+    project_id INTEGER NOT NULL,
+    {", ".join(f"{c} TEXT NOT NULL" for c in ROLLUP_KEYS)},
+    count INTEGER NOT NULL,
+    {", ".join(f"{c} REAL NOT NULL" for c in QUANTITY_COLUMNS)},
+    PRIMARY KEY (project_id, {", ".join(ROLLUP_KEYS)})
+);
+
+CREATE TRIGGER IF NOT EXISTS element_added AFTER INSERT ON elements BEGIN
+    INSERT INTO quantities (element_pk) VALUES (NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS element_changed AFTER UPDATE ON elements
+WHEN {" OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in ELEMENT_COLUMNS[1:] + ("mix_id", "density_id"))}
+BEGIN
+    UPDATE quantities SET stale = 1 WHERE element_pk = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS mix_changed AFTER UPDATE ON mix_designs
+WHEN {" OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in MIX_COLUMNS)}
+BEGIN
+    UPDATE quantities SET stale = 1 WHERE element_pk IN (SELECT id FROM elements WHERE mix_id = NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS densities_changed AFTER UPDATE ON density_sets
+WHEN {" OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in ("unit_system",) + DENSITY_COLUMNS)}
+BEGIN
+    UPDATE quantities SET stale = 1 WHERE element_pk IN (SELECT id FROM elements WHERE density_id = NEW.id);
+END;
+"""
+
+
+def default_path():
+    return os.environ.get(DB_ENV, DEFAULT_DB)
+
+
+def mix_name(values):
+    """Descriptive name for an imported mix design."""
+    return ("{c_ratio:g}:{s_ratio:g}:{a_ratio:g} w/c {wc_ratio:g}, dry {dry_factor:g}, "
+            "+{wastage_percent:g}%").format(**values)
+
+
+def density_name(values):
+    """Descriptive name for an imported density set."""
+    return "{unit_system} {dens_c:g}/{dens_s:g}/{dens_a:g}".format(**values)
+
+
+class ProjectStore:
+    """Thread-safe access to one project database (a single shared connection)."""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+
+    def _migrate(self):
+        """Add the shape columns to databases created before shapes were stored."""
+        have = {r["name"] for r in self._conn.execute("PRAGMA table_info(elements)")}
+        added = [c for c in SHAPE_COLUMNS if c not in have]
+        for c in added:
+            kind = "TEXT NOT NULL DEFAULT 'prism'" if c == "shape" else "TEXT" if c in TEXT_COLUMNS else "REAL"
+            self._conn.execute(f"ALTER TABLE elements ADD COLUMN {c} {kind}")
+        if added:
+            # The old trigger does not watch the new columns.
+            self._conn.execute("DROP TRIGGER IF EXISTS element_changed")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- PROJECTS ---
+    def create_project(self, name, unit_system=METRIC):
+        """New project with a ``Default`` mix design and density set; returns its id."""
+        with self._lock, self._conn:
+            project_id = self._conn.execute("INSERT INTO projects (name, unit_system) VALUES (?, ?)",
+                                            (name, unit_system)).lastrowid
+            mix_id = self._insert_mix(project_id, DEFAULT_NAME, DEFAULTS)
+            dens = dict(zip(DENSITY_COLUMNS, UNIT_SYSTEMS[unit_system]["densities"]))
+            density_id = self._insert_densities(project_id, DEFAULT_NAME, unit_system, dens)
+            self._conn.execute("UPDATE projects SET default_mix_id = ?, default_density_id = ? WHERE id = ?",
+                               (mix_id, density_id, project_id))
+        return project_id
+
+    def projects(self):
+        """``{name: id}`` of every project."""
+        with self._lock:
+            return {r["name"]: r["id"] for r in self._conn.execute("SELECT id, name FROM projects ORDER BY name")}
+
+    def project(self, project_id):
+        """Project row with its default mix and densities merged in (``None`` if missing)."""
+        with self._lock:
+            row = self._conn.execute(
+                f"""SELECT p.*, {", ".join(f"m.{c}" for c in MIX_COLUMNS)},
+                           {", ".join(f"d.{c}" for c in DENSITY_COLUMNS)}
+                    FROM projects p
+                    JOIN mix_designs m ON m.id = p.default_mix_id
+                    JOIN density_sets d ON d.id = p.default_density_id
+                    WHERE p.id = ?""", (project_id,)).fetchone()
+        return dict(row) if row else None
+
+    def update_project(self, project_id, **values):
+        self._update("projects", ("name", "unit_system"), project_id, values)
+
+    def delete_project(self, project_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM rollups WHERE project_id = ?", (project_id,))
+            self._conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    # --- MIX DESIGNS & DENSITY SETS ---
+    def _insert_mix(self, project_id, name, values):
+        return self._conn.execute(
+            f"INSERT INTO mix_designs (project_id, name, {', '.join(MIX_COLUMNS)}) "
+            f"VALUES (?, ?{', ?' * len(MIX_COLUMNS)})",
+            (project_id, name, *(float(values[c]) for c in MIX_COLUMNS))).lastrowid
+
+    def _insert_densities(self, project_id, name, unit_system, values):
+        return self._conn.execute(
+            f"INSERT INTO density_sets (project_id, name, unit_system, {', '.join(DENSITY_COLUMNS)}) "
+            f"VALUES (?, ?, ?{', ?' * len(DENSITY_COLUMNS)})",
+            (project_id, name, unit_system, *(float(values[c]) for c in DENSITY_COLUMNS))).lastrowid
+
+    def add_mix(self, project_id, name, **values):
+        """New mix design (missing parameters take the calculator defaults); returns its id."""
+        with self._lock, self._conn:
+            return self._insert_mix(project_id, name, {**DEFAULTS, **values})
+
+    def add_density_set(self, project_id, name, unit_system=METRIC, **values):
+        with self._lock, self._conn:
+            defaults = dict(zip(DENSITY_COLUMNS, UNIT_SYSTEMS[unit_system]["densities"]))
+            return self._insert_densities(project_id, name, unit_system, {**defaults, **values})
+
+    def _update(self, table, allowed, row_id, values):
+        unknown = set(values) - set(allowed)
+        if unknown:
+            raise ValueError(f"unknown {table} columns: {', '.join(sorted(unknown))}")
+        if values:
+            with self._lock, self._conn:
+                self._conn.execute(f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in values)} WHERE id = ?",
+                                   (*values.values(), row_id))
+
+    def update_mix(self, mix_id, **values):
+        """Change a mix design; elements using it are marked for recompute if a value changed."""
+        self._update("mix_designs", ("name",) + MIX_COLUMNS, mix_id, values)
+
+    def update_density_set(self, density_id, **values):
+        """Change a density set; elements using it are marked for recompute if a value changed."""
+        self._update("density_sets", ("name", "unit_system") + DENSITY_COLUMNS, density_id, values)
+
+    def mixes(self, project_id):
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(
+                "SELECT * FROM mix_designs WHERE project_id = ? ORDER BY id", (project_id,))]
+
+    def density_sets(self, project_id):
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(
+                "SELECT * FROM density_sets WHERE project_id = ? ORDER BY id", (project_id,))]
+
+    # --- ELEMENTS ---
+    def _resolve(self, project_id, table, columns, name_of, rows, unit_column=False):
+        """Id per row of ``rows`` (tuples of ``columns``), creating missing entries by value."""
+        select = ("unit_system, " if unit_column else "") + ", ".join(columns)
+        known = {tuple(r[1:]): r[0] for r in self._conn.execute(
+            f"SELECT id, {select} FROM {table} WHERE project_id = ?", (project_id,))}
+        ids = {}
+        for key in set(rows):
+            if key not in known:
+                values = dict(zip((("unit_system",) if unit_column else ()) + columns, key))
+                if unit_column:
+                    known[key] = self._insert_densities(project_id, name_of(values), key[0], values)
+                else:
+                    known[key] = self._insert_mix(project_id, name_of(values), values)
+            ids[key] = known[key]
+        return [ids[key] for key in rows]
+
+    def add_elements(self, project_id, elements, mix_id=None, density_id=None):
+        """Insert elements from a DataFrame or a mapping of equal-length columns.
+
+        The shape and its dimensions are stored as given (see
+        ``geometry.element_geometry``); rows whose volume cannot be computed
+        raise ``ValueError`` and nothing is saved. Rows use ``mix_id`` /
+        ``density_id`` when given, else the mix design
+        and density set matching their own ``c_ratio`` ... ``wastage_percent``
+        and ``unit_system`` / ``dens_*`` columns (created on first use), else
+        the project defaults. Quantities are computed on the next
+        ``recompute``. Returns the number of rows added.
+        """
+        geometry = element_geometry(elements)
+        n = len(geometry["wet_volume"])
+        if not n:
+            return 0
+        unusable = np.isnan(geometry["wet_volume"])
+        if unusable.any():
+            raise ValueError(f"{int(unusable.sum())} element(s) have an unknown shape or missing dimensions")
+
+        def column(name, default):
+            if name not in elements:
+                return [default] * n
+            return ["" if v is None or v != v else str(v) for v in np.asarray(elements[name], dtype=object)]
+
+        def numbers(name):
+            values = np.asarray(elements[name], dtype=float) if name in elements else np.full(n, np.nan)
+            return [None if v != v else v for v in values.tolist()]
+
+        with self._lock, self._conn:
+            project = self._conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
+            if project is None:
+                raise ValueError(f"no project with id {project_id}")
+            if mix_id is None and all(c in elements for c in MIX_COLUMNS):
+                rows = list(zip(*(np.asarray(elements[c], dtype=float).tolist() for c in MIX_COLUMNS)))
+                mix_ids = self._resolve(project_id, "mix_designs", MIX_COLUMNS, mix_name, rows)
+            else:
+                mix_ids = [mix_id or project["default_mix_id"]] * n
+            if density_id is None and all(c in elements for c in DENSITY_COLUMNS):
+                units = column("unit_system", project["unit_system"])
+                rows = list(zip(units, *(np.asarray(elements[c], dtype=float).tolist() for c in DENSITY_COLUMNS)))
+                density_ids = self._resolve(project_id, "density_sets", DENSITY_COLUMNS, density_name, rows,
+                                            unit_column=True)
+            else:
+                density_ids = [density_id or project["default_density_id"]] * n
+
+            # Shapes that do not use length/width/height keep their bounding box there.
+            dims = [np.where(np.isnan(v), geometry[c], v).tolist()
+                    for c, v in ((c, np.asarray(numbers(c), dtype=float)) for c in ("length", "width", "height"))]
+            shapes = [SHAPES[code] for code in geometry["shape"].tolist()]
+            outlines, openings = [None] * n, [None] * n
+            for i in np.flatnonzero(geometry["shape"] == SHAPES.index("polygon")).tolist():
+                outlines[i] = polygon_text(parse_polygon(np.asarray(elements["outline"], dtype=object)[i]))
+                if "openings" in elements:
+                    holes = parse_polygons(np.asarray(elements["openings"], dtype=object)[i])
+                    openings[i] = polygons_text(holes) or None
+            self._conn.executemany(
+                f"INSERT INTO elements (project_id, {', '.join(ELEMENT_COLUMNS)}, mix_id, density_id) "
+                f"VALUES (?{', ?' * (len(ELEMENT_COLUMNS) + 2)})",
+                zip([project_id] * n, column("element_id", ""), column("element_type", ""), column("pour", ""),
+                    shapes, *dims, *(numbers(c) for c in GEOMETRY_COLUMNS), outlines, openings,
+                    mix_ids, density_ids))
+        return n
+
+    def update_elements(self, element_pks, **values):
+        """Set columns (shape, dimensions, type, pour, mix_id, density_id) on the given elements."""
+        allowed = ELEMENT_COLUMNS + ("mix_id", "density_id")
+        unknown = set(values) - set(allowed)
+        if unknown:
+            raise ValueError(f"unknown element columns: {', '.join(sorted(unknown))}")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"UPDATE elements SET {', '.join(f'{c} = ?' for c in values)} WHERE id = ?",
+                ((*values.values(), int(pk)) for pk in element_pks))
+
+    def delete_elements(self, element_pks):
+        """Remove elements and take their counted quantities out of the roll-ups."""
+        pks = [int(pk) for pk in element_pks]
+        with self._lock, self._conn:
+            for start in range(0, len(pks), 900):
+                batch = pks[start:start + 900]
+                marks = ", ".join("?" * len(batch))
+                old = self._conn.execute(
+                    f"SELECT project_id, {', '.join(ROLLUP_KEYS)}, {', '.join(QUANTITY_COLUMNS)} "
+                    f"FROM quantities WHERE element_pk IN ({marks}) AND wet_volume IS NOT NULL", batch).fetchall()
+                self._apply_deltas([tuple(r[:4]) for r in old], -np.array([r[4:] for r in old], dtype=float),
+                                   -np.ones(len(old), dtype=np.int64))
+                self._conn.execute(f"DELETE FROM quantities WHERE element_pk IN ({marks})", batch)
+                self._conn.execute(f"DELETE FROM elements WHERE id IN ({marks})", batch)
+
+    # --- QUANTITIES & ROLL-UPS ---
+    def stale_count(self, project_id=None):
+        sql = "SELECT COUNT(*) FROM quantities q JOIN elements e ON e.id = q.element_pk WHERE q.stale = 1"
+        with self._lock:
+            if project_id is None:
+                return self._conn.execute(sql).fetchone()[0]
+            return self._conn.execute(sql + " AND e.project_id = ?", (project_id,)).fetchone()[0]
+
+    def _apply_deltas(self, groups, deltas, counts):
+        """Add ``deltas`` and ``counts`` (one row per group key) to the roll-ups, summed per group."""
+        if not len(groups):
+            return
+        index = {}
+        codes = np.array([index.setdefault(g, len(index)) for g in groups])
+        sums = np.zeros((len(index), len(QUANTITY_COLUMNS)))
+        np.add.at(sums, codes, deltas)
+        count_sums = np.zeros(len(index), dtype=np.int64)
+        np.add.at(count_sums, codes, counts)
+        self._conn.executemany(
+            f"""INSERT INTO rollups (project_id, {", ".join(ROLLUP_KEYS)}, count, {", ".join(QUANTITY_COLUMNS)})
+                VALUES (?, ?, ?, ?, ?{", ?" * len(QUANTITY_COLUMNS)})
+                ON CONFLICT (project_id, {", ".join(ROLLUP_KEYS)}) DO UPDATE SET count = count + excluded.count,
+                {", ".join(f"{c} = {c} + excluded.{c}" for c in QUANTITY_COLUMNS)}""",
+            ((*g, int(c), *s) for g, c, s in zip(index, count_sums.tolist(), sums.tolist())))
+        self._conn.execute("DELETE FROM rollups WHERE count <= 0")
+
+    def recompute(self, project_id=None):
+        """Compute quantities for stale elements and update the roll-ups; returns how many rows ran."""
+        where = "q.stale = 1" + (" AND e.project_id = ?" if project_id is not None else "")
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"""SELECT q.element_pk, e.project_id, d.unit_system, e.element_type, e.pour,
+                           {", ".join(f"m.{c}" for c in MIX_COLUMNS)},
+                           {", ".join(f"d.{c}" for c in DENSITY_COLUMNS)},
+                           q.project_id, {", ".join(f"q.{c}" for c in ROLLUP_KEYS)},
+                           {", ".join(f"q.{c}" for c in QUANTITY_COLUMNS)},
+                           {", ".join(f"e.{c}" for c in SHAPE_COLUMNS)}
+                    FROM quantities q
+                    JOIN elements e ON e.id = q.element_pk
+                    JOIN mix_designs m ON m.id = e.mix_id
+                    JOIN density_sets d ON d.id = e.density_id
+                    WHERE {where}""", () if project_id is None else (project_id,)).fetchall()
+            if not rows:
+                return 0
+            pks = [r[0] for r in rows]
+            new_groups = [tuple(r[1:5]) for r in rows]
+            inputs = np.array([r[5:14] for r in rows], dtype=float)
+            (c, s, a, wc, dry, waste), dens = inputs[:, 0:6].T, inputs[:, 6:9].T
+            shapes = {c: [r[24 + i] for r in rows] for i, c in enumerate(SHAPE_COLUMNS)}
+            wet = element_geometry(shapes)["wet_volume"]
+            q = compute_from_volume(wet, c, s, a, *dens, dry, waste, wc)
+            new = np.column_stack([q[k] for k in QUANTITY_COLUMNS])
+
+            counted = [i for i, r in enumerate(rows) if r[18] is not None]
+            old_groups = [tuple(rows[i][14:18]) for i in counted]
+            old = np.array([rows[i][18:24] for i in counted], dtype=float).reshape(-1, len(QUANTITY_COLUMNS))
+            self._apply_deltas(new_groups + old_groups, np.vstack([new, -old]),
+                               counts=np.r_[np.ones(len(rows), dtype=np.int64),
+                                           -np.ones(len(counted), dtype=np.int64)])
+            self._conn.executemany(
+                f"""UPDATE quantities SET stale = 0, project_id = ?, {", ".join(f"{c} = ?" for c in ROLLUP_KEYS)},
+                    {", ".join(f"{c} = ?" for c in QUANTITY_COLUMNS)} WHERE element_pk = ?""",
+                ((*g, *v, pk) for g, v, pk in zip(new_groups, new.tolist(), pks)))
+        return len(rows)
+
+    def rebuild_rollups(self, project_id):
+        """Recount a project's roll-ups from the cached quantities (drops incremental drift)."""
+        keys = ", ".join(ROLLUP_KEYS)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM rollups WHERE project_id = ?", (project_id,))
+            self._conn.execute(
+                f"""INSERT INTO rollups (project_id, {keys}, count, {", ".join(QUANTITY_COLUMNS)})
+                    SELECT project_id, {keys}, COUNT(*), {", ".join(f"SUM({c})" for c in QUANTITY_COLUMNS)}
+                    FROM quantities WHERE project_id = ? AND wet_volume IS NOT NULL
+                    GROUP BY project_id, {keys}""", (project_id,))
+
+    def rollups(self, project_id, by=("unit_system", "element_type")):
+        """Counts and quantity totals grouped by a subset of ``ROLLUP_KEYS``, as columns."""
+        by = tuple(by)
+        if not set(by) <= set(ROLLUP_KEYS):
+            raise ValueError(f"roll-ups can be grouped by {', '.join(ROLLUP_KEYS)}")
+        group = f"GROUP BY {', '.join(by)} ORDER BY {', '.join(by)}" if by else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT {"".join(f"{c}, " for c in by)}SUM(count),
+                           {", ".join(f"SUM({c})" for c in QUANTITY_COLUMNS)}
+                    FROM rollups WHERE project_id = ? {group}""", (project_id,)).fetchall()
+        rows = [r for r in rows if r[len(by)] is not None]
+        names = by + ("count",) + QUANTITY_COLUMNS
+        return {name: np.array([r[i] for r in rows], dtype=object if i < len(by) else float)
+                for i, name in enumerate(names)}
+
+    def element_quantities(self, project_id):
+        """Cached per-element inputs and quantities for a project, as columns."""
+        names = ("id",) + ELEMENT_COLUMNS + ("stale",) + QUANTITY_COLUMNS
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT e.id, {", ".join(f"e.{c}" for c in ELEMENT_COLUMNS)}, q.stale,
+                           {", ".join(f"q.{c}" for c in QUANTITY_COLUMNS)}
+                    FROM elements e JOIN quantities q ON q.element_pk = e.id
+                    WHERE e.project_id = ? ORDER BY e.id""", (project_id,)).fetchall()
+        return {name: np.array([r[i] for r in rows], dtype=object if name in TEXT_COLUMNS else float)
+                for i, name in enumerate(names)}
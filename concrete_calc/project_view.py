@@ -0,0 +1,183 @@
+"""Whole-project 3D view: every element of a schedule in one mesh trace.
+
+Vertices and faces for all elements are generated by
+``geometry.elements_mesh`` (prisms in one batch, other shapes from their
+own meshes) and sent as a single ``go.Mesh3d`` coloured per face, so the
+browser handles one trace however many elements there are.
+
+Above ``max_elements`` the view switches to level of detail: elements are
+binned on a regular 3D grid (the cell size grows until at most
+``max_elements`` cells are occupied) and each occupied cell is drawn as the
+bounding box of its members. A 100k-element project is then still a few
+thousand boxes.
+
+Elements without ``x``/``y``/``z`` placement columns are laid out on a
+grid, largest first.
+"""
+import numpy as np
+
+from concrete_calc.geometry import elements_mesh, prisms_mesh
+
+DEFAULT_MAX_ELEMENTS = 5000
+# All the clustered view needs per element besides the colour column.
+BOX_COLUMNS = ("length", "width", "height", "x", "y", "z")
+LAYOUT_GAP = 0.5
+CATEGORY_COLORS = ["#FFB300", "#4FC3F7", "#E57373", "#81C784", "#BA68C8",
+                   "#FFD54F", "#4DB6AC", "#F06292", "#A1887F", "#90A4AE",
+                   "#7986CB", "#AED581", "#FF8A65", "#4DD0E1", "#9575CD",
+                   "#DCE775", "#E0E0E0", "#64B5F6", "#FFB74D", "#C62828"]
+QUANTITY_COLORSCALE = "YlOrRd"
+
+
+# --- PLACEMENT ---
+def auto_layout(sizes, gap=LAYOUT_GAP):
+    """Origins placing ``(n, 3)`` element sizes on a square grid in plan."""
+    sizes = np.asarray(sizes, dtype=float)
+    n = len(sizes)
+    if n == 0:
+        return np.zeros((0, 3))
+    cols = int(np.ceil(np.sqrt(n)))
+    pitch = sizes[:, :2].max(axis=0) + gap
+    order = np.argsort(-sizes.prod(axis=1), kind="stable")
+    slot = np.empty(n, dtype=np.int64)
+    slot[order] = np.arange(n)
+    origins = np.zeros((n, 3))
+    origins[:, 0] = (slot % cols) * pitch[0]
+    origins[:, 1] = (slot // cols) * pitch[1]
+    return origins
+
+
+def element_arrays(elements, color_by="element_type"):
+    """``(origins, sizes, values, labels)`` from a DataFrame or mapping of columns.
+
+    ``values`` are category codes into ``labels`` when ``color_by`` is a text
+    column (``element_type`` falls back to ``shape_name``), otherwise the
+    numeric column itself and ``labels`` is ``None``.
+    """
+    sizes = np.column_stack([np.asarray(elements[k], dtype=float) for k in ("length", "width", "height")])
+    if all(k in elements for k in ("x", "y", "z")):
+        origins = np.column_stack([np.asarray(elements[k], dtype=float) for k in ("x", "y", "z")])
+        missing = np.isnan(origins).any(axis=1)
+        if missing.any():
+            # Park unplaced elements on a grid beside the placed ones.
+            placed_max = origins[~missing, 0].max() + sizes[~missing, 0].max() if (~missing).any() else 0.0
+            origins[missing] = auto_layout(sizes[missing]) + [placed_max + LAYOUT_GAP * 4, 0, 0]
+    else:
+        origins = auto_layout(sizes)
+
+    column = color_by
+    if column == "element_type" and "element_type" not in elements:
+        column = "shape_name"
+    raw = np.asarray(elements[column]) if column in elements else np.full(len(sizes), "Element", dtype=object)
+    if raw.dtype.kind in "fiu":
+        return origins, sizes, raw.astype(float), None
+    labels, codes = np.unique(raw.astype(str), return_inverse=True)
+    return origins, sizes, codes.astype(float), labels.tolist()
+
+
+# --- LEVEL OF DETAIL ---
+def cluster_boxes(origins, sizes, values, max_boxes, categorical=False):
+    """Merge elements into at most ``max_boxes`` grid-cell bounding boxes.
+
+    Returns ``(origins, sizes, values, counts)`` per box. Numeric values are
+    summed per box; category codes take the code of the box's largest
+    element.
+    """
+    lo, hi = origins, origins + sizes
+    extent_min = lo.min(axis=0)
+    extent = np.maximum(hi.max(axis=0) - extent_min, 1e-9)
+    centres = (lo + hi) / 2 - extent_min
+    cell = extent.max() / np.sqrt(max_boxes)
+    while True:
+        dims = np.floor(extent / cell).astype(np.int64) + 1
+        ijk = np.minimum(np.floor(centres / cell).astype(np.int64), dims - 1)
+        key = (ijk[:, 0] * dims[1] + ijk[:, 1]) * dims[2] + ijk[:, 2]
+        cells, inverse = np.unique(key, return_inverse=True)
+        if len(cells) <= max_boxes:
+            break
+        cell *= 1.5
+
+    order = np.argsort(inverse, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+    box_lo = np.minimum.reduceat(lo[order], starts, axis=0)
+    box_hi = np.maximum.reduceat(hi[order], starts, axis=0)
+    counts = np.diff(np.r_[starts, len(order)])
+    if categorical:
+        volume = sizes.prod(axis=1)
+        # Within each cell, sort by volume and keep the last (largest) element's code.
+        by_volume = np.lexsort((volume, inverse))
+        last = np.r_[np.flatnonzero(np.diff(inverse[by_volume]) != 0), len(by_volume) - 1]
+        box_values = values[by_volume[last]]
+    else:
+        box_values = np.add.reduceat(values[order], starts)
+    return box_lo, box_hi - box_lo, box_values, counts
+
+
+# --- FIGURE ---
+def category_colors(k):
+    """``k`` distinct colours: the fixed palette, or evenly spaced hues beyond it."""
+    if k <= len(CATEGORY_COLORS):
+        return CATEGORY_COLORS[:k]
+    import colorsys
+
+    colors = []
+    for i in range(k):
+        # Alternate the lightness so neighbouring hues stay apart.
+        r, g, b = colorsys.hls_to_rgb(i / k, 0.45 if i % 2 else 0.65, 0.75)
+        colors.append(f"#{round(r * 255):02X}{round(g * 255):02X}{round(b * 255):02X}")
+    return colors
+
+
+def project_mesh(elements, color_by="element_type", max_elements=DEFAULT_MAX_ELEMENTS):
+    """Merged mesh data for a project view.
+
+    Returns ``(vertices, triangles, face_values, labels, info)`` where
+    ``info`` describes the level of detail that was used.
+    """
+    origins, sizes, values, labels = element_arrays(elements, color_by)
+    n = len(sizes)
+    info = {"elements": n, "detail": "elements", "boxes": n}
+    if n > max_elements:
+        origins, sizes, values, counts = cluster_boxes(origins, sizes, values, max_elements,
+                                                       categorical=labels is not None)
+        info.update(detail="clustered bounding boxes", boxes=len(sizes),
+                    max_per_box=int(counts.max()))
+        vertices, triangles = prisms_mesh(origins, sizes, dtype=np.float32)
+        face_values = np.repeat(values, 12)
+    else:
+        # Cylinders, frusta, slabs and stairs get their own meshes; prisms stay batched.
+        vertices, triangles, owner = elements_mesh(origins, elements, dtype=np.float32)
+        face_values = values[owner]
+    info["triangles"] = len(triangles)
+    return vertices, triangles, face_values, labels, info
+
+
+def project_figure(elements, color_by="element_type", max_elements=DEFAULT_MAX_ELEMENTS, height=600):
+    """One-trace Plotly figure of every element; returns ``(figure, info)``."""
+    import plotly.graph_objects as go
+
+    vertices, triangles, face_values, labels, info = project_mesh(elements, color_by, max_elements)
+    if labels is not None:
+        k = max(len(labels), 1)
+        # Stepped colorscale so every category code gets one solid colour.
+        colorscale = []
+        for i, color in enumerate(category_colors(k)):
+            colorscale += [[i / k, color], [(i + 1) / k, color]]
+        colorbar = dict(title=color_by.replace("_", " ").title(),
+                        tickvals=[i + 0.5 for i in range(k)], ticktext=labels)
+        cmin, cmax, face_values = 0, k, face_values + 0.5
+    else:
+        colorscale = QUANTITY_COLORSCALE
+        title = color_by.replace("_", " ").title()
+        colorbar = dict(title=title if info["detail"] == "elements" else f"{title} (box total)")
+        cmin = cmax = None
+
+    fig = go.Figure(go.Mesh3d(
+        x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
+        i=triangles[:, 0], j=triangles[:, 1], k=triangles[:, 2],
+        intensity=face_values.astype(np.float32), intensitymode="cell",
+        colorscale=colorscale, cmin=cmin, cmax=cmax, colorbar=colorbar,
+        flatshading=True, hoverinfo="skip",
+    ))
+    fig.update_layout(scene=dict(aspectmode="data"), margin=dict(l=0, r=0, b=0, t=0), height=height)
+    return fig, info
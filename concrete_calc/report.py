@@ -0,0 +1,137 @@
+"""Element PDF reports.
+
+``add_report_page`` draws one element's report onto an existing FPDF
+document, so single reports, multi-page project files and batch workers
+all share the same layout.
+"""
+import math
+
+from fpdf import FPDF
+
+from concrete_calc.geometry import prism_mesh
+from concrete_calc.metrics import profiled
+from concrete_calc.pdf_vector import draw_mesh
+
+
+@profiled("create_pdf")
+def create_pdf(shape_name, l, w, h, v_unit, w_unit, c_ratio, s_ratio, a_ratio, wc_ratio, 
+               wet_vol, dry_vol, dry_f, waste_p, weight_c, weight_s, weight_a, weight_water, 
+               mesh, slump_val, workability, uncertainty=None, volume_formula="LxWxH", strength_check=None,
+               progress=None):
+    # ``progress(fraction, message)`` is called between stages (see report_jobs).
+    progress = progress or (lambda fraction, message=None: None)
+    pdf = FPDF()
+    progress(0.1, "Drawing the report page")
+    add_report_page(pdf, shape_name, l, w, h, v_unit, w_unit, c_ratio, s_ratio, a_ratio, wc_ratio,
+                    wet_vol, dry_vol, dry_f, waste_p, weight_c, weight_s, weight_a, weight_water,
+                    mesh, slump_val, workability, uncertainty=uncertainty, volume_formula=volume_formula,
+                    strength_check=strength_check)
+    progress(0.8, "Writing the PDF")
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def add_report_page(pdf, shape_name, l, w, h, v_unit, w_unit, c_ratio, s_ratio, a_ratio, wc_ratio,
+                    wet_vol, dry_vol, dry_f, waste_p, weight_c, weight_s, weight_a, weight_water,
+                    mesh, slump_val, workability, title="Concrete Mix Quantity & Workability Report",
+                    uncertainty=None, volume_formula="LxWxH", strength_check=None):
+    """Draw one element's report page.
+
+    ``uncertainty`` is an optional ``uncertainty.simulate_quantities``
+    result; its P50 / P90 weights are added to the material table.
+    ``volume_formula`` names how the wet volume was obtained (step 1).
+    ``strength_check`` is an optional ``strength_model.check_wc`` result,
+    added as a W/C validation step.
+    """
+    pdf.add_page()
+    top_y = pdf.get_y()
+    
+    # --- 1. HEADER ---
+    pdf.set_font("Arial", 'B', 20)
+    pdf.set_text_color(255, 179, 0) # Gold theme color
+    pdf.cell(200, 15, title, ln=True, align='C')
+    pdf.set_draw_color(255, 179, 0)
+    pdf.line(10, top_y + 15, 200, top_y + 15)
+    pdf.ln(5)
+
+    # --- 2. DESIGN SPECS & SLUMP DATA ---
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(200, 10, "1. Design Specifications", ln=True)
+    pdf.set_font("Arial", '', 11)
+    
+    col_width = 90
+    pdf.cell(col_width, 7, f"Specimen Type: {shape_name}", ln=0)
+    pdf.cell(col_width, 7, f"W/C Ratio: {wc_ratio}", ln=1)
+    pdf.cell(col_width, 7, f"Target Slump: {slump_val} mm", ln=0)
+    pdf.cell(col_width, 7, f"Workability: {workability}", ln=1)
+    pdf.cell(col_width, 7, f"Dry Factor: {dry_f}", ln=0)
+    pdf.cell(col_width, 7, f"Wastage: {waste_p}%", ln=1)
+    pdf.ln(5)
+
+    # --- 3. 3D VISUALIZATION (vector isometric, drawn straight into the page) ---
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(200, 10, "2. Specimen Visualization", ln=True)
+    if mesh is None:
+        mesh = prism_mesh(l, w, h)
+    top = pdf.get_y()
+    if not draw_mesh(pdf, *mesh, x=40, y=top, w=130, h=80):
+        pdf.set_font("Arial", 'I', 11)
+        pdf.cell(200, 10, "No drawable geometry for this element.", ln=True)
+    pdf.set_y(top + 80)
+    pdf.ln(5)
+
+    # --- 4. MATERIAL TABLE ---
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(200, 10, "3. Required Material Weights", ln=True)
+    pdf.set_font("Arial", 'B', 11)
+    pdf.set_fill_color(255, 179, 0) 
+    # Five narrower columns when the P50 / P90 bands are included.
+    cw = 60 if uncertainty is None else 38
+    pdf.cell(cw, 10, "Material", 1, 0, 'C', True)
+    pdf.cell(cw, 10, "Ratio", 1, 0, 'C', True)
+    pdf.cell(cw, 10, f"Weight ({w_unit})", 1, int(uncertainty is None), 'C', True)
+    if uncertainty is not None:
+        pdf.cell(cw, 10, f"P50 ({w_unit})", 1, 0, 'C', True)
+        pdf.cell(cw, 10, f"P90 ({w_unit})", 1, 1, 'C', True)
+    
+    pdf.set_font("Arial", '', 11)
+    mats = [["Cement", c_ratio, weight_c, "weight_c"], ["Sand", s_ratio, weight_s, "weight_s"], 
+            ["Stone", a_ratio, weight_a, "weight_a"], ["Water", wc_ratio, weight_water, "weight_water"]]
+    for m in mats:
+        pdf.cell(cw, 10, f" {m[0]}", 1)
+        pdf.cell(cw, 10, f" {m[1]}", 1, 0, 'C')
+        pdf.cell(cw, 10, f" {m[2]:.4f}", 1, int(uncertainty is None), 'C')
+        if uncertainty is not None:
+            pdf.cell(cw, 10, f" {uncertainty[m[3]]['P50']:.4f}", 1, 0, 'C')
+            pdf.cell(cw, 10, f" {uncertainty[m[3]]['P90']:.4f}", 1, 1, 'C')
+    if uncertainty is not None:
+        pdf.set_font("Arial", 'I', 9)
+        dry = uncertainty["dry_volume"]
+        pdf.cell(0, 6, f"P50 / P90 from {uncertainty['draws']:,} Monte Carlo draws. "
+                       f"Dry volume P50 {dry['P50']:.4f}, P90 {dry['P90']:.4f} {v_unit}.", ln=1)
+
+    # --- 5. METHODOLOGY ---
+    pdf.ln(10)
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(200, 10, "4. Step-by-Step Methodology", ln=True)
+    pdf.set_font("Arial", '', 10)
+    method = [
+        f"Step 1: Wet Volume ({volume_formula}) = {wet_vol:.4f} {v_unit}",
+        f"Step 2: Dry Volume (incl. {waste_p}% wastage) = {dry_vol:.4f} {v_unit}",
+        f"Step 3: Total Weight (C+S+A+W) = {weight_c + weight_s + weight_a + weight_water:.4f} {w_unit}",
+        f"Step 4: Slump Verification = {slump_val}mm (Class: {workability})"
+    ]
+    if strength_check is not None:
+        sc = strength_check
+        if math.isnan(sc["predicted"]):
+            method.append(f"Step 5: W/C Check (Abrams' law, {sc['group']}, {sc['n']} results): the source was "
+                          f"not tested at {sc['age_days']:g} days; no estimate.")
+        else:
+            method.append(
+                f"Step 5: W/C Check (Abrams' law, {sc['group']}, {sc['n']} results): f = {sc['A']:.1f} / "
+                f"{sc['B']:.2f}^(w/c) gives {sc['predicted']:.1f} MPa at W/C {sc['wc_ratio']:.2f}, "
+                f"{sc['age_days']:g} days, {sc['confidence']:.0%} confidence; target {sc['target']:g} MPa "
+                f"{'met' if sc['ok'] else 'NOT met'}. Max W/C for the target = {int(sc['suggested_wc'] * 100) / 100:.2f}"
+                + (" (extrapolated beyond the tested W/C range)." if sc["extrapolated"] else "."))
+    for step in method:
+        pdf.multi_cell(0, 7, step)
@@ -0,0 +1,153 @@
+"""Background report jobs with ids, progress and status polling.
+
+Reports render in a bounded thread pool shared by every session in the
+server process, so asking for a report returns a job id at once and the
+page stays interactive while it renders. At most ``workers`` reports
+render at the same time and at most ``max_queue`` more may wait; beyond
+that ``submit`` raises ``QueueFull`` instead of queueing without bound.
+Jobs submitted with the same ``key`` (identical inputs) share one run.
+Finished jobs are kept for ``keep_seconds`` so their owners can collect
+the result, then forgotten. Kept results sit outside any byte budget, so
+jobs should return something small (the page's jobs put the PDF in the
+shared artifact cache and return its key). Jobs run in a copy of the
+submitter's ``contextvars`` context, so ``metrics.profiled`` timings land
+in the submitting run's recorder.
+
+The pool size and queue depth of the shared pool default to 2 and 16 and
+can be set with the ``CONCRETE_CALC_REPORT_WORKERS`` and
+``CONCRETE_CALC_REPORT_QUEUE`` environment variables.
+"""
+import contextvars
+import itertools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_KEEP_SECONDS = 600
+WORKERS_ENV = "CONCRETE_CALC_REPORT_WORKERS"
+QUEUE_ENV = "CONCRETE_CALC_REPORT_QUEUE"
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    """Raised by ``ReportJobs.submit`` when ``max_queue`` jobs are already waiting."""
+
+
+class ReportJobs:
+    """Thread-safe pool of background jobs, polled by id."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE, keep_seconds=DEFAULT_KEEP_SECONDS):
+        self.workers = max(int(workers), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self.keep_seconds = keep_seconds
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="concrete-report")
+        self._jobs = {}  # job id -> job dict
+        self._by_key = {}  # key -> job id of its latest run
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, key=None, **kwargs):
+        """Queue ``func(*args, progress=..., **kwargs)`` and return its job id.
+
+        ``progress(fraction, message)`` may be called by ``func`` to report
+        how far it got. A job with the same ``key`` that is still queued,
+        running or kept as done is reused instead of starting another.
+        """
+        with self._lock:
+            self._expire()
+            existing = self._jobs.get(self._by_key.get(key)) if key is not None else None
+            if existing is not None and existing["state"] != FAILED:
+                return existing["id"]
+            if sum(job["state"] == QUEUED for job in self._jobs.values()) >= self.max_queue:
+                raise QueueFull(f"{self.max_queue} reports are already waiting")
+            job = {
+                "id": uuid.uuid4().hex, "key": key, "state": QUEUED, "progress": 0.0,
+                "message": "Waiting for a worker", "result": None, "error": None,
+                "submitted": time.time(), "started": None, "finished": None, "sequence": next(self._sequence),
+            }
+            self._jobs[job["id"]] = job
+            if key is not None:
+                self._by_key[key] = job["id"]
+        self._executor.submit(contextvars.copy_context().run, self._run, job, func, args, kwargs)
+        return job["id"]
+
+    def _run(self, job, func, args, kwargs):
+        def progress(fraction, message=None):
+            with self._lock:
+                job["progress"] = min(max(float(fraction), 0.0), 1.0)
+                if message is not None:
+                    job["message"] = message
+
+        with self._lock:
+            job.update(state=RUNNING, started=time.time(), message="Rendering")
+        try:
+            result = func(*args, progress=progress, **kwargs)
+        except Exception as e:
+            with self._lock:
+                job.update(state=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+            return
+        with self._lock:
+            job.update(state=DONE, result=result, progress=1.0, message="Done", finished=time.time())
+
+    def _expire(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [i for i, job in self._jobs.items() if job["finished"] and job["finished"] < cutoff]:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job["key"]) == job_id:
+                del self._by_key[job["key"]]
+
+    def status(self, job_id):
+        """State, progress, message, error, timings and queue ``position`` of a job (``None`` if unknown)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = {k: v for k, v in job.items() if k not in ("result", "sequence")}
+            status["position"] = sum(other["state"] == QUEUED and other["sequence"] < job["sequence"]
+                                     for other in self._jobs.values()) if job["state"] == QUEUED else 0
+            return status
+
+    def result(self, job_id):
+        """The return value of a finished job, or ``None``."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job["result"] if job is not None and job["state"] == DONE else None
+
+    def forget(self, job_id):
+        """Drop a job so the next ``submit`` with its key runs again."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None and self._by_key.get(job["key"]) == job_id:
+                del self._by_key[job["key"]]
+
+    def stats(self):
+        """Pool size, queue depth and the number of kept jobs in each state."""
+        with self._lock:
+            self._expire()
+            counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+            for job in self._jobs.values():
+                counts[job["state"]] += 1
+            return {"workers": self.workers, "max_queue": self.max_queue, **counts}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+# --- SHARED POOL ---
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def report_jobs():
+    """The report pool shared by every session in this process."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ReportJobs(int(os.environ.get(WORKERS_ENV, DEFAULT_WORKERS)),
+                                 int(os.environ.get(QUEUE_ENV, DEFAULT_MAX_QUEUE)))
+        return _shared
@@ -0,0 +1,218 @@
+"""Streaming import of member schedules exported from BIM tools.
+
+CSV files are read with ``pandas.read_csv(chunksize=...)`` and Excel
+workbooks row by row with openpyxl's read-only mode, so only one chunk is
+in memory at a time. Each chunk is validated, pushed through the
+vectorized engine and folded into running totals per material and per
+element type.
+"""
+import os
+
+import numpy as np
+
+from concrete_calc.engine import IMPERIAL, METRIC, compute_schedule
+from concrete_calc.geometry import GEOMETRY_COLUMNS, missing_dimensions
+from concrete_calc.headers import (COLUMN_ALIASES, MILLIMETRE_UNITS, UNIT_ALIASES, is_blank,
+                                   millimetres_to_metres, normalise_header)
+
+DEFAULT_CHUNK_SIZE = 50_000
+MAX_ERROR_SAMPLES = 100
+
+NUMERIC_COLUMNS = ("length", "width", "height", "c_ratio", "s_ratio", "a_ratio", "wc_ratio",
+                   "dry_factor", "wastage_percent", "dens_c", "dens_s", "dens_a", "slump", "x", "y", "z") \
+    + GEOMETRY_COLUMNS
+
+TOTAL_COLUMNS = ("wet_volume", "dry_volume", "weight_c", "weight_s", "weight_a", "weight_water")
+
+
+def _per_unique(series, func):
+    """Apply ``func`` once per distinct value (unit and mix columns repeat a lot)."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return pd.Series(func(pd.Series(uniques)).to_numpy()[codes], index=series.index)
+
+
+# --- VALIDATION ---
+def normalise_chunk(chunk, unit_system=METRIC):
+    """Rename BIM headers, split ``1:2:4`` mix strings and coerce numbers.
+
+    Blank unit cells take ``unit_system``; rows in millimetres become metric.
+    """
+    import pandas as pd
+
+    chunk = chunk.rename(columns=lambda c: COLUMN_ALIASES.get(normalise_header(c), normalise_header(c)))
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    if "mix_ratio" in chunk:
+        for i, name in enumerate(("c_ratio", "s_ratio", "a_ratio")):
+            if name not in chunk:
+                chunk[name] = _per_unique(chunk["mix_ratio"], lambda u, i=i: (
+                    u.astype(str).str.split(r"\s*[:/]\s*", n=2, regex=True).str[i]))
+    for name in NUMERIC_COLUMNS:
+        if name in chunk:
+            chunk[name] = pd.to_numeric(chunk[name], errors="coerce")
+    if "unit_system" in chunk:
+        labels = chunk["unit_system"].map(lambda v: unit_system if is_blank(v) else str(v))
+        millimetres = _per_unique(labels, lambda u: u.map(lambda v: normalise_header(v) in MILLIMETRE_UNITS))
+        chunk["unit_system"] = _per_unique(labels, lambda u: (
+            u.map(lambda v: METRIC if normalise_header(v) in MILLIMETRE_UNITS
+                  else UNIT_ALIASES.get(normalise_header(v), v))))
+        millimetres_to_metres(chunk, millimetres.to_numpy(dtype=bool))
+    return chunk
+
+
+def validate_chunk(chunk):
+    """Split a normalised chunk into ``(valid_rows, errors)``.
+
+    ``errors`` is a list of ``(row_number, message)`` for rejected rows.
+    """
+    reasons = np.full(len(chunk), "", dtype=object)
+    if "shape" in chunk:
+        # Each shape needs its own dimensions; the geometry engine says which are missing.
+        reasons = missing_dimensions(chunk)
+        checks = []
+    else:
+        missing = [c for c in ("length", "width", "height") if c not in chunk]
+        if missing:
+            raise ValueError(f"Schedule is missing required column(s): {', '.join(missing)}")
+        checks = [(f"{c} must be a positive number", ~(chunk[c] > 0)) for c in ("length", "width", "height")]
+    for c in ("c_ratio", "s_ratio", "a_ratio"):
+        if c in chunk:
+            checks.append((f"{c} must not be negative", chunk[c] < 0))
+    if "unit_system" in chunk:
+        checks.append(("unknown unit system", ~chunk["unit_system"].isin((METRIC, IMPERIAL))))
+    for message, mask in checks:
+        mask = np.asarray(mask, dtype=bool)
+        reasons[mask & (reasons == "")] = message
+
+    bad = reasons != ""
+    errors = list(zip(chunk.index[bad].tolist(), reasons[bad].tolist()))
+    return chunk[~bad], errors
+
+
+# --- READERS ---
+def _size_of(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    size = getattr(source, "size", None)
+    if size is None and hasattr(source, "seek"):
+        pos = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(pos)
+    return size
+
+
+def _is_excel(source, name):
+    name = str(name or getattr(source, "name", source)).lower()
+    return name.endswith((".xlsx", ".xlsm"))
+
+
+def _csv_chunks(source, chunksize):
+    import pandas as pd
+
+    size = _size_of(source)
+    handle = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        for chunk in pd.read_csv(handle, chunksize=chunksize, skipinitialspace=True):
+            fraction = handle.tell() / size if size else None
+            yield chunk, fraction
+    finally:
+        if handle is not source:
+            handle.close()
+
+
+def _excel_chunks(source, chunksize):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        total = ws.max_row or None
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        buf, seen = [], 1
+        for row in rows:
+            buf.append(row)
+            seen += 1
+            if len(buf) == chunksize:
+                index = range(seen - 1 - len(buf), seen - 1)
+                yield pd.DataFrame(buf, columns=header, index=index), seen / total if total else None
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=header, index=range(seen - 1 - len(buf), seen - 1)), 1.0
+    finally:
+        wb.close()
+
+
+def read_schedule_chunks(source, chunksize=DEFAULT_CHUNK_SIZE, name=None):
+    """Yield ``(raw_chunk, fraction_read)`` from a CSV or Excel schedule.
+
+    ``source`` is a path or a binary file object (e.g. a Streamlit upload);
+    ``fraction_read`` is ``None`` when the total size is unknown.
+    """
+    if _is_excel(source, name):
+        yield from _excel_chunks(source, chunksize)
+    else:
+        yield from _csv_chunks(source, chunksize)
+
+
+# --- RUNNING TOTALS ---
+class ScheduleTotals:
+    """Running per-material and per-element-type totals, split by unit system."""
+
+    def __init__(self):
+        self.rows = 0
+        self.rejected = 0
+        self.errors = []
+        self._by_type = None
+
+    def add(self, computed, errors=()):
+        self.rows += len(computed)
+        self.rejected += len(errors)
+        room = MAX_ERROR_SAMPLES - len(self.errors)
+        if room > 0:
+            self.errors.extend(list(errors)[:room])
+        if computed.empty:
+            return
+        key = computed["element_type"].fillna(computed["shape_name"]) if "element_type" in computed \
+            else computed["shape_name"]
+        grouped = computed.assign(element_type=key, count=1) \
+            .groupby(["unit_system", "element_type"])[["count", *TOTAL_COLUMNS]].sum()
+        self._by_type = grouped if self._by_type is None else self._by_type.add(grouped, fill_value=0)
+
+    def by_type(self):
+        """DataFrame of counts and totals per (unit system, element type)."""
+        import pandas as pd
+
+        if self._by_type is None:
+            return pd.DataFrame(columns=["count", *TOTAL_COLUMNS])
+        return self._by_type.sort_index()
+
+    def by_material(self):
+        """DataFrame of total weight per material (rows) and unit system (columns)."""
+        totals = self.by_type().groupby(level="unit_system")[list(TOTAL_COLUMNS)].sum()
+        totals = totals.rename(columns={"weight_c": "Cement", "weight_s": "Sand",
+                                        "weight_a": "Stone", "weight_water": "Water",
+                                        "wet_volume": "Wet Volume", "dry_volume": "Dry Volume"})
+        return totals.T
+
+
+def process_schedule(source, chunksize=DEFAULT_CHUNK_SIZE, unit_system=METRIC, name=None, totals=None):
+    """Stream a schedule through validation and the engine.
+
+    Yields ``(computed_chunk, totals, fraction_read)`` after each chunk so
+    callers can show progress or forward the rows (reports, exports)
+    without holding the whole file.
+    """
+    totals = totals or ScheduleTotals()
+    for raw, fraction in read_schedule_chunks(source, chunksize, name):
+        chunk = normalise_chunk(raw, unit_system)
+        if "unit_system" not in chunk:
+            chunk["unit_system"] = unit_system
+        valid, errors = validate_chunk(chunk)
+        computed = compute_schedule(valid, unit_system, include_inputs=True)
+        totals.add(computed, errors)
+        yield computed, totals, fraction
@@ -0,0 +1,155 @@
+"""Element specs shared by the CLI and the HTTP API.
+
+A spec is one element record, a list of records, or
+``{"unit_system": ..., <shared defaults>, "elements": [...]}``. Record keys
+may use the BIM header aliases understood by the schedule importer. Specs
+are turned into column arrays and pushed through the engine in one call.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from concrete_calc.engine import (DEFAULT_SLUMP, METRIC, RESULT_COLUMNS, SCHEDULE_COLUMNS,
+                                  UNIT_SYSTEMS, compute_schedule, workability_class)
+from concrete_calc.headers import (COLUMN_ALIASES, MILLIMETRE_UNITS, UNIT_ALIASES, millimetres_to_metres,
+                                   normalise_header)
+
+TOTAL_KEYS = ("wet_volume", "dry_volume", "weight_c", "weight_s", "weight_a", "weight_water")
+TEXT_COLUMNS = ("element_id", "element_type", "unit_system", "pour", "mix_ratio", "shape")
+# Kept as given: point lists (or their string form) for polygonal elements.
+RAW_COLUMNS = ("outline", "openings")
+
+
+class SpecError(ValueError):
+    """A spec that cannot be turned into elements."""
+
+
+# --- PARSING ---
+def _to_floats(values):
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        pass
+    out = np.empty(len(values))
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            out[i] = math.nan
+    return out
+
+
+@lru_cache(maxsize=1024)
+def _target_name(header):
+    name = normalise_header(header)
+    return COLUMN_ALIASES.get(name, name)
+
+
+def target_names(headers):
+    """Engine column names for raw headers or record keys."""
+    return [_target_name(h) for h in headers]
+
+
+def finalise(cols, n, unit_system):
+    """Turn raw column lists into engine arrays (mix strings split, units mapped, mm scaled to m)."""
+    mix = cols.pop("mix_ratio", None)
+    if mix is not None:
+        # Schedules repeat a handful of mixes and unit labels: parse each once.
+        split = {m: (str(m).replace("/", ":").split(":") + ["", "", ""])[:3] for m in set(mix)}
+        for i, name in enumerate(("c_ratio", "s_ratio", "a_ratio")):
+            cols.setdefault(name, [split[m][i] for m in mix])
+    units = cols.get("unit_system") or [unit_system] * n
+    labels = {u: normalise_header(u or unit_system) for u in set(units)}
+    mapped = {u: METRIC if label in MILLIMETRE_UNITS else UNIT_ALIASES.get(label, u or unit_system)
+              for u, label in labels.items()}
+    millimetres = np.array([labels[u] in MILLIMETRE_UNITS for u in units], dtype=bool)
+    cols["unit_system"] = [mapped[u] for u in units]
+    arrays = {}
+    for name, values in cols.items():
+        if name in TEXT_COLUMNS:
+            arrays[name] = np.array(["" if v is None else str(v) for v in values], dtype=object)
+        elif name in RAW_COLUMNS:
+            arrays[name] = np.empty(len(values), dtype=object)
+            arrays[name][:] = values
+        else:
+            arrays[name] = _to_floats(values)
+    return millimetres_to_metres(arrays, millimetres)
+
+
+def columns_from_spec(spec):
+    """Column arrays from a decoded JSON spec."""
+    unit_system = METRIC
+    if isinstance(spec, dict) and "elements" in spec:
+        unit_system = spec.get("unit_system", METRIC)
+        defaults = {k: v for k, v in spec.items() if k not in ("elements", "unit_system")}
+        spec = [{**defaults, **e} for e in spec["elements"]]
+    elif isinstance(spec, dict):
+        spec = [spec]
+    if not isinstance(spec, list) or not all(isinstance(r, dict) for r in spec):
+        raise SpecError("spec must be an element object, a list of them, or {\"elements\": [...]}")
+    cols = {}
+    for i, record in enumerate(spec):
+        for name, value in zip(target_names(record), record.values()):
+            cols.setdefault(name, [None] * len(spec))[i] = value
+    return finalise(cols, len(spec), unit_system)
+
+
+# --- COMPUTE ---
+def compute_records(cols):
+    """Engine results for one chunk of columns; invalid rows are dropped.
+
+    Returns ``(out, rejected)`` where ``out`` is a dict of arrays.
+    """
+    if "shape" in cols:
+        # Only shaped specs need the geometry module.
+        from concrete_calc.geometry import missing_dimensions
+
+        n = len(cols["shape"])
+        valid = missing_dimensions(cols) == ""
+    else:
+        missing = [c for c in ("length", "width", "height") if c not in cols]
+        if missing:
+            raise SpecError(f"spec is missing {', '.join(missing)}")
+        n = len(cols["length"])
+        valid = (cols["length"] > 0) & (cols["width"] > 0) & (cols["height"] > 0)
+    valid &= np.isin(cols["unit_system"], list(UNIT_SYSTEMS))
+    cols = {k: v[valid] for k, v in cols.items()}
+
+    out = compute_schedule(cols, include_inputs=True)
+    m = int(valid.sum())
+    slump = cols.get("slump", np.full(m, math.nan))
+    slump = np.where(np.isnan(slump), DEFAULT_SLUMP, slump)
+    out["slump"] = slump
+    out["workability"] = workability_class(slump)[0]
+    out["unit_system"] = cols["unit_system"]
+    out["element_id"] = cols.get("element_id", np.flatnonzero(valid).astype(str).astype(object))
+    # Remaining inputs (shape dimensions, outlines, pour...) ride along for reports.
+    for name, values in cols.items():
+        out.setdefault(name, values)
+    return out, n - m
+
+
+def row_keys(out):
+    """Output field order for per-element rows."""
+    return ["element_id"] + [k for k in ("element_type", "shape", "unit_system") if k in out] \
+        + list(SCHEDULE_COLUMNS) + ["slump", "workability"] + list(RESULT_COLUMNS)
+
+
+def iter_rows(out, keys=None):
+    """Per-element dicts of plain Python values from a computed chunk (``row_keys`` by default)."""
+    keys = row_keys(out) if keys is None else list(keys)
+    for values in zip(*(out[k].tolist() for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def totals_by_unit(out, totals=None):
+    """Add one computed chunk to per-unit-system totals (a dict of dicts)."""
+    totals = {} if totals is None else totals
+    for unit in np.unique(out["unit_system"]):
+        mask = out["unit_system"] == unit
+        bucket = totals.setdefault(str(unit), dict.fromkeys(TOTAL_KEYS, 0.0) | {"count": 0})
+        bucket["count"] += int(mask.sum())
+        for key in TOTAL_KEYS:
+            bucket[key] += float(out[key][mask].sum())
+    return totals
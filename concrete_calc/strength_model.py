@@ -0,0 +1,269 @@
+"""Abrams'-law strength model fitted from lab cube and cylinder results.
+
+Abrams' law ``f = A / B ** (w/c)`` is linear in logs, and age enters as a
+log term, so every group (cement source x aggregate source) is the
+regression
+
+    ln f = a + b * (w/c) + c * ln(age / 28)
+
+with ``A = exp(a)`` and ``B = exp(-b)`` at 28 days. ``StrengthModel``
+keeps only the least-squares sufficient statistics of each group
+(``X'X``, ``X'y``, ``y'y`` and the count), so lab files of any length are
+streamed through ``schedule_import.read_schedule_chunks`` and new results
+are added to the sums without refitting the history. ``fit`` solves the
+normal equations of every group at once with stacked NumPy arrays.
+A pooled ``ALL_GROUP`` collects every result.
+
+Cube strengths are converted to cylinder strengths with
+``CYLINDER_PER_CUBE``; strengths are in MPa.
+"""
+import io
+
+import numpy as np
+
+from concrete_calc.headers import normalise_header
+from concrete_calc.schedule_import import read_schedule_chunks
+
+DEFAULT_CHUNK_SIZE = 100_000
+REFERENCE_AGE_DAYS = 28.0
+CYLINDER_PER_CUBE = 0.8
+PSI_PER_MPA = 145.038
+ALL_GROUP = "All sources"
+UNKNOWN_SOURCE = "unspecified"
+
+# Confidence that the in-place mean reaches the target -> one-sided normal quantile.
+CONFIDENCE_Z = {0.5: 0.0, 0.9: 1.2816, 0.95: 1.6449}
+
+# Normalised header -> results column.
+RESULT_ALIASES = {
+    "wc_ratio": "wc_ratio", "wc": "wc_ratio", "w_c": "wc_ratio", "w_c_ratio": "wc_ratio",
+    "water_cement_ratio": "wc_ratio",
+    "strength": "strength", "strength_mpa": "strength", "fc": "strength", "fc_mpa": "strength",
+    "compressive_strength": "strength", "compressive_strength_mpa": "strength",
+    "strength_psi": "strength_psi", "fc_psi": "strength_psi",
+    "age": "age_days", "age_days": "age_days", "test_age": "age_days", "days": "age_days",
+    "specimen": "specimen", "specimen_type": "specimen", "sample": "specimen",
+    "cement": "cement", "cement_source": "cement", "cement_type": "cement", "cement_brand": "cement",
+    "aggregate": "aggregate", "aggregate_source": "aggregate", "quarry": "aggregate", "pit": "aggregate",
+}
+
+
+# --- LAB RESULTS ---
+def normalise_results(chunk):
+    """``(groups, wc, strength, age_days, rejected)`` from a raw lab-results chunk.
+
+    Strengths become cylinder MPa; missing ages are taken as 28 days.
+    Rows without a positive W/C and strength are counted in ``rejected``.
+    """
+    import pandas as pd
+
+    chunk = chunk.rename(columns=lambda c: RESULT_ALIASES.get(normalise_header(c), normalise_header(c)))
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    if "wc_ratio" not in chunk or not ({"strength", "strength_psi"} & set(chunk.columns)):
+        raise ValueError("results need wc_ratio and strength columns")
+    wc = pd.to_numeric(chunk["wc_ratio"], errors="coerce").to_numpy(dtype=float)
+    if "strength" in chunk:
+        strength = pd.to_numeric(chunk["strength"], errors="coerce").to_numpy(dtype=float)
+    else:
+        strength = pd.to_numeric(chunk["strength_psi"], errors="coerce").to_numpy(dtype=float) / PSI_PER_MPA
+    if "specimen" in chunk:
+        cube = chunk["specimen"].astype(str).str.strip().str.lower().str.startswith("cube").to_numpy()
+        strength = np.where(cube, strength * CYLINDER_PER_CUBE, strength)
+    age = pd.to_numeric(chunk["age_days"], errors="coerce").to_numpy(dtype=float) if "age_days" in chunk \
+        else np.full(len(chunk), REFERENCE_AGE_DAYS)
+    age = np.where(np.isnan(age), REFERENCE_AGE_DAYS, age)
+    sources = [chunk[c].fillna(UNKNOWN_SOURCE).astype(str).str.strip() if c in chunk
+               else pd.Series(UNKNOWN_SOURCE, index=chunk.index) for c in ("cement", "aggregate")]
+    groups = (sources[0] + " / " + sources[1]).to_numpy()
+    ok = (wc > 0) & (strength > 0) & (age > 0)
+    return groups[ok], wc[ok], strength[ok], age[ok], int((~ok).sum())
+
+
+def features(wc, age_days=REFERENCE_AGE_DAYS):
+    """Regression rows ``[1, w/c, ln(age / 28)]``."""
+    wc = np.asarray(wc, dtype=float)
+    age = np.broadcast_to(np.asarray(age_days, dtype=float), wc.shape)
+    return np.stack([np.ones_like(wc), wc, np.log(age / REFERENCE_AGE_DAYS)], axis=-1)
+
+
+# --- RUNNING SUMS ---
+class StrengthModel:
+    """Per-group least-squares sums of ln(strength) on w/c and age, updated chunk by chunk."""
+
+    def __init__(self):
+        self.groups = []
+        self._index = {}
+        self.rows = self.rejected = 0
+        self.sources = set()  # ids of files already added
+        self._xtx = np.zeros((0, 3, 3))
+        self._xty = np.zeros((0, 3))
+        self._yty = np.zeros(0)
+        self._n = np.zeros(0, dtype=np.int64)
+        self._wc_range = np.zeros((0, 2))
+        self._age_range = np.zeros((0, 2))
+
+    def _codes(self, groups):
+        names, inverse = np.unique(groups, return_inverse=True)
+        new = [name for name in [ALL_GROUP, *names] if name not in self._index]
+        if new:
+            for name in new:
+                self._index[name] = len(self.groups)
+                self.groups.append(name)
+            k = len(new)
+            self._xtx = np.concatenate([self._xtx, np.zeros((k, 3, 3))])
+            self._xty = np.concatenate([self._xty, np.zeros((k, 3))])
+            self._yty = np.concatenate([self._yty, np.zeros(k)])
+            self._n = np.concatenate([self._n, np.zeros(k, dtype=np.int64)])
+            self._wc_range = np.concatenate([self._wc_range, np.tile([np.inf, -np.inf], (k, 1))])
+            self._age_range = np.concatenate([self._age_range, np.tile([np.inf, -np.inf], (k, 1))])
+        return np.array([self._index[name] for name in names], dtype=np.int64)[inverse.ravel()]
+
+    def add(self, chunk):
+        """Fold a raw lab-results chunk (a DataFrame) into the sums."""
+        groups, wc, strength, age, rejected = normalise_results(chunk)
+        self.rejected += rejected
+        if not len(wc):
+            return
+        self.rows += len(wc)
+        # Every result counts for its own group and for the pooled one.
+        codes = np.concatenate([self._codes(groups), np.full(len(wc), self._index[ALL_GROUP])])
+        x = np.tile(features(wc, age), (2, 1))
+        y = np.tile(np.log(strength), 2)
+        size = len(self.groups)
+        for i in range(3):
+            self._xty[:, i] += np.bincount(codes, weights=x[:, i] * y, minlength=size)
+            for j in range(3):
+                self._xtx[:, i, j] += np.bincount(codes, weights=x[:, i] * x[:, j], minlength=size)
+        self._yty += np.bincount(codes, weights=y * y, minlength=size)
+        self._n += np.bincount(codes, minlength=size)
+        np.minimum.at(self._wc_range[:, 0], codes, x[:, 1])
+        np.maximum.at(self._wc_range[:, 1], codes, x[:, 1])
+        np.minimum.at(self._age_range[:, 0], codes, np.tile(age, 2))
+        np.maximum.at(self._age_range[:, 1], codes, np.tile(age, 2))
+
+    def add_results(self, source, chunksize=DEFAULT_CHUNK_SIZE, name=None, source_id=None):
+        """Stream a lab-results file into the sums, yielding the fraction read after each chunk.
+
+        A file whose ``source_id`` was added before is skipped.
+        """
+        if source_id is not None and source_id in self.sources:
+            return
+        for raw, fraction in read_schedule_chunks(source, chunksize, name):
+            self.add(raw)
+            yield fraction
+        if source_id is not None:
+            self.sources.add(source_id)
+
+    def fit(self):
+        """Coefficients of every group, solved at once.
+
+        Returns a dict of arrays over ``groups``: ``n``, ``a``, ``b``, ``c``,
+        Abrams' ``A`` and ``B``, the residual standard deviation ``sd`` of
+        ln(strength), ``r2`` and the ``wc_min`` / ``wc_max`` and ``age_min`` /
+        ``age_max`` tested. Groups whose results are all the same age cannot
+        separate age from the intercept: their ``a`` and ``A`` hold at that
+        age and ``c`` is 0 at 28 days, else NaN (no age extrapolation).
+        Groups tested at a single W/C get NaN coefficients, and groups with
+        fewer results than coefficients a NaN ``sd``.
+        """
+        # pinv gives the minimum-norm solution, which splits a constant age term between a and c.
+        beta = np.einsum("gij,gj->gi", np.linalg.pinv(self._xtx), self._xty)
+        single_age = self._age_range[:, 1] == self._age_range[:, 0]
+        log_age = np.log(self._age_range[single_age, 0] / REFERENCE_AGE_DAYS)
+        beta[single_age, 0] += beta[single_age, 2] * log_age
+        beta[single_age, 2] = np.where(log_age == 0, 0.0, np.nan)
+        rank = np.linalg.matrix_rank(self._xtx) if len(self.groups) else np.zeros(0, dtype=int)
+        sse = np.maximum(self._yty - np.einsum("gi,gi->g", beta, self._xty), 0.0)
+        dof = self._n - rank
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sd = np.where(dof > 0, np.sqrt(sse / np.maximum(dof, 1)), np.nan)
+            sst = self._yty - self._xty[:, 0] ** 2 / self._n
+            r2 = np.where(sst > 0, 1.0 - sse / sst, np.nan)
+        # A slope needs at least two different W/C ratios.
+        beta[~(self._wc_range[:, 1] > self._wc_range[:, 0])] = np.nan
+        a, b, c = beta.T
+        return {
+            "group": np.array(self.groups, dtype=object), "n": self._n.copy(), "a": a, "b": b, "c": c,
+            "A": np.exp(a), "B": np.exp(-b), "sd": sd, "r2": r2,
+            "wc_min": self._wc_range[:, 0].copy(), "wc_max": self._wc_range[:, 1].copy(),
+            "age_min": self._age_range[:, 0].copy(), "age_max": self._age_range[:, 1].copy(),
+        }
+
+    # --- PERSISTENCE ---
+    def save(self, dest):
+        """Write the sums to ``dest`` (a path or binary file) as a compressed ``.npz``."""
+        np.savez_compressed(
+            dest, groups=np.array(self.groups, dtype=str), sources=np.array(sorted(self.sources), dtype=str),
+            tallies=np.array([self.rows, self.rejected]), xtx=self._xtx, xty=self._xty, yty=self._yty,
+            n=self._n, wc_range=self._wc_range, age_range=self._age_range)
+
+    def to_bytes(self):
+        buf = io.BytesIO()
+        self.save(buf)
+        return buf.getvalue()
+
+    @classmethod
+    def load(cls, source):
+        """A model written by ``save``, ready for more results."""
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        model = cls()
+        with np.load(source) as data:
+            model.groups = data["groups"].tolist()
+            model._index = {g: i for i, g in enumerate(model.groups)}
+            model.sources = set(data["sources"].tolist())
+            model.rows, model.rejected = (int(x) for x in data["tallies"])
+            model._xtx, model._xty, model._yty = data["xtx"], data["xty"], data["yty"]
+            model._n, model._wc_range = data["n"], data["wc_range"]
+            if "age_range" in data:
+                model._age_range = data["age_range"]
+            else:
+                # Older files: a zero variance of ln(age) means a single tested age.
+                mean = model._xtx[:, 0, 2] / np.maximum(model._n, 1)
+                var = model._xtx[:, 2, 2] / np.maximum(model._n, 1) - mean ** 2
+                age = REFERENCE_AGE_DAYS * np.exp(mean)
+                model._age_range = np.column_stack([np.where(var > 1e-12, 0.0, age),
+                                                    np.where(var > 1e-12, np.inf, age)])
+        return model
+
+
+# --- DESIGN ---
+def _age_term(fit, age_days):
+    """``c * ln(age / 28)``; groups tested at one age only give 0 at that age and NaN elsewhere."""
+    age = np.asarray(age_days, dtype=float)
+    single = fit["age_min"] == fit["age_max"]
+    with np.errstate(invalid="ignore"):
+        return np.where(single, np.where(np.isclose(age, fit["age_min"]), 0.0, np.nan),
+                        fit["c"] * np.log(age / REFERENCE_AGE_DAYS))
+
+
+def predict_strength(fit, wc, age_days=REFERENCE_AGE_DAYS, z=0.0):
+    """Strength (MPa) of every group at ``wc``, lowered by ``z`` residual SDs (``z=0`` is the median)."""
+    x = features(wc, age_days)
+    return np.exp(fit["a"] + fit["b"] * x[..., 1] + _age_term(fit, age_days) - z * np.nan_to_num(fit["sd"]))
+
+
+def wc_for_strength(fit, target, age_days=REFERENCE_AGE_DAYS, z=0.0):
+    """Largest W/C of every group whose strength, ``z`` residual SDs down, reaches ``target`` MPa.
+
+    NaN for groups where strength does not fall with W/C (``b >= 0``).
+    """
+    need = np.log(target) + z * np.nan_to_num(fit["sd"]) - fit["a"] - _age_term(fit, age_days)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(fit["b"] < 0, need / fit["b"], np.nan)
+
+
+def check_wc(fit, group, wc, target, age_days=REFERENCE_AGE_DAYS, confidence=0.5):
+    """Validation of ``wc`` for ``target`` MPa on one group, as a plain dict for the page and the report."""
+    i = list(fit["group"]).index(group)
+    z = CONFIDENCE_Z[confidence]
+    one = {k: v[i:i + 1] for k, v in fit.items()}
+    predicted = float(predict_strength(one, wc, age_days, z)[0])
+    suggested = float(wc_for_strength(one, target, age_days, z)[0])
+    return {
+        "group": group, "n": int(one["n"][0]), "target": float(target), "age_days": float(age_days),
+        "confidence": float(confidence), "wc_ratio": float(wc), "predicted": predicted,
+        "suggested_wc": suggested, "ok": bool(predicted >= target),
+        "extrapolated": bool(not one["wc_min"][0] <= wc <= one["wc_max"][0]),
+        "A": float(one["A"][0]), "B": float(one["B"][0]),
+    }
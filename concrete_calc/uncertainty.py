@@ -0,0 +1,171 @@
+"""Monte Carlo uncertainty for material quantities.
+
+Bulk densities, the dry volume factor and site wastage are sampled from
+user-given distributions in batches of NumPy draws and pushed through the
+same ``compute_from_volume`` pipeline as the point estimate. Quantiles are
+tracked with ``QuantileSketch``, a log-bucketed histogram with a fixed
+relative error, so millions of draws never have to be held at once.
+
+Distributions are tuples:
+
+``("fixed", value)``, ``("uniform", low, high)``,
+``("triangular", low, mode, high)``, ``("normal", mean, sd)`` (truncated
+at zero) and ``("lognormal", median, sigma)``.
+"""
+import numpy as np
+
+from concrete_calc.engine import compute_from_volume
+
+UNCERTAIN_INPUTS = ("dens_c", "dens_s", "dens_a", "dry_factor", "wastage_percent")
+TRACKED = ("dry_volume", "weight_c", "weight_s", "weight_a", "weight_water")
+DEFAULT_DRAWS = 1_000_000
+DEFAULT_BATCH = 250_000
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+DEFAULT_ACCURACY = 0.001
+
+
+# --- QUANTILE SKETCH ---
+class QuantileSketch:
+    """Streaming quantiles of positive values with relative error ``accuracy``.
+
+    Values are counted in buckets ``[gamma**(k-1), gamma**k)`` with
+    ``gamma = (1 + a) / (1 - a)``; a quantile is reported as its bucket's
+    midpoint, within ``a`` of the true sample quantile. Memory grows with
+    the log of the value range, not the number of values, and sketches
+    with the same accuracy merge by adding counts.
+    """
+
+    def __init__(self, accuracy=DEFAULT_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.offset = 0
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        if not len(positive):
+            return
+        keys = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+        lo, hi = int(keys.min()), int(keys.max())
+        self._extend(lo, hi)
+        self.counts += np.bincount(keys - self.offset, minlength=len(self.counts))[:len(self.counts)]
+
+    def _extend(self, lo, hi):
+        if not len(self.counts):
+            self.offset, self.counts = lo, np.zeros(hi - lo + 1, dtype=np.int64)
+            return
+        new_lo, new_hi = min(lo, self.offset), max(hi, self.offset + len(self.counts) - 1)
+        if (new_lo, new_hi) != (self.offset, self.offset + len(self.counts) - 1):
+            grown = np.zeros(new_hi - new_lo + 1, dtype=np.int64)
+            grown[self.offset - new_lo:self.offset - new_lo + len(self.counts)] = self.counts
+            self.offset, self.counts = new_lo, grown
+
+    def merge(self, other):
+        if other.accuracy != self.accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        if len(other.counts):
+            self._extend(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            self.counts[start:start + len(other.counts)] += other.counts
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Value at quantile(s) ``q`` (0-1); NaN for an empty sketch."""
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        rank = q * (self.count - 1)
+        cumulative = self.zeros + np.cumsum(self.counts)
+        idx = np.searchsorted(cumulative, rank, side="right").clip(max=len(self.counts) - 1)
+        keys = self.offset + idx
+        values = 2 * self.gamma ** keys / (self.gamma + 1)
+        values = np.where(rank < self.zeros, 0.0, values)
+        return np.clip(values, self.min, self.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+
+# --- SAMPLING ---
+def spread(mean, cov, kind="normal"):
+    """Distribution tuple with the given mean and coefficient of variation."""
+    if cov <= 0:
+        return ("fixed", mean)
+    if kind == "normal":
+        return ("normal", mean, mean * cov)
+    if kind == "uniform":
+        half = mean * cov * np.sqrt(3)
+        return ("uniform", mean - half, mean + half)
+    if kind == "lognormal":
+        sigma = np.sqrt(np.log1p(cov ** 2))
+        return ("lognormal", mean * np.exp(-sigma ** 2 / 2), sigma)
+    raise ValueError(f"unknown distribution {kind!r}")
+
+
+def sample(dist, n, rng):
+    """``n`` draws from a distribution tuple (see module docstring)."""
+    kind, *params = dist
+    if kind == "fixed":
+        return np.full(n, float(params[0]))
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1], n)
+    if kind == "triangular":
+        low, mode, high = params
+        if low == high:
+            return np.full(n, float(low))
+        return rng.triangular(low, mode, high, n)
+    if kind == "normal":
+        return np.maximum(rng.normal(params[0], params[1], n), 0.0)
+    if kind == "lognormal":
+        return rng.lognormal(np.log(params[0]), params[1], n)
+    raise ValueError(f"unknown distribution {kind!r}")
+
+
+def simulate_quantities(wet_volume, c_ratio, s_ratio, a_ratio, wc_ratio, inputs, draws=DEFAULT_DRAWS,
+                        batch=DEFAULT_BATCH, seed=0, quantiles=DEFAULT_QUANTILES,
+                        accuracy=DEFAULT_ACCURACY):
+    """Quantiles of the tracked quantities when ``inputs`` are uncertain.
+
+    ``inputs`` maps names in ``UNCERTAIN_INPUTS`` to distribution tuples
+    (plain numbers are taken as fixed). Returns ``{quantity: {"mean": ...,
+    "P10": ..., "P50": ..., "P90": ...}}`` for the quantities in
+    ``TRACKED``, plus ``"draws"``.
+    """
+    rng = np.random.default_rng(seed)
+    sketches = {name: QuantileSketch(accuracy) for name in TRACKED}
+    dists = {name: inputs[name] if isinstance(inputs[name], tuple) else ("fixed", inputs[name])
+             for name in UNCERTAIN_INPUTS}
+    done = 0
+    while done < draws:
+        n = min(batch, draws - done)
+        s = {name: sample(dist, n, rng) for name, dist in dists.items()}
+        q = compute_from_volume(wet_volume, c_ratio, s_ratio, a_ratio, s["dens_c"], s["dens_s"], s["dens_a"],
+                                s["dry_factor"], s["wastage_percent"], wc_ratio)
+        for name, sketch in sketches.items():
+            sketch.add(q[name])
+        done += n
+
+    out = {"draws": done}
+    for name, sketch in sketches.items():
+        values = sketch.quantile(quantiles)
+        out[name] = {"mean": sketch.mean, **{f"P{round(100 * p)}": float(v) for p, v in zip(quantiles, values)}}
+    return out
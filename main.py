@@ -1,24 +1,53 @@
 import streamlit as st
 import pandas as pd
-import base64
+import numpy as np
 import plotly.graph_objects as go
-from fpdf import FPDF
+import datetime
 import io
+import os
+import sqlite3
+from concrete_calc import aci211, assets, costing, dispatch, gradation, maturity, metrics, strength_model
+from concrete_calc.artifact_cache import canonical_key, shared_cache
+from concrete_calc.engine import (UNIT_SYSTEMS, METRIC, DEFAULTS, WORKABILITY_BANDS, compute_from_volume,
+                                  workability_class)
+from concrete_calc.export import EXPORT_FORMATS, TOTAL_COLUMNS, TableWriter, element_table, mix_ids, totals_table
+from concrete_calc.figures import draw_3d_specimen
+from concrete_calc.geometry import GEOMETRY_COLUMNS, SHAPES, element_geometry, element_mesh, missing_dimensions
+from concrete_calc.mesh_import import LENGTH_UNITS, read_mesh
+from concrete_calc.optimizer import optimize_mix, sensitivity
+from concrete_calc.project_store import ROLLUP_KEYS, ProjectStore
+from concrete_calc.project_view import BOX_COLUMNS, DEFAULT_MAX_ELEMENTS, project_figure
+from concrete_calc.report import create_pdf
+from concrete_calc.report_jobs import DONE, FAILED, QUEUED, QueueFull, report_jobs
+from concrete_calc.uncertainty import DEFAULT_DRAWS, simulate_quantities, spread
+from concrete_calc.schedule_import import process_schedule
 
 # --- PAGE SETUP ---
 st.set_page_config(page_title="Concrete Calc - Pro 3D Edition", layout="wide")
 
+# --- PROFILING ---
+# Off unless the URL has ?debug=1 or CONCRETE_CALC_PROFILE=1 is set; with
+# recorder = None every timing hook below is a no-op.
+if metrics.profiling_requested(st.query_params.get("debug")):
+    recorder = st.session_state.setdefault("metrics_recorder", metrics.Recorder())
+    recorder.start_run()
+else:
+    recorder = None
+
+def timed_section(name):
+    return metrics.section(name, recorder)
+
 # --- FUNCTION TO SET LOCAL BACKGROUND ---
+@metrics.profiled("add_bg_from_local")
 def add_bg_from_local(image_file):
     try:
-        with open(image_file, "rb") as f:
-            encoded_string = base64.b64encode(f.read())
-        st.markdown(
-        f"""
+        # Encoded once per process (and per file mtime); reruns only send the URL.
+        bg_url = assets.background_url(image_file)
+        css = f"""
         <style>
         /* 1. Background and Containers */
         .stApp {{
-            background-image: url("data:image/png;base64,{encoded_string.decode()}");
+            background-image: url("{bg_url}");
             background-attachment: fixed;
             background-size: cover;
         }}
@@ -153,7 +182,7 @@ def add_bg_from_local(image_file):
 
         /* 1. MAIN THEME COLORS */
         .stApp {{
-            background-image: url("data:image/png;base64,{encoded_string.decode()}");
+            background-image: url("{bg_url}");
             background-attachment: fixed;
             background-size: cover;
         }}
@@ -191,36 +220,138 @@ def add_bg_from_local(image_file):
         /* 6. GLOBAL TEXT */
         h1, h2, h3, h4 {{ color: #FFB300 !important; }}
         </style>
-        """,
-        unsafe_allow_html=True
-        )
+        """
+        st.markdown(css, unsafe_allow_html=True)
+        if recorder is not None:
+            assets.record_css_payload(css, assets.legacy_background_payload(image_file))
+        metrics.record_size("background CSS", len(css.encode()))
     except FileNotFoundError:
         st.warning("Background image 'background.jpg' not found.")
 
-add_bg_from_local('background.jpg')
+with timed_section("Background CSS"):
+    add_bg_from_local('background.jpg')
+
+def show_card_image(image_file):
+    # Material card images are optional; a missing file should not stop the page.
+    src = assets.image_source(image_file)
+    if isinstance(src, bytes):
+        st.image(src)
+    else:
+        st.caption(f"({image_file} not found)")
+
+# --- PROJECT STORE ---
+NO_PROJECT = "(no project)"
+
+@st.cache_resource
+def project_store():
+    # One SQLite connection per server process, shared by every session.
+    try:
+        return ProjectStore()
+    except sqlite3.Error:
+        return None
+
+def as_input_value(value):
+    # Whole numbers keep the integer inputs these fields have always had.
+    return int(value) if float(value).is_integer() else float(value)
+
+def reset_project_inputs():
+    # Keyed inputs keep their state across reruns; dropping it lets them
+    # pick up the newly selected project's defaults.
+    for key in ("unit_system", "c_ratio", "s_ratio", "a_ratio"):
+        st.session_state.pop(key, None)
+
+def create_project():
+    name = st.session_state.get("new_project_name", "").strip()
+    if name and name not in store.projects():
+        store.create_project(name, st.session_state["unit_system"])
+        st.session_state["project_name"] = name
+        reset_project_inputs()
+
+store = project_store()
+
+# --- ELEMENT SHAPE INPUTS ---
+SHAPE_LABELS = {
+    "prism": "Rectangular Prism", "cylinder": "Circular Column", "frustum": "Tapered Footing",
+    "cone_frustum": "Tapered Circular Pier", "polygon": "Polygonal Slab (with Openings)", "stair": "Stair Flight",
+    "mesh": "Imported Mesh (STL/OBJ)",
+}
+# Starting dimensions in metres (scaled for feet).
+SHAPE_DEFAULTS = {
+    "diameter": 0.5, "height": 3.0, "length": 2.0, "width": 2.0, "top_length": 1.0, "top_width": 1.0,
+    "top_diameter": 0.3, "depth": 0.6, "thickness": 0.2, "rise": 0.175, "going": 0.25, "stair_width": 1.2,
+    "waist": 0.15,
+}
+
+def shape_inputs(shape, len_unit):
+    """Dimension inputs for one element shape; returns the element's geometry columns."""
+    scale = 1.0 if len_unit == "m" else 3.2808
+
+    def dim(label, name):
+        return st.number_input(f"{label} ({len_unit})", value=round(SHAPE_DEFAULTS[name] * scale, 4),
+                               format="%.4f", min_value=0.0)
+
+    if shape == "prism":
+        element = {"length": st.number_input(f"Length ({len_unit})", value=1.0000, format="%.4f"),
+                   "width": st.number_input(f"Width ({len_unit})", value=1.0000, format="%.4f"),
+                   "height": st.number_input(f"Height ({len_unit})", value=1.0000, format="%.4f")}
+    elif shape == "cylinder":
+        element = {"diameter": dim("Diameter", "diameter"), "height": dim("Height", "height")}
+    elif shape == "frustum":
+        element = {"length": dim("Base Length", "length"), "width": dim("Base Width", "width"),
+                   "top_length": dim("Top Length", "top_length"), "top_width": dim("Top Width", "top_width"),
+                   "height": dim("Depth", "depth")}
+    elif shape == "cone_frustum":
+        element = {"diameter": dim("Base Diameter", "diameter"), "top_diameter": dim("Top Diameter", "top_diameter"),
+                   "height": dim("Height", "height")}
+    elif shape == "polygon":
+        element = {
+            "outline": st.text_area(f"Outline Points (x y; ... in {len_unit})", "0 0; 6 0; 6 4; 3 4; 3 8; 0 8"),
+            "openings": st.text_input("Openings (points as above, several separated by |)", "1 1; 2 1; 2 2; 1 2"),
+            "height": dim("Thickness", "thickness"),
+        }
+    elif shape == "mesh":
+        # The upload itself stays in st.session_state["mesh_file"]; the element only names it.
+        upload = st.file_uploader("Mesh File (closed STL or OBJ)", type=["stl", "obj"], key="mesh_file")
+        element = {"file_id": upload.file_id if upload is not None else None,
+                   "units": st.selectbox("Mesh Units", list(LENGTH_UNITS), index=list(LENGTH_UNITS).index(len_unit))}
+    else:
+        element = {"steps": float(st.number_input("Number of Steps", min_value=1, value=10)),
+                   "rise": dim("Rise", "rise"), "going": dim("Going (Tread)", "going"),
+                   "width": dim("Flight Width", "stair_width"), "waist": dim("Waist Thickness", "waist")}
+    element["void_volume"] = st.number_input(f"Voids to Subtract ({len_unit}³)", value=0.0, min_value=0.0,
+                                             format="%.4f")
+    return {"shape": shape, **element}
 
 # --- SIDEBAR: INPUTS ---
 with st.sidebar:
+    st.header("💾 Project")
+    projects = store.projects() if store is not None else {}
+    project_name = st.selectbox("Project", [NO_PROJECT, *projects], key="project_name", on_change=reset_project_inputs)
+    project = store.project(projects[project_name]) if project_name in projects else None
+    if store is None:
+        st.caption("Project store unavailable (the database could not be opened).")
+    # Inputs start from the selected project's default mix and densities.
+    defaults = {**DEFAULTS, "unit_system": METRIC, **(project or {})}
+
     st.header("📐 1. Dimensions")
-    unit_system = st.selectbox("Unit System", ["Metric (SI)", "Imperial (BG)"])
-
-    if unit_system == "Metric (SI)":
-        l = st.number_input("Length (m)", value=1.0000, format="%.4f")
-        w = st.number_input("Width (m)", value=1.0000, format="%.4f")
-        h = st.number_input("Height (m)", value=1.0000, format="%.4f")
-        v_unit, w_unit = "m³", "kg"
-        def_c, def_s, def_a = 1440.0000, 1600.0000, 1550.0000
-    else:
-        l = st.number_input("Length (ft)", value=1.0000, format="%.4f")
-        w = st.number_input("Width (ft)", value=1.0000, format="%.4f")
-        h = st.number_input("Height (ft)", value=1.0000, format="%.4f")
-        v_unit, w_unit = "ft³", "lb"
-        def_c, def_s, def_a = 94.0000, 100.0000, 105.0000
+    unit_system = st.selectbox("Unit System", list(UNIT_SYSTEMS),
+                               index=list(UNIT_SYSTEMS).index(defaults["unit_system"]), key="unit_system")
+
+    shape = st.selectbox("Element Shape", SHAPES + ("mesh",), format_func=SHAPE_LABELS.get, key="element_shape")
+    len_unit = "m" if unit_system == METRIC else "ft"
+    element = shape_inputs(shape, len_unit)
+    v_unit, w_unit = UNIT_SYSTEMS[unit_system]["v_unit"], UNIT_SYSTEMS[unit_system]["w_unit"]
+    def_c, def_s, def_a = UNIT_SYSTEMS[unit_system]["densities"]
+    if project is not None and project["unit_system"] == unit_system:
+        def_c, def_s, def_a = project["dens_c"], project["dens_s"], project["dens_a"]
+    # An applied stockpile blend brings its blended bulk densities.
+    applied_blend = st.session_state.get("applied_blend")
+    if applied_blend is not None and applied_blend["unit_system"] == unit_system:
+        def_s, def_a = applied_blend["dens_s"], applied_blend["dens_a"]
 
     st.header("⚙️ 2. Design Factors")
-    dry_factor = st.number_input("Dry Volume Factor", value=1.54)
-    wastage_percent = st.number_input("Wastage (%)", value=5)
-    wastage_factor = 1 + (wastage_percent / 100)
+    dry_factor = st.number_input("Dry Volume Factor", value=defaults["dry_factor"])
+    wastage_percent = st.number_input("Wastage (%)", value=as_input_value(defaults["wastage_percent"]))
 
     st.header("⚖️ 3. Material Densities")
     u_dens_c = st.number_input("Cement Density", value=def_c)
@@ -228,402 +359,1336 @@ with st.sidebar:
     u_dens_a = st.number_input("Stone Density", value=def_a)
 
     st.header("💧 4. Water Content")
-    wc_ratio = st.number_input("Water-Cement (W/C) Ratio", value=0.50)
+    # A W/C taken from the strength model replaces the default.
+    wc_ratio = st.number_input("Water-Cement (W/C) Ratio",
+                               value=st.session_state.get("applied_wc", defaults["wc_ratio"]))
+
+    if project is not None:
+        st.header("💾 5. Project Defaults")
+        if st.button("Save Inputs as Project Defaults"):
+            # Elements using the default mix or densities are recomputed only if a value changed.
+            store.update_project(project["id"], unit_system=unit_system)
+            store.update_mix(project["default_mix_id"], wc_ratio=wc_ratio, dry_factor=dry_factor,
+                             wastage_percent=wastage_percent,
+                             **{k: st.session_state.get(k, defaults[k]) for k in ("c_ratio", "s_ratio", "a_ratio")})
+            store.update_density_set(project["default_density_id"], unit_system=unit_system,
+                                     dens_c=u_dens_c, dens_s=u_dens_s, dens_a=u_dens_a)
+            st.success(f"Saved to {project_name}.")
+    if store is not None:
+        with st.expander("➕ New Project"):
+            st.text_input("Project Name", key="new_project_name")
+            st.button("Create Project", on_click=create_project)
+
+    if recorder is not None:
+        with st.expander("🛠 Performance Debug"):
+            st.checkbox("Show times under each section", key="show_section_timings")
+            debug_panel = st.empty()
+
+# --- ELEMENT GEOMETRY ---
+# Volume, bounding box (l/w/h) and class of the element described in the sidebar.
+def imported_mesh(units):
+    """Volume and preview of the uploaded mesh file, in the page's length unit."""
+    upload = st.session_state["mesh_file"]
+    scale = LENGTH_UNITS[units] / LENGTH_UNITS[len_unit]
+    return shared_cache().get_or_create(canonical_key("mesh", upload.file_id, scale),
+                                        lambda: read_mesh(upload, name=upload.name, scale=scale),
+                                        size=lambda r: r["preview"][0].nbytes + r["preview"][1].nbytes)
+
+if shape == "mesh":
+    if element["file_id"] is None:
+        st.info("⬅️ Upload a closed STL or OBJ mesh in the sidebar to compute its concrete volume.")
+        st.stop()
+    try:
+        imported = imported_mesh(element["units"])
+    except ValueError as e:
+        st.error(f"⚠️ Could not read the mesh: {e}.")
+        st.stop()
+    wet_volume = imported["volume"] - element["void_volume"]
+    l, w, h = (imported["bbox_max"] - imported["bbox_min"]).tolist()
+else:
+    geometry = element_geometry({k: [v] for k, v in element.items()})
+    wet_volume = float(geometry["wet_volume"][0])
+    l, w, h = (float(geometry[k][0]) for k in ("length", "width", "height"))
+    if np.isnan(wet_volume):
+        st.error(f"⚠️ Cannot compute the element volume: "
+                 f"{missing_dimensions({k: [v] for k, v in element.items()})[0]}.")
+        st.stop()
+
+def specimen_mesh():
+    """Triangles drawn for the element (a decimated preview for imported meshes)."""
+    return imported["preview"] if shape == "mesh" else element_mesh(**element)
 
 # --- 3D VISUALIZATION LOGIC ---
-def draw_3d_specimen(l, w, h):
-    fig = go.Figure(data=[
-        go.Mesh3d(
-            # 8 vertices of the prism
-            x=[0, l, l, 0, 0, l, l, 0],
-            y=[0, 0, w, w, 0, 0, w, w],
-            z=[0, 0, 0, 0, h, h, h, h],
-            i=[7, 0, 0, 0, 4, 4, 6, 6, 4, 0, 3, 2],
-            j=[3, 4, 1, 2, 5, 6, 5, 2, 0, 1, 6, 3],
-            k=[0, 7, 2, 3, 6, 7, 1, 1, 5, 5, 7, 6],
-            opacity=0.6,
-            color='lightcoral',
-            flatshading=True
-        )
-    ])
-    fig.update_layout(
-        scene=dict(
-            xaxis=dict(nticks=4, range=[-1, max(l,w,h)+1]),
-            yaxis=dict(nticks=4, range=[-1, max(l,w,h)+1]),
-            zaxis=dict(nticks=4, range=[-1, max(l,w,h)+1]),
-            aspectmode='data'
-        ),
-        margin=dict(l=0, r=0, b=0, t=0),
-        height=400
-    )
+# The figure only depends on the geometry, so every session asking for the same
+# element reuses it (st.plotly_chart copies the figure, so sharing it is safe).
+def specimen_figure(element):
+    fig = shared_cache().get_or_create(canonical_key("figure", element),
+                                       lambda: draw_3d_specimen(l, w, h, specimen_mesh()),
+                                       size=lambda fig: len(fig.to_json()))
+    if metrics.active():
+        metrics.record_size("3D figure JSON", len(fig.to_json()))
     return fig
 
-# --- CALCULATIONS ---
-wet_volume = l * w * h
-dry_volume = wet_volume * dry_factor * wastage_factor
-
-# Identify Shape
-if l == w == h: shape_name = "Cube"
-elif l > h*2 and w > h*2: shape_name = "Slab"
-elif l > w and l > h: shape_name = "Beam"
-elif h > l and h > w: shape_name = "Column"
-else: shape_name = "Specimen"
+# --- SECTION TIMING ---
+# Fragment sections rerun on their own, so their counts in the debug panel
+# grow independently of the full-page runs.
+def timing_caption(name):
+    if recorder is not None and st.session_state.get("show_section_timings"):
+        runs = sum(1 for e in recorder.events if e["kind"] == "section" and e["name"] == name)
+        st.caption(f"⏱ {name}: {recorder.last('section', name)['ms']:.1f} ms (run #{runs})")
 
-# Apply background
-add_bg_from_local('background.jpg')
+# --- CALCULATIONS ---
+# Identify Shape (quantities are computed by the engine once the mix ratios are known)
+shape_name = "Imported Mesh" if shape == "mesh" else str(geometry["shape_name"][0])
 
 # --- NEW: HORIZONTAL HERO IMAGE WITH ERROR HANDLING ---
-try:
-    st.image("bg.png", use_container_width=True)
-except Exception:
-    # If bg.jpeg is missing, use a professional online placeholder to keep the app running
-    st.image("https://images.unsplash.com/photo-1541888946425-d81bb19480c5?q=80&w=2000&auto=format&fit=crop", 
-             use_container_width=True)
+with timed_section("Hero image"):
+    try:
+        st.image(assets.image_source("bg.png"), use_container_width=True)
+    except Exception:
+        # If bg.jpeg is missing, use a professional online placeholder to keep the app running
+        st.image("https://images.unsplash.com/photo-1541888946425-d81bb19480c5?q=80&w=2000&auto=format&fit=crop",
+                 use_container_width=True)
 
 # --- MAIN PAGE DISPLAY ---
 # This removes the double title and cleans up the header
 st.title("🏙 Concrete Mix Design Calculator")
 st.markdown("---")
 
-col_vis, col_inp = st.columns([1, 1])
-
-with col_vis:
-    st.subheader(f"3D Specimen ({shape_name}) Visualization")
-    st.plotly_chart(draw_3d_specimen(l, w, h), use_container_width=True)
+# --- SECTION: DIMENSIONS / 3D VIEW ---
+# Inputs come from the sidebar only, so this runs on full-page reruns.
+with timed_section("Dimensions / 3D view"):
+    col_vis, col_inp = st.columns([1, 1])
 
-with col_inp:
-    st.subheader("Mix Proportion Inputs")
-    c_ratio = st.number_input("Cement Ratio", value=1)
-    s_ratio = st.number_input("Sand Ratio", value=2)
-    a_ratio = st.number_input("Stone Ratio", value=4)
-
-    # --- THIS FILLS THE GAP (image_ee44ea) ---
-    st.markdown("---")
-    try:
-        # Check if the file name matches your uploaded file exactly
-        st.image("image_ede32d.png", caption="Concrete Mixture", use_container_width=True)
-    except Exception:
-        st.warning("⚠️ image_ede32d.png not found. Please check the filename in your folder.")
+    with col_vis:
+        st.subheader(f"3D Specimen ({shape_name}) Visualization")
+        try:
+            st.plotly_chart(specimen_figure(element), use_container_width=True)
+        except ValueError as e:
+            st.warning(f"⚠️ This outline cannot be drawn: {e}")
+        if shape == "mesh":
+            shown = len(imported["preview"][1])
+            st.caption(f"{imported['format']}: {imported['triangles']:,} triangles"
+                       + (f" (drawn with {shown:,})" if shown < imported["triangles"] else "")
+                       + f", surface area {imported['area']:.4f} {len_unit}²")
+            if not imported["closed"]:
+                st.warning("⚠️ The mesh is not closed (its faces do not enclose a solid), "
+                           "so the computed volume is unreliable.")
+
+    with col_inp:
+        # --- THIS FILLS THE GAP (image_ee44ea) ---
+        try:
+            # Check if the file name matches your uploaded file exactly
+            st.image(assets.image_source("image_ede32d.png"), caption="Concrete Mixture", use_container_width=True)
+        except Exception:
+            st.warning("⚠️ image_ede32d.png not found. Please check the filename in your folder.")
+timing_caption("Dimensions / 3D view")
 
-    total_ratio = c_ratio + s_ratio + a_ratio
-    vol_c = (c_ratio / total_ratio) * dry_volume
-    vol_s = (s_ratio / total_ratio) * dry_volume
-    vol_a = (a_ratio / total_ratio) * dry_volume
+# --- SECTION: MIX PROPORTIONS / MATERIAL CARDS ---
+def band_caption(uq, name, unit):
+    # P50 / P90 under a point estimate when the uncertainty mode is on.
+    if uq is not None:
+        st.caption(f"P50 {uq[name]['P50']:.4f} · P90 {uq[name]['P90']:.4f} {unit}")
 
-    weight_c = vol_c * u_dens_c
-    weight_s = vol_s * u_dens_s
-    weight_a = vol_a * u_dens_a
-    weight_water = wc_ratio * weight_c
 
-# --- RESULTS SECTION WITH IMAGES ---
-st.markdown("---")
-st.header("🧱 Material Breakdown & Requirements")
-
-# 1. Top Metrics for Volumes
-m1, m2 = st.columns(2)
-m1.metric("Total Wet Volume", f"{wet_volume:.4f} {v_unit}")
-m2.metric("Total Dry Volume (+Wastage)", f"{dry_volume:.4f} {v_unit}")
-
-st.markdown("### Mix Details")
-
-# 2. Visual Cards for Materials
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    st.image("cement.png")
-    st.subheader("Cement")
-    st.write(f"**Ratio:** {c_ratio:.1f}")
-    st.write(f"**Weight:** {weight_c:.4f} {w_unit}")
-
-with col2:
-    st.image("sand.png")
-    st.subheader("Sand")
-    st.write(f"**Ratio:** {s_ratio:.1f}")
-    st.write(f"**Weight:** {weight_s:.4f} {w_unit}")
-
-with col3:
-    st.image("coarse.png")
-    st.subheader("Stone")
-    st.write(f"**Ratio:** {a_ratio:.1f}")
-    st.write(f"**Weight:** {weight_a:.4f} {w_unit}")
-
-with col4:
-    st.image("water.png")
-    st.subheader("Water")
-    st.write(f"**W/C Ratio:** {wc_ratio:.2f}")
-    st.write(f"**Weight:** {weight_water:.4f} {w_unit}")
-
-# Keep the table below for official reference if needed
-st.markdown("#### Official Data Table")
-res_df = pd.DataFrame({
-    "Material": ["Cement", "Sand", "Stone", "Water"],
-    "Ratio": [c_ratio, s_ratio, a_ratio, wc_ratio],
-    f"Weight ({w_unit})": [f"{weight_c:.4f}", f"{weight_s:.4f}", f"{weight_a:.4f}", f"{weight_water:.4f}"]
-})
-st.table(res_df)
+def show_material_cards(c_ratio, s_ratio, a_ratio, q, uq=None):
+    weight_c, weight_s, weight_a = q["weight_c"], q["weight_s"], q["weight_a"]
+    weight_water = q["weight_water"]
 
-# --- METHODOLOGY ---
-# --- ADD THIS: STANDARDS & WORKABILITY SECTION ---
-st.markdown("---")
-st.header("📋 Standards & Recommended Workability")
-
-# 1. Interactive Slump Selection
-col_slump1, col_slump2 = st.columns([1, 2])
-with col_slump1:
-    st.subheader("🍙 Target Slump")
-    slump_val = st.number_input("Enter Target Slump (mm)", value=100, step=5)
-    
-    # Selection logic based on ACI 211.1
-    if slump_val < 25:
-        workability = "Very Low / Stiff"
-        color = "red"
-    elif 25 <= slump_val < 75:
-        workability = "Low / Plastic"
-        color = "orange"
-    elif 75 <= slump_val < 125:
-        workability = "Medium"
-        color = "green"
+    # --- RESULTS SECTION WITH IMAGES ---
+    st.markdown("---")
+    st.header("🧱 Material Breakdown & Requirements")
+
+    # 1. Top Metrics for Volumes
+    m1, m2 = st.columns(2)
+    m1.metric("Total Wet Volume", f"{q['wet_volume']:.4f} {v_unit}")
+    m2.metric("Total Dry Volume (+Wastage)", f"{q['dry_volume']:.4f} {v_unit}")
+    with m2:
+        band_caption(uq, "dry_volume", v_unit)
+
+    st.markdown("### Mix Details")
+
+    # 2. Visual Cards for Materials
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        show_card_image("cement.png")
+        st.subheader("Cement")
+        st.write(f"**Ratio:** {c_ratio:.1f}")
+        st.write(f"**Weight:** {weight_c:.4f} {w_unit}")
+        band_caption(uq, "weight_c", w_unit)
+
+    with col2:
+        show_card_image("sand.png")
+        st.subheader("Sand")
+        st.write(f"**Ratio:** {s_ratio:.1f}")
+        st.write(f"**Weight:** {weight_s:.4f} {w_unit}")
+        band_caption(uq, "weight_s", w_unit)
+
+    with col3:
+        show_card_image("coarse.png")
+        st.subheader("Stone")
+        st.write(f"**Ratio:** {a_ratio:.1f}")
+        st.write(f"**Weight:** {weight_a:.4f} {w_unit}")
+        band_caption(uq, "weight_a", w_unit)
+
+    with col4:
+        show_card_image("water.png")
+        st.subheader("Water")
+        st.write(f"**W/C Ratio:** {wc_ratio:.2f}")
+        st.write(f"**Weight:** {weight_water:.4f} {w_unit}")
+        band_caption(uq, "weight_water", w_unit)
+
+    # Keep the table below for official reference if needed
+    st.markdown("#### Official Data Table")
+    with timed_section("Material table"):
+        res_df = pd.DataFrame({
+            "Material": ["Cement", "Sand", "Stone", "Water"],
+            "Ratio": [c_ratio, s_ratio, a_ratio, wc_ratio],
+            f"Weight ({w_unit})": [weight_c, weight_s, weight_a, weight_water]
+        })
+        if uq is not None:
+            names = ("weight_c", "weight_s", "weight_a", "weight_water")
+            res_df[f"P50 ({w_unit})"] = [uq[k]["P50"] for k in names]
+            res_df[f"P90 ({w_unit})"] = [uq[k]["P90"] for k in names]
+        # Values stay numeric; only the display is rounded.
+        st.table(res_df.style.format("{:.4f}", subset=res_df.columns[2:]))
+
+# --- SECTION: METHODOLOGY ---
+VOLUME_FORMULAS = {
+    "prism": (r"V_{wet} = L \times W \times H", "LxWxH"),
+    "cylinder": (r"V_{wet} = \frac{\pi}{4} D^2 \times H", "pi/4 x D^2 x H"),
+    "frustum": (r"V_{wet} = \frac{H}{6}\left(A_{base} + A_{top} + 4A_{mid}\right)", "H/6 x (A1 + A2 + 4Am)"),
+    "cone_frustum": (r"V_{wet} = \frac{\pi H}{12}\left(D^2 + Dd + d^2\right)", "pi x H/12 x (D^2 + Dd + d^2)"),
+    "polygon": (r"V_{wet} = \left(A_{outline} - A_{openings}\right) \times t,\quad "
+                r"A = \tfrac{1}{2}\left|\sum x_i y_{i+1} - x_{i+1} y_i\right|", "net plan area x thickness"),
+    "stair": (r"V_{wet} = A_{profile} \times W", "profile area x width"),
+    "mesh": (r"V_{wet} = \frac{1}{6}\left|\sum_i \mathbf{v}_{i0} \cdot "
+             r"\left(\mathbf{v}_{i1} \times \mathbf{v}_{i2}\right)\right|", "sum of signed tetrahedra"),
+}
+
+def volume_working(wet_volume):
+    """LaTeX formula and worked numbers for the element's wet volume."""
+    e, void = element, element["void_volume"]
+    gross = wet_volume + void
+    if shape == "prism":
+        working = f"{l:.4f} × {w:.4f} × {h:.4f}"
+    elif shape == "cylinder":
+        working = f"π/4 × {e['diameter']:.4f}² × {e['height']:.4f}"
+    elif shape == "frustum":
+        mid = (e["length"] + e["top_length"]) / 2 * (e["width"] + e["top_width"]) / 2
+        working = (f"{e['height']:.4f}/6 × ({e['length'] * e['width']:.4f} + "
+                   f"{e['top_length'] * e['top_width']:.4f} + 4 × {mid:.4f})")
+    elif shape == "cone_frustum":
+        working = f"π × {e['height']:.4f}/12 × ({e['diameter']:.4f}² + {e['diameter']:.4f} × " \
+                  f"{e['top_diameter']:.4f} + {e['top_diameter']:.4f}²)"
+    elif shape == "polygon":
+        working = f"{gross / e['height']:.4f} × {e['height']:.4f}"
+    elif shape == "mesh":
+        working = f"Σ over {imported['triangles']:,} triangles"
     else:
-        workability = "High / Flowing"
-        color = "blue"
-    
-    st.markdown(f"**Workability Class:** :{color}[{workability}]")
+        working = f"{gross / e['width']:.4f} × {e['width']:.4f}"
+    latex = VOLUME_FORMULAS[shape][0] + (r" - V_{voids}" if void else "")
+    if void:
+        working += f" − {void:.4f}"
+    return latex, f"{working} = {wet_volume:.4f} {v_unit}"
+
+def show_methodology(c_ratio, q):
+    wet_volume, dry_volume = q["wet_volume"], q["dry_volume"]
+    wastage_factor, total_ratio = q["wastage_factor"], q["total_ratio"]
+    vol_c, vol_s, vol_a = q["vol_c"], q["vol_s"], q["vol_a"]
+    weight_c, weight_s, weight_a = q["weight_c"], q["weight_s"], q["weight_a"]
+    weight_water = q["weight_water"]
 
-
-    # --- ADDED COMBINED SLUMP IMAGE HERE ---
     st.markdown("---")
-    try:
-        # Make sure the file name matches exactly what you uploaded to GitHub
-        st.image("slump_combined.png", caption="Concrete Slump Test:    Types & Procedure ", use_container_width=True)
-    except:
-        st.info("💡 Upload 'slump_combined.png' to your folder to display the technical diagram.")
-
-with col_slump2:
-    st.subheader("ACI 211.1 Reference Guide")
-    st.write("Recommended slumps for various types of construction (Table 6.3.1):")
-    
-    standards_data = {
-        "Type of Construction": [
-            "Reinforced foundation walls and footings",
-            "Beams and reinforced walls",
-            "Building columns",
-            "Pavements and slabs",
-            "Mass concrete"
-        ],
-        "Slump (Inches)": ["1\" – 3\"", "1\" – 4\"", "1\" – 4\"", "1\" – 3\"", "1\" – 2\""],
-        "Slump (mm)": ["25 – 75 mm", "25 – 100 mm", "25 – 100 mm", "25 – 75 mm", "25 – 50 mm"]
-    }
-    st.table(pd.DataFrame(standards_data))
-
-# 2. Official Sources & Notes
-st.info("""
-**Engineering Reference:**
-* **ASTM C143:** Standard Test Method for Slump of Hydraulic-Cement Concrete.
-* **ACI 211.1:** Standard Practice for Selecting Proportions for Normal, Heavyweight, and Mass Concrete.
-""")
+    st.header("🧮 Step-by-Step Methodology")
 
-# --- CONTINUING TO YOUR METHODOLOGY SECTION ---
+    st.markdown(f"### 1. {shape_name} Volume Calculation")
 
+    latex, working = volume_working(wet_volume)
+    st.latex(latex)
+    st.code(working)
 
+    st.markdown("### 2. Shrinkage and Wastage Adjustment")
 
+    st.latex(r"V_{dry} = V_{wet} \times \text{Dry Factor} \times \text{Wastage Factor}")
+    st.code(f"{wet_volume:.4f} × {dry_factor:.4f} × {wastage_factor:.4f} = {dry_volume:.4f} {v_unit}")
 
-st.markdown("---")
-st.header("🧮 Step-by-Step Methodology")
-
-st.markdown(f"### 1. {shape_name} Volume Calculation")
-
-st.latex(r"V_{wet} = L \times W \times H")
-st.code(f"{l:.4f} × {w:.4f} × {h:.4f} = {wet_volume:.4f} {v_unit}")
-
-st.markdown("### 2. Shrinkage and Wastage Adjustment")
+    st.markdown("### 3. Volumetric Proportioning")
+    st.latex(r"V_{material} = \frac{\text{Ratio Part}}{\sum \text{Ratios}} \times V_{dry}")
+    st.code(f"Cement Vol = ({c_ratio:.4f} / {total_ratio:.4f}) × {dry_volume:.4f} = {vol_c:.4f} {v_unit}")
 
-st.latex(r"V_{dry} = V_{wet} \times \text{Dry Factor} \times \text{Wastage Factor}")
-st.code(f"{wet_volume:.4f} × {dry_factor:.4f} × {wastage_factor:.4f} = {dry_volume:.4f} {v_unit}")
+    st.markdown("### 4. Weight Conversion")
+    st.write("We convert the calculated volume of each material into its required weight using the bulk densities provided in the sidebar.")
+    st.latex(r"\text{Weight} = \text{Volume} \times \text{Density}")
 
-st.markdown("### 3. Volumetric Proportioning")
-st.latex(r"V_{material} = \frac{\text{Ratio Part}}{\sum \text{Ratios}} \times V_{dry}")
-st.code(f"Cement Vol = ({c_ratio:.4f} / {total_ratio:.4f}) × {dry_volume:.4f} = {vol_c:.4f} {v_unit}")
+    st.markdown("### 5. Water Content Calculation")
+    st.write("Water requirement is calculated based on the weight of the cement using the Water-Cement ratio.")
+    st.latex(r"W_{water} = W_{cement} \times \text{W/C Ratio}")
+    st.code(f"Water Weight: {weight_c:.4f} × {wc_ratio:.4f} = {weight_water:.4f} {w_unit}")
 
-st.markdown("### 4. Weight Conversion")
-st.write("We convert the calculated volume of each material into its required weight using the bulk densities provided in the sidebar.")
-st.latex(r"\text{Weight} = \text{Volume} \times \text{Density}")
+    # Optional: Convert to Liters for Metric
+    if unit_system == METRIC:
+        st.info(f"💡 Since 1kg of water ≈ 1 Liter, you need approximately **{weight_water:.2f} Liters** of water.")
 
-st.markdown("### 5. Water Content Calculation")
-st.write("Water requirement is calculated based on the weight of the cement using the Water-Cement ratio.")
-st.latex(r"W_{water} = W_{cement} \times \text{W/C Ratio}")
-st.code(f"Water Weight: {weight_c:.4f} × {wc_ratio:.4f} = {weight_water:.4f} {w_unit}")
-
-# Optional: Convert to Liters for Metric
-if unit_system == "Metric (SI)":
-    st.info(f"💡 Since 1kg of water ≈ 1 Liter, you need approximately **{weight_water:.2f} Liters** of water.")
-
-# Displaying all three material weight calculations
-st.code(f"""
+    # Displaying all three material weight calculations
+    st.code(f"""
 Cement Weight: {vol_c:.4f} {v_unit} × {u_dens_c:.4f} = {weight_c:.4f} {w_unit}
 Sand Weight:   {vol_s:.4f} {v_unit} × {u_dens_s:.4f} = {weight_s:.4f} {w_unit}
 Stone Weight:  {vol_a:.4f} {v_unit} × {u_dens_a:.4f} = {weight_a:.4f} {w_unit}
 """)
 
-st.success(f"**Total Material Weight:** {weight_c + weight_s + weight_a:.4f} {w_unit}")
-# --- PDF GENERATION ---
-import tempfile
-import os
+    st.success(f"**Total Material Weight:** {weight_c + weight_s + weight_a:.4f} {w_unit}")
+
+# --- SECTION: UNCERTAINTY ---
+def uncertainty_bands(wet_volume, c_ratio, s_ratio, a_ratio):
+    """P50 / P90 quantities from a Monte Carlo run, or None when switched off."""
+    with st.expander("🎲 Uncertainty (Monte Carlo P50 / P90)"):
+        enabled = st.toggle("Show P50 / P90 order quantities", key="uq_enabled")
+        u1, u2, u3 = st.columns(3)
+        dens_kind = u1.selectbox("Density Distribution", ["Normal", "Lognormal", "Uniform"], key="uq_dens_kind")
+        dens_cov = u1.number_input("Density Variation (CoV %)", 0.0, 50.0, 5.0, 0.5, key="uq_dens_cov")
+        dry_spread = u2.number_input("Dry Factor Spread (±)", 0.0, 0.5, 0.03, 0.01, key="uq_dry_spread")
+        waste_lo, waste_hi = u2.slider("Wastage Range (%)", 0.0, 50.0,
+                                       (max(0.0, wastage_percent - 3.0), wastage_percent + 5.0),
+                                       0.5, key="uq_waste_range")
+        draws = u3.selectbox("Draws", [100_000, DEFAULT_DRAWS, 5_000_000], index=1,
+                             format_func=lambda n: f"{n:,}", key="uq_draws")
+        st.caption("Densities vary around the sidebar values; dry factor and wastage follow triangular "
+                   "distributions peaking at the sidebar values. Quantiles are streamed, so the draws "
+                   "are never held in memory at once.")
+    if not enabled:
+        return None
+
+    kind = dens_kind.lower()
+    inputs = {
+        "dens_c": spread(u_dens_c, dens_cov / 100, kind),
+        "dens_s": spread(u_dens_s, dens_cov / 100, kind),
+        "dens_a": spread(u_dens_a, dens_cov / 100, kind),
+        "dry_factor": ("triangular", dry_factor - dry_spread, dry_factor, dry_factor + dry_spread),
+        "wastage_percent": ("triangular", min(waste_lo, wastage_percent), wastage_percent,
+                            max(waste_hi, wastage_percent)),
+    }
+    args = (float(wet_volume), c_ratio, s_ratio, a_ratio, wc_ratio, inputs, draws)
+    with timed_section("Monte Carlo uncertainty"):
+        return shared_cache().get_or_create(canonical_key("uncertainty", *args),
+                                            lambda: simulate_quantities(*args), size=metrics.estimate_bytes)
+
+def show_stockpile_batch(q):
+    # Sand and stone weights split over the stockpiles of an applied blend.
+    blend = st.session_state.get("applied_blend")
+    if blend is None or blend["unit_system"] != unit_system:
+        return
+    st.markdown("#### Stockpile Batch Weights")
+    rows = [(name, "Sand", p, q["weight_s"] * p) for name, p in blend["fine"]]
+    rows += [(name, "Stone", p, q["weight_a"] * p) for name, p in blend["coarse"]]
+    st.table(pd.DataFrame(rows, columns=["Stockpile", "Fraction", "Share", f"Weight ({w_unit})"])
+             .style.format({"Share": "{:.1%}", f"Weight ({w_unit})": "{:.4f}"}))
+    st.caption(f"Blended sand FM {blend['fm']:.2f}; densities {blend['dens_s']:.1f} (sand) and "
+               f"{blend['dens_a']:.1f} (stone) {w_unit}/{v_unit}.")
+
+# Changing a ratio reruns only this fragment. The methodology lives inside it
+# because every step after the volume depends on the ratios.
+@st.fragment
+def mix_section():
+    with timed_section("Mix proportions / material cards"):
+        st.markdown("---")
+        st.subheader("Mix Proportion Inputs")
+        r1, r2, r3 = st.columns(3)
+        c_ratio = r1.number_input("Cement Ratio", value=as_input_value(defaults["c_ratio"]), key="c_ratio")
+        s_ratio = r2.number_input("Sand Ratio", value=as_input_value(defaults["s_ratio"]), key="s_ratio")
+        a_ratio = r3.number_input("Stone Ratio", value=as_input_value(defaults["a_ratio"]), key="a_ratio")
+
+        q = {k: v.item() for k, v in compute_from_volume(wet_volume, c_ratio, s_ratio, a_ratio, u_dens_c, u_dens_s,
+                                                          u_dens_a, dry_factor, wastage_percent, wc_ratio).items()}
+        uq = uncertainty_bands(q["wet_volume"], c_ratio, s_ratio, a_ratio)
+        # The PDF section reruns on its own and picks the latest mix up from here.
+        st.session_state["mix_result"] = (c_ratio, s_ratio, a_ratio, q)
+        st.session_state["uncertainty_result"] = uq
+        show_material_cards(c_ratio, s_ratio, a_ratio, q, uq)
+        show_stockpile_batch(q)
+    timing_caption("Mix proportions / material cards")
+
+    with timed_section("Methodology"):
+        show_methodology(c_ratio, q)
+    timing_caption("Methodology")
+
+mix_section()
+
+# --- SECTION: ACI 211.1 MIX DESIGN ---
+def show_aci_design(slump_val):
+    st.subheader("🧪 ACI 211.1 Absolute-Volume Mix Design")
+    st.write("Proportions one cubic metre from the target strength, the slump above, the maximum "
+             "aggregate size and the sand's fineness modulus (Tables 6.3.3, 6.3.4a and 6.3.6).")
+    if not st.toggle("Design a mix from strength", key="aci_open"):
+        return
+    d1, d2, d3, d4 = st.columns(4)
+    strength = d1.number_input("Target Strength f'cr (MPa)", min_value=10.0, max_value=50.0, value=30.0,
+                               step=1.0, key="aci_strength")
+    max_size = d2.selectbox("Max Aggregate Size (mm)", aci211.AGGREGATE_SIZES_MM.tolist(), index=2,
+                            key="aci_max_size")
+    blend = st.session_state.get("applied_blend")
+    fineness = d3.number_input("Sand Fineness Modulus", min_value=2.2, max_value=3.2,
+                               value=blend["aci_fineness"] if blend is not None else 2.8,
+                               step=0.05, key="aci_fineness")
+    air_entrained = d4.checkbox("Air-Entrained", key="aci_air")
+    exposure = d4.selectbox("Exposure", aci211.EXPOSURES, index=1, key="aci_exposure",
+                            disabled=not air_entrained)
+
+    design = {k: float(v) for k, v in aci211.design_mix(strength, slump_val, max_size, fineness,
+                                                        air_entrained, exposure).items()}
+    if design["fine"] <= 0:
+        st.error("No room left for sand: the water, cement, stone and air already fill the cubic metre.")
+        return
+
+    # Batch for this element: wet volume (+ wastage) in m³, masses back in the page's weight unit.
+    c_ratio, s_ratio, a_ratio, q = st.session_state["mix_result"]
+    to_m3, to_w = (1.0, 1.0) if unit_system == METRIC else (aci211.M3_PER_FT3, aci211.LB_PER_KG)
+    batch_m3 = q["wet_volume"] * q["wastage_factor"] * to_m3
+    rows = [("Cement", "cement", "vol_cement"), ("Sand (SSD)", "fine", "vol_fine"),
+            ("Stone (SSD)", "coarse", "vol_coarse"), ("Water", "water", "vol_water")]
+    st.table(pd.DataFrame({
+        "Material": [r[0] for r in rows] + ["Air"],
+        "kg per m³": [f"{design[m]:.1f}" for _, m, _ in rows] + ["–"],
+        "Absolute Volume (m³/m³)": [f"{design[v]:.4f}" for _, _, v in rows] + [f"{design['vol_air']:.4f}"],
+        f"This Element ({w_unit})": [f"{design[m] * batch_m3 * to_w:.4f}" for _, m, _ in rows] + ["–"],
+    }))
+    _, sand, stone = (float(v) for v in aci211.mass_ratios(design))
+    st.caption(f"W/C {design['wc_ratio']:.2f}, air {design['air_percent']:.1f}%, "
+               f"fresh density {design['density']:.0f} kg/m³, "
+               f"mass ratio 1 : {sand:.2f} : {stone:.2f} (cement : sand : stone).")
+
+# --- SECTION: STANDARDS & WORKABILITY ---
+# Changing the target slump reruns only this fragment.
+@st.fragment
+def slump_section():
+    with timed_section("Slump / ACI table"):
+        st.markdown("---")
+        st.header("📋 Standards & Recommended Workability")
+
+        # 1. Interactive Slump Selection
+        col_slump1, col_slump2 = st.columns([1, 2])
+        with col_slump1:
+            st.subheader("🍙 Target Slump")
+            slump_val = st.number_input("Enter Target Slump (mm)", value=100, step=5, key="slump_val")
+
+            # Selection logic based on ACI 211.1
+            workability, color = (str(v) for v in workability_class(slump_val))
+            st.session_state["slump_result"] = (slump_val, workability)
+
+            st.markdown(f"**Workability Class:** :{color}[{workability}]")
+
+
+            # --- ADDED COMBINED SLUMP IMAGE HERE ---
+            st.markdown("---")
+            try:
+                # Make sure the file name matches exactly what you uploaded to GitHub
+                st.image(assets.image_source("slump_combined.png"), caption="Concrete Slump Test:    Types & Procedure ", use_container_width=True)
+            except:
+                st.info("💡 Upload 'slump_combined.png' to your folder to display the technical diagram.")
+
+        with col_slump2:
+            st.subheader("ACI 211.1 Reference Guide")
+            st.write("Recommended slumps for various types of construction (Table 6.3.1):")
+            with timed_section("ACI table"):
+                st.table(ACI_SLUMP_TABLE)
+
+        with timed_section("ACI mix design"):
+            show_aci_design(slump_val)
+
+        # 2. Official Sources & Notes
+        st.info("""
+**Engineering Reference:**
+* **ASTM C143:** Standard Test Method for Slump of Hydraulic-Cement Concrete.
+* **ACI 211.1:** Standard Practice for Selecting Proportions for Normal, Heavyweight, and Mass Concrete.
+""")
+    timing_caption("Slump / ACI table")
 
-# --- PDF GENERATION ---
-import tempfile
-import os
+ACI_SLUMP_TABLE = pd.DataFrame({
+    "Type of Construction": list(aci211.SLUMP_CONSTRUCTION),
+    "Slump (Inches)": [f"{lo / 25:.0f}\" – {hi / 25:.0f}\"" for lo, hi in aci211.SLUMP_RANGES_MM],
+    "Slump (mm)": [f"{lo:.0f} – {hi:.0f} mm" for lo, hi in aci211.SLUMP_RANGES_MM]
+})
+
+slump_section()
+
+# --- SECTION: AGGREGATE GRADATION ---
+EXAMPLE_SIEVE_ANALYSES = """stockpile,sieve,passing
+Concrete Sand,9.5,100
+Concrete Sand,No. 4,97
+Concrete Sand,No. 8,85
+Concrete Sand,No. 16,62
+Concrete Sand,No. 30,38
+Concrete Sand,No. 50,14
+Concrete Sand,No. 100,3
+Plaster Sand,9.5,100
+Plaster Sand,No. 4,100
+Plaster Sand,No. 8,99
+Plaster Sand,No. 16,95
+Plaster Sand,No. 30,80
+Plaster Sand,No. 50,40
+Plaster Sand,No. 100,12
+Crushed Stone 25 mm,37.5,100
+Crushed Stone 25 mm,25,97
+Crushed Stone 25 mm,19,70
+Crushed Stone 25 mm,12.5,30
+Crushed Stone 25 mm,9.5,12
+Crushed Stone 25 mm,No. 4,2
+Crushed Stone 25 mm,No. 8,1
+Pea Gravel,12.5,100
+Pea Gravel,9.5,95
+Pea Gravel,No. 4,30
+Pea Gravel,No. 8,5
+Pea Gravel,No. 16,2
+"""
+FRACTIONS = ("Sand", "Stone")
+
+def sieve_analyses():
+    """Stockpile names and gradings from the uploaded CSV (or the built-in example)."""
+    upload = st.session_state.get("sieve_file")
+    if upload is None:
+        return gradation.read_sieve_analyses(io.StringIO(EXAMPLE_SIEVE_ANALYSES))
+    return shared_cache().get_or_create(canonical_key("sieves", upload.file_id),
+                                        lambda: gradation.read_sieve_analyses(io.BytesIO(upload.getvalue())),
+                                        size=metrics.estimate_bytes)
+
+def solve_blend(passing, band_name, what_ifs):
+    # The best blend first, then every what-if grading solved in one batch.
+    lo, hi = gradation.band(band_name)
+    build = lambda: (gradation.blend(passing, lo, hi),
+                     gradation.blend(gradation.perturbed_gradings(passing, what_ifs), lo, hi) if what_ifs else None)
+    return shared_cache().get_or_create(canonical_key("blend", passing, band_name, what_ifs), build,
+                                        size=metrics.estimate_bytes)
+
+def gradation_figure(curves):
+    fig = go.Figure()
+    for (label, band_name, result), color in zip(curves, ("#FFB300", "#64B5F6")):
+        lo, hi = gradation.band(band_name)
+        keep = ~np.isnan(lo)
+        fig.add_trace(go.Scatter(x=gradation.SIEVES_MM[keep], y=hi[keep], mode="lines", line=dict(width=0),
+                                 showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=gradation.SIEVES_MM[keep], y=lo[keep], mode="lines", line=dict(width=0),
+                                 fill="tonexty", fillcolor="rgba(158,158,158,0.25)",
+                                 name=f"C33 {gradation.C33_LABELS[band_name]}"))
+        fig.add_trace(go.Scatter(x=gradation.SIEVES_MM, y=result["passing"], mode="lines+markers",
+                                 line=dict(color=color), name=f"Blended {label.lower()}"))
+    fig.update_layout(height=380, margin=dict(l=0, r=0, b=0, t=30), yaxis_title="Passing (%)",
+                      xaxis=dict(type="log", title="Sieve opening (mm)", autorange="reversed"),
+                      yaxis_range=[0, 100], title="Blended gradings against the ASTM C33 limits")
+    return fig
 
-def create_pdf(shape_name, l, w, h, v_unit, w_unit, c_ratio, s_ratio, a_ratio, wc_ratio, 
-               wet_vol, dry_vol, dry_f, waste_p, weight_c, weight_s, weight_a, weight_water, 
-               fig, slump_val, workability):
-    
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # --- 1. HEADER ---
-    pdf.set_font("Arial", 'B', 20)
-    pdf.set_text_color(255, 179, 0) # Gold theme color
-    pdf.cell(200, 15, "Concrete Mix Quantity & Workability Report", ln=True, align='C')
-    pdf.set_draw_color(255, 179, 0)
-    pdf.line(10, 25, 200, 25)
-    pdf.ln(5)
-
-    # --- 2. DESIGN SPECS & SLUMP DATA ---
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, "1. Design Specifications", ln=True)
-    pdf.set_font("Arial", '', 11)
-    
-    col_width = 90
-    pdf.cell(col_width, 7, f"Specimen Type: {shape_name}", ln=0)
-    pdf.cell(col_width, 7, f"W/C Ratio: {wc_ratio}", ln=1)
-    pdf.cell(col_width, 7, f"Target Slump: {slump_val} mm", ln=0)
-    pdf.cell(col_width, 7, f"Workability: {workability}", ln=1)
-    pdf.cell(col_width, 7, f"Dry Factor: {dry_f}", ln=0)
-    pdf.cell(col_width, 7, f"Wastage: {waste_p}%", ln=1)
-    pdf.ln(5)
-
-    # --- 3. 3D VISUALIZATION ---
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, "2. Specimen Visualization", ln=True)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmpfile:
+def apply_blend(blend):
+    # Runs before the app reruns; dropping the fineness input's state lets it start from the blend's FM.
+    st.session_state["applied_blend"] = {**blend, "aci_fineness": round(float(np.clip(blend["fm"], 2.2, 3.2)), 2)}
+    st.session_state.pop("aci_fineness", None)
+
+@st.fragment
+def gradation_section():
+    with timed_section("Aggregate gradation"):
+        st.markdown("---")
+        st.header("🪨 Aggregate Gradation & Stockpile Blending")
+        st.write("Blends the sand and stone stockpiles in the proportions that best fit the ASTM C33 grading "
+                 "limits, and checks how often the blend stays in the band when the gradings scatter.")
+        if not st.toggle("Blend stockpiles", key="gradation_open"):
+            return
+        st.file_uploader("Sieve Analyses (CSV)", type=["csv"], key="sieve_file",
+                         help="Columns stockpile, sieve and passing (%) or retained (mass, with a pan row); "
+                              "or a sieve column and one percent-passing column per stockpile. "
+                              "Without a file the built-in example stockpiles are used.")
         try:
-            fig.write_image(tmpfile.name, engine="kaleido", width=600, height=400)
-            pdf.image(tmpfile.name, x=40, w=130)
-        except Exception:
-            pdf.set_font("Arial", 'I', 10)
-            pdf.cell(200, 10, "(Image capture failed: Ensure kaleido is installed)", ln=True)
-        finally:
-            tmp_path = tmpfile.name
-    if os.path.exists(tmp_path):
-        os.remove(tmp_path)
-    pdf.ln(5)
-
-    # --- 4. MATERIAL TABLE ---
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, "3. Required Material Weights", ln=True)
-    pdf.set_font("Arial", 'B', 11)
-    pdf.set_fill_color(255, 179, 0) 
-    pdf.cell(60, 10, "Material", 1, 0, 'C', True)
-    pdf.cell(60, 10, "Ratio", 1, 0, 'C', True)
-    pdf.cell(60, 10, f"Weight ({w_unit})", 1, 1, 'C', True)
-    
-    pdf.set_font("Arial", '', 11)
-    mats = [["Cement", c_ratio, weight_c], ["Sand", s_ratio, weight_s], 
-            ["Stone", a_ratio, weight_a], ["Water", wc_ratio, weight_water]]
-    for m in mats:
-        pdf.cell(60, 10, f" {m[0]}", 1)
-        pdf.cell(60, 10, f" {m[1]}", 1, 0, 'C')
-        pdf.cell(60, 10, f" {m[2]:.4f}", 1, 1, 'C')
-
-    # --- 5. METHODOLOGY ---
-    pdf.ln(10)
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, "4. Step-by-Step Methodology", ln=True)
-    pdf.set_font("Arial", '', 10)
-    method = [
-        f"Step 1: Wet Volume (LxWxH) = {wet_vol:.4f} {v_unit}",
-        f"Step 2: Dry Volume (incl. {waste_p}% wastage) = {dry_vol:.4f} {v_unit}",
-        f"Step 3: Total Weight (C+S+A+W) = {weight_c + weight_s + weight_a + weight_water:.4f} {w_unit}",
-        f"Step 4: Slump Verification = {slump_val}mm (Class: {workability})"
-    ]
-    for step in method:
-        pdf.multi_cell(0, 7, step)
-
-    return pdf.output(dest='S').encode('latin-1')
+            names, passing = sieve_analyses()
+        except ValueError as e:
+            st.error(f"⚠️ Could not read the sieve analyses: {e}.")
+            return
+        fm = gradation.fineness_modulus(passing.T)
+        stockpiles = st.data_editor(pd.DataFrame({
+            "Stockpile": names,
+            "Fraction": np.where(gradation.is_fine(passing.T), *FRACTIONS),
+            "FM": fm,
+            f"Bulk Density ({w_unit}/{v_unit})": np.where(gradation.is_fine(passing.T), u_dens_s, u_dens_a),
+        }), column_config={
+            "Fraction": st.column_config.SelectboxColumn(options=FRACTIONS, required=True),
+            "FM": st.column_config.NumberColumn(format="%.2f"),
+        }, disabled=["Stockpile", "FM"], hide_index=True, key=f"stockpiles_{canonical_key('names', names)}")
+
+        b1, b2 = st.columns(2)
+        coarse_band = b1.selectbox("Stone Grading (ASTM C33 size number)",
+                                   [k for k in gradation.C33_BANDS if k != "fine"], index=2,
+                                   format_func=gradation.C33_LABELS.get, key="c33_coarse")
+        what_ifs = b2.number_input("What-If Gradings", min_value=0, max_value=20_000, value=2000, step=500,
+                                   help="Gradings perturbed by ±3 % passing per sieve, each re-blended.")
+
+        blends, curves = {}, []
+        for label, band_name in zip(FRACTIONS, ("fine", coarse_band)):
+            rows = np.flatnonzero(stockpiles["Fraction"].to_numpy() == label)
+            if not len(rows):
+                st.warning(f"No {label.lower()} stockpile: set a stockpile's fraction to {label}.")
+                return
+            result, spread_ = solve_blend(passing[:, rows], band_name, int(what_ifs))
+            density = stockpiles.iloc[rows, 3].to_numpy(dtype=float)
+            blends[label] = (rows, result, spread_, float(gradation.blended_density(result["proportions"], density)))
+            curves.append((label, band_name, result))
+
+        table = []
+        for label, (rows, result, spread_, _) in blends.items():
+            for i, row in enumerate(rows):
+                share = spread_["proportions"][:, i] if spread_ is not None else None
+                table.append({
+                    "Stockpile": names[row], "Fraction": label, "Share": result["proportions"][i],
+                    "What-If P10": np.percentile(share, 10) if share is not None else np.nan,
+                    "What-If P90": np.percentile(share, 90) if share is not None else np.nan,
+                })
+        st.table(pd.DataFrame(table).style.format({"Share": "{:.1%}", "What-If P10": "{:.1%}",
+                                                   "What-If P90": "{:.1%}"}, na_rep="–"))
+        sand, stone = blends["Sand"], blends["Stone"]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Blended Sand FM", f"{sand[1]['fineness_modulus']:.2f}")
+        for col, (label, (_, result, _, _)) in zip((m2, m3), blends.items()):
+            col.metric(f"{label} vs C33", "Within" if result["within"] else f"{result['excess']:.1f} % out")
+        if int(what_ifs):
+            m4.metric("What-Ifs Within C33", f"{sand[2]['within'].mean():.0%} · {stone[2]['within'].mean():.0%}",
+                      help="Share of the perturbed gradings whose re-solved blend stays in the band "
+                           "(sand · stone).")
+        st.plotly_chart(gradation_figure(curves), use_container_width=True)
+
+        blend = {
+            "unit_system": unit_system, "fm": float(sand[1]["fineness_modulus"]),
+            "dens_s": round(sand[3], 2), "dens_a": round(stone[3], 2),
+            "fine": [(names[r], float(p)) for r, p in zip(sand[0], sand[1]["proportions"])],
+            "coarse": [(names[r], float(p)) for r, p in zip(stone[0], stone[1]["proportions"])],
+        }
+        st.caption(f"Blended bulk densities: sand {blend['dens_s']:.1f}, stone {blend['dens_a']:.1f} "
+                   f"{w_unit}/{v_unit}.")
+        if st.button("Apply Blend to Mix", on_click=apply_blend, args=(blend,)):
+            # The densities live in the sidebar, outside this fragment.
+            st.rerun()
+        if st.session_state.get("applied_blend") is not None and st.button("Clear Applied Blend"):
+            del st.session_state["applied_blend"]
+            st.rerun()
+    timing_caption("Aggregate gradation")
+
+gradation_section()
+
+# --- SECTION: STRENGTH MODEL (ABRAMS' LAW) ---
+def add_lab_files(model, uploads):
+    bar = st.progress(0.0, text="Reading lab results...")
+    for i, upload in enumerate(uploads):
+        for fraction in model.add_results(upload, name=upload.name, source_id=upload.file_id):
+            bar.progress((i + min(fraction or 0.0, 1.0)) / len(uploads),
+                         text=f"{upload.name}: {model.rows:,} results added...")
+    bar.empty()
+
+def strength_curve_figure(fit, i, check):
+    lo, hi = fit["wc_min"][i], fit["wc_max"][i]
+    wc = np.linspace(max(lo - 0.1, 0.2), hi + 0.1, 100)
+    one = {k: v[i:i + 1] for k, v in fit.items()}
+    z = strength_model.CONFIDENCE_Z[check["confidence"]]
+    fig = go.Figure([
+        go.Scatter(x=wc, y=strength_model.predict_strength(one, wc[:, None], check["age_days"])[:, 0],
+                   mode="lines", name="Median strength"),
+        go.Scatter(x=wc, y=strength_model.predict_strength(one, wc[:, None], check["age_days"], z)[:, 0],
+                   mode="lines", line_dash="dot", name=f"{check['confidence']:.0%} confidence"),
+    ])
+    fig.add_hline(y=check["target"], line_dash="dash", line_color="#FFB300", annotation_text="Target")
+    fig.add_vline(x=check["wc_ratio"], line_color="#9E9E9E", annotation_text="Mix W/C")
+    fig.add_vrect(x0=lo, x1=hi, fillcolor="rgba(158,158,158,0.12)", line_width=0)
+    fig.update_layout(height=340, margin=dict(l=0, r=0, b=0, t=30), xaxis_title="W/C ratio",
+                      yaxis_title="Cylinder strength (MPa)",
+                      title=f"Abrams' law for {check['group']} at {check['age_days']:g} days (shaded: tested W/C)")
+    return fig
+
+def apply_wc(wc):
+    # Runs before the app reruns, so the sidebar W/C picks it up; rounded down so it still reaches the target.
+    st.session_state["applied_wc"] = float(np.floor(wc * 100) / 100)
+
+@st.fragment
+def strength_section():
+    with timed_section("Strength model"):
+        st.markdown("---")
+        st.header("🧫 W/C from Strength (Abrams' Law)")
+        st.write("Fits Abrams' law, ln f = a + b·(w/c) + c·ln(age/28), to your cube and cylinder results for each "
+                 "cement and aggregate source, then checks the mix's W/C against a target strength. New result "
+                 "files add to the fit without re-reading the older ones.")
+        if not st.toggle("Check W/C against lab results", key="strength_open"):
+            # A closed section's check is not kept up to date, so the PDF leaves it out.
+            st.session_state.pop("strength_check", None)
+            return
+        model = st.session_state.get("strength_model")
+        uploads = st.file_uploader("Lab Results (CSV or Excel)", type=["csv", "xlsx"], accept_multiple_files=True,
+                                   key="lab_results",
+                                   help="Columns wc_ratio and strength (MPa) or strength_psi, optionally age_days, "
+                                        "specimen (cube/cylinder), cement and aggregate.")
+        saved = st.file_uploader("Resume From Saved Model (.npz)", type=["npz"], key="strength_saved")
+        if saved is not None and saved.file_id != st.session_state.get("strength_saved_id"):
+            model = strength_model.StrengthModel.load(saved.getvalue())
+            st.session_state["strength_model"], st.session_state["strength_saved_id"] = model, saved.file_id
+        new = [u for u in uploads or () if model is None or u.file_id not in model.sources]
+        if new and st.button(f"➕ Add {len(new)} Result File{'s' if len(new) > 1 else ''}"):
+            model = model or strength_model.StrengthModel()
+            try:
+                add_lab_files(model, new)
+            except ValueError as e:
+                st.error(f"Could not read the results: {e}")
+            st.session_state["strength_model"] = model
+        if model is None or not model.rows:
+            st.session_state.pop("strength_check", None)
+            st.info("No lab results yet. Upload result files and add them.")
+            return
+
+        fit = model.fit()
+        st.dataframe(pd.DataFrame({
+            "Source (cement / aggregate)": fit["group"], "Results": fit["n"], "A (MPa)": fit["A"], "B": fit["B"],
+            "Age Exponent": fit["c"], "R²": fit["r2"], "Tested W/C": [f"{lo:.2f} – {hi:.2f}" for lo, hi in
+                                                                      zip(fit["wc_min"], fit["wc_max"])],
+        }).style.format({"A (MPa)": "{:.1f}", "B": "{:.2f}", "Age Exponent": "{:.3f}", "R²": "{:.3f}"}),
+            hide_index=True)
+        st.caption(f"{model.rows:,} results in {len(fit['group']) - 1:,} source groups "
+                   f"({model.rejected:,} rows without a usable W/C or strength).")
+
+        usable = [g for g, b in zip(fit["group"], fit["b"]) if b < 0]
+        if not usable:
+            st.warning("No source group shows strength falling with W/C yet; add results over a range of W/C.")
+            st.session_state.pop("strength_check", None)
+            return
+        t1, t2, t3, t4 = st.columns(4)
+        group = t1.selectbox("Source", usable, key="strength_group")
+        target = t2.number_input("Target Strength (MPa)", min_value=5.0, max_value=100.0,
+                                 value=float(st.session_state.get("aci_strength", 30.0)), step=1.0,
+                                 key="strength_target")
+        age = t3.number_input("At Age (days)", min_value=1, max_value=365, value=28, key="strength_age")
+        confidence = t4.selectbox("Confidence", list(strength_model.CONFIDENCE_Z), index=1,
+                                  format_func=lambda p: f"{p:.0%}", key="strength_confidence")
+        check = strength_model.check_wc(fit, group, wc_ratio, target, age, confidence)
+        # The PDF section picks the check up from here.
+        st.session_state["strength_check"] = check
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric(f"Strength at W/C {wc_ratio:.2f}", f"{check['predicted']:.1f} MPa",
+                  f"{check['predicted'] - target:+.1f} MPa vs target")
+        c2.metric("Suggested Max W/C", f"{np.floor(check['suggested_wc'] * 100) / 100:.2f}")
+        if np.isnan(check["predicted"]):
+            tested = fit["age_min"][list(fit["group"]).index(group)]
+            c3.warning(f"⚠️ This source was only tested at {tested:g} days, so there is no estimate "
+                       f"at {age} days.")
+        elif check["ok"]:
+            c3.success(f"✅ W/C {wc_ratio:.2f} reaches {target:g} MPa at {age} days "
+                       f"with {confidence:.0%} confidence.")
+        else:
+            c3.error(f"❌ W/C {wc_ratio:.2f} falls short of {target:g} MPa; use at most {np.floor(check['suggested_wc'] * 100) / 100:.2f}.")
+        if check["extrapolated"]:
+            st.warning("⚠️ The mix's W/C is outside the range tested for this source; the estimate is extrapolated.")
+        st.plotly_chart(strength_curve_figure(fit, list(fit["group"]).index(group), check), use_container_width=True)
+        s1, s2, s3 = st.columns(3)
+        if s1.button("Use Suggested W/C", on_click=apply_wc, args=(check["suggested_wc"],),
+                     disabled=not 0.2 <= check["suggested_wc"] <= 1.0):
+            # The W/C lives in the sidebar, outside this fragment.
+            st.rerun()
+        s2.download_button("💾 Save Strength Model", model.to_bytes(), "strength_model.npz",
+                           "application/octet-stream", on_click="ignore")
+        s3.button("Reset Results", on_click=st.session_state.pop, args=("strength_model", None))
+    timing_caption("Strength model")
+
+strength_section()
+
+# --- SECTION: LEAST-COST OPTIMIZER ---
+def show_sensitivity(rows):
+    names = [r["parameter"].replace("_", " ").title() for r in rows]
+    fig = go.Figure([
+        go.Bar(y=names, x=[r["cost_change_low"] for r in rows], orientation="h", name="-10%",
+               marker_color=["#81C784" if r["feasible_low"] else "#616161" for r in rows]),
+        go.Bar(y=names, x=[r["cost_change_high"] for r in rows], orientation="h", name="+10%",
+               marker_color=["#FFB300" if r["feasible_high"] else "#616161" for r in rows]),
+    ])
+    fig.update_layout(barmode="overlay", height=300, margin=dict(l=0, r=0, b=0, t=30),
+                      xaxis_title="Cost change (%)", title="Sensitivity of the cheapest mix (grey: infeasible)")
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def optimizer_section():
+    with timed_section("Least-cost optimizer"):
+        st.markdown("---")
+        st.header("💰 Least-Cost Mix Optimizer")
+        st.write("Searches ratio, W/C, dry factor and wastage combinations for this element and returns "
+                 "the cheapest mixes that meet the constraints.")
+        if not st.toggle("Search for the cheapest mix", key="optimizer_open"):
+            return
+        p1, p2, p3, p4 = st.columns(4)
+        prices = {
+            "cement": p1.number_input(f"Cement Price (per {w_unit})", min_value=0.0, value=0.15, format="%.4f"),
+            "sand": p2.number_input(f"Sand Price (per {w_unit})", min_value=0.0, value=0.02, format="%.4f"),
+            "stone": p3.number_input(f"Stone Price (per {w_unit})", min_value=0.0, value=0.025, format="%.4f"),
+            "water": p4.number_input(f"Water Price (per {w_unit})", min_value=0.0, value=0.001, format="%.4f"),
+        }
+        r1, r2, r3 = st.columns(3)
+        s_range = r1.slider("Sand Ratio Range", 0.5, 6.0, (1.0, 3.0), step=0.05)
+        a_range = r2.slider("Stone Ratio Range", 0.5, 8.0, (2.0, 5.0), step=0.05)
+        wc_range = r3.slider("W/C Range", 0.25, 0.90, (0.35, 0.70), step=0.01)
+        k1, k2, k3 = st.columns(3)
+        min_cement = k1.number_input(f"Min Cement Content ({w_unit}/{v_unit})", min_value=0.0,
+                                     value=300.0 if unit_system == METRIC else 18.7)
+        workability = k2.multiselect("Allowed Workability", [b[1] for b in WORKABILITY_BANDS],
+                                     default=[b[1] for b in WORKABILITY_BANDS[1:3]])
+        max_size = k3.selectbox("Max Aggregate Size (mm)", aci211.AGGREGATE_SIZES_MM.tolist(), index=2,
+                                key="opt_max_size")
+        g1, g2, g3 = st.columns(3)
+        search = g1.radio("Search", ["Grid", "Random"], horizontal=True)
+        points = g2.number_input("Grid Points per Ratio" if search == "Grid" else "Random Samples",
+                                 min_value=5, value=60 if search == "Grid" else 1_000_000,
+                                 step=5 if search == "Grid" else 100_000)
+        use_pool = g3.checkbox("Use all CPU cores")
+
+        if st.button("🔎 Find Cheapest Mixes"):
+            if search == "Grid":
+                n = int(points)
+                space = {"s_ratio": np.linspace(*s_range, n), "a_ratio": np.linspace(*a_range, n),
+                         "wc_ratio": np.linspace(*wc_range, n)}
+            else:
+                space = {"s_ratio": s_range, "a_ratio": a_range, "wc_ratio": wc_range}
+            space.update(c_ratio=1.0, dry_factor=dry_factor, wastage_percent=wastage_percent)
+            constraints = {"min_cement": min_cement, "wc_min": wc_range[0], "wc_max": wc_range[1],
+                           "workability": workability}
+            q = st.session_state["mix_result"][3]
+            densities = (u_dens_c, u_dens_s, u_dens_a)
+            bar = st.progress(0.0, text="Evaluating candidates...")
+            result = optimize_mix(q["wet_volume"], space, prices, densities, unit_system, constraints,
+                                  samples=int(points), workers=os.cpu_count() if use_pool else None,
+                                  max_aggregate=max_size,
+                                  progress=lambda done, total: bar.progress(done / total,
+                                                                            text=f"Evaluated {done:,} of {total:,}"))
+            bar.empty()
+            rows = None
+            if len(result["best"]["cost"]):
+                best = {k: v[0] for k, v in result["best"].items()}
+                rows = sensitivity(best, q["wet_volume"], densities, prices, unit_system, constraints,
+                                   max_aggregate=max_size)
+            st.session_state["optimizer_result"] = (result, rows, w_unit, v_unit)
+
+        if "optimizer_result" in st.session_state:
+            result, rows, opt_w, opt_v = st.session_state["optimizer_result"]
+            st.caption(f"{result['evaluated']:,} candidates in {result['seconds']:.2f} s, "
+                       f"{result['feasible']:,} feasible.")
+            if rows is None:
+                st.warning("No mix meets the constraints. Widen the ranges or relax the limits.")
+            else:
+                best = result["best"]
+                st.table(pd.DataFrame({
+                    "Mix (C:S:A)": [f"{c:.2f} : {s_:.2f} : {a:.2f}" for c, s_, a in
+                                    zip(best["c_ratio"], best["s_ratio"], best["a_ratio"])],
+                    "W/C": best["wc_ratio"],
+                    f"Cement ({opt_w}/{opt_v})": best["cement_content"],
+                    "Est. Slump (mm)": best["slump"],
+                    "Cost": best["cost"],
+                    f"Cost per {opt_v}": best["cost_per_volume"],
+                }).style.format({"W/C": "{:.2f}", f"Cement ({opt_w}/{opt_v})": "{:.1f}",
+                                 "Est. Slump (mm)": "{:.0f}", "Cost": "{:,.2f}", f"Cost per {opt_v}": "{:,.2f}"}))
+                show_sensitivity(rows)
+    timing_caption("Least-cost optimizer")
+
+optimizer_section()
+
+# --- SCHEDULE IMPORT ---
+# Columns kept per element for the project 3D view (float32 to keep big schedules small).
+VIEW_COLUMNS = ("length", "width", "height", "x", "y", "z", "wet_volume", "weight_c", "weight_s", "weight_a",
+                "weight_water") + GEOMETRY_COLUMNS
+# Text columns kept for costing (priced per pour date, region and supplier, rolled up per pour and floor)
+# and for truck dispatch (pour windows and plants).
+TEXT_COLUMNS = ("pour", "floor", "region", "supplier", "pour_date", "unit_system", "pour_start", "pour_end",
+                "plant")
+
+# Inputs re-read from the upload for pricing and for dispatch.
+COST_INPUTS = ("weight_c", "weight_s", "weight_a", "weight_water", "element_type") + TEXT_COLUMNS
+DISPATCH_INPUTS = ("wet_volume", "unit_system", "pour", "pour_start", "pour_end", "plant", "mix_id")
+
+def view_columns(computed):
+    keep = {k: computed[k].astype("float32") for k in VIEW_COLUMNS if k in computed}
+    # Non-prismatic elements are drawn from their own shape and outline.
+    keep.update({k: computed[k] for k in ("shape", "outline", "openings") if k in computed})
+    keep.update({k: computed[k].astype("category") for k in TEXT_COLUMNS if k in computed})
+    keep["mix_id"] = pd.Categorical(mix_ids(computed["c_ratio"], computed["s_ratio"], computed["a_ratio"]))
+    keep["element_type"] = (computed["element_type"].fillna(computed["shape_name"])
+                            if "element_type" in computed else computed["shape_name"])
+    return pd.DataFrame(keep)
+
+def stream_elements(schedule_file, units, columns=None):
+    """Read the upload again, yielding each chunk's ``view_columns`` (only ``columns`` if given).
+
+    Only the totals are kept in the session; sections that need per-element
+    rows stream them from the upload when they run, with the ``units`` the
+    schedule was processed in.
+    """
+    schedule_file.seek(0)
+    for computed, _, _ in process_schedule(schedule_file, unit_system=units, name=schedule_file.name):
+        view = view_columns(computed)
+        yield view if columns is None else view[[c for c in columns if c in view]]
+
+def show_project_view(schedule_file, units, count):
+    st.markdown("#### 🏗 Project 3D View")
+    if not st.toggle("Draw the project in 3D", key="project_view_on"):
+        return
+    v1, v2 = st.columns(2)
+    color_by = v1.selectbox("Color By", ["element_type", "wet_volume", "weight_c", "weight_s", "weight_a"],
+                            format_func=lambda c: c.replace("_", " ").title())
+    max_elements = int(v2.number_input("Max Elements Drawn Individually", min_value=100,
+                                       value=DEFAULT_MAX_ELEMENTS, step=500))
+    key = (schedule_file.file_id, color_by, max_elements)
+    cached = st.session_state.get("project_view")
+    if cached is None or cached[0] != key:
+        # Above the limit the view is clustered boxes, which only need placement, size and colour.
+        columns = None if count <= max_elements else BOX_COLUMNS + (color_by,)
+        with st.spinner("Reading the schedule for the 3D view..."):
+            elements = pd.concat(stream_elements(schedule_file, units, columns), ignore_index=True)
+            cached = (key, *project_figure(elements, color_by, max_elements))
+        st.session_state["project_view"] = cached
+    _, fig, info = cached
+    st.plotly_chart(fig, use_container_width=True)
+    if info["detail"] == "elements":
+        st.caption(f"{info['elements']:,} elements, {info['triangles']:,} triangles in one mesh.")
+    else:
+        st.caption(f"{info['elements']:,} elements shown as {info['boxes']:,} clustered bounding boxes "
+                   f"(up to {info['max_per_box']:,} elements each, {info['triangles']:,} triangles).")
+
+def export_schedule(schedule_file, units, fmt, plan=None):
+    """Per-element and per-type exports of a schedule as ``(elements_bytes, totals_bytes, dispatch_bytes)``.
+
+    The upload is streamed through the engine again, in the ``units`` it was
+    processed with, and each chunk written as it is computed, so only the
+    output files are held, not the rows.
+    ``plan`` is a dispatch plan ``(loads, volume_unit)``, exported alongside
+    (``None`` bytes without one).
+    """
+    elements, totals_out = io.BytesIO(), io.BytesIO()
+    schedule_file.seek(0)
+    with TableWriter(elements, fmt) as writer:
+        for computed, totals, _ in process_schedule(schedule_file, unit_system=units, name=schedule_file.name):
+            writer.write(element_table(computed))
+    with TableWriter(totals_out, fmt, TOTAL_COLUMNS, sheet="Totals") as writer:
+        writer.write(totals_table(totals.by_type()))
+    if plan is None:
+        return elements.getvalue(), totals_out.getvalue(), None
+    loads_out = io.BytesIO()
+    with TableWriter(loads_out, fmt, dispatch.DISPATCH_COLUMNS, sheet="Dispatch") as writer:
+        writer.write(dispatch.dispatch_table(*plan))
+    return elements.getvalue(), totals_out.getvalue(), loads_out.getvalue()
+
+def export_section(schedule_file, units):
+    st.markdown("#### Export Quantities")
+    x1, x2 = st.columns([2, 1])
+    fmt = x1.selectbox("Export Format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][0],
+                       key="export_format")
+    if x2.button("📦 Prepare Export", use_container_width=True):
+        with st.spinner("Writing export..."):
+            st.session_state["schedule_export"] = (fmt, *export_schedule(
+                schedule_file, units, fmt, st.session_state.get("dispatch_plan")))
+    if "schedule_export" in st.session_state:
+        fmt, elements, totals, loads = st.session_state["schedule_export"]
+        label, ext, mime = EXPORT_FORMATS[fmt]
+        stem = os.path.splitext(schedule_file.name)[0]
+        d1, d2, d3 = st.columns(3)
+        d1.download_button(f"📥 Per-element ({label})", elements, f"{stem}_elements{ext}", mime, on_click="ignore")
+        d2.download_button(f"📥 Totals per Type ({label})", totals, f"{stem}_totals{ext}", mime, on_click="ignore")
+        if loads is not None:
+            d3.download_button(f"📥 Dispatch Schedule ({label})", loads, f"{stem}_dispatch{ext}", mime,
+                               on_click="ignore")
+
+def price_catalog(catalog_file):
+    """The uploaded catalog, read once per upload and kept in the session."""
+    cached = st.session_state.get("price_catalog")
+    if cached is None or cached[0] != catalog_file.file_id:
+        cached = (catalog_file.file_id, costing.read_catalog(catalog_file, name=catalog_file.name))
+        st.session_state["price_catalog"] = cached
+    return cached[1]
+
+def cost_section(schedule_file, units, count):
+    st.markdown("#### Material Costs")
+    st.caption("Upload a price catalog (material, region, supplier, effective date, price, unit). Elements "
+               "are priced on their pour date; blank suppliers take the cheapest, blank regions apply everywhere.")
+    if not st.toggle("Price the schedule", key="cost_open"):
+        return
+    c1, c2 = st.columns([2, 1])
+    catalog_file = c1.file_uploader("Price Catalog", type=["csv", "xlsx"], key="price_catalog_file")
+    as_of = c2.date_input("Price Undated Pours As Of", key="cost_as_of")
+    if catalog_file is None:
+        st.session_state.pop("cost_ledger", None)
+        return
+    try:
+        catalog = price_catalog(catalog_file)
+    except ValueError as e:
+        st.error(f"Could not read the price catalog: {e}")
+        return
+    ledger_as_of, ledger = st.session_state.get("cost_ledger", (None, None))
+    if ledger is None or ledger_as_of != as_of:
+        with st.spinner(f"Pricing {count:,} elements..."):
+            elements = pd.concat(stream_elements(schedule_file, units, COST_INPUTS), ignore_index=True)
+            ledger = costing.CostLedger(elements, catalog, as_of=as_of)
+    elif ledger.catalog is not catalog:
+        # A new catalog version: only the element-materials it can affect are re-priced.
+        repriced = ledger.reprice(catalog)
+        st.caption(f"Re-priced {repriced:,} element-materials affected by the catalog changes.")
+    st.session_state["cost_ledger"] = (as_of, ledger)
+
+    by = st.multiselect("Group By", costing.COST_KEYS, default=["floor", "element_type"],
+                        format_func=lambda c: c.replace("_", " ").title(), key="cost_group_by")
+    m1, m2 = st.columns(2)
+    m1.metric("Total Material Cost", f"{np.nansum(ledger.cost):,.2f}")
+    m2.metric("Catalog Rows", f"{len(catalog):,}")
+    rollup = ledger.rollup(by).reset_index(drop=not by)
+    rollup = rollup.rename(columns=lambda c: c.replace("_", " ").title()).rename(columns={"Kg": "Weight (kg)"})
+    st.dataframe(rollup.style.format("{:,.2f}", subset=["Cost", "Weight (kg)"], na_rep="-"), hide_index=True)
+    if unpriced := ledger.unpriced():
+        st.warning(f"⚠️ {unpriced:,} element-materials have no price in effect for their region, supplier "
+                   "and pour date and are left out of the totals.")
+
+def clock(minutes):
+    return pd.Series(minutes).map(dispatch.time_label)
+
+def dispatch_section(schedule_file, units):
+    st.markdown("#### Truck Dispatch")
+    st.caption("Splits each pour (schedule 'pour' column, else each element) into truck loads and books "
+               "plant batching and trucks within its window ('pour_start' / 'pour_end' columns, else the "
+               "default below). A 'plant' column pins a pour to one plant.")
+    if not st.toggle("Plan truck dispatch", key="dispatch_open"):
+        return
+    d_unit = "m³" if UNIT_SYSTEMS[units]["v_unit"] == "m³" else "yd³"
+    t1, t2, t3, t4 = st.columns(4)
+    truck = t1.number_input(f"Truck Capacity ({d_unit})", min_value=0.5,
+                            value=dispatch.DEFAULT_TRUCK if d_unit == "m³" else 10.0, step=0.5)
+    discharge = t2.number_input(f"Placing Rate ({d_unit}/h)", min_value=1.0, value=dispatch.DEFAULT_DISCHARGE_RATE)
+    day_start = t3.time_input("Default Window Start", value=datetime.time(6, 0), key="dispatch_start")
+    day_end = t4.time_input("Default Window End", value=datetime.time(18, 0), key="dispatch_end")
+    combine = st.checkbox(f"Combine pours under {dispatch.COMBINE_BELOW:.0%} of a truck into multi-drop loads",
+                          value=True, key="dispatch_combine")
+    plants = st.data_editor(pd.DataFrame(list(dispatch.DEFAULT_PLANTS)), num_rows="dynamic", hide_index=True,
+                            key="dispatch_plants", column_config={
+                                "plant": "Plant", "rate": f"Rate ({d_unit}/h)", "batch": f"Batch ({d_unit})",
+                                "trucks": "Trucks", "travel": "Travel (min)"})
+    if st.button("🚚 Plan Dispatch"):
+        window = (day_start.hour * 60 + day_start.minute, day_end.hour * 60 + day_end.minute)
+        try:
+            pours = dispatch.pours_from_chunks(stream_elements(schedule_file, units, DISPATCH_INPUTS), d_unit, window)
+            loads = dispatch.schedule_loads(pours, plants.dropna().to_dict("records"), truck, discharge,
+                                            dispatch.COMBINE_BELOW if combine else 0.0)
+        except ValueError as e:
+            st.session_state.pop("dispatch_plan", None)
+            st.error(f"Could not plan the dispatch: {e}")
+        else:
+            # The prepared export no longer matches the plan.
+            st.session_state.pop("schedule_export", None)
+            st.session_state["dispatch_plan"] = (loads, d_unit)
+    if "dispatch_plan" not in st.session_state:
+        return
+    loads, d_unit = st.session_state["dispatch_plan"]
+    summary = dispatch.pour_summary(loads)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Truck Loads", f"{len(loads):,}")
+    m2.metric("Trucks Used", f"{loads.groupby(['plant', 'truck']).ngroups:,}")
+    m3.metric("Last Truck Back", clock(loads["truck_return"].max())[0] if len(loads) else "-")
+    m4.metric("Late Pours", f"{int((summary['late_minutes'] > 0).sum()):,} of {len(summary):,}")
+    summary = summary.assign(first_arrival=clock(summary["first_arrival"]).to_numpy(),
+                             finish=clock(summary["finish"]).to_numpy()).reset_index()
+    st.dataframe(summary.rename(columns=lambda c: c.replace("_", " ").title()).rename(
+        columns={"Volume": f"Volume ({d_unit})"}).style.format(
+        {f"Volume ({d_unit})": "{:,.2f}", "Wait Minutes": "{:,.0f}", "Late Minutes": "{:,.0f}"}), hide_index=True)
+    with st.expander(f"Load-by-load schedule ({len(loads):,} loads)"):
+        st.dataframe(pd.DataFrame(dispatch.dispatch_table(loads, d_unit)), hide_index=True)
+    st.caption("Prepare the export below to download the dispatch schedule with the quantities.")
+
+@st.fragment
+def schedule_section():
+    with timed_section("Schedule import"):
+        st.markdown("---")
+        st.header("📂 Member Schedule Import")
+        st.write("Upload a CSV or Excel member schedule (element id, type, dimensions, mix ratio, units) "
+                 "to total the materials for a whole takeoff. The file is processed in chunks.")
+        schedule_file = st.file_uploader("Member Schedule", type=["csv", "xlsx"])
+        save_to_project = project is not None and st.checkbox(f"Save rows to project '{project_name}'",
+                                                              key="schedule_to_project")
+        if schedule_file is not None and st.button("📊 Process Schedule"):
+            progress_bar = st.progress(0.0, text="Reading schedule...")
+            try:
+                for computed, totals, fraction in process_schedule(schedule_file, unit_system=unit_system,
+                                                                   name=schedule_file.name):
+                    if save_to_project:
+                        store.add_elements(project["id"], computed)
+                    if fraction is not None:
+                        progress_bar.progress(min(fraction, 1.0), text=f"Processed {totals.rows:,} rows...")
+                progress_bar.progress(1.0, text=f"Done: {totals.rows:,} rows, {totals.rejected:,} rejected")
+                # Only the running totals (and their unit system) are kept; per-element views
+                # stream the upload again in those units, whatever the sidebar says now.
+                st.session_state.pop("schedule_export", None)
+                st.session_state.pop("cost_ledger", None)
+                st.session_state.pop("dispatch_plan", None)
+                st.session_state.pop("project_view", None)
+                st.session_state["schedule_result"] = (totals, unit_system)
+            except ValueError as e:
+                st.session_state.pop("schedule_result", None)
+                st.error(f"Could not read the schedule: {e}")
+
+        if schedule_file is None:
+            st.session_state.pop("schedule_result", None)
+            st.session_state.pop("schedule_export", None)
+            st.session_state.pop("cost_ledger", None)
+            st.session_state.pop("dispatch_plan", None)
+            st.session_state.pop("project_view", None)
+        elif "schedule_result" in st.session_state:
+            totals, units = st.session_state["schedule_result"]
+            st.markdown("#### Totals per Material")
+            st.table(totals.by_material().style.format("{:.4f}"))
+            st.markdown("#### Totals per Element Type")
+            st.table(totals.by_type().style.format("{:.4f}").format("{:,.0f}", subset=["count"]))
+            if totals.errors:
+                st.warning(f"⚠️ {totals.rejected:,} rows were rejected. First issues:")
+                st.table(pd.DataFrame(totals.errors, columns=["Row", "Problem"]))
+            if totals.rows:
+                with timed_section("Material costs"):
+                    cost_section(schedule_file, units, totals.rows)
+                with timed_section("Truck dispatch"):
+                    dispatch_section(schedule_file, units)
+            export_section(schedule_file, units)
+            if totals.rows:
+                with timed_section("Project 3D view"):
+                    show_project_view(schedule_file, units, totals.rows)
+
+schedule_section()
+
+# --- SECTION: IN-PLACE STRENGTH (MATURITY METHOD) ---
+MAX_STRENGTH_CURVES = 30
+
+def maturity_times(state, seconds):
+    # Timestamped logs plot against the clock, elapsed-hours logs against hours.
+    return pd.to_datetime(seconds, unit="s") if state.datetime else np.asarray(seconds) / 3600.0
+
+def add_logger_files(state, uploads):
+    bar = st.progress(0.0, text="Reading logger files...")
+    for i, upload in enumerate(uploads):
+        for fraction in state.add_log(upload, name=upload.name, source_id=upload.file_id):
+            done = (i + min(fraction or 0.0, 1.0)) / len(uploads)
+            bar.progress(done, text=f"{upload.name}: {state.readings:,} readings integrated...")
+    bar.empty()
+
+def strength_figure(state, curves, target):
+    fig = go.Figure()
+    for name, (t, values) in curves:
+        fig.add_trace(go.Scatter(x=maturity_times(state, t), y=values, mode="lines", name=str(name)))
+    fig.add_hline(y=target, line_dash="dash", line_color="#FFB300", annotation_text="Stripping strength")
+    fig.update_layout(height=380, margin=dict(l=0, r=0, b=0, t=30), yaxis_title="Strength (MPa)",
+                      xaxis_title="Time" if state.datetime else "Elapsed time (h)",
+                      title="Estimated in-place strength (weakest sensor per element)")
+    return fig
+
+@st.fragment
+def maturity_section():
+    with timed_section("Maturity method"):
+        st.markdown("---")
+        st.header("🌡️ In-Place Strength (Maturity Method)")
+        st.write("Upload embedded-sensor temperature logs (sensor, time, temperature and optionally element "
+                 "columns) to estimate in-place strength by ASTM C1074. Files are streamed in chunks; "
+                 "adding the next download from the same loggers continues where the last one stopped.")
+        if not st.toggle("Estimate in-place strength", key="maturity_open"):
+            return
+        state = st.session_state.get("maturity_state")
+        started = state is not None and state.readings > 0
+        m1, m2, m3 = st.columns(3)
+        datum = m1.number_input("Datum Temperature T0 (°C)", value=maturity.DATUM_C, step=1.0,
+                                disabled=started, key="maturity_datum")
+        energy = m2.number_input("Activation Energy (kJ/mol)", value=maturity.ACTIVATION_ENERGY / 1000, step=1.0,
+                                 disabled=started, key="maturity_energy")
+        index = m3.radio("Maturity Function", list(maturity.INDICES), horizontal=True, key="maturity_index",
+                         format_func=lambda i: "Nurse-Saul" if i == "ttf" else "Equivalent Age")
+
+        uploads = st.file_uploader("Temperature Logs", type=["csv", "xlsx"], accept_multiple_files=True,
+                                   key="maturity_logs")
+        saved = st.file_uploader("Resume From Saved State (.npz)", type=["npz"], key="maturity_saved")
+        if saved is not None and saved.file_id != st.session_state.get("maturity_saved_id"):
+            state = maturity.MaturityState.load(saved.getvalue())
+            st.session_state["maturity_state"], st.session_state["maturity_saved_id"] = state, saved.file_id
+        new = [u for u in uploads or () if state is None or u.file_id not in state.sources]
+        if new and st.button(f"➕ Add {len(new)} Log File{'s' if len(new) > 1 else ''}"):
+            state = state or maturity.MaturityState(datum, energy * 1000)
+            try:
+                add_logger_files(state, new)
+            except ValueError as e:
+                st.error(f"Could not read the log: {e}")
+            st.session_state["maturity_state"] = state
+        if state is None or not state.readings:
+            st.info("No readings yet. Upload logger files and add them.")
+            return
+
+        st.markdown("#### Strength-Maturity Calibration")
+        k1, k2 = st.columns([2, 1])
+        lab = k1.data_editor(pd.DataFrame(maturity.DEFAULT_CALIBRATION, columns=["Lab Age (days)", "Strength (MPa)"]),
+                             num_rows="dynamic", hide_index=True, key="maturity_calibration")
+        cure_temp = k2.number_input("Lab Curing Temperature (°C)", value=maturity.REFERENCE_C, step=1.0)
+        target = k2.number_input("Stripping Strength (MPa)", min_value=0.0, value=10.0, step=0.5)
+        try:
+            curve = maturity.calibrate(lab.iloc[:, 0], lab.iloc[:, 1], index, cure_temp, state.datum,
+                                       state.activation_energy)
+        except ValueError as e:
+            st.error(f"Cannot fit the calibration: {e}.")
+            return
+        k2.caption(f"S = {curve['a']:.2f} + {curve['b']:.2f} ln(M), M = {maturity.INDICES[index].lower()}")
+
+        curves = maturity.element_curves(state, curve)
+        rows = []
+        for name, (t, values) in curves.items():
+            reached = maturity.time_to_strength(t, values, target)
+            rows.append({
+                "Element": name, "Strength Now (MPa)": values[-1],
+                "Age (h)": (t[-1] - t[0]) / 3600.0,
+                "Stripping Strength At": "not yet" if np.isnan(reached) else
+                (str(maturity_times(state, [reached])[0].floor("min")) if state.datetime
+                 else f"{reached / 3600.0:.1f} h"),
+            })
+        table = pd.DataFrame(rows).sort_values("Strength Now (MPa)")
+        # The weakest elements decide the stripping times, so they are the ones drawn.
+        shown = [(name, curves[name]) for name in table["Element"][:MAX_STRENGTH_CURVES]]
+        st.plotly_chart(strength_figure(state, shown, target), use_container_width=True)
+        st.dataframe(table.style.format({"Strength Now (MPa)": "{:.1f}", "Age (h)": "{:.1f}"}), hide_index=True)
+        st.caption(f"{len(state.sensors):,} sensors in {len(curves):,} elements, {state.readings:,} readings "
+                   f"({state.skipped:,} already covered, {state.rejected:,} unreadable)"
+                   + (f"; the {MAX_STRENGTH_CURVES} weakest elements are drawn." if len(curves) > MAX_STRENGTH_CURVES
+                      else "."))
+        s1, s2 = st.columns(2)
+        s1.download_button("💾 Save Maturity State", state.to_bytes(), "maturity_state.npz",
+                           "application/octet-stream", on_click="ignore")
+        s2.button("Reset Readings", on_click=st.session_state.pop, args=("maturity_state", None))
+    timing_caption("Maturity method")
+
+maturity_section()
+
+# --- SECTION: PROJECT STORE ---
+@st.fragment
+def project_section():
+    with timed_section("Project store"):
+        st.markdown("---")
+        st.header(f"📁 Project: {project_name}")
+        # Only elements whose inputs changed since the last visit are recomputed.
+        stale = store.stale_count(project["id"])
+        if stale:
+            with st.spinner(f"Recomputing {stale:,} changed elements..."):
+                store.recompute(project["id"])
+            st.caption(f"Recomputed {stale:,} elements whose inputs changed.")
+        by = st.multiselect("Group By", ROLLUP_KEYS, default=["unit_system", "element_type"],
+                            format_func=lambda c: c.replace("_", " ").title(), key="project_group_by")
+        rollups = pd.DataFrame(store.rollups(project["id"], by))
+        if rollups.empty or not rollups["count"].sum():
+            st.info("No elements saved yet. Process a schedule with 'Save rows to project' ticked.")
+            return
+        rollups = rollups.rename(columns=lambda c: c.replace("_", " ").title())
+        numeric = [c for c in rollups.columns if c.lower().replace(" ", "_") not in ROLLUP_KEYS]
+        st.table(rollups.style.format("{:.4f}", subset=numeric[1:]).format("{:,.0f}", subset=["Count"]))
+        mixes = pd.DataFrame(store.mixes(project["id"])).drop(columns=["project_id"])
+        with st.expander(f"Mix designs ({len(mixes)}) and density sets"):
+            st.dataframe(mixes, hide_index=True)
+            st.dataframe(pd.DataFrame(store.density_sets(project["id"])).drop(columns=["project_id"]),
+                         hide_index=True)
+
+if project is not None:
+    project_section()
 
 # --- FINAL BUTTON TRIGGER ---
-st.markdown("---")
-if st.button("🚀 Generate Detailed PDF Report"):
-    # Generate fresh visual for PDF
-    current_fig = draw_3d_specimen(l, w, h)
-    
+# Reports render in the shared background pool (concrete_calc.report_jobs):
+# the button only queues a job, a small polling fragment shows its progress
+# and the download button appears once it is done.
+PDF_POLL_SECONDS = 0.5
+
+def pdf_inputs():
+    c_ratio, s_ratio, a_ratio, q = st.session_state["mix_result"]
+    slump_val, workability = st.session_state["slump_result"]
     # Build PDF with all data including Slump
-    pdf_out = create_pdf(
+    return (
         shape_name, l, w, h, v_unit, w_unit, c_ratio, s_ratio, a_ratio, wc_ratio,
-        wet_volume, dry_volume, dry_factor, wastage_percent,
-        weight_c, weight_s, weight_a, weight_water, 
-        current_fig, slump_val, workability
-    )
-    
-    st.download_button(
-        label="📥 Download Result PDF", 
-        data=pdf_out, 
-        file_name=f"{shape_name}_Full_Report.pdf", 
-        mime="application/pdf"
+        q["wet_volume"], q["dry_volume"], dry_factor, wastage_percent,
+        q["weight_c"], q["weight_s"], q["weight_a"], q["weight_water"],
+        specimen_mesh(), slump_val, workability,
+        st.session_state.get("uncertainty_result"),
+        VOLUME_FORMULAS[shape][1] + (" - voids" if element["void_volume"] else ""),
+        st.session_state.get("strength_check"),
     )
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+def render_pdf(key, pdf_args, progress):
+    # Identical inputs (from any session) get the already rendered bytes. The bytes stay in
+    # the byte-budgeted cache; the finished job only keeps the key.
+    shared_cache().get_or_create(key, lambda: create_pdf(*pdf_args, progress=progress))
+    return key
+
+@st.fragment(run_every=PDF_POLL_SECONDS)
+def pdf_job_progress(job_id):
+    status = report_jobs().status(job_id)
+    if status is None or status["state"] in (DONE, FAILED):
+        # Rerun the page once so the section shows the result and this poller stops.
+        st.rerun()
+    if status["state"] == QUEUED:
+        st.progress(0.0, text=f"Queued behind {status['position']} other report(s)...")
+    else:
+        st.progress(status["progress"], text=f"{status['message']}...")
+
+@st.fragment
+def pdf_section():
+    with timed_section("PDF report"):
+        st.markdown("---")
+        pdf_args = pdf_inputs()
+        key = canonical_key("pdf", *pdf_args)
+        if st.button("🚀 Generate Detailed PDF Report"):
+            try:
+                st.session_state["pdf_job"] = (key, report_jobs().submit(render_pdf, key, pdf_args, key=key))
+            except QueueFull:
+                st.warning("⚠️ The report queue is full. Please try again in a moment.")
+
+        job = st.session_state.get("pdf_job")
+        # A job for inputs that have since changed (or that was forgotten) is dropped.
+        status = report_jobs().status(job[1]) if job is not None and job[0] == key else None
+        if status is None:
+            st.session_state.pop("pdf_job", None)
+        elif status["state"] == FAILED:
+            st.error(f"Report generation failed: {status['error']}")
+        elif status["state"] == DONE:
+            # The bytes are only looked up when the download is clicked (not on every
+            # rerun); if the cache evicted them since, that click renders them again.
+            st.download_button(
+                label="📥 Download Result PDF",
+                data=lambda: shared_cache().get_or_create(key, lambda: create_pdf(*pdf_args)),
+                file_name=f"{shape_name}_Full_Report.pdf",
+                mime="application/pdf",
+                on_click="ignore"
+            )
+        else:
+            pdf_job_progress(job[1])
+    timing_caption("PDF report")
+
+pdf_section()
+
+# --- PERFORMANCE DEBUG PANEL ---
+# Filled on full-page runs; fragment reruns show up here (and in the inline
+# captions) as their counts grow.
+if recorder is not None:
+    recorder.record("memory", "session_state",
+                    nbytes=metrics.estimate_bytes({k: st.session_state[k] for k in st.session_state}))
+    recorder.record("memory", "process peak RSS", nbytes=metrics.peak_rss_bytes())
+    with debug_panel.container():
+        st.markdown("**Timings**")
+        st.dataframe(pd.DataFrame(recorder.summary_rows()).drop(columns="Bytes").dropna(subset=["Last (ms)"])
+                     .style.format(precision=1), hide_index=True)
+        st.markdown("**Payloads & Memory**")
+        sizes = [r for r in recorder.summary_rows() if r["Bytes"] is not None]
+        st.dataframe(pd.DataFrame([{"Name": r["Name"], "KiB": r["Bytes"] / 1024} for r in sizes])
+                     .style.format(precision=1), hide_index=True)
+        payload = assets.payload_report()
+        if payload["css_bytes"]:
+            st.caption(f"Background CSS per rerun: {payload['css_bytes'] / 1024:.1f} KiB "
+                       f"(the base64 background sent {payload['legacy_css_bytes'] / 1024:.1f} KiB).")
+        images = assets.asset_report()
+        if images:
+            st.dataframe(pd.DataFrame([{"Image": name, "Source KiB": info["source_bytes"] / 1024,
+                                        "Served KiB": info["served_bytes"] / 1024, "Format": info["format"],
+                                        "Encode (ms)": info["encode_seconds"] * 1000}
+                                       for name, info in images.items()])
+                         .style.format(precision=1), hide_index=True)
+        cache_stats = shared_cache().stats()
+        st.caption(f"Artifact cache (all sessions): {cache_stats['hits']:,} hits, "
+                   f"{cache_stats['misses']:,} misses, {cache_stats['entries']} entries, "
+                   f"{cache_stats['bytes'] / 2**20:.1f} of {cache_stats['max_bytes'] / 2**20:.0f} MiB")
+        d1, d2 = st.columns(2)
+        d1.download_button("Export JSON", recorder.to_json(), "metrics.json", "application/json",
+                           on_click="ignore")
+        d2.download_button("Export CSV", recorder.to_csv(), "metrics.csv", "text/csv", on_click="ignore")
+    recorder.end_run()
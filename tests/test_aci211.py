@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from concrete_calc import aci211
+
+
+def test_table_points_are_reproduced():
+    d = aci211.design_mix(30, 87.5, 19.0, 2.8)
+    assert d["water"] == pytest.approx(205)
+    assert d["wc_ratio"] == pytest.approx(0.54)
+    assert d["cement"] == pytest.approx(205 / 0.54)
+    assert d["coarse"] == pytest.approx(0.62 * 1600)
+    assert d["air_percent"] == pytest.approx(2.0)
+    volumes = sum(d[k] for k in ("vol_water", "vol_cement", "vol_coarse", "vol_fine", "vol_air"))
+    assert volumes == pytest.approx(1.0)
+
+
+def test_batches_broadcast_and_interpolate():
+    d = aci211.design_mix([20, 25, 30], 87.5, 19.0, 2.8, wc_ratio=[np.nan, 0.5, np.nan])
+    assert d["wc_ratio"] == pytest.approx([0.69, 0.5, 0.54])
+    between = aci211.design_mix(27.5, 87.5, 19.0, 2.8)["wc_ratio"]
+    assert between == pytest.approx((0.61 + 0.54) / 2)
+    entrained = aci211.design_mix(30, 87.5, 19.0, 2.8, air_entrained=True, exposure="severe")
+    assert entrained["wc_ratio"] < d["wc_ratio"][2] and entrained["air_percent"] > 2.0
+
+
+def test_out_of_range_inputs_clamp_to_the_table_edges():
+    assert aci211.design_mix(60, 87.5, 19.0, 2.8)["wc_ratio"] == pytest.approx(0.42)
+    assert aci211.design_mix(30, 87.5, 19.0, 3.5)["coarse"] == pytest.approx(0.60 * 1600)
+
+
+def test_slump_from_water_inverts_the_water_table():
+    slump = np.array([37.5, 87.5, 162.5])
+    water = aci211.design_mix(30, slump, 25.0, 2.8)["water"]
+    assert aci211.slump_from_water(water, 25.0) == pytest.approx(slump)
+    assert aci211.recommended_slump("Mass concrete") == (25.0, 50.0)
+    c, s, a = aci211.mass_ratios(aci211.design_mix(30, 87.5, 19.0, 2.8))
+    assert c == 1.0 and s > 1.0 and a > s
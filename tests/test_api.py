@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+from concrete_calc import api
+from concrete_calc.artifact_cache import shared_cache
+from concrete_calc.engine import IMPERIAL, METRIC
+from concrete_calc.spec import SpecError
+
+SPEC = {"elements": [{"length": 2, "width": 0.3, "height": 0.4},
+                     {"length": 1, "width": 1, "height": 1, "unit_system": "imperial"},
+                     {"length": -1, "width": 1, "height": 1}]}
+
+
+def test_quantities_totals_per_unit_system():
+    body = json.loads(api.quantities(SPEC))
+    assert len(body["results"]) == 2 and body["rejected"] == 1
+    assert body["totals"][METRIC]["wet_volume"] == pytest.approx(0.24)
+    assert body["totals"][IMPERIAL]["count"] == 1
+
+
+def test_report_draws_every_element():
+    pytest.importorskip("fpdf")
+    shared_cache().clear()
+    pdf = api.report({"elements": [{"shape": "cylinder", "diameter": 0.5, "height": 3},
+                                   {"length": 1, "width": 1, "height": 1}]})
+    assert pdf.startswith(b"%PDF") and pdf.count(b"/Type /Page\n") == 2
+
+
+def test_report_needs_valid_elements():
+    with pytest.raises(SpecError):
+        api.report({"length": 0, "width": 1, "height": 1})
+
+
+def test_oversized_report_is_refused_before_computing(monkeypatch):
+    monkeypatch.setattr(api, "compute_records", lambda cols: pytest.fail("computed an oversized report"))
+    elements = [{"length": 1, "width": 1, "height": 1}] * (api.MAX_REPORT_PAGES + 1)
+    with pytest.raises(SpecError, match="at most"):
+        api._render_report({"elements": elements})
+
+
+async def request(port, method, path, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                 .encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), data
+
+
+def test_server_round_trip():
+    async def scenario():
+        server = await api.QuantityServer(port=0, workers=1).start()
+        try:
+            health = await request(server.port, "GET", "/health")
+            ok = await request(server.port, "POST", "/v1/quantities", json.dumps(SPEC).encode())
+            bad = await request(server.port, "POST", "/v1/quantities", b"[1, 2]")
+            garbled = await request(server.port, "POST", "/v1/quantities", b"{not json")
+            missing = await request(server.port, "GET", "/nowhere")
+        finally:
+            await server.close()
+        return health, ok, bad, garbled, missing
+
+    health, ok, bad, garbled, missing = asyncio.run(scenario())
+    assert health[0] == 200 and json.loads(health[1])["status"] == "ok"
+    assert ok[0] == 200 and len(json.loads(ok[1])["results"]) == 2
+    assert bad[0] == 422
+    assert garbled[0] == 400 and b"invalid JSON" in garbled[1]
+    assert missing[0] == 404
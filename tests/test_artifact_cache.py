@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from concrete_calc.artifact_cache import ArtifactCache, canonical_key
+
+
+def test_keys_depend_on_kind_type_and_value():
+    assert canonical_key("pdf", 1, "a") == canonical_key("pdf", 1, "a")
+    assert canonical_key("pdf", 1) != canonical_key("pdf", 1.0)
+    assert canonical_key("pdf", 1) != canonical_key("figure", 1)
+    assert canonical_key("mesh", np.arange(3)) != canonical_key("mesh", np.arange(3.0))
+    assert canonical_key("x", {"b": 1, "a": 2}) == canonical_key("x", {"a": 2, "b": 1})
+    with pytest.raises(TypeError):
+        canonical_key("x", object())
+
+
+def test_least_recently_used_entries_go_once_over_budget():
+    cache = ArtifactCache(max_bytes=10)
+    cache.put("pdf:a", "A", 4)
+    cache.put("pdf:b", "B", 4)
+    assert cache.get("pdf:a") == "A"  # b is now the least recently used
+    cache.put("figure:c", "C", 4)
+    assert cache.get("pdf:b") is None
+    assert cache.get("pdf:a") == "A" and cache.get("figure:c") == "C"
+    stats = cache.stats()
+    assert stats["bytes"] == 8 and stats["entries"] == 2
+    assert stats["by_kind"]["pdf"]["evictions"] == 1
+
+
+def test_oversized_values_are_not_kept_and_resize_evicts():
+    cache = ArtifactCache(max_bytes=10)
+    assert cache.get_or_create("pdf:big", lambda: b"x" * 11) == b"x" * 11
+    assert cache.stats()["entries"] == 0
+    cache.get_or_create("blend:a", lambda: [1, 2], size=lambda v: 6)
+    cache.get_or_create("blend:b", lambda: [3], size=lambda v: 3)
+    cache.resize(5)
+    assert cache.get("blend:a") is None and cache.get("blend:b") == [3]
+    cache.clear("blend")
+    assert cache.stats()["bytes"] == 0
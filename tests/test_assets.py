@@ -0,0 +1,67 @@
+import io
+import os
+
+import pytest
+
+from concrete_calc import assets
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    assets.clear_cache()
+    yield
+    assets.clear_cache()
+
+
+def write_image(path, size=(800, 400), mode="RGB", shade=0):
+    Image.linear_gradient("L").resize(size).point(lambda v: (v + shade) % 256).convert(mode).save(path)
+    return str(path)
+
+
+def test_images_are_downsized_and_encoded_once(tmp_path):
+    path = write_image(tmp_path / "photo.png")
+    data, fmt = assets.optimized_image(path, max_width=200)
+    assert fmt == "WEBP"
+    assert Image.open(io.BytesIO(data)).size == (200, 100)
+    assert assets.optimized_image(path, max_width=200) == (data, fmt)
+    report = assets.asset_report()["photo.png"]
+    assert report["served_bytes"] == len(data) < report["source_bytes"]
+
+
+def test_edited_files_are_encoded_again(tmp_path):
+    path = write_image(tmp_path / "photo.png")
+    first, _ = assets.optimized_image(path, max_width=100)
+    write_image(path, size=(400, 400), shade=90)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    again, _ = assets.optimized_image(path, max_width=100)
+    assert Image.open(io.BytesIO(again)).size == (100, 100)
+    assert first != again
+
+
+def test_streamlit_images_keep_the_format_st_image_serves(tmp_path):
+    opaque = assets.image_source(write_image(tmp_path / "opaque.png"))
+    clear = assets.image_source(write_image(tmp_path / "clear.png", mode="RGBA"))
+    assert Image.open(io.BytesIO(opaque)).format == "JPEG"
+    assert Image.open(io.BytesIO(clear)).format == "PNG"
+    assert assets.image_source(str(tmp_path / "missing.png")) == str(tmp_path / "missing.png")
+
+
+def test_background_data_uri_is_smaller_than_the_legacy_payload(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "static_serving_enabled", lambda: False)
+    path = write_image(tmp_path / "background.jpg")
+    url = assets.background_url(path)
+    assert url.startswith("data:image/webp;base64,")
+    assets.record_css_payload(url, assets.legacy_background_payload(path))
+    report = assets.payload_report()
+    assert report["css_bytes"] < report["legacy_css_bytes"]
+
+
+def test_background_url_points_at_a_hashed_static_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "static_serving_enabled", lambda: True)
+    monkeypatch.setattr(assets, "STATIC_DIR", str(tmp_path / "static"))
+    url = assets.background_url(write_image(tmp_path / "background.jpg"))
+    name = url.rsplit("/", 1)[1]
+    assert url.startswith(f"app/static/{assets.GENERATED_SUBDIR}/background.")
+    assert (tmp_path / "static" / assets.GENERATED_SUBDIR / name).exists()
@@ -0,0 +1,34 @@
+import pytest
+
+from concrete_calc.batch_reports import generate_reports, report_filename
+from concrete_calc.engine import METRIC
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("fpdf")
+
+
+def schedule(ids):
+    return pd.DataFrame({
+        "element_id": ids, "shape_name": "Slab", "length": 2.0, "width": 1.0, "height": 0.2,
+        "c_ratio": 1.0, "s_ratio": 2.0, "a_ratio": 4.0, "wc_ratio": 0.5, "wastage_percent": 5.0,
+        "unit_system": METRIC,
+    })
+
+
+def test_repeated_element_ids_get_their_own_files(tmp_path):
+    stats = generate_reports(schedule(["S1", "S1", "S/2"]), tmp_path, workers=1, chunk_size=2, summary=False)
+    names = sorted(p.name for p in tmp_path.glob("*.pdf"))
+    assert stats["reports"] == 3
+    assert names == ["000001_S1_Slab_Report.pdf", "000002_S1_Slab_Report.pdf", "000003_S_2_Slab_Report.pdf"]
+    assert report_filename({"row": 0, "element_id": "B 1", "shape_name": "Circular Column"}) \
+        == "000001_B_1_Circular_Column_Report.pdf"
+
+
+def test_progress_is_reported_for_every_chunk(tmp_path):
+    seen = []
+    stats = generate_reports(schedule([f"E{i}" for i in range(5)]), tmp_path, workers=1, chunk_size=2,
+                             part_files=True, progress=seen.append)
+    assert seen == [2, 4, 5]
+    assert stats["totals"][METRIC]["count"] == 5
+    assert sorted(p.name for p in tmp_path.glob("*.pdf")) == [
+        "project_part_0001.pdf", "project_part_0002.pdf", "project_part_0003.pdf", "project_summary.pdf"]
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+
+import pytest
+
+from concrete_calc import cli
+from concrete_calc.engine import METRIC
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_json_spec_rows_and_totals(tmp_path, capsys):
+    spec = write(tmp_path, "spec.json", json.dumps({
+        "unit_system": "metric", "mix": "1:2:4",
+        "elements": [{"id": "B1", "L": 2, "W": 0.3, "H": 0.4},
+                     {"id": "C1", "shape": "cylinder", "diameter": 0.5, "height": 3},
+                     {"id": "X1", "L": 0, "W": 1, "H": 1}],
+    }))
+    assert cli.main([spec, "--totals"]) == 0
+    out, err = capsys.readouterr()
+    rows = json.loads(out)
+    assert [r["element_id"] for r in rows] == ["B1", "C1"]
+    assert rows[0]["wet_volume"] == pytest.approx(0.24)
+    assert rows[1]["shape_name"] == "Circular Column"
+    assert "skipped 1 row(s)" in err
+    assert f"{METRIC}: 2 elements" in err
+
+
+def test_csv_spec_in_millimetres(tmp_path, capsys):
+    spec = write(tmp_path, "schedule.csv", "mark,length,width,height,units\nB1,2000,300,400,mm\nB2,2,0.3,0.4,\n")
+    assert cli.main([spec]) == 0
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert [float(r["wet_volume"]) for r in rows] == pytest.approx([0.24, 0.24])
+    assert {r["unit_system"] for r in rows} == {METRIC}
+
+
+def test_spec_errors_exit_with_a_message(tmp_path):
+    spec = write(tmp_path, "spec.json", json.dumps([{"length": 1, "width": 1}]))
+    with pytest.raises(SystemExit, match="height"):
+        cli.main([spec])
+
+
+def test_pdf_reports(tmp_path, capsys):
+    pytest.importorskip("fpdf")
+    pytest.importorskip("pandas")
+    spec = write(tmp_path, "spec.json", json.dumps([{"length": 1, "width": 1, "height": 1},
+                                                     {"shape": "cylinder", "diameter": 0.5, "height": 3}]))
+    assert cli.main([spec, "--no-rows", "--pdf", str(tmp_path / "reports")]) == 0
+    pdfs = list((tmp_path / "reports").rglob("*.pdf"))
+    assert pdfs and all(p.read_bytes().startswith(b"%PDF") for p in pdfs)
@@ -0,0 +1,72 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from concrete_calc.costing import CostLedger, PriceCatalog, normalise_catalog, read_catalog
+from concrete_calc.engine import IMPERIAL, METRIC
+
+CATALOG = """Material,Region,Supplier,Effective Date,Price,Unit
+Cement,,Acme,2026-01-01,150,per t
+Cement,,Acme,2026-06-01,180,per t
+Cement,North,Acme,2026-01-01,200,per t
+Cement,,Budget,2026-01-01,160,per t
+Sand,,Acme,,0.02,kg
+Gravel,,Acme,,0.03,kg
+Rebar,,Acme,,1.00,kg
+"""
+
+
+def elements():
+    return pd.DataFrame({
+        "weight_c": [1000.0, 1000.0, 1000.0, 2204.62262], "weight_s": [100.0] * 4,
+        "weight_a": [100.0] * 4, "weight_water": [50.0] * 4,
+        "unit_system": [METRIC, METRIC, METRIC, IMPERIAL],
+        "region": ["South", "North", "South", ""], "supplier": ["", "Acme", "Acme", "Budget"],
+        "pour_date": ["2026-03-01", "2026-03-01", "2026-07-01", None],
+        "floor": ["L1", "L1", "L2", "L2"], "element_type": ["Slab", "Wall", "Slab", "Column"],
+    })
+
+
+def test_normalise_catalog_drops_unknown_materials():
+    frame = normalise_catalog(pd.read_csv(io.StringIO(CATALOG)))
+    assert len(frame) == 6 and set(frame["material"]) == {"cement", "sand", "stone"}
+    assert frame["price_per_kg"].iloc[0] == pytest.approx(0.15)
+    with pytest.raises(ValueError, match="price"):
+        normalise_catalog(pd.DataFrame({"material": ["cement"]}))
+
+
+def test_prices_follow_region_supplier_and_date():
+    catalog = read_catalog(io.BytesIO(CATALOG.encode()), name="prices.csv")
+    ledger = CostLedger(elements(), catalog, as_of="2026-08-01")
+    np.testing.assert_allclose(ledger.unit_price[:, 0], [0.15, 0.20, 0.18, 0.16])
+    # The imperial element's pounds are priced per kilogram.
+    assert ledger.kg[3, 0] == pytest.approx(1000.0)
+    assert [ledger.supplier_names[s] for s in ledger.supplier[:, 0]] == ["Acme", "Acme", "Acme", "Budget"]
+    # Nobody sells water, and Budget (pinned by the last element) sells no aggregates.
+    assert ledger.unpriced() == 4 + 2
+    assert ledger.table()["total_cost"][0] == pytest.approx(150 + 2 + 3)
+
+
+def test_rollup_groups_costs():
+    ledger = CostLedger(elements(), read_catalog(io.BytesIO(CATALOG.encode()), name="prices.csv"),
+                        as_of="2026-08-01")
+    by_floor = ledger.rollup(["floor"])
+    assert by_floor.loc["L1", "cost"] == pytest.approx(150 + 200 + 2 * 5)
+    by_material = ledger.rollup(["material"])
+    assert np.isnan(by_material.loc["water", "cost"])
+    assert ledger.rollup([])["cost"].iloc[0] == pytest.approx(np.nansum(ledger.cost))
+    with pytest.raises(ValueError):
+        ledger.rollup(["colour"])
+
+
+def test_reprice_touches_only_changed_regions():
+    frame = normalise_catalog(pd.read_csv(io.StringIO(CATALOG)))
+    ledger = CostLedger(elements(), PriceCatalog(frame), as_of="2026-08-01")
+    changed = frame.copy()
+    changed.loc[(changed["region"] == "North"), "price_per_kg"] = 0.25
+    assert ledger.reprice(PriceCatalog(changed)) == 1
+    assert ledger.unit_price[1, 0] == pytest.approx(0.25)
+    fresh = CostLedger(elements(), PriceCatalog(changed), as_of="2026-08-01")
+    np.testing.assert_allclose(ledger.unit_price, fresh.unit_price)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from concrete_calc import dispatch
+
+
+def elements(pours, plants, volumes=None):
+    return {"wet_volume": np.asarray(volumes or [5.0] * len(pours)),
+            "pour": np.array(pours, dtype=object), "plant": np.array(plants, dtype=object)}
+
+
+def test_pour_takes_its_first_given_plant():
+    pours = dispatch.pours_from_elements(elements(["P1", "P1", "P1", "P2"], ["", "Plant 2", "Plant 1", ""]))
+    assert pours.set_index("pour")["plant"].to_dict() == {"P1": "Plant 2", "P2": ""}
+    assert pours.set_index("pour")["volume"]["P1"] == pytest.approx(15.0)
+
+
+def test_pours_merge_across_chunks():
+    chunks = [elements(["P1", ""], ["", ""]), elements(["P1", ""], ["Plant 1", ""])]
+    pours = dispatch.pours_from_chunks(chunks)
+    assert pours["pour"].tolist() == ["P1", "Element 2", "Element 4"]
+    assert pours.set_index("pour").loc["P1", "plant"] == "Plant 1"
+
+
+def test_loads_cover_every_pour():
+    pours = dispatch.pours_from_elements(elements(["P1", "P2"], ["", ""], [20.0, 3.0]))
+    loads = dispatch.schedule_loads(pours, truck=8.0)
+    assert loads["volume"].sum() == pytest.approx(23.0)
+    assert loads["volume"].max() <= 8.0
+
+
+def test_pinned_pours_use_their_plant():
+    plants = [{**dispatch.DEFAULT_PLANTS[0]}, {**dispatch.DEFAULT_PLANTS[0], "plant": "Plant 2"}]
+    pours = dispatch.pours_from_elements(elements(["P1"], ["Plant 2"], [30.0]))
+    assert set(dispatch.schedule_loads(pours, plants)["plant"]) == {"Plant 2"}
+
+
+def test_unknown_plants_are_reported():
+    pours = dispatch.pours_from_elements(elements(["P1", "P2"], ["Plant 9", "Plant 1"]))
+    with pytest.raises(ValueError, match="Plant 9"):
+        dispatch.schedule_loads(pours)
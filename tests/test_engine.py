@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from concrete_calc.engine import (DEFAULTS, IMPERIAL, METRIC, UNIT_SYSTEMS, classify_shape, compute_from_volume,
+                                  compute_schedule, compute_single, workability_class)
+
+
+def test_single_prism_matches_hand_calculation():
+    q = compute_single(2.0, 0.3, 0.4, 1, 2, 4, 1440, 1600, 1550)
+    dry = 0.24 * DEFAULTS["dry_factor"] * 1.05
+    assert q["wet_volume"] == pytest.approx(0.24)
+    assert q["dry_volume"] == pytest.approx(dry)
+    assert q["weight_c"] == pytest.approx(dry / 7 * 1440)
+    assert q["weight_s"] == pytest.approx(2 * dry / 7 * 1600)
+    assert q["weight_a"] == pytest.approx(4 * dry / 7 * 1550)
+    assert q["weight_water"] == pytest.approx(0.5 * q["weight_c"])
+    assert q["shape_name"] == "Beam"
+
+
+def test_compute_from_volume_broadcasts():
+    out = compute_from_volume(np.array([1.0, 2.0]), 1, 2, 4, 1440, 1600, 1550)
+    assert out["weight_c"].shape == (2,)
+    assert out["weight_c"][1] == pytest.approx(2 * out["weight_c"][0])
+
+
+def test_classify_shape():
+    assert list(classify_shape([1, 5, 5, 0.3], [1, 5, 0.3, 0.3], [1, 0.2, 0.4, 3])) == \
+        ["Cube", "Slab", "Beam", "Column"]
+
+
+def test_workability_bands():
+    classes, _ = workability_class(np.array([10, 50, 100, 200]))
+    assert list(classes) == ["Very Low / Stiff", "Low / Plastic", "Medium", "High / Flowing"]
+
+
+def test_schedule_fills_defaults_per_unit_system():
+    out = compute_schedule({
+        "length": np.array([1.0, 1.0]), "width": np.array([1.0, 1.0]), "height": np.array([1.0, 1.0]),
+        "unit_system": np.array([METRIC, IMPERIAL], dtype=object),
+        "c_ratio": np.array([np.nan, 1.0]),
+    }, include_inputs=True)
+    assert out["c_ratio"].tolist() == [DEFAULTS["c_ratio"], 1.0]
+    assert out["dens_c"].tolist() == [UNIT_SYSTEMS[METRIC]["densities"][0], UNIT_SYSTEMS[IMPERIAL]["densities"][0]]
+    single = compute_single(1, 1, 1, 1, 2, 4, *UNIT_SYSTEMS[METRIC]["densities"])
+    assert out["weight_c"][0] == pytest.approx(single["weight_c"])
+
+
+def test_schedule_with_shapes_uses_element_volumes():
+    out = compute_schedule({
+        "shape": np.array(["cylinder", ""], dtype=object),
+        "diameter": np.array([0.5, np.nan]), "height": np.array([3.0, 0.2]),
+        "length": np.array([np.nan, 4.0]), "width": np.array([np.nan, 5.0]),
+    }, include_inputs=True)
+    assert out["wet_volume"] == pytest.approx([np.pi / 4 * 0.25 * 3, 4.0])
+    # Length/width/height become each element's bounding box.
+    assert out["length"][0] == pytest.approx(0.5)
+    assert list(out["shape_name"]) == ["Circular Column", "Slab"]
@@ -0,0 +1,60 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+
+from concrete_calc.export import ELEMENT_COLUMNS, TableWriter, element_table, mix_ids
+from concrete_calc.spec import columns_from_spec, compute_records
+
+SPEC = {"elements": [{"element_id": "C1", "length": 2, "width": 0.3, "height": 0.4, "mix_ratio": "1:2:4"},
+                     {"element_id": "S1", "length": 5, "width": 4, "height": 0.2, "mix_ratio": "1:1.5:3"},
+                     {"element_id": "F1", "length": 1, "width": 1, "height": 1, "unit_system": "imperial"}]}
+
+
+def chunk():
+    out, rejected = compute_records(columns_from_spec(SPEC))
+    assert rejected == 0
+    return element_table(out)
+
+
+def test_element_table_columns():
+    table = chunk()
+    assert list(table) == [name for name, _ in ELEMENT_COLUMNS]
+    assert table["element_id"].tolist() == ["C1", "S1", "F1"]
+    assert table["mix_id"][:2].tolist() == ["1:2:4", "1:1.5:3"]
+    assert table["volume_unit"][0] == "m³" and table["volume_unit"][2] != "m³"
+    assert mix_ids([1, 1], [2, 2], [4, 4]).tolist() == ["1:2:4", "1:2:4"]
+
+
+def test_parquet_round_trip_keeps_types():
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = chunk()
+    dest = io.BytesIO()
+    with TableWriter(dest, "parquet") as writer:
+        writer.write(table)
+        writer.write(table)
+    back = pq.read_table(io.BytesIO(dest.getvalue()))
+    assert back.num_rows == writer.rows == 6
+    assert str(back.schema.field("wet_volume").type) == "double"
+    assert str(back.schema.field("element_id").type) == "string"
+    np.testing.assert_allclose(back.column("wet_volume").to_numpy(), np.tile(table["wet_volume"], 2))
+    assert back.column("element_id").to_pylist() == table["element_id"].tolist() * 2
+
+
+def test_csv_round_trip_leaves_nan_empty(tmp_path):
+    table = chunk()
+    table["wc_ratio"] = np.full(3, np.nan)
+    path = tmp_path / "quantities.csv"
+    with TableWriter(path, "csv") as writer:
+        writer.write(table)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["element_id"] for r in rows] == ["C1", "S1", "F1"]
+    assert [float(r["wet_volume"]) for r in rows] == pytest.approx(table["wet_volume"])
+    assert all(r["wc_ratio"] == "" for r in rows)
+
+
+def test_unknown_format_is_refused():
+    with pytest.raises(ValueError):
+        TableWriter(io.BytesIO(), "docx")
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from concrete_calc.geometry import (element_geometry, element_mesh, missing_dimensions, parse_polygon,
+                                    parse_polygons, polygon_text, polygons_text, prism_mesh, report_geometry,
+                                    triangulate_polygon)
+
+
+def mesh_volume(vertices, triangles):
+    corners = np.asarray(vertices, dtype=float)[np.asarray(triangles)]
+    return np.einsum("ij,ij->i", corners[:, 0], np.cross(corners[:, 1], corners[:, 2])).sum() / 6
+
+
+def test_element_volumes():
+    geo = element_geometry({
+        "shape": np.array(["prism", "cylinder", "frustum", "cone_frustum", "polygon", "stair"], dtype=object),
+        "length": np.array([2.0, np.nan, 2.0, np.nan, np.nan, np.nan]),
+        "width": np.array([3.0, np.nan, 2.0, np.nan, np.nan, 1.2]),
+        "height": np.array([0.5, 3.0, 1.0, 2.0, 0.2, np.nan]),
+        "diameter": np.array([np.nan, 0.5, np.nan, 1.0, np.nan, np.nan]),
+        "top_length": np.array([np.nan, np.nan, 1.0, np.nan, np.nan, np.nan]),
+        "top_width": np.array([np.nan, np.nan, 1.0, np.nan, np.nan, np.nan]),
+        "top_diameter": np.array([np.nan, np.nan, np.nan, 0.5, np.nan, np.nan]),
+        "outline": np.array([None, None, None, None, "0 0; 6 0; 6 4; 0 4", None], dtype=object),
+        "openings": np.array([None, None, None, None, "1 1; 2 1; 2 2; 1 2", None], dtype=object),
+        "steps": np.array([np.nan] * 5 + [10.0]),
+        "rise": np.array([np.nan] * 5 + [0.17]),
+        "going": np.array([np.nan] * 5 + [0.28]),
+        "waist": np.array([np.nan] * 5 + [0.15]),
+    })
+    v = geo["wet_volume"]
+    assert v[0] == pytest.approx(3.0)
+    assert v[1] == pytest.approx(np.pi / 4 * 0.25 * 3)
+    assert v[2] == pytest.approx(1 / 6 * (4 + 1 + 4 * 1.5 * 1.5))
+    assert v[3] == pytest.approx(np.pi * 2 / 12 * (1 + 0.5 + 0.25))
+    assert v[4] == pytest.approx((24 - 1) * 0.2)
+    assert v[5] > 0
+    assert geo["plan_area"][4] == pytest.approx(23)
+    assert list(geo["length"][:2]) == pytest.approx([2.0, 0.5])
+
+
+def test_voids_and_missing_dimensions():
+    elements = {
+        "shape": np.array(["cylinder", "cylinder", "blob", None], dtype=object),
+        "diameter": np.array([0.5, np.nan, 1.0, np.nan]),
+        "height": np.array([3.0, 3.0, 1.0, 1.0]),
+        "length": np.array([np.nan, np.nan, np.nan, 1.0]),
+        "width": np.array([np.nan, np.nan, np.nan, 1.0]),
+        "void_volume": np.array([0.1, np.nan, np.nan, 2.0]),
+    }
+    geo = element_geometry(elements)
+    assert geo["wet_volume"][0] == pytest.approx(np.pi / 4 * 0.25 * 3 - 0.1)
+    assert np.isnan(geo["wet_volume"][1:]).all()
+    reasons = missing_dimensions(elements)
+    assert reasons[0] == ""
+    assert "diameter" in reasons[1]
+    assert reasons[2] == "unknown shape"
+    assert reasons[3] == "voids exceed the element volume"
+
+
+def test_polygon_text_round_trip():
+    outline = parse_polygon("0 0; 6 0; 6 4.5; 0 4")
+    assert parse_polygon(polygon_text(outline)) == pytest.approx(outline)
+    holes = parse_polygons("1 1; 2 1; 2 2 | 3 1; 4 1; 4 2")
+    back = parse_polygons(polygons_text(holes))
+    assert len(back) == 2 and back[1] == pytest.approx(holes[1])
+
+
+@pytest.mark.parametrize("shape, dims, volume", [
+    ("prism", dict(length=2, width=3, height=0.5), 3.0),
+    ("frustum", dict(length=2, width=2, top_length=1, top_width=1, height=1), 1 / 6 * (4 + 1 + 9)),
+    ("polygon", dict(outline="0 0; 6 0; 6 4; 0 4", openings="1 1; 2 1; 2 2; 1 2", height=0.2), 23 * 0.2),
+])
+def test_meshes_enclose_the_element_volume(shape, dims, volume):
+    assert mesh_volume(*element_mesh(shape, **dims)) == pytest.approx(volume)
+
+
+def test_cylinder_mesh_approaches_the_volume():
+    assert mesh_volume(*element_mesh("cylinder", diameter=0.5, height=3)) == \
+        pytest.approx(np.pi / 4 * 0.25 * 3, rel=0.02)
+
+
+def test_report_geometry_uses_the_shape():
+    mesh, formula = report_geometry({"shape": "cylinder", "diameter": 0.5, "height": 3.0,
+                                     "length": 0.5, "width": 0.5})
+    assert len(mesh[1]) > len(prism_mesh(1, 1, 1)[1])
+    assert formula != report_geometry({"length": 1, "width": 1, "height": 1})[1]
+
+
+def test_empty_outline_gives_an_empty_mesh():
+    vertices, triangles = element_mesh("polygon", outline="", height=0.2)
+    assert vertices.shape == (0, 3) and triangles.shape == (0, 3)
+
+
+def test_triangulation_keeps_every_vertex_and_the_area():
+    # A 2000-point wavy outline with a square hole.
+    t = np.linspace(0, 2 * np.pi, 2000, endpoint=False)
+    r = 10 + np.sin(7 * t)
+    outline = np.column_stack([r * np.cos(t), r * np.sin(t)])
+    hole = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
+    points, triangles = triangulate_polygon(outline, [hole])
+    a, b, c = (points[triangles[:, k]] for k in range(3))
+    areas = ((b - a)[:, 0] * (c - a)[:, 1] - (b - a)[:, 1] * (c - a)[:, 0]) / 2
+    x, y = outline.T
+    assert areas.min() >= 0
+    assert areas.sum() == pytest.approx((x @ np.roll(y, -1) - y @ np.roll(x, -1)) / 2 - 4)
+    # Collinear points along the bottom edge become zero-area triangles, not dropped vertices.
+    points, triangles = triangulate_polygon([(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (0, 1)])
+    assert set(triangles.ravel()) == set(range(6)) and len(triangles) == 4
+
+
+def test_self_intersecting_outline_is_an_error():
+    with pytest.raises(ValueError, match="self-intersecting"):
+        triangulate_polygon([(4, 3), (2, 1), (2, 4), (2, 0), (3, 4), (3, 2), (3, 1)])
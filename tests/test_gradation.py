@@ -0,0 +1,81 @@
+import io
+
+import numpy as np
+import pytest
+
+from concrete_calc.gradation import (SIEVES_MM, _sieve_size, band, blend, blended_density, fineness_modulus,
+                                     is_fine, passing_from_retained, perturbed_gradings, project_simplex,
+                                     read_sieve_analyses, resample)
+
+SAND = resample([9.5, 4.75, 2.36, 1.18, 0.6, 0.3, 0.15], [100, 97, 85, 68, 45, 18, 4])
+STONE = resample([37.5, 25, 12.5, 4.75, 2.36], [100, 97, 42, 4, 1])
+
+
+def test_sieve_names():
+    assert _sieve_size("No. 4") == 4.75 and _sieve_size("#200") == 0.075
+    assert _sieve_size('3/8"') == 9.5 and _sieve_size("600 um") == pytest.approx(0.6)
+    assert _sieve_size("Pan") == 0.0 and _sieve_size(19) == 19.0
+    with pytest.raises(ValueError):
+        _sieve_size("sieve")
+
+
+def test_fineness_modulus_of_a_sand():
+    # Retained on 4.75..0.15 mm: 3 + 15 + 32 + 55 + 82 + 96 = 283 -> FM 2.83.
+    assert fineness_modulus(SAND) == pytest.approx(2.83)
+    assert is_fine(SAND) and not is_fine(STONE)
+
+
+def test_passing_from_retained():
+    passing = passing_from_retained([4.75, 0, 2.36, 1.18], [10, 30, 40, 20])
+    np.testing.assert_allclose(passing, [90, 0, 50, 30])
+    with pytest.raises(ValueError):
+        passing_from_retained([4.75, 0], [0, 0])
+
+
+def test_band_fills_outside_sieves():
+    lo, hi = band("57")
+    assert lo[0] == hi[0] == 100.0
+    assert np.isnan(lo[list(SIEVES_MM).index(19.0)])
+    assert hi[-1] == 5.0
+
+
+def test_project_simplex():
+    x = project_simplex(np.array([[0.5, 2.0, -1.0], [0.2, 0.3, 0.5]]))
+    np.testing.assert_allclose(x.sum(axis=1), 1.0)
+    np.testing.assert_allclose(x, [[0, 1, 0], [0.2, 0.3, 0.5]], atol=1e-12)
+
+
+def test_blend_recovers_a_known_mix():
+    A = np.column_stack([SAND, STONE])
+    target = A @ np.array([0.4, 0.6])
+    result = blend(A, target - 1.0, target + 1.0)
+    np.testing.assert_allclose(result["proportions"], [0.4, 0.6], atol=0.01)
+    assert result["within"] and result["excess"] <= 0.5
+
+
+def test_blend_is_batched_over_what_ifs():
+    A = np.column_stack([SAND, STONE])
+    target = A @ np.array([0.4, 0.6])
+    gradings = perturbed_gradings(A, 50, seed=1)
+    assert gradings.shape == (50,) + A.shape
+    assert (np.diff(gradings, axis=1) <= 0).all()
+    result = blend(gradings, target - 5.0, target + 5.0)
+    assert result["proportions"].shape == (50, 2)
+    np.testing.assert_allclose(result["proportions"].sum(axis=-1), 1.0)
+
+
+def test_blended_density():
+    # Half and half by mass of 1600 and 1400 kg/m3 loose material.
+    assert blended_density([0.5, 0.5], [1600, 1400]) == pytest.approx(1 / (0.5 / 1600 + 0.5 / 1400))
+
+
+def test_read_long_and_wide_analyses():
+    long = io.StringIO("stockpile,sieve,retained\nsand,No. 4,5\nsand,No. 16,45\nsand,pan,50\n")
+    names, passing = read_sieve_analyses(long)
+    assert names == ["sand"] and passing.shape == (len(SIEVES_MM), 1)
+    assert passing[list(SIEVES_MM).index(4.75), 0] == pytest.approx(95)
+    wide = io.StringIO('sieve,Sand A,Stone B\n3/8",100,60\nNo. 4,95,5\nNo. 100,2,0\n')
+    names, passing = read_sieve_analyses(wide)
+    assert names == ["Sand A", "Stone B"] and passing.shape == (len(SIEVES_MM), 2)
+    with pytest.raises(ValueError):
+        read_sieve_analyses(io.StringIO("stockpile,opening\nsand,4.75\n"))
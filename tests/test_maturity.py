@@ -0,0 +1,90 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from concrete_calc.maturity import (MaturityState, calibrate, element_curves, equivalent_age, strength,
+                                    time_to_strength)
+
+
+def log(sensor, hours, temp, element=None):
+    frame = pd.DataFrame({"Sensor ID": sensor, "Elapsed Hours": hours, "Temp (C)": temp})
+    if element is not None:
+        frame["Element"] = element
+    return frame
+
+
+def test_constant_reference_temperature():
+    state = MaturityState()
+    state.add(log(["A"] * 49, np.arange(49.0), [20.0] * 49))
+    row = state.summary().iloc[0]
+    assert row["ttf"] == pytest.approx(20 * 48)
+    assert row["equivalent_age"] == pytest.approx(48)
+    assert row["readings"] == 49 and row["age_h"] == pytest.approx(48)
+    # Warmer concrete ages faster than the reference.
+    assert equivalent_age(30.0, 1.0) > 1.0 > equivalent_age(10.0, 1.0)
+
+
+def test_chunks_and_overlaps_continue_the_sums():
+    hours = np.arange(0.0, 24.0, 0.5)
+    temp = 15 + 5 * np.sin(hours / 4)
+    whole = MaturityState()
+    whole.add(log(["A"] * len(hours) + ["B"] * len(hours), np.r_[hours, hours], np.r_[temp, temp + 2]))
+    parts = MaturityState()
+    shuffled = np.random.default_rng(0).permutation(30)
+    parts.add(log(["A"] * 30, hours[:30][shuffled], temp[:30][shuffled]))
+    # The next download overlaps the first and brings a second sensor.
+    parts.add(log(["A"] * 28 + ["B"] * len(hours), np.r_[hours[20:], hours], np.r_[temp[20:], temp + 2]))
+    assert parts.skipped == 10
+    pd.testing.assert_frame_equal(parts.summary(), whole.summary())
+
+
+def test_rejected_rows_and_mixed_time_kinds():
+    state = MaturityState()
+    state.add(log(["A", None, "A"], [0, 1, "x"], [20, 20, 20]))
+    assert state.rejected == 2 and state.readings == 1
+    with pytest.raises(ValueError):
+        state.add(pd.DataFrame({"sensor": ["A"], "time": ["2026-01-01 08:00"], "temperature": [20]}))
+    with pytest.raises(ValueError, match="temperature"):
+        MaturityState().add(pd.DataFrame({"sensor": ["A"], "hours": [1]}))
+
+
+def test_save_and_load_round_trip():
+    state = MaturityState()
+    state.add(log(["A"] * 10, np.arange(10.0), [25.0] * 10, ["Slab 1"] * 10))
+    state.sources.add("file-1")
+    restored = MaturityState.load(state.to_bytes())
+    pd.testing.assert_frame_equal(restored.summary(), state.summary())
+    assert restored.sources == {"file-1"} and restored.datetime is False
+    restored.add(log(["A"] * 2, [10.0, 11.0], [25.0, 25.0]))
+    assert restored.summary().loc[0, "ttf"] == pytest.approx(25 * 11)
+
+
+def test_add_log_skips_a_file_seen_before():
+    data = b"sensor,hours,temperature_f\nA,0,68\nA,2,68\n"
+    state = MaturityState()
+    list(state.add_log(io.BytesIO(data), name="log.csv", source_id="log"))
+    list(state.add_log(io.BytesIO(data), name="log.csv", source_id="log"))
+    assert state.readings == 2
+    assert state.summary().loc[0, "ttf"] == pytest.approx(40)
+
+
+def test_calibration_and_weakest_sensor():
+    curve = calibrate([1, 3, 7, 28], [8, 17, 23, 30])
+    assert curve["b"] > 0
+    assert strength(20 * 24 * 7, curve) == pytest.approx(curve["a"] + curve["b"] * np.log(20 * 24 * 7))
+    assert strength(0.0, curve) == 0.0
+    with pytest.raises(ValueError):
+        calibrate([7], [23])
+
+    state = MaturityState(history_hours=6)
+    hours = np.arange(0.0, 169.0)
+    state.add(log(["warm"] * 169 + ["cool"] * 169, np.r_[hours, hours], [25.0] * 169 + [10.0] * 169,
+                  ["Wall"] * 338))
+    times, strengths = element_curves(state, curve)["Wall"]
+    cool = strength(10.0 * times / 3600.0, curve)
+    np.testing.assert_allclose(strengths, cool)
+    reached = time_to_strength(times, strengths, 15.0)
+    assert 0 < reached < times[-1]
+    assert np.isnan(time_to_strength(times, strengths, 100.0))
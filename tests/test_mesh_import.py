@@ -0,0 +1,86 @@
+import io
+
+import numpy as np
+import pytest
+
+from concrete_calc import mesh_import
+from concrete_calc.mesh_import import STL_FACET, TriangleMesh, preview_mesh, read_mesh
+
+# A 2 x 3 x 4 box (volume 24) as 8 corners and 6 outward-facing quads.
+BOX_VERTICES = np.array([[0, 0, 0], [2, 0, 0], [2, 3, 0], [0, 3, 0],
+                         [0, 0, 4], [2, 0, 4], [2, 3, 4], [0, 3, 4]], dtype=float)
+BOX_QUADS = [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]
+BOX_TRIANGLES = np.array([t for a, b, c, d in BOX_QUADS for t in ((a, b, c), (a, c, d))])
+
+
+def binary_stl(corners):
+    facets = np.zeros(len(corners), dtype=STL_FACET)
+    facets["corners"] = corners
+    return b"\0" * 80 + np.uint32(len(corners)).tobytes() + facets.tobytes()
+
+
+def ascii_stl(corners):
+    lines = ["solid box"]
+    for tri in corners:
+        lines += ["  facet normal 0 0 0", "    outer loop"]
+        lines += [f"\tvertex {x:g} {y:g}  {z:g}" for x, y, z in tri]
+        lines += ["    endloop", "  endfacet"]
+    return ("\r\n".join(lines + ["endsolid box"]) + "\r\n").encode()
+
+
+def box_obj():
+    lines = ["# box", "o box"] + [f"v {x:g} {y:g} {z:g}" for x, y, z in BOX_VERTICES] + ["vt 0 0", "vn 0 0 1"]
+    # Quads with v/vt/vn references; the last two count back from the end.
+    lines += ["f " + " ".join(f"{i + 1}/1/1" for i in quad) for quad in BOX_QUADS[:4]]
+    lines += ["f " + " ".join(str(i - 8) for i in quad) for quad in BOX_QUADS[4:]]
+    return "\n".join(lines).encode()
+
+
+@pytest.mark.parametrize("name, data", [
+    ("box.stl", binary_stl(BOX_VERTICES[BOX_TRIANGLES].astype(np.float32))),
+    ("box.stl", ascii_stl(BOX_VERTICES[BOX_TRIANGLES])),
+    ("box.obj", box_obj()),
+])
+def test_box_volume(name, data):
+    props = read_mesh(io.BytesIO(data), name, scale=0.5)
+    assert props["volume"] == pytest.approx(24 * 0.125)
+    assert props["area"] == pytest.approx(2 * (6 + 8 + 12) * 0.25)
+    assert props["closed"] and props["triangles"] == 12
+    np.testing.assert_allclose(props["bbox_max"], [1, 1.5, 2])
+
+
+def test_file_path_and_small_blocks(tmp_path, monkeypatch):
+    path = tmp_path / "box.stl"
+    path.write_bytes(ascii_stl(BOX_VERTICES[BOX_TRIANGLES]))
+    assert read_mesh(path)["volume"] == pytest.approx(24)
+    # Lines split across read blocks are stitched back together.
+    monkeypatch.setattr(mesh_import._line_blocks, "__defaults__", (7,))
+    obj = tmp_path / "box.obj"
+    obj.write_bytes(box_obj())
+    assert read_mesh(obj)["volume"] == pytest.approx(24)
+
+
+@pytest.mark.parametrize("name, data", [
+    ("box.stl", b"not a mesh"),
+    ("box.stl", b"solid x\nvertex 1 2\nendsolid x\n"),
+    ("box.obj", b"v 0 0 0\nv 1 0 0\nf 1 2\n"),
+    ("box.obj", b"v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 9\n"),
+    ("box.obj", b"v 0 zero 0\n"),
+    ("box.ply", b"ply\n"),
+])
+def test_malformed_files_are_refused(name, data):
+    with pytest.raises(ValueError):
+        read_mesh(io.BytesIO(data), name)
+
+
+def test_preview_is_bounded():
+    # A 200 x 100 grid of unit squares (40,000 triangles).
+    x, y = np.meshgrid(np.arange(201.0), np.arange(101.0), indexing="ij")
+    vertices = np.stack([x.ravel(), y.ravel(), np.zeros(x.size)], axis=1)
+    cell = (np.arange(200)[:, None] * 101 + np.arange(100)).ravel()
+    faces = np.concatenate([np.stack([cell, cell + 101, cell + 102], 1), np.stack([cell, cell + 102, cell + 1], 1)])
+    mesh = TriangleMesh(vertices=vertices, faces=faces)
+    pts, tris = preview_mesh(mesh, vertices.min(0), vertices.max(0), 20_000.0, max_triangles=2_000)
+    assert 200 <= len(tris) <= 2_000
+    assert tris.max() < len(pts)
+    np.testing.assert_allclose(pts.max(0)[:2], [200, 100], atol=10)
@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+from concrete_calc import metrics
+
+
+def test_profiling_is_opt_in(monkeypatch):
+    monkeypatch.delenv(metrics.PROFILE_ENV, raising=False)
+    assert not metrics.profiling_requested(None)
+    assert metrics.profiling_requested("1") and metrics.profiling_requested("True")
+    monkeypatch.setenv(metrics.PROFILE_ENV, "1")
+    assert metrics.profiling_requested(None)
+
+
+def test_sections_attribute_profiled_calls_to_their_recorder():
+    square = metrics.profiled("square")(lambda x: x * x)
+    assert square(3) == 9  # no recorder: nothing to attribute to
+    recorder = metrics.Recorder()
+    recorder.start_run()
+    with metrics.section("page", recorder):
+        assert metrics.active()
+        square(4)
+        metrics.record_size("pdf", 1234)
+    recorder.end_run()
+    assert not metrics.active()
+    assert [(e["kind"], e["name"]) for e in recorder.events] == [
+        ("call", "square"), ("payload", "pdf"), ("section", "page"), ("run", "full page")]
+    assert recorder.last("payload", "pdf")["bytes"] == 1234
+    rows = {(r["Kind"], r["Name"]): r for r in recorder.summary_rows()}
+    assert rows[("payload", "pdf")]["Last (ms)"] is None and rows[("call", "square")]["Count"] == 1
+    assert len(json.loads(recorder.to_json())) == 4
+    assert len(list(csv.DictReader(io.StringIO(recorder.to_csv())))) == 4
+
+
+def test_event_log_is_bounded():
+    recorder = metrics.Recorder(max_events=3)
+    for i in range(5):
+        recorder.record("call", f"f{i}", ms=1.0)
+    assert [e["name"] for e in recorder.events] == ["f2", "f3", "f4"]
+
+
+def test_estimate_bytes_counts_buffers_and_containers():
+    array = np.zeros(1000)
+    assert metrics.estimate_bytes(array) == 8000
+    assert metrics.estimate_bytes({"a": array, "b": [array, b"x" * 100]}) > 8100
+    assert metrics.estimate_bytes([array, array]) < 2 * 8000  # shared objects count once
@@ -0,0 +1,49 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from concrete_calc import optimizer
+from concrete_calc.engine import METRIC, UNIT_SYSTEMS
+
+DENSITIES = UNIT_SYSTEMS[METRIC]["densities"]
+PRICES = {"cement": 0.2, "sand": 0.02, "stone": 0.03, "water": 0.001}
+SPACE = {"c_ratio": 1.0, "s_ratio": [1.5, 2.0, 2.5], "a_ratio": [3.0, 4.0], "wc_ratio": [0.45, 0.5, 0.55]}
+
+
+def test_grid_search_matches_brute_force():
+    result = optimizer.optimize_mix(1.0, SPACE, PRICES, DENSITIES, METRIC, top=3, chunk_size=4)
+    assert result["evaluated"] == optimizer.space_size(SPACE) == 18
+    brute = []
+    for s, a, wc in itertools.product(SPACE["s_ratio"], SPACE["a_ratio"], SPACE["wc_ratio"]):
+        fixed = {"c_ratio": 1.0, "s_ratio": s, "a_ratio": a, "wc_ratio": wc}
+        cols = optimizer.candidates(optimizer._axes(fixed), 0, 1)
+        brute.append(float(optimizer.evaluate(cols, 1.0, DENSITIES, PRICES, METRIC)["cost"][0]))
+    assert result["best"]["cost"] == pytest.approx(sorted(brute)[:3])
+    assert list(result["best"]["cost"]) == sorted(result["best"]["cost"])
+
+
+def test_constraints_filter_candidates():
+    loose = optimizer.optimize_mix(1.0, SPACE, PRICES, DENSITIES, METRIC)
+    strict = optimizer.optimize_mix(1.0, SPACE, PRICES, DENSITIES, METRIC, constraints={"wc_max": 0.45})
+    assert strict["feasible"] == 6 < loose["feasible"]
+    assert (strict["best"]["wc_ratio"] <= 0.45).all()
+    none = optimizer.optimize_mix(1.0, SPACE, PRICES, DENSITIES, METRIC, constraints={"min_cement": 1e9})
+    assert none["feasible"] == 0 and len(none["best"]["cost"]) == 0
+
+
+def test_random_search_is_reproducible_and_in_range():
+    space = {"s_ratio": (1.5, 2.5), "a_ratio": [3.0, 4.0]}
+    runs = [optimizer.optimize_mix(1.0, space, PRICES, DENSITIES, METRIC, samples=1000, chunk_size=300, seed=7)
+            for _ in range(2)]
+    assert runs[0]["evaluated"] == 1000
+    np.testing.assert_array_equal(runs[0]["best"]["cost"], runs[1]["best"]["cost"])
+    assert ((runs[0]["best"]["s_ratio"] >= 1.5) & (runs[0]["best"]["s_ratio"] <= 2.5)).all()
+
+
+def test_sensitivity_reports_cost_changes():
+    mix = {k: v[0] for k, v in optimizer.optimize_mix(1.0, SPACE, PRICES, DENSITIES, METRIC)["best"].items()}
+    rows = {r["parameter"]: r for r in optimizer.sensitivity(mix, 1.0, DENSITIES, PRICES, METRIC)}
+    assert set(rows) == set(optimizer.PARAMETERS)
+    # More cement per part costs more; less costs less.
+    assert rows["c_ratio"]["cost_change_high"] > 0 > rows["c_ratio"]["cost_change_low"]
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from concrete_calc.geometry import prism_mesh
+from concrete_calc.pdf_vector import draw_mesh, finite_mesh, project_isometric
+
+fpdf = pytest.importorskip("fpdf")
+
+
+def page():
+    pdf = fpdf.FPDF()
+    pdf.add_page()
+    return pdf
+
+
+def test_closed_prism_culls_back_faces():
+    points, order, shade, edges, _ = project_isometric(*prism_mesh(1, 2, 3))
+    assert len(order) == 6
+    assert len(edges) == 9
+    assert ((shade > 0) & (shade <= 1)).all()
+
+
+def test_non_finite_vertices_are_skipped():
+    vertices, triangles = prism_mesh(1, 2, 3)
+    vertices = np.array(vertices, dtype=float)
+    vertices[0] = np.nan
+    kept, faces = finite_mesh(vertices, triangles)
+    assert np.isfinite(kept).all() and faces.max() < len(kept)
+    pdf = page()
+    assert draw_mesh(pdf, vertices, triangles, 40, 20, 130, 80) > 0
+    assert b"nan" not in pdf.output(dest="S").encode("latin-1")
+
+
+def test_empty_mesh_draws_nothing():
+    pdf = page()
+    assert draw_mesh(pdf, np.zeros((0, 3)), np.zeros((0, 3), dtype=int), 40, 20, 130, 80) == 0
+    assert draw_mesh(pdf, np.full((3, 3), np.nan), [[0, 1, 2]], 40, 20, 130, 80) == 0
+
+
+def test_faces_use_the_public_polygon_call_when_fpdf_has_one():
+    calls = []
+
+    class PolygonPDF(fpdf.FPDF):
+        def polygon(self, points, style=None):
+            calls.append((len(points), style))
+
+    pdf = PolygonPDF()
+    pdf.add_page()
+    drawn = draw_mesh(pdf, *prism_mesh(1, 2, 3), 40, 20, 130, 80)
+    assert calls == [(3, "DF")] * drawn
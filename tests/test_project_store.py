@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from concrete_calc.project_store import ProjectStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProjectStore(str(tmp_path / "projects.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_shaped_elements_keep_their_volume(store):
+    project = store.create_project("Tower")
+    store.add_elements(project, {
+        "element_id": np.array(["C1", "B1", "S1"], dtype=object),
+        "shape": np.array(["cylinder", None, "polygon"], dtype=object),
+        "diameter": np.array([0.5, np.nan, np.nan]),
+        "length": np.array([np.nan, 2.0, np.nan]),
+        "width": np.array([np.nan, 0.3, np.nan]),
+        "height": np.array([3.0, 0.4, 0.2]),
+        "outline": np.array([None, None, "0 0; 6 0; 6 4; 0 4"], dtype=object),
+        "openings": np.array([None, None, "1 1; 2 1; 2 2; 1 2"], dtype=object),
+    })
+    store.recompute(project)
+    q = store.element_quantities(project)
+    assert q["wet_volume"].tolist() == pytest.approx([0.589049, 0.24, 4.6], rel=1e-5)
+    # Stored dimensions are the bounding box, not a volume source.
+    assert q["length"][0] == pytest.approx(0.5)
+    assert store.rollups(project, ())["wet_volume"][0] == pytest.approx(0.589049 + 0.24 + 4.6, rel=1e-5)
+
+
+def test_edits_recompute_only_stale_elements(store):
+    project = store.create_project("Yard")
+    store.add_elements(project, {"length": np.array([1.0, 2.0]), "width": np.ones(2), "height": np.ones(2)})
+    store.recompute(project)
+    assert store.stale_count(project) == 0
+    pk = int(store.element_quantities(project)["id"][1])
+    store.update_elements([pk], height=3.0)
+    assert store.stale_count(project) == 1
+    store.recompute(project)
+    assert store.rollups(project, ())["wet_volume"][0] == pytest.approx(7.0)
+
+
+def test_unusable_elements_are_refused(store):
+    project = store.create_project("Bad")
+    with pytest.raises(ValueError):
+        store.add_elements(project, {"shape": np.array(["cylinder"], dtype=object), "height": np.array([3.0])})
+    assert store.element_quantities(project)["id"].size == 0
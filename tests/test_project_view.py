@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from concrete_calc import project_view
+
+
+def elements(n, types=("Beam", "Column")):
+    rng = np.random.default_rng(0)
+    return {
+        "length": rng.uniform(1, 5, n), "width": rng.uniform(0.2, 1, n), "height": rng.uniform(0.2, 3, n),
+        "element_type": np.array([types[i % len(types)] for i in range(n)], dtype=object),
+        "wet_volume": rng.uniform(0.1, 2, n),
+    }
+
+
+def test_small_projects_draw_every_element():
+    vertices, triangles, face_values, labels, info = project_view.project_mesh(elements(10))
+    assert info["detail"] == "elements" and info["triangles"] == 10 * 12
+    assert labels == ["Beam", "Column"] and set(face_values) == {0.0, 1.0}
+    assert triangles.max() < len(vertices)
+
+
+def test_large_projects_cluster_into_bounded_boxes():
+    data = elements(2000)
+    _, _, face_values, labels, info = project_view.project_mesh(data, color_by="wet_volume", max_elements=100)
+    assert labels is None
+    assert info["detail"] == "clustered bounding boxes" and info["boxes"] <= 100
+    # Numeric values are summed per box, so the project total survives clustering.
+    assert face_values.sum() / 12 == pytest.approx(data["wet_volume"].sum())
+
+
+def test_every_category_gets_its_own_colour():
+    for k in (1, 10, 20, 35, 200):
+        colors = project_view.category_colors(k)
+        assert len(colors) == k and len(set(colors)) == k
+    assert project_view.category_colors(3) == project_view.CATEGORY_COLORS[:3]
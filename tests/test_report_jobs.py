@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from concrete_calc.report_jobs import DONE, FAILED, QUEUED, QueueFull, ReportJobs
+
+
+def wait(jobs, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while jobs.status(job_id)["state"] not in (DONE, FAILED):
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return jobs.status(job_id)
+
+
+@pytest.fixture
+def jobs():
+    pool = ReportJobs(workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_result_and_progress(jobs):
+    def render(n, progress):
+        progress(0.5, "half way")
+        return n * 2
+
+    job_id = jobs.submit(render, 21)
+    status = wait(jobs, job_id)
+    assert status["state"] == DONE and status["progress"] == 1.0
+    assert jobs.result(job_id) == 42
+    assert jobs.status("missing") is None and jobs.result("missing") is None
+
+
+def test_failure_is_reported_and_retried(jobs):
+    def broken(progress):
+        raise RuntimeError("no fonts")
+
+    job_id = jobs.submit(broken, key="k")
+    status = wait(jobs, job_id)
+    assert status["state"] == FAILED and "no fonts" in status["error"]
+    assert jobs.result(job_id) is None
+    # A failed run is not reused.
+    assert jobs.submit(lambda progress: 1, key="k") != job_id
+
+
+def test_same_key_shares_a_run_and_queue_is_bounded(jobs):
+    release = threading.Event()
+
+    def blocked(progress):
+        release.wait(5)
+        return "pdf"
+
+    first = jobs.submit(blocked, key="a")
+    assert jobs.submit(blocked, key="a") == first
+    # Wait for the only worker to pick up the first job, then fill the queue.
+    while jobs.status(first)["state"] == QUEUED:
+        time.sleep(0.01)
+    queued = jobs.submit(blocked, key="b")
+    assert jobs.status(queued)["position"] == 0
+    with pytest.raises(QueueFull):
+        jobs.submit(blocked, key="c")
+    release.set()
+    assert wait(jobs, queued)["state"] == DONE
+    assert jobs.stats()[DONE] == 2
+
+
+def test_finished_jobs_expire():
+    pool = ReportJobs(workers=1, keep_seconds=0)
+    try:
+        job_id = pool.submit(lambda progress: 1, key="k")
+        wait(pool, job_id)
+        time.sleep(0.01)
+        assert pool.stats()[DONE] == 0
+        assert pool.status(job_id) is None
+        assert pool.submit(lambda progress: 2, key="k") != job_id
+    finally:
+        pool.shutdown()
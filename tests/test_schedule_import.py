@@ -0,0 +1,71 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from concrete_calc.engine import IMPERIAL, METRIC
+from concrete_calc.schedule_import import normalise_chunk, process_schedule, validate_chunk
+
+SCHEDULE = b"""Mark,Type,L,W,H,Mix,Units
+B1,Beam,2,0.3,0.4,1:2:4,metric
+B2,Beam,2000,300,400,1:2:4,mm
+S1,Slab,5,5,0.2,1/1.5/3,
+C1,Column,1,1,10,1:2:4,imperial
+X1,Bad,0,1,1,1:2:4,metric
+"""
+
+
+def run(data, **kwargs):
+    for computed, totals, fraction in process_schedule(io.BytesIO(data), **kwargs):
+        pass
+    return computed, totals
+
+
+def test_headers_mix_and_units_are_normalised():
+    chunk = normalise_chunk(pd.read_csv(io.BytesIO(SCHEDULE)))
+    assert {"element_id", "element_type", "length", "c_ratio", "s_ratio", "a_ratio", "unit_system"} <= set(chunk)
+    assert chunk["s_ratio"].tolist() == [2, 2, 1.5, 2, 2]
+    assert chunk["unit_system"].tolist() == [METRIC, METRIC, METRIC, IMPERIAL, METRIC]
+
+
+def test_millimetres_are_scaled_to_metres():
+    chunk = normalise_chunk(pd.read_csv(io.BytesIO(SCHEDULE)))
+    assert chunk.loc[1, ["length", "width", "height"]].tolist() == pytest.approx([2.0, 0.3, 0.4])
+
+
+def test_millimetre_outlines_and_voids():
+    raw = pd.DataFrame({"shape": ["polygon"], "outline": ["0 0; 6000 0; 6000 4000; 0 4000"], "height": [200],
+                        "void_volume": [1e9], "units": ["mm"]})
+    chunk = normalise_chunk(raw)
+    assert chunk["void_volume"][0] == pytest.approx(1.0)
+    assert chunk["outline"][0].startswith("0.0 0.0; 6.0 0.0")
+
+
+def test_blank_units_take_the_default_system():
+    chunk = normalise_chunk(pd.read_csv(io.BytesIO(SCHEDULE)), unit_system=IMPERIAL)
+    assert chunk["unit_system"][2] == IMPERIAL
+    valid, errors = validate_chunk(chunk)
+    assert [e[0] for e in errors] == [4]
+    assert "length" in errors[0][1]
+
+
+def test_process_schedule_totals_per_unit_system():
+    computed, totals = run(SCHEDULE, chunksize=2)
+    assert totals.rows == 4 and totals.rejected == 1
+    by_type = totals.by_type()
+    assert by_type.loc[(METRIC, "Beam"), "count"] == 2
+    # The mm row computes exactly like its metre twin.
+    assert by_type.loc[(METRIC, "Beam"), "wet_volume"] == pytest.approx(0.48)
+    assert by_type.loc[(IMPERIAL, "Column"), "wet_volume"] == pytest.approx(10.0)
+
+
+def test_missing_required_columns():
+    with pytest.raises(ValueError, match="width"):
+        run(b"length,height\n1,1\n")
+
+
+def test_shaped_rows_are_validated_per_shape():
+    computed, totals = run(b"shape,diameter,height\ncylinder,0.5,3\ncylinder,,3\n")
+    assert totals.rejected == 1
+    assert computed["wet_volume"].tolist() == pytest.approx([np.pi / 4 * 0.25 * 3])
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from concrete_calc.strength_model import (ALL_GROUP, CYLINDER_PER_CUBE, StrengthModel, check_wc, predict_strength,
+                                          wc_for_strength)
+
+A, B, C = 150.0, 8.0, 0.2
+
+
+def results(wc, age, cement="CEM I", specimen="cylinder"):
+    wc, age = np.broadcast_arrays(np.asarray(wc, dtype=float), np.asarray(age, dtype=float))
+    strength = A / B ** wc * (age / 28) ** C
+    if specimen == "cube":
+        strength = strength / CYLINDER_PER_CUBE
+    return pd.DataFrame({"w/c": wc, "fc (MPa)": strength, "age": age, "specimen": specimen,
+                         "cement": cement, "quarry": "North"})
+
+
+def fitted(*frames):
+    model = StrengthModel()
+    for frame in frames:
+        model.add(frame)
+    return model, model.fit()
+
+
+def test_recovers_abrams_law_across_ages():
+    model, fit = fitted(results([0.4, 0.5, 0.6, 0.4, 0.5, 0.6], [7, 7, 7, 28, 28, 28]))
+    i = list(fit["group"]).index("CEM I / North")
+    assert fit["A"][i] == pytest.approx(A)
+    assert fit["B"][i] == pytest.approx(B)
+    assert fit["c"][i] == pytest.approx(C)
+    assert predict_strength(fit, 0.45, 56)[i] == pytest.approx(A / B ** 0.45 * 2 ** C)
+    assert wc_for_strength(fit, A / B ** 0.5)[i] == pytest.approx(0.5)
+
+
+def test_cubes_are_converted_and_pooled():
+    model, fit = fitted(results([0.4, 0.6], 28), results([0.45, 0.55], 28, cement="CEM II", specimen="cube"))
+    assert model.rows == 4
+    pooled = list(fit["group"]).index(ALL_GROUP)
+    assert fit["n"][pooled] == 4
+    assert fit["A"][pooled] == pytest.approx(A)
+
+
+def test_single_age_fit_does_not_extrapolate():
+    _, fit = fitted(results([0.4, 0.5, 0.6], 7))
+    i = list(fit["group"]).index("CEM I / North")
+    # The intercept holds at the tested age; other ages have no estimate.
+    assert predict_strength(fit, 0.5, 7)[i] == pytest.approx(A / B ** 0.5 * 0.25 ** C)
+    assert np.isnan(predict_strength(fit, 0.5, 28)[i])
+    assert np.isnan(wc_for_strength(fit, 30.0, 28)[i])
+
+
+def test_single_age_at_28_days():
+    _, fit = fitted(results([0.4, 0.5, 0.6], 28))
+    i = list(fit["group"]).index("CEM I / North")
+    assert fit["c"][i] == 0
+    assert predict_strength(fit, 0.5)[i] == pytest.approx(A / B ** 0.5)
+
+
+def test_single_wc_has_no_slope():
+    _, fit = fitted(results([0.5, 0.5], [7, 28]))
+    assert np.isnan(fit["b"]).all()
+
+
+def test_save_load_keeps_adding():
+    model, _ = fitted(results([0.4, 0.5], 7))
+    again = StrengthModel.load(model.to_bytes())
+    again.add(results([0.6], 7))
+    assert again.rows == 3
+    _, fit = fitted(results([0.4, 0.5, 0.6], 7))
+    np.testing.assert_allclose(again.fit()["a"], fit["a"])
+
+
+def test_check_wc():
+    _, fit = fitted(results([0.4, 0.5, 0.6, 0.4, 0.5, 0.6], [7, 7, 7, 28, 28, 28]))
+    check = check_wc(fit, "CEM I / North", 0.5, 30.0)
+    assert check["predicted"] == pytest.approx(A / B ** 0.5)
+    assert check["ok"] and not check["extrapolated"]
+    assert check["suggested_wc"] == pytest.approx(np.log(A / 30.0) / np.log(B))
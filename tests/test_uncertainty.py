@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from concrete_calc import uncertainty
+from concrete_calc.engine import compute_from_volume
+
+INPUTS = {"dens_c": 1440.0, "dens_s": 1600.0, "dens_a": 1450.0, "dry_factor": 1.54, "wastage_percent": 5.0}
+
+
+def test_sketch_quantiles_stay_within_the_relative_error():
+    values = np.random.default_rng(1).lognormal(3.0, 1.0, 200_000)
+    sketch = uncertainty.QuantileSketch(accuracy=0.01)
+    for part in np.array_split(values, 7):
+        sketch.add(part)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        exact = np.quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.0101 * exact
+    assert sketch.mean == pytest.approx(values.mean())
+
+
+def test_sketches_merge_like_one_sketch():
+    a, b, whole = (uncertainty.QuantileSketch() for _ in range(3))
+    a.add([0.0, 1.0, 2.0])
+    b.add([1000.0, 5.0])
+    whole.add([0.0, 1.0, 2.0, 1000.0, 5.0])
+    merged = a.merge(b)
+    np.testing.assert_array_equal(merged.quantile([0, 0.5, 1]), whole.quantile([0, 0.5, 1]))
+    assert merged.quantile(0) == 0.0 and merged.quantile(1) == pytest.approx(1000.0, rel=merged.accuracy)
+    assert np.isnan(uncertainty.QuantileSketch().quantile(0.5))
+    with pytest.raises(ValueError):
+        a.merge(uncertainty.QuantileSketch(accuracy=0.01))
+
+
+def test_fixed_inputs_reproduce_the_point_estimate():
+    point = compute_from_volume(2.0, 1, 2, 4, *INPUTS.values(), 0.5)
+    result = uncertainty.simulate_quantities(2.0, 1, 2, 4, 0.5, INPUTS, draws=1000, batch=300)
+    assert result["draws"] == 1000
+    for name in uncertainty.TRACKED:
+        assert result[name]["P50"] == pytest.approx(float(point[name]), rel=2e-3)
+        assert result[name]["P10"] == result[name]["P90"]
+
+
+def test_spread_widens_the_band_symmetrically():
+    inputs = {**INPUTS, "dens_c": uncertainty.spread(1440.0, 0.05)}
+    result = uncertainty.simulate_quantities(2.0, 1, 2, 4, 0.5, inputs, draws=50_000, seed=3)
+    c = result["weight_c"]
+    assert c["P10"] < c["P50"] < c["P90"]
+    assert c["P90"] - c["P50"] == pytest.approx(c["P50"] - c["P10"], rel=0.05)
+    assert uncertainty.spread(10.0, 0) == ("fixed", 10.0)
+    with pytest.raises(ValueError):
+        uncertainty.spread(10.0, 0.1, "cauchy")